@@ -1,7 +1,6 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
@@ -11,6 +10,7 @@ from django.core.exceptions import ValidationError
 import re
 
 from .serializers import UserSerializer
+from .authentication import obtain_token, revoke_token
 
 
 class LoginView(APIView):
@@ -46,8 +46,8 @@ class LoginView(APIView):
         if user:
             # 检查用户账户是否激活
             if user.is_active:
-                # 获取或创建用户的认证token
-                token, created = Token.objects.get_or_create(user=user)
+                # 获取用户的认证token（过期则换发新token），并写入认证缓存
+                token = obtain_token(user)
                 # 返回成功响应，包含token和用户序列化数据
                 return Response({
                     'success': True,
@@ -179,8 +179,8 @@ class LogoutView(APIView):
     
     def post(self, request):
         try:
-            # 删除用户的token
-            request.user.auth_token.delete()
+            # 删除用户的token并清除认证缓存
+            revoke_token(request.user)
             return Response({
                 'success': True,
                 'message': '登出成功'
@@ -238,8 +238,8 @@ class ChangePasswordView(APIView):
             request.user.set_password(new_password)
             request.user.save()
             
-            # 删除旧token，强制重新登录
-            request.user.auth_token.delete()
+            # 删除旧token并清除认证缓存，强制重新登录
+            revoke_token(request.user)
             
             return Response({
                 'success': True,
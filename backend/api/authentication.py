@@ -0,0 +1,154 @@
+"""
+Token 认证
+
+设计思路：
+1. CachedTokenAuthentication 替代 DRF 的 TokenAuthentication：解析后的 Token（含用户对象）
+   缓存在进程内 LRU 中，命中时不再执行 Token + User 联表查询
+2. 解析时同时预热 api.roles 的用户组缓存，后续权限判断同样不访问数据库
+3. Token 过期：Token.created 记录最近一次续期时间，超过 EXPIRE_AFTER 未使用即失效
+4. 滑动续期：使用中的 Token 距上次续期超过 REFRESH_INTERVAL 时更新 created（节流，避免每个请求都写库）
+5. 登出、修改密码、用户信息变化时通过 revoke_token / invalidate_* 使缓存失效；
+   多进程部署时其他 worker 依赖 CACHE_TIMEOUT 收敛，因此缓存时间应保持较短
+"""
+
+import copy
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .cache import LRUCache
+from .roles import role_cache
+
+TOKEN_AUTH = {
+    # Token 闲置多久后过期（秒），None 表示永不过期
+    'EXPIRE_AFTER': 7 * 24 * 3600,
+    # 滑动续期的最小间隔（秒）
+    'REFRESH_INTERVAL': 3600,
+    # 进程内缓存有效期（秒）和最大条目数
+    'CACHE_TIMEOUT': 60,
+    'CACHE_MAX_ENTRIES': 10000,
+    **getattr(settings, 'TOKEN_AUTH', {}),
+}
+
+
+class CachedToken:
+    """缓存条目：Token 快照和对应用户"""
+
+    __slots__ = ('key', 'user', 'refreshed_at')
+
+    def __init__(self, key, user, refreshed_at):
+        self.key = key
+        self.user = user
+        self.refreshed_at = refreshed_at
+
+
+# 进程内 Token 缓存：{token key: CachedToken}
+token_cache = LRUCache(TOKEN_AUTH['CACHE_TIMEOUT'], TOKEN_AUTH['CACHE_MAX_ENTRIES'])
+
+
+def get_expire_after():
+    seconds = TOKEN_AUTH['EXPIRE_AFTER']
+    return None if seconds is None else timedelta(seconds=seconds)
+
+
+def is_token_expired(refreshed_at, now=None):
+    """Token 是否已超过闲置有效期"""
+    expire_after = get_expire_after()
+    if expire_after is None:
+        return False
+    return (now or timezone.now()) - refreshed_at > expire_after
+
+
+def cache_token(token, user):
+    """将 Token 和用户写入进程内缓存"""
+    entry = CachedToken(token.key, user, token.created)
+    token_cache.set(token.key, entry)
+    return entry
+
+
+def obtain_token(user):
+    """
+    登录时获取用户的 Token
+
+    已有未过期的 Token 时续期后复用，已过期则换发新 Token；结果直接写入缓存，
+    登录后的第一个请求也不需要查询 Token。
+    """
+    now = timezone.now()
+    token = Token.objects.filter(user=user).first()
+
+    if token is not None and is_token_expired(token.created, now):
+        token.delete()
+        token = None
+
+    if token is None:
+        token = Token.objects.create(user=user)
+    else:
+        Token.objects.filter(key=token.key).update(created=now)
+        token.created = now
+
+    cache_token(token, user)
+    return token
+
+
+def revoke_token(user):
+    """删除用户的 Token 并清除缓存（登出、修改密码）"""
+    invalidate_user_tokens(user.pk)
+    Token.objects.filter(user=user).delete()
+
+
+def invalidate_token(key):
+    token_cache.invalidate(key)
+
+
+def invalidate_user_tokens(user_id):
+    """清除指定用户的全部缓存 Token（用户信息变化后调用）"""
+    token_cache.invalidate_where(lambda key, entry: entry.user.pk == user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    带进程内缓存、过期和滑动续期的 Token 认证
+
+    请求头格式与 TokenAuthentication 相同：Authorization: Token <key>
+    """
+
+    def authenticate_credentials(self, key):
+        now = timezone.now()
+        entry = token_cache.get(key)
+
+        if entry is None:
+            entry = self.load_token(key)
+
+        if is_token_expired(entry.refreshed_at, now):
+            invalidate_token(key)
+            Token.objects.filter(key=key).delete()
+            raise exceptions.AuthenticationFailed('Token 已过期，请重新登录')
+
+        if now - entry.refreshed_at >= timedelta(seconds=TOKEN_AUTH['REFRESH_INTERVAL']):
+            Token.objects.filter(key=key).update(created=now)
+            entry.refreshed_at = now
+
+        # 每个请求使用独立的用户对象，避免视图中的修改影响缓存
+        return copy.copy(entry.user), key
+
+    def load_token(self, key):
+        """缓存未命中：联表加载 Token 和用户，并预取用户组"""
+        try:
+            token = (
+                Token.objects.select_related('user')
+                .prefetch_related('user__groups')
+                .get(key=key)
+            )
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('无效的 Token')
+
+        user = token.user
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('账户已被禁用')
+
+        role_cache.set(user.pk, frozenset(group.name for group in user.groups.all()))
+        return cache_token(token, user)
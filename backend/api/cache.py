@@ -0,0 +1,265 @@
+"""
+API 缓存层
+
+设计思路：
+1. 模型版本号：每个模型在缓存中维护一个版本号，写入时递增，
+   所有依赖该模型的缓存键都带上版本号，版本变化即自动失效（无需逐个删除键）
+2. 响应缓存：cache_response 装饰器按接口缓存 GET 响应，可在 settings.API_RESPONSE_CACHE 中按接口配置
+3. ETag：缓存时计算响应内容摘要，客户端携带 If-None-Match 且未变化时返回 304
+4. 监控：进程内记录每个接口的命中/未命中次数
+   读取只读副本（@replica_read）的接口按实际读取的库区分缓存键；副本的数据可能落后于主库中已递增的版本号，
+   副本响应只缓存 REPLICA_TIMEOUT 秒（默认 REPLICA_STICKY_SECONDS），避免复制延迟期间的旧数据按新版本号缓存整个有效期
+5. 进程内 LRU 缓存：热点路径（Token 认证、角色解析）使用带过期时间和容量上限的 LRUCache，
+   不经过缓存后端，命中时没有任何 I/O
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework.response import Response
+
+from .db_router import PRIMARY_ALIAS, REPLICA_ALIAS, should_use_replica
+
+
+# ==================== 模型版本号 ====================
+
+def _model_version_key(model):
+    return f'model_version:{model._meta.label_lower}'
+
+
+def get_model_version(model):
+    """获取模型缓存版本号"""
+    return cache.get_or_set(_model_version_key(model), 1, timeout=None)
+
+
+def bump_model_version(model):
+    """
+    递增模型缓存版本号，使依赖该模型的所有缓存失效
+
+    post_save / post_delete 信号中自动调用；
+    bulk_create / update() 等不触发信号的批量写入需手动调用。
+    """
+    key = _model_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+# ==================== 命中统计 ====================
+
+class CacheStats:
+    """进程内的缓存命中统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {'hits': 0, 'misses': 0, 'not_modified': 0})
+
+    def record(self, endpoint, outcome):
+        with self._lock:
+            self._counters[endpoint][outcome] += 1
+
+    def snapshot(self):
+        """返回各接口的计数及命中率"""
+        with self._lock:
+            result = {}
+            for endpoint, counters in self._counters.items():
+                hits = counters['hits'] + counters['not_modified']
+                total = hits + counters['misses']
+                result[endpoint] = {
+                    **counters,
+                    'hit_rate': round(hits / total, 4) if total else 0.0,
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+cache_stats = CacheStats()
+
+
+# ==================== 进程内 LRU 缓存 ====================
+
+class LRUCache:
+    """
+    线程安全的进程内 LRU 缓存，条目带过期时间
+
+    超出容量时淘汰最久未访问的条目；过期条目在读取时删除。
+    """
+
+    def __init__(self, timeout, max_entries):
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """删除 predicate(key, value) 为真的条目"""
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# ==================== 响应缓存 ====================
+
+def get_endpoint_cache_config(endpoint):
+    """
+    读取接口的缓存配置
+
+    settings.API_RESPONSE_CACHE 示例：
+        {
+            'ENABLED': True,
+            'CACHE_ALIAS': 'default',
+            'DEFAULT_TIMEOUT': 60,
+            'REPLICA_TIMEOUT': 10,
+            'ENDPOINTS': {'salary_stats': {'timeout': 30, 'replica_timeout': 5, 'enabled': True}},
+        }
+    """
+    config = getattr(settings, 'API_RESPONSE_CACHE', {})
+    endpoint_config = config.get('ENDPOINTS', {}).get(endpoint, {})
+    return {
+        'enabled': config.get('ENABLED', True) and endpoint_config.get('enabled', True),
+        'alias': endpoint_config.get('cache_alias', config.get('CACHE_ALIAS', 'default')),
+        'timeout': endpoint_config.get('timeout', config.get('DEFAULT_TIMEOUT', 60)),
+        'replica_timeout': endpoint_config.get(
+            'replica_timeout', config.get('REPLICA_TIMEOUT', getattr(settings, 'REPLICA_STICKY_SECONDS', 10)),
+        ),
+    }
+
+
+def _build_etag(content):
+    return '"{}"'.format(hashlib.md5(content).hexdigest())
+
+
+def _etag_matches(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return etag in candidates or '*' in candidates
+
+
+def _cache_key(endpoint, request, models, vary_on_user, alias):
+    versions = '.'.join(str(get_model_version(model)) for model in models)
+    query = hashlib.md5(request.META.get('QUERY_STRING', '').encode('utf-8')).hexdigest()
+    user_part = request.user.pk if vary_on_user and request.user.is_authenticated else '-'
+    return f'api_response:{endpoint}:{alias}:{versions}:{user_part}:{query}'
+
+
+def _freeze_response(response):
+    """将响应转换为可缓存的数据（DRF Response 缓存 data，普通响应缓存 content）"""
+    if isinstance(response, Response):
+        content = json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')
+        return {'kind': 'drf', 'data': response.data, 'etag': _build_etag(content)}
+    return {
+        'kind': 'http',
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'etag': _build_etag(response.content),
+    }
+
+
+def _thaw_response(entry):
+    if entry['kind'] == 'drf':
+        return Response(entry['data'])
+    return HttpResponse(entry['content'], content_type=entry['content_type'])
+
+
+def cache_response(endpoint, models=(), vary_on_user=False):
+    """
+    接口响应缓存装饰器
+
+    用法（放在 @permission_classes 之下，权限检查仍在缓存之前执行）：
+        @api_view(['GET'])
+        @permission_classes([permissions.IsAuthenticated])
+        @cache_response('salary_stats', models=[SalaryRecord, Employee])
+        def salary_stats_view(request): ...
+
+    Args:
+        endpoint: 接口标识，用于配置和统计
+        models: 响应所依赖的模型，任一模型写入后缓存失效
+        vary_on_user: 是否按用户区分缓存
+
+    放在 @replica_read 之上时，读取副本和读取主库（刚写入过的用户、未配置副本）的请求使用不同的缓存键，
+    副本响应的缓存时间不超过 replica_timeout。
+    """
+    def decorator(view_func):
+        reads_replica = getattr(view_func, 'reads_replica', False)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            config = get_endpoint_cache_config(endpoint)
+            if request.method != 'GET' or not config['enabled']:
+                return view_func(request, *args, **kwargs)
+
+            backend = caches[config['alias']]
+            alias = REPLICA_ALIAS if reads_replica and should_use_replica(request) else PRIMARY_ALIAS
+            key = _cache_key(endpoint, request, models, vary_on_user, alias)
+            entry = backend.get(key)
+
+            if entry is None:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+                entry = _freeze_response(response)
+                timeout = config['timeout']
+                if getattr(response, 'read_from_replica', False):
+                    timeout = min(timeout, config['replica_timeout'])
+                backend.set(key, entry, timeout=timeout)
+                outcome = 'misses'
+            elif _etag_matches(request, entry['etag']):
+                cache_stats.record(endpoint, 'not_modified')
+                response = HttpResponseNotModified()
+                response['ETag'] = entry['etag']
+                return response
+            else:
+                response = _thaw_response(entry)
+                outcome = 'hits'
+
+            cache_stats.record(endpoint, outcome)
+            response['ETag'] = entry['etag']
+            response['X-Cache'] = 'HIT' if outcome == 'hits' else 'MISS'
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,126 @@
+"""
+数据库路由
+
+设计思路：
+1. 写操作始终使用主库（default）
+2. 只有显式进入 read_from_replica() 上下文的读操作才路由到只读副本，其余读操作仍走主库，
+   避免副本复制延迟影响普通业务读写
+3. 报表类只读接口使用 @replica_read 装饰器；流式响应在输出过程中同样读取副本
+4. 读写一致性：用户执行写请求后，PrimaryPinMiddleware 将该用户固定到主库 REPLICA_STICKY_SECONDS 秒，
+   期间 @replica_read 接口仍读取主库，保证用户能立即看到自己的修改
+5. 未配置副本（DATABASES 中没有 replica）或副本连接失败时回退到主库
+6. 副本不执行迁移，表结构由主库复制
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError
+from django.http import StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ALIAS = 'replica'
+PRIMARY_ALIAS = 'default'
+
+# 用户写入后固定读取主库的时间（秒）
+REPLICA_STICKY_SECONDS = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_configured():
+    """是否配置了只读副本"""
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def read_from_replica():
+    """在上下文内将读查询路由到只读副本（未配置副本时无效果）"""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+class ReadReplicaRouter:
+    """主库 / 只读副本路由"""
+
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and replica_configured():
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库数据相同，跨库关联视为同一数据库
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 副本不执行迁移，表结构由主库复制；测试配置中的独立副本库可通过 REPLICA_ALLOW_MIGRATE 建表
+        return db != REPLICA_ALIAS or getattr(settings, 'REPLICA_ALLOW_MIGRATE', False)
+
+
+# ==================== 读写一致性 ====================
+
+def _primary_pin_key(user_id):
+    return f'db_primary_pin:{user_id}'
+
+
+def pin_to_primary(user):
+    """用户写入后在 REPLICA_STICKY_SECONDS 秒内固定读取主库"""
+    if user is not None and user.is_authenticated:
+        cache.set(_primary_pin_key(user.pk), True, timeout=REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(_primary_pin_key(user.pk)))
+
+
+def should_use_replica(request):
+    """当前请求是否可以读取副本"""
+    return replica_configured() and not is_pinned_to_primary(getattr(request, 'user', None))
+
+
+def _stream_from_replica(chunks):
+    """流式响应在视图返回后才读取数据，输出过程中同样使用副本"""
+    with read_from_replica():
+        yield from chunks
+
+
+def replica_read(view_func):
+    """
+    只读视图装饰器：视图中的查询路由到只读副本
+
+    用在 @api_view / @permission_classes 之后（紧贴视图函数），此时 request.user 已完成认证。
+    副本未配置、用户刚写入过数据或副本连接失败时使用主库。
+    读取副本的响应带 read_from_replica 标记，cache_response 据此缩短缓存时间。
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not should_use_replica(request):
+            return view_func(request, *args, **kwargs)
+
+        try:
+            with read_from_replica():
+                response = view_func(request, *args, **kwargs)
+        except OperationalError:
+            logger.warning(f"只读副本不可用，{view_func.__name__} 回退到主库", exc_info=True)
+            return view_func(request, *args, **kwargs)
+
+        if isinstance(response, StreamingHttpResponse):
+            response.streaming_content = _stream_from_replica(response.streaming_content)
+        response.read_from_replica = True
+        return response
+
+    wrapper.reads_replica = True
+    return wrapper
@@ -0,0 +1,48 @@
+"""
+分批修复员工部门名称漂移
+
+用法：
+    python manage.py backfill_employee_departments                     # 每批 5000 名员工
+    python manage.py backfill_employee_departments --chunk-size 20000
+    python manage.py backfill_employee_departments --no-link           # 只同步名称，不按名称补关联
+
+按主键顺序分批执行基于子查询的 UPDATE，每批独立提交，中断后重新执行即可继续。
+部门名称有变化时会重建考勤汇总表。
+"""
+
+from django.core.management.base import BaseCommand
+
+from api.models import Employee
+from api.services.department_sync_service import DepartmentSyncService
+
+
+class Command(BaseCommand):
+    help = '同步员工的部门名称，并为未关联部门的员工按名称补关联'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DepartmentSyncService.DEFAULT_CHUNK_SIZE,
+            help='每批处理的员工数',
+        )
+        parser.add_argument('--no-link', action='store_true', help='不为未关联部门的员工补关联')
+
+    def handle(self, *args, **options):
+        total = Employee.objects.count()
+
+        def progress(processed, renamed, linked):
+            percent = processed / total * 100 if total else 100
+            self.stdout.write(
+                f'  {processed}/{total}（{percent:.1f}%）同步名称 {renamed}，补关联 {linked}'
+            )
+
+        stats = DepartmentSyncService().backfill(
+            chunk_size=options['chunk_size'],
+            link_unlinked=not options['no_link'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"回填完成：处理 {stats['processed']} 名员工，同步名称 {stats['renamed']}，"
+            f"补关联 {stats['linked']}，{stats['chunks']} 批，耗时 {stats['elapsed_seconds']}s"
+        ))
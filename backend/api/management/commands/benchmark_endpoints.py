@@ -0,0 +1,295 @@
+"""
+接口基准测试（确定性数据集）
+
+用法：
+    python manage.py benchmark_endpoints                                  # 临时测试库 + 10k 数据集
+    python manage.py benchmark_endpoints --dataset 100k --seed 7 --requests 20
+    python manage.py benchmark_endpoints --output bench.json
+    python manage.py benchmark_endpoints --baseline bench.json --tolerance 25   # 与基线对比，退化时退出码非 0
+    python manage.py benchmark_endpoints --only employee_list salary_list
+    python manage.py benchmark_endpoints --existing-data                  # 使用当前数据库中的数据，不生成数据
+
+默认与 manage.py test 一样创建临时测试数据库（SQLite / PostgreSQL 均可），按 seed 生成数据集
+（api.services.seed_data_service），用 Django 测试客户端依次请求每个接口，
+统计 p50 / p95 延迟、SQL 耗时和查询次数，结果以 JSON 输出，结束后删除临时数据库。
+写接口在事务中执行后回滚，每次请求面对的数据相同。
+--existing-data 只测试读接口（写接口会递增缓存版本号、标记仪表盘快照过期，这些不随事务回滚）；
+临时管理员账号及其 Token 在结束时删除。
+接口响应缓存默认关闭（测量未命中缓存的路径），--with-cache 时保留缓存配置。
+"""
+
+import json
+import statistics
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from api.metrics import RequestMetrics
+from api.models import Department, Employee, SalaryRecord, PayrollJob
+from api.services.seed_data_service import DATASETS, SeedDataGenerator
+
+from .benchmark_load import BENCHMARK_USERNAME, benchmark_token, percentile
+
+# 写接口使用的薪资期间（不与生成的数据重叠）
+WRITE_PERIOD = '2099-01'
+
+
+class Endpoint:
+    """一个被测接口"""
+
+    def __init__(self, name, path, method='GET', data=None, content_type='application/json', write=False):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.data = data
+        self.content_type = content_type
+        # 写接口在事务中执行后回滚
+        self.write = write
+
+    def body(self):
+        if self.data is None:
+            return ''
+        if isinstance(self.data, (bytes, str)):
+            return self.data
+        return json.dumps(self.data)
+
+
+def build_endpoints(employee, department, record, job):
+    """按数据集中的对象生成全部被测接口"""
+    import_csv = 'employee_id,name,gender,department,position,hire_date,base_salary\n' + ''.join(
+        f'BENCH{index:03d},基准{index},M,{department.name},工程师,2024-01-01,9000\n' for index in range(20)
+    )
+    attendance_ndjson = ''.join(
+        json.dumps({'employee_id': employee.employee_id, 'date': f'2099-01-{day:02d}',
+                    'check_in_time': '09:00', 'check_out_time': '18:00'}) + '\n'
+        for day in range(1, 21)
+    )
+    endpoints = [
+        Endpoint('api_info', '/api/'),
+        Endpoint('current_user', '/api/auth/user/'),
+        Endpoint('check_auth', '/api/auth/check/'),
+        Endpoint('dashboard_summary_stats', '/api/dashboard/summary-stats/'),
+        Endpoint('dashboard_department_distribution', '/api/dashboard/department-distribution/'),
+        Endpoint('cache_stats', '/api/cache/stats/'),
+        Endpoint('metrics', '/api/metrics/'),
+        Endpoint('department_list', '/api/departments/'),
+        Endpoint('department_detail', f'/api/departments/{department.pk}/'),
+        Endpoint('employee_list', '/api/employees/'),
+        Endpoint('employee_list_search', '/api/employees/?search=王'),
+        Endpoint('employee_list_cursor', '/api/employees/?cursor=&page_size=50'),
+        Endpoint('employee_detail', f'/api/employees/{employee.pk}/'),
+        Endpoint('employee_salary_history', f'/api/employees/{employee.employee_id}/salary/'),
+        Endpoint('salary_list', '/api/salaries/'),
+        Endpoint('salary_detail', f'/api/salaries/{record.pk}/'),
+        Endpoint('salary_print', f'/api/salaries/{record.pk}/print_view/'),
+        Endpoint('salary_stats', '/api/salaries/stats/'),
+        Endpoint('salary_export', '/api/salaries/export/'),
+        Endpoint('attendance_trends', '/api/attendance/trends/'),
+        Endpoint('department_create', '/api/departments/', 'POST',
+                 {'name': '基准测试部', 'code': 'BENCH'}, write=True),
+        Endpoint('department_update', f'/api/departments/{department.pk}/', 'PATCH',
+                 {'name': f'{department.name}（改名）'}, write=True),
+        Endpoint('employee_create', '/api/employees/', 'POST', {
+            'employee_id': 'BENCH-NEW', 'name': '基准员工', 'gender': 'F',
+            'department_ref': str(department.pk), 'position': '工程师',
+            'hire_date': '2024-01-01', 'base_salary': '9000.00',
+        }, write=True),
+        Endpoint('employee_update', f'/api/employees/{employee.pk}/', 'PATCH',
+                 {'position': '高级工程师'}, write=True),
+        Endpoint('employee_import', '/api/employees/import/', 'POST', import_csv, 'text/csv', write=True),
+        Endpoint('calculate_salary', '/api/salaries/calculate_and_create/', 'POST', {
+            'employee_id': employee.employee_id, 'salary_period': WRITE_PERIOD, 'bonus': '500', 'deductions': '100',
+        }, write=True),
+        Endpoint('calculate_salary_by_employee', f'/api/salaries/calculate/{employee.pk}/', 'POST',
+                 {'salary_period': WRITE_PERIOD, 'bonus': '500', 'deductions': '100'}, write=True),
+        Endpoint('generate_salaries', '/api/salaries/generate/', 'POST',
+                 {'salary_period': WRITE_PERIOD}, write=True),
+        Endpoint('attendance_ingest', '/api/attendance/ingest/', 'POST',
+                 attendance_ndjson, 'application/x-ndjson', write=True),
+    ]
+    if job is not None:
+        endpoints.append(Endpoint('payroll_job_detail', f'/api/salaries/jobs/{job.pk}/'))
+    return endpoints
+
+
+@contextmanager
+def rolled_back():
+    """在事务中执行，结束时回滚"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+class Command(BaseCommand):
+    help = '在确定性数据集上请求全部接口，输出 p50 / p95 延迟和查询次数（JSON）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', choices=list(DATASETS), default='10k', help='数据规模，默认 10k')
+        parser.add_argument('--seed', type=int, default=42, help='随机种子，默认 42')
+        parser.add_argument('--requests', type=int, default=10, help='每个接口的计时请求数，默认 10')
+        parser.add_argument('--warmup', type=int, default=2, help='每个接口正式计时前的预热请求数')
+        parser.add_argument('--only', nargs='+', help='只测试指定名称的接口')
+        parser.add_argument('--output', help='结果 JSON 写入的文件（默认输出到标准输出）')
+        parser.add_argument('--baseline', help='基线结果 JSON，p95 或查询次数超出容差时返回非 0 退出码')
+        parser.add_argument('--tolerance', type=float, default=25.0, help='p95 允许比基线增加的百分比，默认 25')
+        parser.add_argument('--with-cache', action='store_true', help='保留接口响应缓存（默认关闭以测量未命中路径）')
+        parser.add_argument(
+            '--existing-data', action='store_true', help='直接使用当前数据库中的数据，不创建临时库（只测试读接口）',
+        )
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests 必须大于 0')
+
+        cache_settings = {**getattr(settings, 'API_RESPONSE_CACHE', {})}
+        if not options['with_cache']:
+            cache_settings['ENABLED'] = False
+
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(API_RESPONSE_CACHE=cache_settings))
+            if options['existing_data']:
+                dataset = {'name': 'existing'}
+            else:
+                old_config = setup_databases(verbosity=0, interactive=False, aliases=set(connections))
+                stack.callback(teardown_databases, old_config, verbosity=0)
+                dataset = self.generate(options['dataset'], options['seed'])
+            # 临时管理员账号在退出时删除（临时测试库之前清理）
+            token = stack.enter_context(benchmark_token())
+            result = self.run(dataset, options, token)
+
+        content = json.dumps(result, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                output.write(content + '\n')
+            self.stderr.write(f"结果已写入 {options['output']}")
+        else:
+            self.stdout.write(content)
+
+        if options['baseline']:
+            self.compare(result, options['baseline'], options['tolerance'])
+
+    def generate(self, name, seed):
+        """在临时数据库中生成数据集"""
+        self.stderr.write(f'生成 {name} 数据集（seed={seed}）...')
+        generator = SeedDataGenerator(seed=seed)
+        rows = generator.generate(
+            **DATASETS[name],
+            progress=lambda label, count, elapsed: self.stderr.write(f'  {label}: {count} 行，{elapsed:.1f}s'),
+        )
+        return {'name': name, 'seed': seed, 'rows': rows}
+
+    def load_objects(self):
+        """选取接口路径中使用的员工、部门、薪资记录和任务"""
+        employee = Employee.objects.filter(status='active').order_by('employee_id').first()
+        record = SalaryRecord.objects.filter(employee=employee).order_by('salary_period').first()
+        if employee is None or record is None:
+            raise CommandError('数据库中没有在职员工或薪资记录')
+        department = employee.department_ref or Department.objects.order_by('name').first()
+        job = PayrollJob.objects.order_by('-created_at').first()
+        return employee, department, record, job
+
+    def run(self, dataset, options, token):
+        employee, department, record, job = self.load_objects()
+        if job is None and not options['existing_data']:
+            job = PayrollJob.objects.create(salary_period=record.salary_period, status='completed')
+
+        endpoints = build_endpoints(employee, department, record, job)
+        if options['only']:
+            unknown = set(options['only']) - {endpoint.name for endpoint in endpoints}
+            if unknown:
+                raise CommandError(f'未知接口: {", ".join(sorted(unknown))}')
+            endpoints = [endpoint for endpoint in endpoints if endpoint.name in options['only']]
+        if options['existing_data']:
+            # 写接口的数据库修改会回滚，但缓存版本号、仪表盘快照失效标记等写在事务之外，不能对真实数据执行
+            writes = [endpoint.name for endpoint in endpoints if endpoint.write]
+            if options['only'] and writes:
+                raise CommandError(f'--existing-data 不能测试写接口: {", ".join(writes)}')
+            if writes:
+                self.stderr.write(f'--existing-data：跳过 {len(writes)} 个写接口')
+            endpoints = [endpoint for endpoint in endpoints if not endpoint.write]
+
+        client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Token {token}')
+        results = {}
+        for endpoint in endpoints:
+            for _ in range(options['warmup']):
+                self.request(client, endpoint)
+            samples = [self.request(client, endpoint) for _ in range(options['requests'])]
+            results[endpoint.name] = self.summarize(endpoint, samples)
+            summary = results[endpoint.name]
+            self.stderr.write(
+                f"  {endpoint.name:<36} {summary['status']}  p50 {summary['p50_ms']:8.2f} ms  "
+                f"p95 {summary['p95_ms']:8.2f} ms  查询 {summary['queries']}"
+            )
+
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'database': {'vendor': connection.vendor, 'engine': connection.settings_dict['ENGINE']},
+            'dataset': dataset,
+            'options': {
+                'requests': options['requests'], 'warmup': options['warmup'],
+                'response_cache': options['with_cache'], 'user': BENCHMARK_USERNAME,
+            },
+            'endpoints': results,
+        }
+
+    def request(self, client, endpoint):
+        """执行一次请求，返回 (状态码, 耗时 ms, 查询次数, SQL 耗时 ms)"""
+        metrics = RequestMetrics()
+        with ExitStack() as stack:
+            if endpoint.write:
+                stack.enter_context(rolled_back())
+            # 在事务之内统计，不计入回滚用的 SAVEPOINT 语句
+            for db in connections.all():
+                stack.enter_context(db.execute_wrapper(metrics))
+            started = time.perf_counter()
+            response = client.generic(
+                endpoint.method, endpoint.path, endpoint.body(), content_type=endpoint.content_type,
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = (time.perf_counter() - started) * 1000
+        return response.status_code, elapsed, metrics.queries, metrics.sql_time * 1000
+
+    @staticmethod
+    def summarize(endpoint, samples):
+        statuses = sorted({status_code for status_code, *_ in samples})
+        latencies = [elapsed for _, elapsed, _, _ in samples]
+        queries = [count for _, _, count, _ in samples]
+        return {
+            'method': endpoint.method,
+            'path': endpoint.path,
+            'write': endpoint.write,
+            'status': statuses[0] if len(statuses) == 1 else statuses,
+            'requests': len(samples),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'max_ms': round(max(latencies), 3),
+            'queries': max(queries),
+            'sql_p50_ms': round(percentile([sql for *_, sql in samples], 50), 3),
+        }
+
+    def compare(self, result, baseline_path, tolerance):
+        """与基线对比：p95 超出容差或查询次数增加视为退化"""
+        with open(baseline_path, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['endpoints']
+
+        regressions = []
+        for name, current in result['endpoints'].items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(f"{name}: 查询次数 {previous['queries']} -> {current['queries']}")
+            if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance / 100):
+                regressions.append(f"{name}: p95 {previous['p95_ms']:.2f} ms -> {current['p95_ms']:.2f} ms")
+
+        if regressions:
+            raise CommandError('与基线相比存在性能退化：\n' + '\n'.join(f'  {line}' for line in regressions))
+        self.stderr.write(self.style.SUCCESS(f'与基线 {baseline_path} 相比没有性能退化'))
@@ -0,0 +1,97 @@
+"""
+薪资导出内存基准测试
+
+用法：
+    python manage.py benchmark_export                          # 合成数据，1万/10万行
+    python manage.py benchmark_export --rows 10000 100000      # 指定行数
+    python manage.py benchmark_export --from-db                # 使用数据库中的真实薪资记录
+
+对每种导出格式统计耗时、输出字节数和 tracemalloc 内存峰值。
+流式导出的内存峰值应基本不随行数增长。
+"""
+
+import time
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from api.services.export_service import SalaryExportService, EXPORT_WRITERS
+
+
+def synthetic_rows(count):
+    """生成与 SalaryExportService.iter_rows 格式相同的合成数据行"""
+    pay_date = date.today().strftime('%Y-%m-%d')
+    for index in range(count):
+        base_salary = Decimal(8000 + index % 5000).quantize(Decimal('0.01'))
+        bonus = Decimal(index % 3000).quantize(Decimal('0.01'))
+        deductions = Decimal(index % 800).quantize(Decimal('0.01'))
+        gross_salary = base_salary + bonus
+        yield (
+            f'员工{index}', f'EMP{index:08d}', '技术部', '2025-06', '工程师',
+            base_salary, gross_salary, bonus, deductions, gross_salary - deductions,
+            pay_date,
+        )
+
+
+class Command(BaseCommand):
+    help = '测试薪资导出的耗时和内存峰值，验证流式导出内存占用恒定'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10000, 100000],
+            help='合成数据行数，可指定多个',
+        )
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            default=list(EXPORT_WRITERS),
+            choices=list(EXPORT_WRITERS),
+            help='要测试的导出格式',
+        )
+        parser.add_argument('--gzip', action='store_true', help='同时启用 gzip 压缩')
+        parser.add_argument('--from-db', action='store_true', help='使用数据库中的薪资记录')
+
+    def measure(self, export_format, compress, rows):
+        """消费整个导出流并返回 (耗时秒, 输出字节, 内存峰值字节)"""
+        service = SalaryExportService()
+        tracemalloc.start()
+        started = time.perf_counter()
+
+        chunks, _ = service.stream(export_format, compress=compress, rows=rows)
+        total_bytes = sum(len(chunk) for chunk in chunks)
+
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, total_bytes, peak
+
+    def handle(self, *args, **options):
+        results = []
+        for export_format in options['formats']:
+            if options['from_db']:
+                row_count = SalaryExportService().get_queryset().count()
+                cases = [(row_count, None)]
+            else:
+                cases = [(count, synthetic_rows(count)) for count in options['rows']]
+
+            for row_count, rows in cases:
+                elapsed, total_bytes, peak = self.measure(export_format, options['gzip'], rows)
+                results.append((export_format, row_count, elapsed, total_bytes, peak))
+                self.stdout.write(
+                    f'{export_format:>5} {row_count:>9} 行  耗时 {elapsed:7.2f}s  '
+                    f'{row_count / elapsed if elapsed else 0:>10.0f} 行/秒  '
+                    f'输出 {total_bytes / 1024 / 1024:8.2f} MB  内存峰值 {peak / 1024 / 1024:6.2f} MB'
+                )
+
+        # 同一格式下内存峰值的最大/最小比值，用于判断是否与行数无关
+        for export_format in options['formats']:
+            peaks = [result[4] for result in results if result[0] == export_format]
+            if len(peaks) > 1:
+                ratio = max(peaks) / min(peaks)
+                style = self.style.SUCCESS if ratio < 2 else self.style.WARNING
+                self.stdout.write(style(f'{export_format}: 内存峰值最大/最小比 {ratio:.2f}'))
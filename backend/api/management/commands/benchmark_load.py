@@ -0,0 +1,149 @@
+"""
+接口负载基准测试
+
+用法：
+    python manage.py benchmark_load                                 # 对比 CONN_MAX_AGE=0 与 60
+    python manage.py benchmark_load --requests 500 --concurrency 8
+    python manage.py benchmark_load --conn-max-age 0 300 --urls /api/employees/ /api/departments/
+    DJANGO_SETTINGS_MODULE=core.settings_production python manage.py benchmark_load --conn-max-age current
+
+使用 Django 测试客户端在多个线程中并发请求接口。每个请求结束时 Django 会按 CONN_MAX_AGE
+决定是否关闭数据库连接（与真实部署相同），因此 CONN_MAX_AGE=0 时每个请求都要重新建立连接。
+对每组配置输出 p50 / p95 / 平均延迟和吞吐量。
+请求使用临时创建的管理员账号，命令结束（包括中断）时删除该账号及其 Token。
+"""
+
+import statistics
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from api.authentication import obtain_token
+
+DEFAULT_URLS = [
+    '/api/employees/',
+    '/api/departments/',
+    '/api/salaries/',
+    '/api/dashboard/summary-stats/',
+]
+BENCHMARK_USERNAME = 'benchmark_admin'
+
+
+def percentile(values, percent):
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@contextmanager
+def benchmark_token():
+    """
+    创建临时管理员账号并返回其 Token，退出时删除账号（Token 随之删除）
+
+    账号名带随机后缀，不会复用或删除已有账号；命令中断时也会在 finally 中清理。
+    """
+    user = User.objects.create_user(
+        f'{BENCHMARK_USERNAME}_{uuid.uuid4().hex[:8]}', is_superuser=True, is_staff=True,
+    )
+    try:
+        yield obtain_token(user).key
+    finally:
+        user.delete()
+
+
+class Command(BaseCommand):
+    help = '并发请求接口，对比不同数据库连接配置下的延迟（p50 / p95）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='每组配置的请求总数，默认 200')
+        parser.add_argument('--concurrency', type=int, default=4, help='并发线程数，默认 4')
+        parser.add_argument('--urls', nargs='+', default=DEFAULT_URLS, help='轮流请求的接口路径')
+        parser.add_argument(
+            '--conn-max-age',
+            nargs='+',
+            default=['0', '60'],
+            help='要对比的 CONN_MAX_AGE 取值；current 表示使用当前配置，默认 0 60',
+        )
+        parser.add_argument('--warmup', type=int, default=10, help='每组配置正式计时前的预热请求数')
+
+    def run_round(self, urls, total_requests, concurrency, token):
+        """执行一轮请求，返回每个请求的耗时（毫秒）和失败数"""
+        latencies = []
+        failures = []
+        lock = threading.Lock()
+        counter = iter(range(total_requests))
+
+        def worker():
+            client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Token {token}')
+            while True:
+                with lock:
+                    index = next(counter, None)
+                if index is None:
+                    break
+                url = urls[index % len(urls)]
+                started = time.perf_counter()
+                response = client.get(url)
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if response.status_code >= 400:
+                        failures.append((url, response.status_code))
+            connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, failures
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests 和 --concurrency 必须大于 0')
+
+        db_settings = connections.settings['default']
+        original_max_age = db_settings.get('CONN_MAX_AGE', 0)
+        self.stdout.write(
+            f"数据库 {db_settings['ENGINE']}，请求 {options['requests']} 次，"
+            f"并发 {options['concurrency']}，接口 {len(options['urls'])} 个"
+        )
+
+        results = []
+        with benchmark_token() as token:
+            try:
+                for value in options['conn_max_age']:
+                    max_age = original_max_age if value == 'current' else int(value)
+                    # 所有线程的连接共用同一份配置字典，修改后对新建连接立即生效
+                    db_settings['CONN_MAX_AGE'] = max_age
+                    connections.close_all()
+
+                    self.run_round(options['urls'], options['warmup'], options['concurrency'], token)
+                    started = time.perf_counter()
+                    latencies, failures = self.run_round(
+                        options['urls'], options['requests'], options['concurrency'], token
+                    )
+                    wall = time.perf_counter() - started
+
+                    results.append(latencies)
+                    self.stdout.write(
+                        f'CONN_MAX_AGE={max_age!s:>5}  p50 {percentile(latencies, 50):7.2f} ms  '
+                        f'p95 {percentile(latencies, 95):7.2f} ms  平均 {statistics.mean(latencies):7.2f} ms  '
+                        f'{len(latencies) / wall:8.1f} 请求/秒  失败 {len(failures)}'
+                    )
+                    for url, status_code in sorted(set(failures)):
+                        self.stdout.write(self.style.WARNING(f'  {url} 返回 {status_code}'))
+            finally:
+                db_settings['CONN_MAX_AGE'] = original_max_age
+
+        if len(results) > 1:
+            baseline, best = percentile(results[0], 50), percentile(results[-1], 50)
+            self.stdout.write(self.style.SUCCESS(
+                f'p50 变化：{baseline:.2f} ms -> {best:.2f} ms（{(best - baseline) / baseline * 100:+.1f}%）'
+            ))
@@ -0,0 +1,117 @@
+"""
+薪资规则引擎基准测试
+
+用法：
+    python manage.py benchmark_payroll                       # 10 万名员工（合成数据，不访问数据库）
+    python manage.py benchmark_payroll --employees 10000 100000 --repeat 5
+    python manage.py benchmark_payroll --from-db --salary-period 2025-06   # 数据库中的员工和考勤（含查询耗时）
+
+对比两种计算方式的耗时：
+    逐条 Decimal   （calculate_reference，每名员工逐项 Decimal 运算）
+    按列整数分      （PayrollEngine.calculate，当前实现）
+并校验两者每名员工的各项金额完全一致。规则取自 settings.PAYROLL_RULES。
+"""
+
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Employee
+from api.services.payroll_rules_service import (
+    PayrollEngine, PayrollRules, RESULT_COLUMNS, calculate_reference, employee_columns,
+)
+
+DEPARTMENTS = ['技术部', '市场部', '人力资源部', '财务部', '运营部', '客服部']
+
+
+def synthetic_workforce(count, rules, seed):
+    """生成员工列和考勤计数（约三分之一的员工有计入扣款的考勤）"""
+    rng = random.Random(seed)
+    statuses = rules.attendance_statuses
+    columns = {'id': [], 'base_salary': [], 'department': []}
+    attendance = {}
+    for _ in range(count):
+        employee_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        columns['id'].append(employee_id)
+        columns['base_salary'].append(Decimal(rng.randrange(300000, 6000000)).scaleb(-2))
+        columns['department'].append(rng.choice(DEPARTMENTS))
+        if statuses and rng.random() < 0.33:
+            attendance[employee_id] = {
+                status: rng.randint(1, 3) for status in rng.sample(statuses, rng.randint(1, len(statuses)))
+            }
+    return columns, attendance
+
+
+class Command(BaseCommand):
+    help = '对比逐条 Decimal 与按列整数运算的薪资计算耗时，并校验结果一致'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, nargs='+', default=[100000], help='员工数，可指定多个')
+        parser.add_argument('--repeat', type=int, default=3, help='每种方式重复次数，取最快一次')
+        parser.add_argument('--seed', type=int, default=42, help='合成数据的随机种子，默认 42')
+        parser.add_argument('--bonus', type=Decimal, default=Decimal('500.00'), help='每人手工奖金，默认 500')
+        parser.add_argument('--deductions', type=Decimal, default=Decimal('100.00'), help='每人手工扣除，默认 100')
+        parser.add_argument('--salary-period', default='2025-06', help='薪资期间（统计考勤），默认 2025-06')
+        parser.add_argument('--from-db', action='store_true', help='读取数据库中的员工和考勤（计入查询耗时）')
+
+    def best_of(self, repeat, run):
+        best, result = None, None
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def handle(self, *args, **options):
+        rules = PayrollRules()
+        engine = PayrollEngine(rules)
+        period, bonus, deductions = options['salary_period'], options['bonus'], options['deductions']
+
+        counts = options['employees']
+        if options['from_db']:
+            available = Employee.objects.count()
+            if not available:
+                raise CommandError('数据库中没有员工')
+            counts = [min(count, available) for count in counts]
+
+        for count in counts:
+            if options['from_db']:
+                employees = list(Employee.objects.only('id', 'base_salary', 'department').order_by('id')[:count])
+                columns = employee_columns(employees)
+                load_attendance = lambda: engine.attendance_counts(period)  # noqa: E731
+            else:
+                columns, attendance = synthetic_workforce(count, rules, options['seed'])
+                load_attendance = lambda: attendance  # noqa: E731
+
+            query_time, attendance = self.best_of(1, load_attendance)
+            reference_time, expected = self.best_of(options['repeat'], lambda: [
+                calculate_reference(rules, base_salary, department, attendance.get(employee_id), bonus, deductions)
+                for employee_id, base_salary, department in zip(
+                    columns['id'], columns['base_salary'], columns['department'],
+                )
+            ])
+            columnar_time, actual = self.best_of(options['repeat'], lambda: engine.calculate(
+                columns, period, bonus, deductions, attendance=attendance,
+            ))
+
+            mismatches = sum(
+                1 for index, row in enumerate(expected)
+                if any(row[name] != actual[name][index] for name in RESULT_COLUMNS)
+            )
+            self.stdout.write(f'\n{count} 名员工（{"数据库" if options["from_db"] else "合成数据"}）：')
+            if options['from_db']:
+                self.stdout.write(f'  考勤计数查询  {query_time * 1000:8.1f} ms')
+            for label, elapsed in (('逐条 Decimal', reference_time), ('按列整数分', columnar_time)):
+                self.stdout.write(
+                    f'  {label:<10}  {elapsed * 1000:8.1f} ms  {count / elapsed:>10.0f} 人/秒  '
+                    f'x{reference_time / elapsed:.1f}'
+                )
+            total_net = sum(actual['net_salary'], Decimal('0.00'))
+            if mismatches:
+                self.stdout.write(self.style.ERROR(f'  {mismatches} 名员工的计算结果不一致'))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'  两种方式结果一致（实发合计 {total_net}）'))
@@ -0,0 +1,144 @@
+"""
+列表序列化基准测试
+
+用法：
+    python manage.py benchmark_serialization                 # 合成数据，1 万条薪资记录
+    python manage.py benchmark_serialization --rows 10000 100000
+    python manage.py benchmark_serialization --from-db       # 读取数据库中的薪资记录（含查询耗时）
+
+对比四种组合的耗时：
+    serializer + JSONRenderer   （原列表接口）
+    serializer + ORJSONRenderer
+    values()   + JSONRenderer
+    values()   + ORJSONRenderer （当前列表接口）
+并校验各组合输出的 JSON 字节完全一致。
+"""
+
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from api.models import Employee, SalaryRecord
+from api.projections import ValuesProjection
+from api.renderers import ORJSONRenderer, orjson
+from api.serializers import SalaryRecordSerializer
+
+
+def synthetic_records(count):
+    """生成未保存的薪资记录（含关联员工），不访问数据库"""
+    now = timezone.now()
+    departments = ['技术部', '市场部', '财务部', '人事部', '运营部']
+    employees = [
+        Employee(
+            id=uuid.uuid4(), employee_id=f'EMP{index:06d}', name=f'员工{index}',
+            department=departments[index % len(departments)],
+        )
+        for index in range(max(1, count // 12))
+    ]
+    records = []
+    for index in range(count):
+        employee = employees[index % len(employees)]
+        base_salary = Decimal(8000 + index % 5000).quantize(Decimal('0.01'))
+        bonus = Decimal(index % 3000).quantize(Decimal('0.01'))
+        deductions = Decimal(index % 800).quantize(Decimal('0.01'))
+        created_at = now - timedelta(minutes=index, microseconds=index)
+        records.append(SalaryRecord(
+            id=uuid.uuid4(), employee=employee,
+            salary_period=f'2025-{index % 12 + 1:02d}', position_snapshot='工程师',
+            base_salary_snapshot=base_salary, bonus=bonus, deductions=deductions,
+            gross_salary=base_salary + bonus, net_salary=base_salary + bonus - deductions,
+            created_at=created_at, updated_at=created_at,
+        ))
+    return records
+
+
+def values_row(instance, lookups):
+    """按 values() 的格式从模型实例读取一行（合成数据使用）"""
+    row = {}
+    for lookup in lookups:
+        value = instance
+        for part in lookup.split('__'):
+            value = getattr(value, part)
+        row[lookup] = value.pk if hasattr(value, 'pk') else value
+    return row
+
+
+class Command(BaseCommand):
+    help = '对比序列化器与 values() 快速读取路径、JSONRenderer 与 ORJSONRenderer 的列表序列化耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10000], help='记录数，可指定多个')
+        parser.add_argument('--repeat', type=int, default=3, help='每种组合重复次数，取最快一次')
+        parser.add_argument('--from-db', action='store_true', help='读取数据库中的薪资记录（计入查询耗时）')
+
+    def build_cases(self, row_count, from_db):
+        """返回 {路径名: 生成输出数据的函数}"""
+        projection = ValuesProjection(SalaryRecordSerializer)
+
+        if from_db:
+            queryset = SalaryRecord.objects.select_related('employee').order_by('-created_at', 'pk')
+            return {
+                'serializer': lambda: SalaryRecordSerializer(queryset[:row_count], many=True).data,
+                'values()': lambda: projection.to_representation(projection.values(queryset)[:row_count]),
+            }
+
+        records = synthetic_records(row_count)
+        rows = [values_row(record, projection.lookups) for record in records]
+        return {
+            'serializer': lambda: SalaryRecordSerializer(records, many=True).data,
+            'values()': lambda: projection.to_representation(rows),
+        }
+
+    def measure(self, build, renderer, repeat):
+        """返回 (最快一次的序列化耗时, 渲染耗时, 输出字节)"""
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data = build()
+            serialized = time.perf_counter()
+            content = renderer.render(data)
+            rendered = time.perf_counter()
+            timing = (serialized - started, rendered - serialized, content)
+            if best is None or sum(timing[:2]) < sum(best[:2]):
+                best = timing
+        return best
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('未安装 orjson，ORJSONRenderer 将回退为标准库 json'))
+
+        renderers = {'JSONRenderer': JSONRenderer(), 'ORJSONRenderer': ORJSONRenderer()}
+        row_counts = options['rows']
+        if options['from_db']:
+            available = SalaryRecord.objects.count()
+            if not available:
+                raise CommandError('数据库中没有薪资记录')
+            row_counts = [min(count, available) for count in row_counts]
+
+        for row_count in row_counts:
+            self.stdout.write(f'\n{row_count} 条薪资记录：')
+            cases = self.build_cases(row_count, options['from_db'])
+            outputs = set()
+            baseline = None
+
+            for path, build in cases.items():
+                for renderer_name, renderer in renderers.items():
+                    serialize, render, content = self.measure(build, renderer, options['repeat'])
+                    outputs.add(content)
+                    total = serialize + render
+                    baseline = baseline or total
+                    self.stdout.write(
+                        f'  {path:<10} + {renderer_name:<14}  序列化 {serialize * 1000:8.1f} ms  '
+                        f'渲染 {render * 1000:7.1f} ms  合计 {total * 1000:8.1f} ms  '
+                        f'{row_count / total:>9.0f} 行/秒  x{baseline / total:.1f}'
+                    )
+
+            if len(outputs) == 1:
+                self.stdout.write(self.style.SUCCESS(f'  各路径输出一致（{len(outputs.pop())} 字节）'))
+            else:
+                self.stdout.write(self.style.ERROR('  各路径输出不一致'))
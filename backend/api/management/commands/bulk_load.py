@@ -0,0 +1,64 @@
+"""
+历史数据批量装载（员工、薪资记录、考勤记录）
+
+用法：
+    python manage.py bulk_load employees employees.csv
+    python manage.py bulk_load salaries salaries_2019_2024.parquet
+    python manage.py bulk_load attendance attendance.csv --batch-size 100000
+
+文件先按批写入临时暂存表（PostgreSQL 使用 COPY FROM STDIN，SQLite 使用 executemany），
+再一次性按唯一键 INSERT ... ON CONFLICT 合并到目标表；工号按集合解析为员工主键。
+第一行为表头，可使用字段名（employee_id）或中文名（工号）。
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.bulk_load_service import BulkLoader, BulkLoadError, LOADERS, READERS
+
+
+class Command(BaseCommand):
+    help = '将 CSV / Parquet 文件经暂存表批量装载到员工、薪资或考勤表（按唯一键 upsert）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('table', choices=sorted(LOADERS), help='目标表')
+        parser.add_argument('paths', nargs='+', help='CSV / Parquet 文件路径')
+        parser.add_argument(
+            '--format',
+            dest='input_format',
+            choices=sorted(READERS),
+            help='文件格式，默认按扩展名判断（.parquet / .pq 为 Parquet，其余为 CSV）',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BulkLoader.DEFAULT_BATCH_SIZE,
+            help=f'每批写入暂存表的行数，默认 {BulkLoader.DEFAULT_BATCH_SIZE}',
+        )
+        parser.add_argument('--database', default='default', help='目标数据库别名，默认 default')
+
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            loader = LOADERS[options['table']](batch_size=max(1, options['batch_size']), using=options['database'])
+            try:
+                result = loader.load_file(path, options['input_format'])
+            except BulkLoadError as e:
+                raise CommandError(f'{path}: {e}')
+            except OSError as e:
+                raise CommandError(f'无法读取文件 {path}: {e}')
+
+            for error in result['errors']:
+                messages = '; '.join(
+                    f'{field}: {", ".join(field_errors)}' for field, field_errors in error['errors'].items()
+                )
+                self.stdout.write(self.style.WARNING(f"  第 {error['line']} 行（{error['employee_id']}）: {messages}"))
+            if result['failed'] > len(result['errors']):
+                self.stdout.write(self.style.WARNING(
+                    f"  ……共 {result['failed']} 行失败，仅显示前 {len(result['errors'])} 行"
+                ))
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{path}: 接收 {result['received']} 行，新增 {result['inserted']} 条，更新 {result['updated']} 条，"
+                f"文件内重复 {result['duplicates']} 行，失败 {result['failed']} 行"
+                f"（其中工号不存在 {result['unresolved']} 行），"
+                f"耗时 {result['elapsed_seconds']} 秒，{result['rows_per_second']} 行/秒"
+            ))
@@ -0,0 +1,45 @@
+"""
+员工部门名称漂移报告
+
+用法：
+    python manage.py department_drift_report              # 输出各类漂移数量和样例
+    python manage.py department_drift_report --sample 20  # 每类显示前 20 组
+    python manage.py department_drift_report --json       # 以 JSON 输出，便于监控脚本读取
+
+存在漂移时以非零状态码退出（--json 时除外），可用于定时检查。
+修复请使用 backfill_employee_departments。
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.department_sync_service import DepartmentSyncService
+
+
+class Command(BaseCommand):
+    help = '检查员工部门名称与关联部门是否一致'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sample', type=int, default=10, help='每类漂移显示的分组数')
+        parser.add_argument('--json', action='store_true', help='以 JSON 格式输出报告')
+
+    def handle(self, *args, **options):
+        report = DepartmentSyncService().report(sample_size=options['sample'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(f"员工总数：{report['total_employees']}")
+        self.stdout.write(f"名称与关联部门不一致：{report['mismatched']}")
+        for group in report['mismatched_groups']:
+            self.stdout.write(f"  {group['department']!r} -> {group['current_name']!r}：{group['count']}")
+        self.stdout.write(f"未关联部门但名称可匹配：{report['unlinked']}")
+        self.stdout.write(f"名称无法匹配任何部门：{report['orphaned']}")
+        for group in report['orphaned_groups']:
+            self.stdout.write(f"  {group['department']!r}：{group['count']}")
+
+        if report['mismatched'] or report['unlinked']:
+            raise CommandError('存在部门名称漂移，请执行 python manage.py backfill_employee_departments')
+        self.stdout.write(self.style.SUCCESS('员工部门名称与关联部门一致'))
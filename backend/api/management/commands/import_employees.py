@@ -0,0 +1,65 @@
+"""
+员工批量导入
+
+用法：
+    python manage.py import_employees employees.csv
+    python manage.py import_employees employees.xlsx --chunk-size 5000
+    python manage.py import_employees employees.csv --dry-run      # 只校验，不写入
+
+第一行为表头，可使用字段名（employee_id）或中文名（工号）。
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.employee_import_service import EmployeeImportService, EmployeeImportError, READERS
+
+
+class Command(BaseCommand):
+    help = '从 CSV / XLSX 文件批量导入员工，批量校验工号唯一性并分批写入'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV / XLSX 文件路径')
+        parser.add_argument(
+            '--format',
+            dest='input_format',
+            choices=sorted(READERS),
+            help='文件格式，默认按扩展名判断',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EmployeeImportService.DEFAULT_CHUNK_SIZE,
+            help=f'每批写入的行数，默认 {EmployeeImportService.DEFAULT_CHUNK_SIZE}',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='只校验，不写入数据库')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        input_format = options['input_format'] or path.rsplit('.', 1)[-1].lower()
+
+        try:
+            with open(path, 'rb') as handle:
+                content = handle.read()
+        except OSError as e:
+            raise CommandError(f'无法读取文件 {path}: {e}')
+
+        service = EmployeeImportService(chunk_size=max(1, options['chunk_size']), dry_run=options['dry_run'])
+        try:
+            result = service.import_file(content, input_format)
+        except EmployeeImportError as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            messages = '; '.join(
+                f'{field}: {", ".join(field_errors)}' for field, field_errors in error['errors'].items()
+            )
+            self.stdout.write(self.style.WARNING(f"  第 {error['line']} 行（{error['employee_id']}）: {messages}"))
+        if result['failed'] > len(result['errors']):
+            self.stdout.write(self.style.WARNING(f"  ……共 {result['failed']} 行失败，仅显示前 {len(result['errors'])} 行"))
+
+        action = '校验' if options['dry_run'] else '导入'
+        self.stdout.write(self.style.SUCCESS(
+            f"{path}: {action}完成，接收 {result['received']} 行，通过 {result['valid']} 行，"
+            f"写入 {result['created']} 条，失败 {result['failed']} 行，"
+            f"耗时 {result['elapsed_seconds']} 秒，{result['rows_per_second']} 行/秒"
+        ))
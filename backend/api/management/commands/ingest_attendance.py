@@ -0,0 +1,60 @@
+"""
+考勤数据批量导入
+
+用法：
+    python manage.py ingest_attendance punches.ndjson
+    python manage.py ingest_attendance punches.csv --format csv --batch-size 10000
+    cat punches.ndjson | python manage.py ingest_attendance -
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.services.attendance_service import AttendanceIngestService, PARSERS
+
+
+class Command(BaseCommand):
+    help = '从 NDJSON / CSV 文件批量导入考勤打卡数据，按 (员工, 日期) upsert'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='+',
+            help='数据文件路径，- 表示标准输入',
+        )
+        parser.add_argument(
+            '--format',
+            dest='input_format',
+            choices=sorted(PARSERS),
+            help='文件格式，默认按扩展名判断（.csv 为 CSV，其余为 NDJSON）',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=AttendanceIngestService.DEFAULT_BATCH_SIZE,
+            help=f'每批写入的行数，默认 {AttendanceIngestService.DEFAULT_BATCH_SIZE}',
+        )
+
+    def handle(self, *args, **options):
+        for path in options['paths']:
+            input_format = options['input_format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+            service = AttendanceIngestService(batch_size=max(1, options['batch_size']))
+
+            if path == '-':
+                result = service.ingest(PARSERS[input_format](sys.stdin))
+            else:
+                try:
+                    # 逐行读取，内存占用只与批大小有关
+                    with open(path, encoding='utf-8-sig', newline='') as handle:
+                        result = service.ingest(PARSERS[input_format](handle))
+                except OSError as e:
+                    raise CommandError(f'无法读取文件 {path}: {e}')
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{path}: 接收 {result['received']} 行，写入 {result['upserted']} 条，"
+                f"失败 {result['failed']} 行，耗时 {result['elapsed_seconds']} 秒，"
+                f"{result['rows_per_second']} 行/秒"
+            ))
+            for error in result['errors']:
+                self.stdout.write(self.style.WARNING(f"  第 {error['line']} 行: {error['error']}"))
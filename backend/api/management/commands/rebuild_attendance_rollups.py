@@ -0,0 +1,35 @@
+"""
+重建考勤汇总表
+
+用法：
+    python manage.py rebuild_attendance_rollups                       # 全量重建
+    python manage.py rebuild_attendance_rollups --start 2025-01-01    # 重建指定日期之后的数据
+
+考勤写入和员工调整部门时汇总表会自动增量刷新；批量装载调整了员工部门或直接修改数据库后需执行本命令。
+"""
+
+import argparse
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from api.services.attendance_rollup_service import AttendanceRollupService
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'无效的日期: {value}，格式应为 YYYY-MM-DD')
+
+
+class Command(BaseCommand):
+    help = '由原始考勤记录重建按日 / 按部门按日考勤汇总表'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=parse_date, help='开始日期（YYYY-MM-DD）')
+        parser.add_argument('--end', type=parse_date, help='结束日期（YYYY-MM-DD）')
+
+    def handle(self, *args, **options):
+        days = AttendanceRollupService().rebuild(options['start'], options['end'])
+        self.stdout.write(self.style.SUCCESS(f'考勤汇总表重建完成：{days} 天'))
@@ -0,0 +1,50 @@
+"""
+刷新仪表盘统计快照
+
+用法：
+    python manage.py refresh_dashboard_snapshot                # 刷新一次
+    python manage.py refresh_dashboard_snapshot --interval 60  # 每 60 秒刷新一次
+    python manage.py refresh_dashboard_snapshot --if-stale     # 仅在快照过期时刷新
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.models import DashboardSnapshot
+from api.services.dashboard_service import DashboardStatsService
+
+
+class Command(BaseCommand):
+    help = '重新计算仪表盘汇总统计并写入 DashboardSnapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='循环刷新间隔（秒），默认 0 表示只刷新一次',
+        )
+        parser.add_argument(
+            '--if-stale',
+            action='store_true',
+            help='仅在快照不存在或已标记过期时刷新',
+        )
+
+    def handle(self, *args, **options):
+        service = DashboardStatsService()
+
+        while True:
+            if options['if_stale'] and DashboardSnapshot.objects.filter(
+                key=service.SUMMARY_KEY, is_stale=False
+            ).exists():
+                self.stdout.write('快照未过期，跳过刷新')
+            else:
+                snapshot = service.refresh_snapshot()
+                self.stdout.write(self.style.SUCCESS(
+                    f'仪表盘快照已刷新：{snapshot.computed_at.isoformat()}'
+                ))
+
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
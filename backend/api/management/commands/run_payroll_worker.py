@@ -0,0 +1,64 @@
+"""
+薪资生成任务 worker
+
+用法：
+    python manage.py run_payroll_worker            # 常驻运行，轮询待处理任务
+    python manage.py run_payroll_worker --once     # 处理完当前所有任务后退出
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from api.services.payroll_service import PayrollJobRunner
+
+
+class Command(BaseCommand):
+    help = '处理异步薪资生成任务（PayrollJob），无需外部消息队列'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='处理完当前待处理任务后退出',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='没有任务时的轮询间隔（秒），默认 2',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=int(PayrollJobRunner.STALE_AFTER.total_seconds()),
+            help='运行中任务超过该秒数未更新即视为中断并重新领取，默认 300',
+        )
+
+    def handle(self, *args, **options):
+        stale_after = timedelta(seconds=options['stale_after'])
+        self.stdout.write('薪资生成 worker 已启动')
+
+        while True:
+            job = PayrollJobRunner.claim_next_job(stale_after=stale_after)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'领取任务 {job.id}（{job.salary_period}）')
+            job = PayrollJobRunner(job).run()
+
+            if job.status == 'completed':
+                self.stdout.write(self.style.SUCCESS(
+                    f'任务 {job.id} 完成：新建 {job.created_count} 条，跳过 {job.skipped_count} 条，'
+                    f'{job.throughput} 行/秒'
+                ))
+            elif job.status == 'failed':
+                self.stdout.write(self.style.ERROR(f'任务 {job.id} 失败：{job.error_message}'))
+            else:
+                self.stdout.write(self.style.WARNING(f'任务 {job.id} 已被其他 worker 接管'))
+
+        self.stdout.write('没有待处理任务，worker 退出')
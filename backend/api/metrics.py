@@ -0,0 +1,277 @@
+"""
+请求性能监控
+
+设计思路：
+1. 每个请求一个 RequestMetrics（保存在 contextvar 中），由 api.middleware.RequestMetricsMiddleware 创建：
+   - 通过 connection.execute_wrapper 统计所有数据库别名的 SQL 次数和耗时
+   - 序列化（api.serializers.TimedSerializerMixin 的 .data、values() 快速读取路径）和渲染阶段
+     （api.renderers）用 measure() 计时，同一阶段嵌套调用只计最外层
+2. 响应携带 Server-Timing 头（db / serialize / render / total），浏览器开发者工具可直接查看
+3. 按 (请求方法, 路由) 在进程内聚合直方图（耗时、SQL 耗时、序列化耗时、查询次数），
+   /api/metrics/ 以 Prometheus 文本格式输出，同时输出接口缓存命中统计（api.cache.cache_stats）
+4. 预算：查询次数或耗时超出配置的预算时记录 warning 日志，并计数
+5. 统计为进程内数据，多进程部署时每个 worker 独立计数（与缓存命中统计相同）
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .cache import cache_stats
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 默认直方图分桶：耗时（秒）与查询次数
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+TIMED_PHASES = ('serialize', 'render')
+
+
+def get_metrics_config():
+    """
+    读取监控配置
+
+    settings.API_METRICS 示例：
+        {
+            'ENABLED': True,
+            'SERVER_TIMING': True,
+            'QUERY_BUDGET': 30,            # 默认每个请求的查询次数预算，None 表示不限制
+            'LATENCY_BUDGET_MS': 1000,     # 默认每个请求的耗时预算（毫秒）
+            'ROUTE_BUDGETS': {'salary_list': {'queries': 10, 'latency_ms': 500}},  # 按 URL 名称覆盖
+        }
+    """
+    config = getattr(settings, 'API_METRICS', {})
+    return {
+        'enabled': config.get('ENABLED', True),
+        'server_timing': config.get('SERVER_TIMING', True),
+        'query_budget': config.get('QUERY_BUDGET'),
+        'latency_budget_ms': config.get('LATENCY_BUDGET_MS'),
+        'route_budgets': config.get('ROUTE_BUDGETS', {}),
+        'latency_buckets': tuple(config.get('LATENCY_BUCKETS', DEFAULT_LATENCY_BUCKETS)),
+        'query_buckets': tuple(config.get('QUERY_BUCKETS', DEFAULT_QUERY_BUCKETS)),
+    }
+
+
+# ==================== 单个请求的计时 ====================
+
+_current_metrics = ContextVar('api_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """一个请求的 SQL 次数、SQL 耗时和各阶段耗时"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.timings = dict.fromkeys(TIMED_PHASES, 0.0)
+        self.total_time = None
+        self._active = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        """connection.execute_wrapper 回调：统计查询次数和耗时"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += time.perf_counter() - started
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+        return self
+
+    def server_timing(self):
+        """Server-Timing 响应头（毫秒）"""
+        entries = [f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries"']
+        entries += [f'{phase};dur={self.timings[phase] * 1000:.2f}' for phase in TIMED_PHASES]
+        entries.append(f'total;dur={self.total_time * 1000:.2f}')
+        return ', '.join(entries)
+
+
+@contextmanager
+def track_request():
+    """在当前上下文中记录请求指标，退出时计算总耗时"""
+    metrics = RequestMetrics()
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+        metrics.finish()
+
+
+@contextmanager
+def measure(phase):
+    """
+    为当前请求的某个阶段计时；不在请求中时不做任何事
+
+    同一阶段嵌套调用（如嵌套序列化器）只计最外层，避免重复计时。
+    """
+    metrics = _current_metrics.get()
+    if metrics is None or phase in metrics._active:
+        yield
+        return
+
+    metrics._active.add(phase)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.timings[phase] += time.perf_counter() - started
+        metrics._active.discard(phase)
+
+
+# ==================== 进程内聚合 ====================
+
+class Histogram:
+    """Prometheus 风格的直方图（累积分桶）"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """返回 [(上界, 累积计数)]，最后一项为 +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class RouteMetrics:
+    """单个 (请求方法, 路由) 的聚合指标"""
+
+    def __init__(self, latency_buckets, query_buckets):
+        self.duration = Histogram(latency_buckets)
+        self.sql_duration = Histogram(latency_buckets)
+        self.serialize_duration = Histogram(latency_buckets)
+        self.queries = Histogram(query_buckets)
+        self.statuses = defaultdict(int)
+        self.budget_exceeded = defaultdict(int)
+
+
+class MetricsRegistry:
+    """按路由聚合的请求指标"""
+
+    HISTOGRAMS = (
+        ('api_request_duration_seconds', 'duration', '请求总耗时（秒）'),
+        ('api_request_sql_duration_seconds', 'sql_duration', '请求中 SQL 执行耗时（秒）'),
+        ('api_request_serialize_duration_seconds', 'serialize_duration', '请求中序列化耗时（秒）'),
+        ('api_request_queries', 'queries', '请求中执行的 SQL 次数'),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, method, route, status_code, metrics, exceeded=(), config=None):
+        """记录一个请求的指标"""
+        config = config or get_metrics_config()
+        key = (method, route)
+        with self._lock:
+            route_metrics = self._routes.get(key)
+            if route_metrics is None:
+                route_metrics = self._routes[key] = RouteMetrics(
+                    config['latency_buckets'], config['query_buckets'],
+                )
+            route_metrics.duration.observe(metrics.total_time)
+            route_metrics.sql_duration.observe(metrics.sql_time)
+            route_metrics.serialize_duration.observe(metrics.timings['serialize'])
+            route_metrics.queries.observe(metrics.queries)
+            route_metrics.statuses[status_code] += 1
+            for kind in exceeded:
+                route_metrics.budget_exceeded[kind] += 1
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    def render(self):
+        """Prometheus 文本格式输出（含接口缓存命中统计）"""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+
+            lines += ['# HELP api_requests_total 请求次数', '# TYPE api_requests_total counter']
+            for (method, route), route_metrics in routes:
+                for status_code, count in sorted(route_metrics.statuses.items()):
+                    labels = _labels(method=method, route=route, status=status_code)
+                    lines.append(f'api_requests_total{{{labels}}} {count}')
+
+            for name, attr, description in self.HISTOGRAMS:
+                lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+                for (method, route), route_metrics in routes:
+                    histogram = getattr(route_metrics, attr)
+                    labels = _labels(method=method, route=route)
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{name}_sum{{{labels}}} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+            lines += [
+                '# HELP api_budget_exceeded_total 超出查询次数或耗时预算的请求数',
+                '# TYPE api_budget_exceeded_total counter',
+            ]
+            for (method, route), route_metrics in routes:
+                for kind, count in sorted(route_metrics.budget_exceeded.items()):
+                    labels = _labels(method=method, route=route, budget=kind)
+                    lines.append(f'api_budget_exceeded_total{{{labels}}} {count}')
+
+        lines += ['# HELP api_cache_requests_total 接口响应缓存命中统计', '# TYPE api_cache_requests_total counter']
+        for endpoint, counters in sorted(cache_stats.snapshot().items()):
+            for outcome in ('hits', 'misses', 'not_modified'):
+                labels = _labels(endpoint=endpoint, outcome=outcome)
+                lines.append(f'api_cache_requests_total{{{labels}}} {counters[outcome]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_metrics = MetricsRegistry()
+
+
+# ==================== 预算检查 ====================
+
+def check_budget(url_name, metrics, config):
+    """
+    检查请求是否超出预算
+
+    Returns:
+        list: 超出的预算类型（'queries' / 'latency'）
+    """
+    route_budget = config['route_budgets'].get(url_name, {})
+    query_budget = route_budget.get('queries', config['query_budget'])
+    latency_budget_ms = route_budget.get('latency_ms', config['latency_budget_ms'])
+
+    exceeded = []
+    if query_budget is not None and metrics.queries > query_budget:
+        exceeded.append('queries')
+    if latency_budget_ms is not None and metrics.total_time * 1000 > latency_budget_ms:
+        exceeded.append('latency')
+    return exceeded
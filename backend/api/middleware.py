@@ -1,5 +1,14 @@
+import logging
+from contextlib import ExitStack
+
+from django.db import connections
 from django.utils.deprecation import MiddlewareMixin
 
+from .db_router import pin_to_primary
+from .metrics import check_budget, get_metrics_config, request_metrics, track_request
+
+logger = logging.getLogger(__name__)
+
 
 class CSRFExemptMiddleware(MiddlewareMixin):
     """
@@ -9,4 +18,58 @@ class CSRFExemptMiddleware(MiddlewareMixin):
         # 如果请求路径以 /api/ 开头，则豁免CSRF检查
         if request.path.startswith('/api/'):
             setattr(request, '_dont_enforce_csrf_checks', True)
-        return None 
\ No newline at end of file
+        return None 
+
+class PrimaryPinMiddleware(MiddlewareMixin):
+    """
+    写请求成功后将用户固定到主库一段时间（见 api.db_router）
+
+    需放在 AuthenticationMiddleware 之后；DRF 认证的用户会回写到 request.user，
+    因此在响应阶段可以取到 Token 认证的用户。
+    """
+    WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def process_response(self, request, response):
+        if request.method in self.WRITE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request, 'user', None))
+        return response
+
+
+class RequestMetricsMiddleware:
+    """
+    请求性能监控中间件（见 api.metrics）
+
+    统计每个请求的 SQL 次数、SQL 耗时、序列化耗时和总耗时，添加 Server-Timing 响应头，
+    按路由聚合到进程内直方图，超出预算时记录 warning。
+    应放在中间件列表靠前的位置，使总耗时覆盖其余中间件。
+    流式响应的耗时只统计到响应对象返回为止，不含逐块输出的时间。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_metrics_config()
+        if not config['enabled']:
+            return self.get_response(request)
+
+        with track_request() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        route = f'/{match.route}' if match is not None else '<unmatched>'
+        url_name = match.url_name if match is not None else None
+
+        exceeded = check_budget(url_name, metrics, config)
+        if exceeded:
+            logger.warning(
+                f"接口超出预算 {request.method} {route}：{metrics.queries} 次查询，"
+                f"耗时 {metrics.total_time * 1000:.1f} ms（超出: {', '.join(exceeded)}）"
+            )
+        request_metrics.record(request.method, route, response.status_code, metrics, exceeded, config)
+
+        if config['server_timing']:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:03
+
+import django.db.models.deletion
+import uuid
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_attendancerecord'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('salary_period', models.CharField(help_text='格式：YYYY-MM', max_length=7, verbose_name='薪资期间')),
+                ('bonus', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='奖金')),
+                ('deductions', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='扣除')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '运行中'), ('completed', '已完成'), ('failed', '失败')], default='pending', max_length=20, verbose_name='任务状态')),
+                ('chunk_size', models.PositiveIntegerField(default=1000, verbose_name='每批处理员工数')),
+                ('total_employees', models.PositiveIntegerField(default=0, verbose_name='员工总数')),
+                ('processed_employees', models.PositiveIntegerField(default=0, verbose_name='已处理员工数')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='新建记录数')),
+                ('skipped_count', models.PositiveIntegerField(default=0, verbose_name='跳过记录数')),
+                ('last_employee_id', models.UUIDField(blank=True, null=True, verbose_name='最后处理的员工')),
+                ('chunk_timings', models.JSONField(blank=True, default=list, verbose_name='分批耗时')),
+                ('error_message', models.TextField(blank=True, verbose_name='错误信息')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='结束时间')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_jobs', to=settings.AUTH_USER_MODEL, verbose_name='创建者')),
+            ],
+            options={
+                'verbose_name': '薪资生成任务',
+                'verbose_name_plural': '薪资生成任务',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='api_payroll_status_d2c22e_idx'), models.Index(fields=['salary_period'], name='api_payroll_salary__c86360_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:20
+
+from django.db import migrations
+
+# 员工搜索字段的 pg_trgm GIN 索引，支撑 icontains 和相似度排序。
+# Django 在 PostgreSQL 上把 icontains 编译为 UPPER("col"::text) LIKE UPPER(%s)，
+# 裸列上的 trigram 索引无法支撑该条件，因此索引建在 UPPER(col::text) 表达式上
+TRIGRAM_INDEXES = [
+    ('api_employee_name_trgm', 'name'),
+    ('api_employee_employee_id_trgm', 'employee_id'),
+    ('api_employee_department_trgm', 'department'),
+    ('api_employee_position_trgm', 'position'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """仅在 PostgreSQL 上创建 pg_trgm 扩展和 GIN 索引，其他数据库跳过"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} '
+            f'ON api_employee USING gin ((UPPER({column}::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_payrolljob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
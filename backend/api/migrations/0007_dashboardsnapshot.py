@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_employee_search_trgm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True, verbose_name='快照标识')),
+                ('data', models.JSONField(default=dict, verbose_name='统计数据')),
+                ('is_stale', models.BooleanField(default=False, verbose_name='是否过期')),
+                ('computed_at', models.DateTimeField(verbose_name='计算时间')),
+            ],
+            options={
+                'verbose_name': '仪表盘快照',
+                'verbose_name_plural': '仪表盘快照',
+            },
+        ),
+    ]
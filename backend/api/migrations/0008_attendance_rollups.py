@@ -0,0 +1,97 @@
+# Generated by Django 5.2.1 on 2026-10-18 11:14
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum, Q, F
+from django.db.models.functions import Coalesce
+
+
+def backfill_rollups(apps, schema_editor):
+    """由已有考勤记录生成汇总数据"""
+    AttendanceRecord = apps.get_model('api', 'AttendanceRecord')
+    AttendanceDailyRollup = apps.get_model('api', 'AttendanceDailyRollup')
+    AttendanceDepartmentDailyRollup = apps.get_model('api', 'AttendanceDepartmentDailyRollup')
+
+    aggregates = {
+        'total_count': Count('id'),
+        'present_count': Count('id', filter=Q(status='present')),
+        'late_count': Count('id', filter=Q(status='late')),
+        'early_leave_count': Count('id', filter=Q(status='early_leave')),
+        'overtime_count': Count('id', filter=Q(status='overtime')),
+        'absent_count': Count('id', filter=Q(status='absent')),
+        'leave_count': Count('id', filter=Q(status__in=['sick_leave', 'personal_leave', 'annual_leave'])),
+        'work_hours': Coalesce(Sum('work_hours'), Decimal('0.00')),
+        'overtime_hours': Coalesce(Sum('overtime_hours'), Decimal('0.00')),
+    }
+
+    daily_rows = AttendanceRecord.objects.values('date').annotate(**aggregates).order_by()
+    AttendanceDailyRollup.objects.bulk_create(
+        (AttendanceDailyRollup(**row) for row in daily_rows), batch_size=1000
+    )
+    department_rows = (
+        AttendanceRecord.objects.values('date', department=F('employee__department'))
+        .annotate(**aggregates)
+        .order_by()
+    )
+    AttendanceDepartmentDailyRollup.objects.bulk_create(
+        (AttendanceDepartmentDailyRollup(**row) for row in department_rows), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_dashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='考勤日期')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='考勤记录数')),
+                ('present_count', models.PositiveIntegerField(default=0, verbose_name='出勤数')),
+                ('late_count', models.PositiveIntegerField(default=0, verbose_name='迟到数')),
+                ('early_leave_count', models.PositiveIntegerField(default=0, verbose_name='早退数')),
+                ('overtime_count', models.PositiveIntegerField(default=0, verbose_name='加班数')),
+                ('absent_count', models.PositiveIntegerField(default=0, verbose_name='缺勤数')),
+                ('leave_count', models.PositiveIntegerField(default=0, verbose_name='请假数')),
+                ('work_hours', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='总工作时长(小时)')),
+                ('overtime_hours', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='总加班时长(小时)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '考勤日汇总',
+                'verbose_name_plural': '考勤日汇总',
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('date',), name='uniq_attendance_daily_rollup_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceDepartmentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='考勤日期')),
+                ('total_count', models.PositiveIntegerField(default=0, verbose_name='考勤记录数')),
+                ('present_count', models.PositiveIntegerField(default=0, verbose_name='出勤数')),
+                ('late_count', models.PositiveIntegerField(default=0, verbose_name='迟到数')),
+                ('early_leave_count', models.PositiveIntegerField(default=0, verbose_name='早退数')),
+                ('overtime_count', models.PositiveIntegerField(default=0, verbose_name='加班数')),
+                ('absent_count', models.PositiveIntegerField(default=0, verbose_name='缺勤数')),
+                ('leave_count', models.PositiveIntegerField(default=0, verbose_name='请假数')),
+                ('work_hours', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='总工作时长(小时)')),
+                ('overtime_hours', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14, verbose_name='总加班时长(小时)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('department', models.CharField(max_length=100, verbose_name='部门')),
+            ],
+            options={
+                'verbose_name': '考勤部门日汇总',
+                'verbose_name_plural': '考勤部门日汇总',
+                'ordering': ['date', 'department'],
+                'indexes': [models.Index(fields=['department', 'date'], name='api_attenda_departm_b35f1b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'department'), name='uniq_attendance_department_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+RECENT_CHUNKS = 20
+
+
+def backfill_chunk_stats(apps, schema_editor):
+    """由已有任务的分批耗时累计批次数和总耗时，只保留最近的批次"""
+    PayrollJob = apps.get_model('api', 'PayrollJob')
+    for job in PayrollJob.objects.exclude(chunk_timings=[]).iterator():
+        job.chunk_count = len(job.chunk_timings)
+        job.processing_seconds = sum(chunk['seconds'] for chunk in job.chunk_timings)
+        job.chunk_timings = job.chunk_timings[-RECENT_CHUNKS:]
+        job.save(update_fields=['chunk_count', 'processing_seconds', 'chunk_timings'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payrolljob',
+            name='chunk_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='已完成批次数'),
+        ),
+        migrations.AddField(
+            model_name='payrolljob',
+            name='processing_seconds',
+            field=models.FloatField(default=0.0, verbose_name='处理耗时（秒）'),
+        ),
+        migrations.AddField(
+            model_name='payrolljob',
+            name='worker_token',
+            field=models.UUIDField(blank=True, null=True, verbose_name='执行者令牌'),
+        ),
+        migrations.AlterField(
+            model_name='payrolljob',
+            name='chunk_timings',
+            field=models.JSONField(blank=True, default=list, verbose_name='最近批次耗时'),
+        ),
+        migrations.RunPython(backfill_chunk_stats, migrations.RunPython.noop),
+    ]
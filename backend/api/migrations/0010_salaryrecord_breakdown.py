@@ -0,0 +1,34 @@
+# Generated by Django 5.2.1 on 2026-10-18 12:29
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_payrolljob_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salaryrecord',
+            name='attendance_deduction',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='考勤扣款'),
+        ),
+        migrations.AddField(
+            model_name='salaryrecord',
+            name='department_bonus',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='部门奖金'),
+        ),
+        migrations.AddField(
+            model_name='salaryrecord',
+            name='income_tax',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='个人所得税'),
+        ),
+        migrations.AddField(
+            model_name='salaryrecord',
+            name='social_insurance',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10, verbose_name='社保公积金'),
+        ),
+    ]
@@ -6,6 +6,26 @@ from decimal import Decimal
 
 # Create your models here.
 
+class DepartmentQuerySet(models.QuerySet):
+    """部门查询集"""
+
+    def with_employee_counts(self):
+        """
+        在查询中聚合员工数量，避免逐个部门执行 COUNT 查询（N+1）
+
+        annotated_employee_count: 员工总数
+        annotated_active_employee_count: 在职员工数
+        """
+        return self.annotate(
+            annotated_employee_count=models.Count('employees', distinct=True),
+            annotated_active_employee_count=models.Count(
+                'employees',
+                filter=models.Q(employees__status='active'),
+                distinct=True
+            ),
+        )
+
+
 class Department(models.Model):
     """部门模型"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -32,6 +52,8 @@ class Department(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    objects = DepartmentQuerySet.as_manager()
     
     class Meta:
         verbose_name = '部门'
@@ -48,8 +70,17 @@ class Department(models.Model):
     
     @property
     def employee_count(self):
-        """获取部门员工数量"""
+        """获取部门员工数量，优先使用查询集中聚合好的结果"""
+        if hasattr(self, 'annotated_employee_count'):
+            return self.annotated_employee_count
         return self.employees.count()
+
+    @property
+    def active_employee_count(self):
+        """获取部门在职员工数量，优先使用查询集中聚合好的结果"""
+        if hasattr(self, 'annotated_active_employee_count'):
+            return self.annotated_active_employee_count
+        return self.employees.filter(status='active').count()
     
     def to_dict(self):
         """转换为字典格式，用于API响应"""
@@ -66,6 +97,7 @@ class Department(models.Model):
             'budget': float(self.budget),
             'status': self.status,
             'employee_count': self.employee_count,
+            'active_employee_count': self.active_employee_count,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
         }
@@ -238,6 +270,31 @@ class SalaryRecord(models.Model):
         default=Decimal('0.00'),
         verbose_name='扣除'
     )
+    # 薪资规则（payroll_rules_service）计算的明细，未启用规则时为 0
+    department_bonus = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='部门奖金'
+    )
+    attendance_deduction = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='考勤扣款'
+    )
+    social_insurance = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='社保公积金'
+    )
+    income_tax = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='个人所得税'
+    )
     gross_salary = models.DecimalField(
         max_digits=10, 
         decimal_places=2, 
@@ -277,6 +334,10 @@ class SalaryRecord(models.Model):
             'base_salary_snapshot': float(self.base_salary_snapshot),
             'bonus': float(self.bonus),
             'deductions': float(self.deductions),
+            'department_bonus': float(self.department_bonus),
+            'attendance_deduction': float(self.attendance_deduction),
+            'social_insurance': float(self.social_insurance),
+            'income_tax': float(self.income_tax),
             'gross_salary': float(self.gross_salary),
             'net_salary': float(self.net_salary),
             'created_at': self.created_at.isoformat(),
@@ -284,11 +345,14 @@ class SalaryRecord(models.Model):
         }
     
     def save(self, *args, **kwargs):
-        """保存时自动计算薪资"""
+        """保存时自动计算薪资（应发含部门奖金，实发扣除考勤扣款、社保公积金和个税）"""
         if not self.gross_salary:
-            self.gross_salary = self.base_salary_snapshot + self.bonus
+            self.gross_salary = self.base_salary_snapshot + self.bonus + self.department_bonus
         if not self.net_salary:
-            self.net_salary = self.gross_salary - self.deductions
+            self.net_salary = (
+                self.gross_salary - self.deductions
+                - self.attendance_deduction - self.social_insurance - self.income_tax
+            )
         super().save(*args, **kwargs)
 
 
@@ -383,6 +447,242 @@ class AttendanceRecord(models.Model):
             'updated_at': self.updated_at.isoformat(),
         }
 
+class PayrollJob(models.Model):
+    """批量薪资生成任务模型"""
+    STATUS_CHOICES = [
+        ('pending', '等待中'),
+        ('running', '运行中'),
+        ('completed', '已完成'),
+        ('failed', '失败'),
+    ]
+
+    # 每批处理员工数上限，避免单个事务过大
+    MAX_CHUNK_SIZE = 10000
+    # chunk_timings 只保留最近的批次，总耗时和批次数另行累计
+    RECENT_CHUNKS = 20
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    salary_period = models.CharField(
+        max_length=7,
+        verbose_name='薪资期间',
+        help_text='格式：YYYY-MM'
+    )
+    bonus = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='奖金'
+    )
+    deductions = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='扣除'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name='任务状态'
+    )
+    chunk_size = models.PositiveIntegerField(default=1000, verbose_name='每批处理员工数')
+    total_employees = models.PositiveIntegerField(default=0, verbose_name='员工总数')
+    processed_employees = models.PositiveIntegerField(default=0, verbose_name='已处理员工数')
+    created_count = models.PositiveIntegerField(default=0, verbose_name='新建记录数')
+    skipped_count = models.PositiveIntegerField(default=0, verbose_name='跳过记录数')
+    # 断点续跑游标：最后处理完成的员工 UUID
+    last_employee_id = models.UUIDField(blank=True, null=True, verbose_name='最后处理的员工')
+    chunk_timings = models.JSONField(default=list, blank=True, verbose_name='最近批次耗时')
+    chunk_count = models.PositiveIntegerField(default=0, verbose_name='已完成批次数')
+    processing_seconds = models.FloatField(default=0.0, verbose_name='处理耗时（秒）')
+    # 领取任务时生成，进度只能由持有该令牌的 worker 写入
+    worker_token = models.UUIDField(blank=True, null=True, verbose_name='执行者令牌')
+    error_message = models.TextField(blank=True, verbose_name='错误信息')
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='payroll_jobs',
+        verbose_name='创建者'
+    )
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name='开始时间')
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name='结束时间')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        verbose_name = '薪资生成任务'
+        verbose_name_plural = '薪资生成任务'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['salary_period']),
+        ]
+
+    def __str__(self):
+        return f"{self.salary_period} - {self.get_status_display()}"
+
+    @property
+    def progress(self):
+        """任务进度百分比"""
+        if not self.total_employees:
+            return 100.0 if self.status == 'completed' else 0.0
+        return round(self.processed_employees / self.total_employees * 100, 1)
+
+    @property
+    def elapsed_seconds(self):
+        """已运行秒数（各批次耗时之和）"""
+        return round(self.processing_seconds, 3)
+
+    @property
+    def throughput(self):
+        """处理速度（行/秒）"""
+        elapsed = self.elapsed_seconds
+        if not elapsed:
+            return 0.0
+        return round(self.processed_employees / elapsed, 1)
+
+    def to_dict(self):
+        """转换为字典格式，用于API响应"""
+        return {
+            'id': str(self.id),
+            'salary_period': self.salary_period,
+            'bonus': float(self.bonus),
+            'deductions': float(self.deductions),
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'chunk_size': self.chunk_size,
+            'total_employees': self.total_employees,
+            'processed_employees': self.processed_employees,
+            'created_count': self.created_count,
+            'skipped_count': self.skipped_count,
+            'progress': self.progress,
+            'elapsed_seconds': self.elapsed_seconds,
+            'throughput': self.throughput,
+            'chunk_count': self.chunk_count,
+            'chunk_timings': self.chunk_timings,
+            'error_message': self.error_message,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat(),
+        }
+
+
+class DashboardSnapshot(models.Model):
+    """仪表盘统计快照模型"""
+    key = models.CharField(max_length=50, unique=True, verbose_name='快照标识')
+    data = models.JSONField(default=dict, verbose_name='统计数据')
+    is_stale = models.BooleanField(default=False, verbose_name='是否过期')
+    computed_at = models.DateTimeField(verbose_name='计算时间')
+
+    class Meta:
+        verbose_name = '仪表盘快照'
+        verbose_name_plural = '仪表盘快照'
+
+    def __str__(self):
+        return f"{self.key} @ {self.computed_at.isoformat()}"
+
+    def to_dict(self):
+        """转换为字典格式，用于API响应"""
+        return {
+            'key': self.key,
+            'data': self.data,
+            'is_stale': self.is_stale,
+            'computed_at': self.computed_at.isoformat(),
+        }
+
+
+class AttendanceRollupBase(models.Model):
+    """考勤汇总公共字段（按日 / 按部门按日汇总表共用）"""
+    date = models.DateField(verbose_name='考勤日期')
+    total_count = models.PositiveIntegerField(default=0, verbose_name='考勤记录数')
+    present_count = models.PositiveIntegerField(default=0, verbose_name='出勤数')
+    late_count = models.PositiveIntegerField(default=0, verbose_name='迟到数')
+    early_leave_count = models.PositiveIntegerField(default=0, verbose_name='早退数')
+    overtime_count = models.PositiveIntegerField(default=0, verbose_name='加班数')
+    absent_count = models.PositiveIntegerField(default=0, verbose_name='缺勤数')
+    leave_count = models.PositiveIntegerField(default=0, verbose_name='请假数')
+    work_hours = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='总工作时长(小时)'
+    )
+    overtime_hours = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='总加班时长(小时)'
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        abstract = True
+
+    @property
+    def attended_count(self):
+        """计入出勤的记录数（出勤、迟到、早退、加班）"""
+        return self.present_count + self.late_count + self.early_leave_count + self.overtime_count
+
+    def to_dict(self):
+        """转换为字典格式，用于API响应"""
+        return {
+            'date': self.date.isoformat(),
+            'total_count': self.total_count,
+            'present_count': self.present_count,
+            'late_count': self.late_count,
+            'early_leave_count': self.early_leave_count,
+            'overtime_count': self.overtime_count,
+            'absent_count': self.absent_count,
+            'leave_count': self.leave_count,
+            'work_hours': float(self.work_hours),
+            'overtime_hours': float(self.overtime_hours),
+        }
+
+
+class AttendanceDailyRollup(AttendanceRollupBase):
+    """考勤按日汇总"""
+
+    class Meta:
+        verbose_name = '考勤日汇总'
+        verbose_name_plural = '考勤日汇总'
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(fields=['date'], name='uniq_attendance_daily_rollup_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.total_count}"
+
+
+class AttendanceDepartmentDailyRollup(AttendanceRollupBase):
+    """考勤按部门按日汇总"""
+    department = models.CharField(max_length=100, verbose_name='部门')
+
+    class Meta:
+        verbose_name = '考勤部门日汇总'
+        verbose_name_plural = '考勤部门日汇总'
+        ordering = ['date', 'department']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'department'], name='uniq_attendance_department_rollup'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['department', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.department} - {self.total_count}"
+
+    def to_dict(self):
+        data = super().to_dict()
+        data['department'] = self.department
+        return data
+
+
 # # RAG and AI models @start
 # class KnowledgeDocument(models.Model):
 #     """技术文档知识库模型"""
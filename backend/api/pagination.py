@@ -0,0 +1,385 @@
+"""
+列表分页工具
+
+设计思路：
+1. 默认保持页码分页（page / page_size），与前端现有的响应格式一致
+2. 请求携带 cursor 参数时（包括空的 ?cursor=）切换为游标分页（keyset pagination）
+3. 游标分页按当前排序字段 + 主键做范围过滤，不执行 COUNT(*) 和 OFFSET，深分页性能稳定
+4. 游标为 base64 编码的不透明字符串，前端只需使用 next / previous 链接翻页
+5. 页码分页的总数由 CountStrategy 提供：无筛选的大表使用 PostgreSQL reltuples 估算，
+   其余情况缓存精确 COUNT(*) 结果，缓存键带查询涉及的全部模型（主表、JOIN 的表、子查询）的版本号
+   （见 api.cache），任一模型写入时失效
+"""
+
+import base64
+import datetime
+import hashlib
+import json
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.db.models.sql import Query
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+
+from .cache import get_model_version
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 1000
+
+# 精确总数的缓存时间（秒）
+COUNT_CACHE_TIMEOUT = getattr(settings, 'LIST_COUNT_CACHE_TIMEOUT', 30)
+# 表行数估算值达到该阈值时才使用估算，小表直接精确计数
+COUNT_ESTIMATE_THRESHOLD = getattr(settings, 'LIST_COUNT_ESTIMATE_THRESHOLD', 100000)
+
+
+def get_page_params(request):
+    """
+    解析页码和每页数量
+
+    Returns:
+        tuple: (page, page_size)，参数无效时回退为默认值
+    """
+    page = request.query_params.get('page', 1)
+    page_size = request.query_params.get('page_size', DEFAULT_PAGE_SIZE)
+
+    try:
+        page = int(page)
+        page_size = int(page_size)
+    except (ValueError, TypeError):
+        page = 1
+        page_size = DEFAULT_PAGE_SIZE
+
+    return page, page_size
+
+
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """游标编码器：时间保留完整微秒精度（DjangoJSONEncoder 会截断到毫秒，导致等值比较失效）"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values, reverse=False):
+    """将排序字段的值编码为不透明游标"""
+    payload = json.dumps({'v': values, 'r': reverse}, cls=CursorJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    解码游标
+
+    Returns:
+        tuple: (排序字段值列表, 是否向前翻页)
+
+    Raises:
+        ValidationError: 游标格式无效
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        return list(payload['v']), bool(payload.get('r', False))
+    except (ValueError, TypeError, KeyError, UnicodeError):
+        raise ValidationError({'cursor': '无效的分页游标'})
+
+
+class KeysetPaginator:
+    """
+    游标（keyset）分页器
+
+    按排序字段构造字典序范围条件：
+        (f1 > v1) OR (f1 = v1 AND f2 > v2) OR ...
+    降序字段使用 < 比较；主键作为最后一个排序字段保证顺序唯一。
+    排序字段需为非空字段，否则 NULL 行可能被跳过。
+    """
+
+    def __init__(self, queryset, page_size=DEFAULT_PAGE_SIZE):
+        self.queryset = queryset
+        self.page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+        self.ordering = self.get_ordering(queryset)
+
+    @staticmethod
+    def get_ordering(queryset):
+        """获取查询集当前排序，并补充主键作为唯一排序键"""
+        ordering = [
+            field for field in (queryset.query.order_by or queryset.model._meta.ordering)
+            if isinstance(field, str) and field != '?'
+        ]
+        pk_names = {'pk', 'id', queryset.model._meta.pk.name}
+        if not any(field.lstrip('-') in pk_names for field in ordering):
+            descending = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append('-pk' if descending else 'pk')
+        return ordering
+
+    def get_value(self, obj, field):
+        """
+        按 a__b 形式的字段路径读取对象属性
+
+        obj 也可以是 values() 返回的字典行（见 api.projections），此时直接按字段路径取值
+        """
+        if isinstance(obj, dict):
+            name = field.lstrip('-')
+            return obj[self.queryset.model._meta.pk.name if name == 'pk' else name]
+        value = obj
+        for part in field.lstrip('-').split('__'):
+            if value is None:
+                return None
+            value = getattr(value, part)
+        if hasattr(value, 'pk'):
+            value = value.pk
+        return value
+
+    def build_filter(self, values, reverse):
+        """根据游标值构造字典序范围过滤条件"""
+        condition = Q()
+        equal_prefix = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-')
+            # 向前翻页时比较方向取反
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal_prefix & Q(**{f'{name}__{lookup}': value})
+            equal_prefix &= Q(**{name: value})
+        return condition
+
+    def paginate(self, cursor):
+        """
+        获取游标对应的一页数据
+
+        Args:
+            cursor: 游标字符串，为空表示第一页
+
+        Returns:
+            tuple: (当前页对象列表, next 游标, previous 游标)
+        """
+        reverse = False
+        queryset = self.queryset.order_by(*self.ordering)
+
+        if cursor:
+            values, reverse = decode_cursor(cursor)
+            if len(values) != len(self.ordering):
+                raise ValidationError({'cursor': '分页游标与当前排序不匹配'})
+            queryset = queryset.filter(self.build_filter(values, reverse))
+            if reverse:
+                queryset = queryset.reverse()
+
+        # 多取一条用于判断是否还有下一页
+        objects = list(queryset[:self.page_size + 1])
+        has_more = len(objects) > self.page_size
+        objects = objects[:self.page_size]
+        if reverse:
+            objects.reverse()
+
+        if not objects:
+            return objects, None, None
+
+        first_values = [self.get_value(objects[0], field) for field in self.ordering]
+        last_values = [self.get_value(objects[-1], field) for field in self.ordering]
+
+        if reverse:
+            next_cursor = encode_cursor(last_values)
+            previous_cursor = encode_cursor(first_values, reverse=True) if has_more else None
+        else:
+            next_cursor = encode_cursor(last_values) if has_more else None
+            previous_cursor = encode_cursor(first_values, reverse=True) if cursor else None
+
+        return objects, next_cursor, previous_cursor
+
+
+def referenced_models(query):
+    """
+    查询涉及的全部模型：主表、JOIN 的表，以及筛选条件中子查询（__in、Exists）涉及的表
+
+    Returns:
+        list: 按 label 排序的模型类
+    """
+    tables = set()
+    stack = [query]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Query):
+            tables.add(node.get_meta().db_table)
+            tables.update(alias.table_name for alias in node.alias_map.values())
+            stack.append(node.where)
+            continue
+        if hasattr(node, 'query'):
+            stack.append(node.query)
+        stack.extend(getattr(node, 'children', ()))
+        for side in ('lhs', 'rhs'):
+            if hasattr(node, side):
+                stack.append(getattr(node, side))
+        if hasattr(node, 'get_source_expressions'):
+            stack.extend(node.get_source_expressions())
+
+    models_by_table = {
+        model._meta.db_table: model for model in apps.get_models(include_auto_created=True)
+    }
+    return sorted(
+        (models_by_table[table] for table in tables if table in models_by_table),
+        key=lambda model: model._meta.label_lower,
+    )
+
+
+class CountStrategy:
+    """
+    列表总数计算策略
+
+    - 无筛选条件且数据库为 PostgreSQL：读取 pg_class.reltuples 估算行数（大表时）
+    - 其他情况：精确 COUNT(*)，按规范化后的查询 SQL 缓存，查询涉及的任一模型写入时失效
+      （如按 employee__department 筛选的薪资列表，员工调整部门后总数随之失效）
+    """
+
+    def __init__(self, queryset):
+        # 排序不影响总数，去掉排序后作为规范化查询
+        self.queryset = queryset.order_by()
+        self.model = queryset.model
+        self.is_exact = True
+
+    def is_unfiltered(self):
+        """查询是否没有任何筛选条件"""
+        return not self.queryset.query.where
+
+    def estimate(self):
+        """
+        读取 PostgreSQL 的表行数估算值
+
+        Returns:
+            int | None: 估算行数；非 PostgreSQL、表未 ANALYZE 或表较小时返回 None
+        """
+        connection = connections[self.queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [self.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+
+        if not row or row[0] < COUNT_ESTIMATE_THRESHOLD:
+            return None
+        return int(row[0])
+
+    def cache_key(self):
+        """根据规范化 SQL 和所涉及模型的版本号生成缓存键"""
+        sql, params = self.queryset.query.sql_with_params()
+        digest = hashlib.md5(f'{sql}|{params!r}'.encode('utf-8')).hexdigest()
+        versions = '.'.join(
+            str(get_model_version(model)) for model in referenced_models(self.queryset.query)
+        )
+        return f'list_count:{self.model._meta.label_lower}:{versions}:{digest}'
+
+    def count(self):
+        """返回总数，is_exact 标记结果是否为精确值"""
+        if self.is_unfiltered():
+            estimated = self.estimate()
+            if estimated is not None:
+                self.is_exact = False
+                return estimated
+
+        key = self.cache_key()
+        total = cache.get(key)
+        if total is None:
+            total = self.queryset.count()
+            cache.set(key, total, timeout=COUNT_CACHE_TIMEOUT)
+        return total
+
+
+class CountingPaginator(Paginator):
+    """
+    使用 CountStrategy 计算总数的分页器
+
+    总数为估算值时不按总数裁剪页码，保证估算偏小时仍可访问末尾页面。
+    """
+
+    @cached_property
+    def count_strategy(self):
+        return CountStrategy(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self.count_strategy.count()
+
+    @property
+    def count_is_exact(self):
+        return self.count_strategy.is_exact
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('页码必须为整数')
+        if number < 1:
+            raise EmptyPage('页码必须大于 0')
+        return number
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class ListPaginationMixin:
+    """
+    列表视图分页混入类
+
+    为手写 list() 的视图提供统一的分页逻辑：
+    - 默认页码分页，返回 total_pages / current_page / total_count / count_is_exact
+    - 携带 cursor 参数时使用游标分页，返回 next / previous 链接
+    """
+
+    cursor_query_param = 'cursor'
+
+    def use_cursor_pagination(self):
+        """请求中出现 cursor 参数即启用游标分页"""
+        return self.cursor_query_param in self.request.query_params
+
+    def build_cursor_link(self, cursor):
+        """构造携带新游标的完整 URL，保留其余查询参数"""
+        if cursor is None:
+            return None
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = cursor
+        params.pop('page', None)
+        return self.request.build_absolute_uri(f'{self.request.path}?{params.urlencode()}')
+
+    def paginate_list(self, queryset):
+        """
+        对查询集分页
+
+        Returns:
+            tuple: (当前页对象, 分页信息字典)
+        """
+        page, page_size = get_page_params(self.request)
+
+        if self.use_cursor_pagination():
+            paginator = KeysetPaginator(queryset, page_size)
+            objects, next_cursor, previous_cursor = paginator.paginate(
+                self.request.query_params.get(self.cursor_query_param)
+            )
+            return objects, {
+                'next': self.build_cursor_link(next_cursor),
+                'previous': self.build_cursor_link(previous_cursor),
+                'page_size': paginator.page_size,
+            }
+
+        paginator = CountingPaginator(queryset, page_size)
+        page_obj = paginator.get_page(page)
+        return page_obj, {
+            'total_pages': paginator.num_pages,
+            'current_page': page,
+            'total_count': paginator.count,
+            'count_is_exact': paginator.count_is_exact,
+        }
@@ -0,0 +1,79 @@
+"""
+导入数据的取值解析
+
+设计思路：
+1. 考勤导入（attendance_service）、员工导入（employee_import_service）和历史数据批量装载
+   （bulk_load_service）共用同一套日期、时间和 choices 取值解析，可接受的格式和错误提示保持一致
+2. 解析失败抛出 ParseError（ValueError 子类），由各导入服务按行记录错误
+3. 只做格式转换，不访问数据库；取值范围、长度等校验仍由各服务按模型字段完成
+"""
+
+from datetime import date, datetime, time, timedelta
+
+# Excel 日期序列号的起点（1900 日期系统，已包含 1900-02-29 的历史误差）
+EXCEL_EPOCH = date(1899, 12, 30)
+# 序列号 100000 约为 2173 年，更大的纯数字不按序列号解析
+MAX_EXCEL_SERIAL = 100000
+
+TIME_FORMATS = ('%H:%M:%S', '%H:%M')
+
+
+class ParseError(ValueError):
+    """取值无法解析"""
+
+
+def parse_date(value, excel_serial=False):
+    """
+    解析日期
+
+    Args:
+        value: date / datetime 对象，或 YYYY-MM-DD、YYYY/MM/DD 格式的字符串
+        excel_serial: 是否接受 Excel 日期序列号（如 45658）
+
+    Raises:
+        ParseError: 格式无效
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip() if value is not None else ''
+    if excel_serial:
+        try:
+            serial = float(text)
+        except ValueError:
+            pass
+        else:
+            if 0 <= serial < MAX_EXCEL_SERIAL:
+                return EXCEL_EPOCH + timedelta(days=int(serial))
+    try:
+        return datetime.strptime(text.replace('/', '-'), '%Y-%m-%d').date()
+    except ValueError:
+        raise ParseError(f'无效的日期: {value}')
+
+
+def parse_time(value):
+    """
+    解析时间：time 对象、HH:MM 或 HH:MM:SS
+
+    Raises:
+        ParseError: 格式无效
+    """
+    if isinstance(value, time):
+        return value
+    text = str(value).strip()
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            continue
+    raise ParseError(f'无效的时间: {value}')
+
+
+def choice_aliases(field):
+    """choices 字段的取值别名 {代码或中文显示值: 代码}"""
+    aliases = {}
+    for value, label in field.flatchoices:
+        aliases[value] = value
+        aliases[str(label)] = value
+    return aliases
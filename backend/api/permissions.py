@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from .roles import is_admin
+
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -11,10 +13,7 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return request.user and request.user.is_authenticated
         
         # 写入权限只对管理员开放
-        return request.user and request.user.is_authenticated and (
-            request.user.is_superuser or 
-            request.user.groups.filter(name='Admin').exists()
-        )
+        return is_admin(request)
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -25,10 +24,7 @@ class IsAdminUser(permissions.BasePermission):
     the request is 
     """
     def has_permission(self, request, view):
-        return request.user and request.user.is_authenticated and (
-            request.user.is_superuser or 
-            request.user.groups.filter(name='Admin').exists()
-        )
+        return is_admin(request)
 
 
 class IsOwnerOrAdmin(permissions.BasePermission):
@@ -40,7 +36,7 @@ class IsOwnerOrAdmin(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # 管理员可以访问所有资源
-        if request.user.is_superuser or request.user.groups.filter(name='Admin').exists():
+        if is_admin(request):
             return True
         # # check if the owner of resource.
         # if hasattr(obj, 'user') and obj.user:
@@ -63,7 +59,7 @@ class IsSalaryOwnerOrAdmin(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # 管理员可以访问所有薪资记录
-        if request.user.is_superuser or request.user.groups.filter(name='Admin').exists():
+        if is_admin(request):
             return True
         
         # if hasattr(obj, 'employee') and hasattr(obj.employee, 'user')
@@ -0,0 +1,368 @@
+"""
+列表接口的快速读取路径
+
+设计思路：
+1. 只读列表不需要实例化模型，也不需要 ModelSerializer 逐字段 get_attribute 的开销：
+   直接用 QuerySet.values() 读取所需列，再逐列格式化为响应数据
+2. 列和格式化方式由序列化器的字段定义推导（source -> ORM 查询路径，字段的 to_representation），
+   输出的键顺序、取值格式与序列化器完全一致；序列化器调整字段后快速路径自动同步
+3. 关联字段（如 department_ref.name）经过可空外键时，同时读取外键列，
+   外键为空时按 DRF 的规则处理（default / allow_null / 省略该键）
+4. 无法从数据库列直接得到的字段（SerializerMethodField、模型属性等）不支持，
+   构造时抛出 ValueError，视图应继续使用序列化器
+5. 列表接口支持 ?fields= / ?exclude= 选择字段（SparseFieldsMixin）：快速读取路径只 values() 选中的列，
+   不需要关联表字段时也不再 JOIN；序列化器路径裁剪输出字段并用 .only() 缩小查询的列
+"""
+
+import copy
+import decimal
+from datetime import datetime
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
+
+from .metrics import measure
+
+
+class ProjectionColumn:
+    """快速路径的一列：输出键、values() 查询路径及格式化函数"""
+
+    __slots__ = ('name', 'lookup', 'null_lookup', 'formatter', 'missing')
+
+    def __init__(self, name, lookup, null_lookup, formatter, missing):
+        self.name = name
+        self.lookup = lookup
+        # 经过可空外键时，用于判断关联对象是否存在的外键列
+        self.null_lookup = null_lookup
+        # 格式化函数工厂，每次输出前调用一次（绑定当前时区等状态），返回 None 表示直接使用数据库值
+        self.formatter = formatter
+        # 关联对象不存在时的取值；empty 表示省略该键
+        self.missing = missing
+
+
+def _missing_value(field):
+    """关联对象不存在时 DRF 的处理方式（见 rest_framework.fields.Field.get_attribute）"""
+    if field.default is not empty:
+        return field.get_default()
+    if field.allow_null:
+        return None
+    return empty
+
+
+def _decimal_formatter(field):
+    """
+    DecimalField 的格式化：与 DecimalField.to_representation 结果相同，
+    量化精度和上下文只构造一次（DRF 每个值都会复制一次 decimal 上下文）
+    """
+    exponent = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def to_representation(value):
+        if not isinstance(value, decimal.Decimal):
+            return field.to_representation(value)
+        return '{:f}'.format(value.quantize(exponent, rounding=rounding, context=context))
+
+    return lambda: to_representation
+
+
+def _datetime_formatter(field):
+    """
+    DateTimeField（ISO 8601 格式）的格式化：与 DateTimeField.to_representation 结果相同，
+    当前时区在每次输出前读取一次，而不是每个值读取一次
+    """
+    def bind():
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if field_timezone is None:
+            return field.to_representation
+
+        def to_representation(value):
+            if not isinstance(value, datetime) or value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+        return to_representation
+
+    return bind
+
+
+def _formatter(field):
+    """返回字段的格式化函数工厂"""
+    if isinstance(field, serializers.ReadOnlyField):
+        return lambda: None
+    if isinstance(field, serializers.PrimaryKeyRelatedField):
+        # 关联字段输出主键对象本身，由渲染器转为字符串
+        if field.pk_field is not None:
+            return lambda: field.pk_field.to_representation
+        return lambda: None
+    if isinstance(field, (serializers.RelatedField, serializers.ManyRelatedField, serializers.BaseSerializer)):
+        raise ValueError(f'快速读取路径不支持关联字段: {field.field_name}')
+    if isinstance(field, serializers.SerializerMethodField):
+        raise ValueError(f'快速读取路径不支持 SerializerMethodField: {field.field_name}')
+
+    field_type = type(field)
+    # CharField 和默认格式 UUIDField 的 to_representation 等价于 str()
+    if field_type is serializers.CharField:
+        return lambda: str
+    if field_type is serializers.UUIDField and field.uuid_format == 'hex_verbose':
+        return lambda: str
+    if (
+        field_type is serializers.DecimalField
+        and field.decimal_places is not None
+        and getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+        and not field.localize
+        and not field.normalize_output
+    ):
+        return _decimal_formatter(field)
+    if field_type is serializers.DateTimeField and _is_iso_format(field, api_settings.DATETIME_FORMAT):
+        return _datetime_formatter(field)
+    if field_type is serializers.DateField and _is_iso_format(field, api_settings.DATE_FORMAT):
+        return lambda: _isoformat
+    return lambda: field.to_representation
+
+
+def _is_iso_format(field, default):
+    output_format = getattr(field, 'format', default)
+    return output_format is not None and output_format.lower() == ISO_8601
+
+
+def _isoformat(value):
+    return value if isinstance(value, str) else value.isoformat()
+
+
+class ValuesProjection:
+    """
+    按序列化器字段定义，将 values() 查询结果转换为与序列化器相同的输出
+
+    用法：
+        projection = ValuesProjection(SalaryRecordSerializer)
+        rows = projection.values(queryset)       # values() 查询集，可继续分页
+        data = projection.to_representation(rows)
+    """
+
+    def __init__(self, serializer_class, context=None):
+        serializer = serializer_class(context=context or {})
+        self.model = serializer.Meta.model
+        self.columns = [
+            self.build_column(field)
+            for field in serializer.fields.values()
+            if not field.write_only
+        ]
+
+    def build_column(self, field):
+        """由序列化器字段推导查询路径；字段无法映射到数据库列时抛出 ValueError"""
+        formatter = _formatter(field)
+        model = self.model
+        null_lookup = None
+        parts = []
+
+        for index, attr in enumerate(field.source_attrs):
+            try:
+                model_field = model._meta.get_field(attr)
+            except FieldDoesNotExist:
+                raise ValueError(f'快速读取路径不支持非数据库字段: {field.field_name}')
+
+            if model_field.many_to_many or model_field.one_to_many:
+                raise ValueError(f'快速读取路径不支持多值关联: {field.field_name}')
+
+            parts.append(attr)
+            if index == len(field.source_attrs) - 1:
+                break
+            if not model_field.is_relation:
+                raise ValueError(f'快速读取路径不支持非数据库字段: {field.field_name}')
+            # 经过可空外键：记录外键列，外键为空时按 DRF 规则处理
+            if model_field.null and null_lookup is None:
+                null_lookup = '__'.join(parts)
+            model = model_field.related_model
+
+        return ProjectionColumn(
+            field.field_name, '__'.join(parts), null_lookup, formatter, _missing_value(field),
+        )
+
+    @property
+    def field_names(self):
+        return [column.name for column in self.columns]
+
+    def select(self, field_names):
+        """返回只包含指定字段的投影（保持序列化器中的字段顺序）"""
+        field_names = set(field_names)
+        projection = copy.copy(self)
+        projection.columns = [column for column in self.columns if column.name in field_names]
+        return projection
+
+    @property
+    def lookups(self):
+        """values() 需要读取的全部查询路径"""
+        lookups = []
+        for column in self.columns:
+            for lookup in (column.lookup, column.null_lookup):
+                if lookup and lookup not in lookups:
+                    lookups.append(lookup)
+        return lookups
+
+    def values(self, queryset):
+        """
+        将模型查询集转换为只读取所需列的 values() 查询集（保留筛选和排序）
+
+        排序字段不在输出列中时一并读取，游标分页需要用它们生成游标
+        """
+        lookups = self.lookups
+        pk_name = self.model._meta.pk.name
+        for field in [pk_name, *queryset.query.order_by]:
+            if not isinstance(field, str) or field == '?':
+                continue
+            name = field.lstrip('-')
+            name = pk_name if name == 'pk' else name
+            if name not in lookups:
+                lookups.append(name)
+        return queryset.values(*lookups)
+
+    def to_representation(self, rows):
+        """
+        将 values() 行转换为序列化器格式的输出
+
+        Args:
+            rows: values() 返回的字典行（查询集、分页对象或列表）
+
+        Returns:
+            list: 与 serializer(many=True).data 相同结构的字典列表
+        """
+        with measure('serialize'):
+            return self._to_representation(rows)
+
+    def _to_representation(self, rows):
+        columns = [
+            (column.name, column.lookup, column.null_lookup, column.formatter(), column.missing)
+            for column in self.columns
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, null_lookup, to_representation, missing in columns:
+                if null_lookup is not None and row[null_lookup] is None:
+                    if missing is not empty:
+                        item[name] = missing
+                    continue
+                value = row[lookup]
+                if value is None or to_representation is None:
+                    item[name] = value
+                else:
+                    item[name] = to_representation(value)
+            data.append(item)
+        return data
+
+
+@lru_cache(maxsize=None)
+def get_projection(serializer_class):
+    """获取序列化器对应的快速读取投影（按序列化器类缓存，字段只解析一次）"""
+    return ValuesProjection(serializer_class)
+
+
+def parse_field_list(value):
+    """解析逗号分隔的字段列表"""
+    return [name.strip() for name in value.split(',') if name.strip()] if value else []
+
+
+class SparseFieldsMixin:
+    """
+    列表视图的字段选择（稀疏字段集）
+
+    - ?fields=id,name,department：只返回指定字段
+    - ?exclude=notes,created_at：返回除指定字段外的全部字段
+    两者可同时使用（先按 fields 选择，再排除 exclude）；未知字段返回 400。
+    """
+
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+
+    def get_available_fields(self):
+        """可供选择的字段（序列化器的输出字段，保持声明顺序）"""
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return [name for name, field in serializer.fields.items() if not field.write_only]
+
+    def get_selected_fields(self):
+        """
+        解析请求选择的字段
+
+        Returns:
+            list | None: 选中的字段（保持序列化器顺序）；请求未指定时返回 None，表示全部字段
+
+        Raises:
+            ValidationError: 包含序列化器中不存在的字段
+        """
+        if hasattr(self, '_selected_fields'):
+            return self._selected_fields
+
+        requested = parse_field_list(self.request.query_params.get(self.fields_query_param))
+        excluded = parse_field_list(self.request.query_params.get(self.exclude_query_param))
+        selected = None
+
+        if requested or excluded:
+            available = self.get_available_fields()
+            for param, names in ((self.fields_query_param, requested), (self.exclude_query_param, excluded)):
+                unknown = [name for name in names if name not in available]
+                if unknown:
+                    raise ValidationError({param: f'未知字段: {", ".join(unknown)}'})
+            selected = [
+                name for name in available
+                if (not requested or name in requested) and name not in excluded
+            ]
+
+        self._selected_fields = selected
+        return selected
+
+    def is_field_selected(self, name):
+        selected = self.get_selected_fields()
+        return selected is None or name in selected
+
+    def get_list_projection(self):
+        """获取按请求字段裁剪后的快速读取投影"""
+        projection = get_projection(self.get_serializer_class())
+        selected = self.get_selected_fields()
+        return projection if selected is None else projection.select(selected)
+
+    def narrow_serializer(self, serializer):
+        """裁剪序列化器的输出字段（序列化器路径使用）"""
+        selected = self.get_selected_fields()
+        if selected is not None:
+            child = getattr(serializer, 'child', serializer)
+            for name in list(child.fields):
+                if name not in selected:
+                    child.fields.pop(name)
+        return serializer
+
+    def only_selected_columns(self, queryset):
+        """
+        序列化器路径：用 .only() 只读取选中字段对应的列
+
+        只处理直接对应模型字段的序列化器字段；选中了跨关联的字段时不裁剪，避免逐行加载关联对象
+        """
+        selected = self.get_selected_fields()
+        if selected is None:
+            return queryset
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        opts = queryset.model._meta
+        columns = [opts.pk.name]
+        for name in selected:
+            source_attrs = serializer.fields[name].source_attrs
+            if not source_attrs:
+                # source='*'（如 SerializerMethodField）不对应单独的列
+                continue
+            if len(source_attrs) > 1:
+                return queryset
+            try:
+                model_field = opts.get_field(source_attrs[0])
+            except FieldDoesNotExist:
+                # 查询注解、模型属性等不是数据库列
+                continue
+            if model_field.concrete and not model_field.many_to_many:
+                columns.append(model_field.name)
+        return queryset.only(*columns)
@@ -0,0 +1,53 @@
+"""
+JSON 渲染器
+
+设计思路：
+1. ORJSONRenderer 使用 orjson（C 实现）编码响应，列表接口大批量数据时编码耗时明显低于标准库 json
+2. 输出与 DRF JSONRenderer 默认配置一致（紧凑格式、不转义中文、U+2028/2029 转义）：
+   日期时间、Decimal、惰性翻译字符串等 orjson 不直接处理或格式不同的类型，
+   交给 DRF 的 JSONEncoder.default 转换，格式与原渲染器相同
+3. orjson 为可选依赖：未安装，或请求指定了缩进（可浏览调试）时回退到 DRF JSONRenderer
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+from .metrics import measure
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 未安装时使用标准库 json
+    orjson = None
+
+if orjson is not None:
+    # 日期时间交给 DRF 编码器（毫秒精度、UTC 输出为 Z）；非字符串键与 json 模块一样转为字符串
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+else:
+    ORJSON_OPTIONS = 0
+
+
+class ORJSONRenderer(JSONRenderer):
+    """与 JSONRenderer 输出一致、使用 orjson 编码的渲染器"""
+
+    def can_use_orjson(self, accepted_media_type, renderer_context):
+        """orjson 只输出紧凑格式，需要缩进或自定义格式时使用 JSONRenderer"""
+        return (
+            orjson is not None
+            and self.get_indent(accepted_media_type, renderer_context or {}) is None
+            and self.compact
+            and not self.ensure_ascii
+            and self.strict
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with measure('render'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if data is None:
+            return b''
+        if not self.can_use_orjson(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder_class().default, option=ORJSON_OPTIONS)
+        # 与 JSONRenderer 一致：转义 JavaScript 中非法的行分隔符
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,80 @@
+"""
+用户角色解析
+
+设计思路：
+1. 权限类和视图统一通过 is_admin(request) / has_role() 判断角色，不再各自查询 groups
+2. 一个请求内用户组只解析一次：结果记录在 request 对象上，权限类和视图共用
+3. 跨请求使用进程内 LRU 缓存（带过期时间和容量上限），命中时不访问数据库
+4. 用户组成员变化（m2m_changed）、组改名或删除时由 api.signals 调用 invalidate_* 使缓存失效；
+   多进程部署时其他 worker 依赖过期时间（ROLE_CACHE_TIMEOUT）收敛
+5. is_superuser 直接读取用户对象，不参与缓存
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+
+from .cache import LRUCache
+
+ADMIN_GROUP = 'Admin'
+
+# 进程内缓存有效期（秒）和最大条目数
+ROLE_CACHE_TIMEOUT = getattr(settings, 'ROLE_CACHE_TIMEOUT', 60)
+ROLE_CACHE_MAX_ENTRIES = getattr(settings, 'ROLE_CACHE_MAX_ENTRIES', 10000)
+
+# 请求内缓存在 request 对象上的属性名
+_REQUEST_ATTR = '_cached_group_names'
+
+
+# 进程内用户组缓存：{user_id: 组名集合}
+role_cache = LRUCache(ROLE_CACHE_TIMEOUT, ROLE_CACHE_MAX_ENTRIES)
+
+
+def get_user_groups(user):
+    """
+    获取用户所属的组名集合（进程内缓存）
+
+    Returns:
+        frozenset: 组名集合；匿名用户返回空集合
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    groups = role_cache.get(user.pk)
+    if groups is None:
+        groups = frozenset(
+            Group.objects.filter(user=user.pk).values_list('name', flat=True)
+        )
+        role_cache.set(user.pk, groups)
+    return groups
+
+
+def get_request_groups(request):
+    """获取当前请求用户的组名集合，同一请求内只解析一次"""
+    groups = getattr(request, _REQUEST_ATTR, None)
+    if groups is None:
+        groups = get_user_groups(request.user)
+        setattr(request, _REQUEST_ATTR, groups)
+    return groups
+
+
+def has_role(request, group_name):
+    """当前请求用户是否属于指定组"""
+    return group_name in get_request_groups(request)
+
+
+def is_admin(request):
+    """当前请求用户是否为管理员（超级用户或 Admin 组成员）"""
+    user = request.user
+    if not user or not user.is_authenticated:
+        return False
+    return user.is_superuser or has_role(request, ADMIN_GROUP)
+
+
+def invalidate_user_roles(*user_ids):
+    """使指定用户的角色缓存失效"""
+    role_cache.invalidate(*user_ids)
+
+
+def invalidate_all_roles():
+    """使全部角色缓存失效（组改名、删除等影响多个用户的变更）"""
+    role_cache.clear()
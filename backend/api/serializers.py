@@ -1,6 +1,12 @@
 from rest_framework import serializers
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.settings import api_settings
+from rest_framework.validators import UniqueValidator, UniqueTogetherValidator
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
 from .models import Department, Employee, SalaryRecord
+from .metrics import measure
 # , KnowledgeDocument, ChatSession, ChatMessage
 from decimal import Decimal
 import re
@@ -9,21 +15,198 @@ from datetime import datetime
 from django.conf import settings
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class TimedSerializerMixin:
+    """
+    序列化器 .data 计入当前请求的 serialize 阶段（api.metrics，Server-Timing 和 /api/metrics/）
+
+    嵌套序列化器只计最外层；序列化期间的延迟查询同时计入 db 和 serialize。
+    """
+
+    @property
+    def data(self):
+        with measure('serialize'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    """many=True 时计时的列表序列化器（Meta.list_serializer_class）"""
+
+
+class BatchUniqueListSerializer(TimedListSerializer):
+    """
+    批量写入（many=True）时统一校验唯一性的列表序列化器
+    
+    设计思路：
+    - 子序列化器逐个校验时，唯一性检查（validate_xxx 中的 exists()、ModelSerializer 自动添加的
+      UniqueValidator / UniqueTogetherValidator）每个对象各查询一次，批量写入时为 O(n) 次查询
+    - 由列表序列化器收集整批数据的候选键，每个唯一约束只查询一次数据库，同时检查批次内的重复
+    - 主键关联字段（如 department_ref、employee）同样整批用 in_bulk 一次解析，不再逐个 get()
+    - 子序列化器在 Meta.batch_unique 中声明唯一约束及错误提示：
+        batch_unique = {('name',): '该部门名称已存在', ('employee', 'salary_period'): '...'}
+      单字段约束的错误归到该字段，多字段约束归到 non_field_errors
+    - 只用于新建；传入 instance 的批量更新仍由子序列化器逐个校验
+    """
+
+    def run_child_validation(self, data):
+        validated = super().run_child_validation(data)
+        self._validated_items.append(validated)
+        return validated
+
+    def to_internal_value(self, data):
+        self._validated_items = []
+        if self.instance is None and isinstance(data, list):
+            self.prefetch_related_fields(data)
+
+        try:
+            ret = super().to_internal_value(data)
+            errors = [{} for _ in ret]
+        except serializers.ValidationError as exc:
+            if not isinstance(exc.detail, list):
+                raise
+            ret = None
+            errors = exc.detail
+
+        if self.instance is None:
+            # 与 data 对齐：校验失败的对象为 None
+            validated = iter(self._validated_items)
+            items = [None if error else next(validated) for error in errors]
+            self.check_batch_unique(items, errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return ret
+
+    def prefetch_related_fields(self, data):
+        """整批解析主键关联字段：每个字段一次 in_bulk 查询，替换该字段逐个 get() 的解析方法"""
+        for name, field in self.child.fields.items():
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+
+            pk_field = field.get_queryset().model._meta.pk
+            keys = set()
+            for item in data:
+                value = item.get(field.source) if isinstance(item, dict) else None
+                if value is None or isinstance(value, bool):
+                    continue
+                try:
+                    keys.add(pk_field.to_python(value))
+                except (DjangoValidationError, TypeError, ValueError):
+                    continue
+            objects = field.get_queryset().in_bulk(keys) if keys else {}
+
+            def to_internal_value(value, field=field, pk_field=pk_field, objects=objects):
+                if isinstance(value, bool):
+                    field.fail('incorrect_type', data_type=type(value).__name__)
+                try:
+                    key = pk_field.to_python(value)
+                except (DjangoValidationError, TypeError, ValueError):
+                    field.fail('incorrect_type', data_type=type(value).__name__)
+                if key not in objects:
+                    field.fail('does_not_exist', pk_value=value)
+                return objects[key]
+
+            field.to_internal_value = to_internal_value
+
+    @staticmethod
+    def key_value(value):
+        """关联对象取主键，使批次中的值可与数据库中的值比较"""
+        return value.pk if isinstance(value, models.Model) else value
+
+    def check_batch_unique(self, items, errors):
+        """逐个唯一约束检查批次内重复和数据库中已存在的值（每个约束一次查询）"""
+        model = self.child.Meta.model
+        for fields, message in getattr(self.child.Meta, 'batch_unique', {}).items():
+            error_key = fields[0] if len(fields) == 1 else api_settings.NON_FIELD_ERRORS_KEY
+
+            keys = {}
+            for index, item in enumerate(items):
+                if item is None:
+                    continue
+                key = tuple(self.key_value(item.get(field)) for field in fields)
+                if None in key:
+                    continue
+                if key in keys:
+                    errors[index].setdefault(error_key, []).append(
+                        ErrorDetail(f'与第 {keys[key] + 1} 条数据重复', code='unique')
+                    )
+                else:
+                    keys[key] = index
+
+            if not keys:
+                continue
+            # 多字段约束按各字段 IN 查询后在内存中比对组合，仍只有一次查询
+            lookup = {f'{field}__in': {key[position] for key in keys} for position, field in enumerate(fields)}
+            existing = set(model.objects.filter(**lookup).values_list(*fields))
+            for key, index in keys.items():
+                if key in existing:
+                    errors[index].setdefault(error_key, []).append(ErrorDetail(message, code='unique'))
+
+
+class BatchUniqueMixin:
+    """
+    支持 BatchUniqueListSerializer 的模型序列化器混入类
+    
+    many=True 新建时去掉已由列表序列化器批量校验的唯一性检查：
+    字段上的 UniqueValidator、序列化器上的 UniqueTogetherValidator，
+    validate_xxx 中通过 validated_in_batch 判断是否跳过 exists() 查询。
+    """
+
+    @property
+    def validated_in_batch(self):
+        """是否作为批量新建的子序列化器（唯一性由列表序列化器统一校验）"""
+        return isinstance(self.parent, BatchUniqueListSerializer) and self.parent.instance is None
+
+    def batch_unique_fields(self):
+        return [tuple(fields) for fields in getattr(self.Meta, 'batch_unique', {})]
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.validated_in_batch:
+            for unique_fields in self.batch_unique_fields():
+                if len(unique_fields) == 1 and unique_fields[0] in fields:
+                    field = fields[unique_fields[0]]
+                    field.validators = [
+                        validator for validator in field.validators
+                        if not isinstance(validator, UniqueValidator)
+                    ]
+        return fields
+
+    def get_validators(self):
+        validators = super().get_validators()
+        if self.validated_in_batch:
+            covered = {frozenset(fields) for fields in self.batch_unique_fields()}
+            validators = [
+                validator for validator in validators
+                if not (isinstance(validator, UniqueTogetherValidator) and frozenset(validator.fields) in covered)
+            ]
+        return validators
+
+
+class DepartmentSerializer(TimedSerializerMixin, BatchUniqueMixin, serializers.ModelSerializer):
     """部门序列化器"""
+    # 列表和详情视图通过 Department.objects.with_employee_counts() 预先聚合，避免 N+1 查询
     employee_count = serializers.ReadOnlyField()
+    active_employee_count = serializers.ReadOnlyField()
     
     class Meta:
         model = Department
         fields = [
             'id', 'name', 'code', 'description', 'manager', 'manager_title',
             'location', 'phone', 'email', 'budget', 'status', 'employee_count',
-            'created_at', 'updated_at'
+            'active_employee_count', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'employee_count', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'employee_count', 'active_employee_count', 'created_at', 'updated_at']
+        list_serializer_class = BatchUniqueListSerializer
+        # 批量新建时由 BatchUniqueListSerializer 统一校验
+        batch_unique = {
+            ('name',): '该部门名称已存在',
+            ('code',): '该部门代码已存在',
+        }
     
     def validate_name(self, value):
         """验证部门名称唯一性"""
+        if self.validated_in_batch:
+            return value
         if self.instance:
             # 更新时排除当前实例
             if Department.objects.exclude(pk=self.instance.pk).filter(name=value).exists():
@@ -36,6 +219,8 @@ class DepartmentSerializer(serializers.ModelSerializer):
     
     def validate_code(self, value):
         """验证部门代码唯一性"""
+        if self.validated_in_batch:
+            return value
         if self.instance:
             # 更新时排除当前实例
             if Department.objects.exclude(pk=self.instance.pk).filter(code=value).exists():
@@ -65,7 +250,7 @@ class DepartmentSerializer(serializers.ModelSerializer):
         return value
 
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(TimedSerializerMixin, BatchUniqueMixin, serializers.ModelSerializer):
     """员工序列化器"""
     department_name = serializers.CharField(source='department_ref.name', read_only=True)
     
@@ -78,9 +263,15 @@ class EmployeeSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'department', 'department_name', 'created_at', 'updated_at']
+        list_serializer_class = BatchUniqueListSerializer
+        batch_unique = {
+            ('employee_id',): '该工号已存在',
+        }
     
     def validate_employee_id(self, value):
         """验证工号唯一性"""
+        if self.validated_in_batch:
+            return value
         if self.instance:
             # 更新时排除当前实例
             if Employee.objects.exclude(pk=self.instance.pk).filter(employee_id=value).exists():
@@ -120,7 +311,7 @@ class EmployeeSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class SalaryRecordSerializer(serializers.ModelSerializer):
+class SalaryRecordSerializer(TimedSerializerMixin, BatchUniqueMixin, serializers.ModelSerializer):
     """薪资记录序列化器"""
     employee_name = serializers.CharField(source='employee.name', read_only=True)
     employee_id = serializers.CharField(source='employee.employee_id', read_only=True)
@@ -131,10 +322,19 @@ class SalaryRecordSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'employee', 'employee_id', 'employee_name', 'department',
             'salary_period', 'position_snapshot', 'base_salary_snapshot',
-            'bonus', 'deductions', 'gross_salary', 'net_salary',
+            'bonus', 'deductions', 'department_bonus', 'attendance_deduction',
+            'social_insurance', 'income_tax', 'gross_salary', 'net_salary',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'gross_salary', 'net_salary', 'created_at', 'updated_at']
+        # 规则明细由薪资规则计算，只读
+        read_only_fields = [
+            'id', 'department_bonus', 'attendance_deduction', 'social_insurance', 'income_tax',
+            'gross_salary', 'net_salary', 'created_at', 'updated_at',
+        ]
+        list_serializer_class = BatchUniqueListSerializer
+        batch_unique = {
+            ('employee', 'salary_period'): '该员工在此期间已有薪资记录',
+        }
     
     def validate_salary_period(self, value):
         """验证薪资期间格式"""
@@ -168,6 +368,9 @@ class SalaryRecordSerializer(serializers.ModelSerializer):
         employee = attrs.get('employee')
         salary_period = attrs.get('salary_period')
         
+        if self.validated_in_batch:
+            return attrs
+        
         # 检查同一员工同一期间是否已有记录
         if self.instance:
             # 更新时排除当前实例
@@ -186,7 +389,7 @@ class SalaryRecordSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class SalaryCalculationSerializer(serializers.Serializer):
+class SalaryCalculationSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for salary calculation
     
     This serializer handles the validation of salary calculation data including:
@@ -265,7 +468,7 @@ class SalaryCalculationSerializer(serializers.Serializer):
             raise serializers.ValidationError("扣除不能为负数")
         return value
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """User serializer for handling user data
     
     This serializer handles the serialization/deserialization of User model data.
@@ -0,0 +1,347 @@
+"""
+考勤汇总服务
+
+设计思路：
+1. 维护两张预聚合表：按日汇总（AttendanceDailyRollup）和按部门按日汇总（AttendanceDepartmentDailyRollup）
+2. 单条写入（信号）和批量导入按增量更新汇总：根据记录写入前后的取值（日期、部门、状态、工时）
+   计算各汇总行的差值，每个受影响的汇总行执行一条 UPDATE ... SET col = col + 差值，
+   不重新聚合整天的原始记录；记录改日期时旧日期减去、新日期加上；
+   员工调整部门时其全部考勤从原部门的汇总行移到新部门（move_employee），按日汇总不变
+3. 汇总行不存在时插入；差值为负但汇总行不存在或计数变为负数（汇总表与原始记录不一致，
+   如直接修改数据库后未重建）时，回退为按日期重算（refresh_dates）
+4. refresh_dates 由原始记录重新聚合受影响日期，重复执行结果一致，用于批量装载历史数据和全量重建
+5. 趋势查询和仪表盘考勤率只读取汇总表，12 个月的趋势只需读取几百行
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum, Q, F
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from ..models import AttendanceRecord, AttendanceDailyRollup, AttendanceDepartmentDailyRollup
+
+logger = logging.getLogger(__name__)
+
+# 计入请假的考勤状态
+LEAVE_STATUSES = ['sick_leave', 'personal_leave', 'annual_leave']
+
+# 汇总表的统计字段
+ROLLUP_COUNT_FIELDS = [
+    'total_count', 'present_count', 'late_count', 'early_leave_count',
+    'overtime_count', 'absent_count', 'leave_count',
+]
+ROLLUP_HOUR_FIELDS = ['work_hours', 'overtime_hours']
+ROLLUP_FIELDS = ROLLUP_COUNT_FIELDS + ROLLUP_HOUR_FIELDS
+# 考勤状态 -> 计数字段
+STATUS_COUNT_FIELDS = {
+    'present': 'present_count',
+    'late': 'late_count',
+    'early_leave': 'early_leave_count',
+    'overtime': 'overtime_count',
+    'absent': 'absent_count',
+    **{status: 'leave_count' for status in LEAVE_STATUSES},
+}
+
+# 趋势查询的预设时间范围
+TREND_PERIODS = {
+    '7d': timedelta(days=7),
+    '30d': timedelta(days=30),
+    '90d': timedelta(days=90),
+    '12m': timedelta(days=365),
+}
+DEFAULT_TREND_PERIOD = '30d'
+# 单次趋势查询允许的最大天数
+MAX_TREND_DAYS = 3 * 366
+
+
+def rollup_aggregates():
+    """从原始考勤记录计算汇总字段的聚合表达式"""
+    return {
+        'total_count': Count('id'),
+        'present_count': Count('id', filter=Q(status='present')),
+        'late_count': Count('id', filter=Q(status='late')),
+        'early_leave_count': Count('id', filter=Q(status='early_leave')),
+        'overtime_count': Count('id', filter=Q(status='overtime')),
+        'absent_count': Count('id', filter=Q(status='absent')),
+        'leave_count': Count('id', filter=Q(status__in=LEAVE_STATUSES)),
+        'work_hours': Coalesce(Sum('work_hours'), Decimal('0.00')),
+        'overtime_hours': Coalesce(Sum('overtime_hours'), Decimal('0.00')),
+    }
+
+
+def summed_rollup_fields():
+    """对汇总表再次求和的聚合表达式（按月汇总、区间合计时使用）"""
+    aggregates = {field: Coalesce(Sum(field), 0) for field in ROLLUP_COUNT_FIELDS}
+    aggregates.update({field: Coalesce(Sum(field), Decimal('0.00')) for field in ROLLUP_HOUR_FIELDS})
+    return aggregates
+
+
+def rollup_fact(day, department, status, work_hours, overtime_hours):
+    """一条考勤记录对汇总的贡献，工时统一为 Decimal"""
+    return day, department, status, Decimal(str(work_hours or 0)), Decimal(str(overtime_hours or 0))
+
+
+class RollupOutOfSync(Exception):
+    """汇总表与原始记录不一致，增量无法应用"""
+
+
+class AttendanceRollupService:
+    """考勤汇总表维护与查询"""
+
+    @staticmethod
+    def record_fact(record, department):
+        """
+        考勤记录对汇总的贡献：(日期, 部门, 状态, 工作时长, 加班时长)
+
+        Args:
+            record: AttendanceRecord 实例
+            department: 员工所在部门名称
+        """
+        return rollup_fact(record.date, department, record.status, record.work_hours, record.overtime_hours)
+
+    @staticmethod
+    def collect_deltas(changes):
+        """
+        汇总各行的差值
+
+        Args:
+            changes: 可迭代的 (写入前, 写入后)，均为 record_fact() 的结果，新增时写入前为 None，删除时写入后为 None
+
+        Returns:
+            tuple: ({日期: {字段: 差值}}, {(日期, 部门): {字段: 差值}})，已去掉差值全为 0 的行
+        """
+        daily = defaultdict(lambda: defaultdict(int))
+        departments = defaultdict(lambda: defaultdict(int))
+        for before, after in changes:
+            for fact, sign in ((before, -1), (after, 1)):
+                if fact is None:
+                    continue
+                day, department, status, work_hours, overtime_hours = fact
+                for deltas in (daily[day], departments[(day, department)]):
+                    deltas['total_count'] += sign
+                    if status in STATUS_COUNT_FIELDS:
+                        deltas[STATUS_COUNT_FIELDS[status]] += sign
+                    deltas['work_hours'] += sign * work_hours
+                    deltas['overtime_hours'] += sign * overtime_hours
+
+        def non_zero(rows):
+            rows = {key: {field: value for field, value in deltas.items() if value} for key, deltas in rows.items()}
+            return {key: deltas for key, deltas in rows.items() if deltas}
+
+        return non_zero(daily), non_zero(departments)
+
+    def apply_changes(self, changes):
+        """
+        按增量更新汇总表
+
+        Args:
+            changes: 见 collect_deltas()
+        """
+        daily, departments = self.collect_deltas(changes)
+        if not daily and not departments:
+            return
+        try:
+            with transaction.atomic():
+                self._apply_deltas(AttendanceDailyRollup, ('date',), {(day,): deltas for day, deltas in daily.items()})
+                self._apply_deltas(AttendanceDepartmentDailyRollup, ('date', 'department'), departments)
+        except (IntegrityError, RollupOutOfSync):
+            dates = set(daily) | {day for day, _ in departments}
+            logger.warning(f"考勤汇总增量更新失败，按日期重算：{sorted(dates)}", exc_info=True)
+            self.refresh_dates(dates)
+
+    def move_employee(self, employee_id, old_department, new_department):
+        """员工调整部门后，将其全部考勤从原部门的汇总行移到新部门"""
+        records = AttendanceRecord.objects.filter(employee_id=employee_id).values_list(
+            'date', 'status', 'work_hours', 'overtime_hours'
+        )
+        self.apply_changes(
+            (rollup_fact(day, old_department, *values), rollup_fact(day, new_department, *values))
+            for day, *values in records.iterator()
+        )
+
+    @staticmethod
+    def _apply_deltas(model, key_fields, rows):
+        """逐个汇总行执行 col = col + 差值；行不存在时插入，计数归零的行删除"""
+        now = timezone.now()
+        emptied = Q()
+        for key, deltas in rows.items():
+            lookup = dict(zip(key_fields, key))
+            updated = model.objects.filter(**lookup).update(
+                updated_at=now, **{field: F(field) + value for field, value in deltas.items()}
+            )
+            if not updated:
+                if any(value < 0 for value in deltas.values()):
+                    raise RollupOutOfSync(f'{model.__name__} 缺少汇总行：{lookup}')
+                model.objects.create(**lookup, **deltas)
+            if deltas.get('total_count', 0) < 0:
+                emptied |= Q(**lookup)
+        if emptied:
+            model.objects.filter(emptied, total_count__lte=0).delete()
+
+    def refresh_dates(self, dates):
+        """
+        重算指定日期的汇总数据
+
+        Args:
+            dates: 受影响的考勤日期集合
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return
+
+        records = AttendanceRecord.objects.filter(date__in=dates)
+        daily_rows = list(records.values('date').annotate(**rollup_aggregates()).order_by())
+        department_rows = list(
+            records.values('date', department=F('employee__department'))
+            .annotate(**rollup_aggregates())
+            .order_by()
+        )
+
+        with transaction.atomic():
+            AttendanceDailyRollup.objects.bulk_create(
+                [AttendanceDailyRollup(**row) for row in daily_rows],
+                update_conflicts=True,
+                unique_fields=['date'],
+                update_fields=ROLLUP_FIELDS + ['updated_at'],
+            )
+            AttendanceDepartmentDailyRollup.objects.bulk_create(
+                [AttendanceDepartmentDailyRollup(**row) for row in department_rows],
+                update_conflicts=True,
+                unique_fields=['date', 'department'],
+                update_fields=ROLLUP_FIELDS + ['updated_at'],
+            )
+
+            # 删除已没有考勤记录的日期 / 部门
+            AttendanceDailyRollup.objects.filter(date__in=dates).exclude(
+                date__in=[row['date'] for row in daily_rows]
+            ).delete()
+            stale_departments = Q()
+            for day in dates:
+                departments = [row['department'] for row in department_rows if row['date'] == day]
+                stale_departments |= Q(date=day) & ~Q(department__in=departments)
+            AttendanceDepartmentDailyRollup.objects.filter(stale_departments).delete()
+
+    def rebuild(self, start_date=None, end_date=None, chunk_days=31):
+        """
+        全量重建汇总表（首次部署、批量装载或直接修改数据库后使用）
+
+        Returns:
+            int: 重算的日期数
+        """
+        records = AttendanceRecord.objects.all()
+        stale = AttendanceDailyRollup.objects.all()
+        if start_date:
+            records = records.filter(date__gte=start_date)
+            stale = stale.filter(date__gte=start_date)
+        if end_date:
+            records = records.filter(date__lte=end_date)
+            stale = stale.filter(date__lte=end_date)
+
+        dates = set(records.values_list('date', flat=True).distinct().order_by())
+        dates.update(stale.values_list('date', flat=True))
+        dates = sorted(dates)
+
+        for index in range(0, len(dates), chunk_days):
+            self.refresh_dates(dates[index:index + chunk_days])
+
+        logger.info(f"考勤汇总表重建完成：{len(dates)} 天")
+        return len(dates)
+
+    @staticmethod
+    def resolve_range(period=None, start_date=None, end_date=None, today=None):
+        """
+        解析趋势查询的日期范围
+
+        Returns:
+            tuple: (开始日期, 结束日期)
+
+        Raises:
+            ValueError: 参数无效
+        """
+        today = today or timezone.localdate()
+        if start_date or end_date:
+            end_date = end_date or today
+            start_date = start_date or end_date - TREND_PERIODS[DEFAULT_TREND_PERIOD] + timedelta(days=1)
+        else:
+            period = period or DEFAULT_TREND_PERIOD
+            if period not in TREND_PERIODS:
+                raise ValueError(f'无效的时间范围: {period}，可选值: {", ".join(TREND_PERIODS)}')
+            end_date = today
+            start_date = today - TREND_PERIODS[period] + timedelta(days=1)
+
+        if start_date > end_date:
+            raise ValueError('开始日期不能晚于结束日期')
+        if (end_date - start_date).days >= MAX_TREND_DAYS:
+            raise ValueError(f'时间范围不能超过 {MAX_TREND_DAYS} 天')
+        return start_date, end_date
+
+    @staticmethod
+    def build_point(label, row):
+        """根据汇总数据计算趋势点（含出勤率）"""
+        total = row['total_count']
+        attended = row['present_count'] + row['late_count'] + row['early_leave_count'] + row['overtime_count']
+        point = {'date': label}
+        point.update({field: row[field] for field in ROLLUP_COUNT_FIELDS})
+        point.update({field: float(row[field]) for field in ROLLUP_HOUR_FIELDS})
+        point['attendance_rate'] = round(attended / total * 100, 1) if total else 0
+        point['average_work_hours'] = round(float(row['work_hours']) / attended, 2) if attended else 0
+        return point
+
+    def get_trends(self, start_date, end_date, department=None, group_by='day'):
+        """
+        读取考勤趋势
+
+        Args:
+            start_date / end_date: 日期范围（含）
+            department: 部门名称，为空时读取全公司汇总
+            group_by: day（按日，缺失日期补零）或 month（按月）
+
+        Returns:
+            list: 趋势点列表
+        """
+        if department:
+            queryset = AttendanceDepartmentDailyRollup.objects.filter(department=department)
+        else:
+            queryset = AttendanceDailyRollup.objects.all()
+        queryset = queryset.filter(date__gte=start_date, date__lte=end_date)
+
+        if group_by == 'month':
+            rows = (
+                queryset.annotate(month=TruncMonth('date'))
+                .values('month')
+                .annotate(**summed_rollup_fields())
+                .order_by('month')
+            )
+            return [self.build_point(row['month'].strftime('%Y-%m'), row) for row in rows]
+
+        rows = {
+            row['date']: row
+            for row in queryset.values('date', *ROLLUP_FIELDS).order_by('date')
+        }
+        empty = dict.fromkeys(ROLLUP_COUNT_FIELDS, 0)
+        empty.update(dict.fromkeys(ROLLUP_HOUR_FIELDS, Decimal('0.00')))
+
+        points = []
+        day = start_date
+        while day <= end_date:
+            points.append(self.build_point(day.isoformat(), rows.get(day, empty)))
+            day += timedelta(days=1)
+        return points
+
+    def get_totals(self, start_date, end_date, department=None):
+        """读取日期范围内的合计值"""
+        if department:
+            queryset = AttendanceDepartmentDailyRollup.objects.filter(department=department)
+        else:
+            queryset = AttendanceDailyRollup.objects.all()
+        totals = queryset.filter(date__gte=start_date, date__lte=end_date).aggregate(
+            **summed_rollup_fields()
+        )
+        point = self.build_point(None, totals)
+        point.pop('date')
+        return point
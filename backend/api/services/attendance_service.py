@@ -0,0 +1,370 @@
+"""
+考勤数据导入服务
+
+设计思路：
+1. 接收 NDJSON / CSV / JSON 数组格式的打卡事件，按批处理
+2. 每批只执行固定次数的查询：一次解析工号 -> 员工 UUID，一次读取已有考勤记录，一次批量 upsert
+3. 同一员工同一天的多次打卡合并为一条记录：最早签到、最晚签退（与库中已有记录合并）；
+   已有记录上的请假状态在导入数据未显式给出状态时保留，不被打卡推导的状态覆盖
+4. 工作时长、加班时长和考勤状态按列（列表）统一计算，避免逐对象调用模型方法
+5. 以 (employee, date) 唯一约束执行 bulk_create(update_conflicts=True)
+6. 写入后增量刷新受影响日期的考勤汇总表（见 attendance_rollup_service）
+"""
+
+import csv
+import io
+import json
+import logging
+import time
+
+from django.db import transaction
+
+from ..cache import bump_model_version
+from ..models import Employee, AttendanceRecord
+from ..parsing import ParseError, parse_date, parse_time
+from .dashboard_service import DashboardStatsService
+from .attendance_rollup_service import AttendanceRollupService, rollup_fact
+
+logger = logging.getLogger(__name__)
+
+# 作息规则（分钟）
+WORK_START = 9 * 60               # 上班时间 9:00
+LATE_AFTER = 9 * 60 + 30          # 9:30 之后签到记为迟到
+WORK_END = 18 * 60                # 下班时间 18:00
+EARLY_LEAVE_BEFORE = 17 * 60 + 30  # 17:30 之前签退记为早退
+OVERTIME_AFTER = 19 * 60          # 19:00 之后签退计算加班
+LUNCH_BREAK = 60                  # 午休时长
+
+# 不由打卡时间推导的考勤状态（请假、缺勤等），导入数据中显式给出时保留
+EXPLICIT_STATUSES = {'absent', 'sick_leave', 'personal_leave', 'annual_leave'}
+VALID_STATUSES = {choice for choice, _ in AttendanceRecord.ATTENDANCE_STATUS_CHOICES}
+# 重新导入只有打卡时间的数据时，保留已有记录上的这些状态；
+# 缺勤可能是无打卡时推导出来的，出现打卡后按打卡时间重新计算
+PRESERVED_STATUSES = EXPLICIT_STATUSES - {'absent'}
+
+
+class AttendanceIngestError(ValueError):
+    """单行数据校验失败"""
+
+
+def _parse_time(value):
+    if value in (None, ''):
+        return None
+    return parse_time(value)
+
+
+def _to_minutes(value):
+    return None if value is None else value.hour * 60 + value.minute + value.second / 60
+
+
+def _hours(minutes):
+    """分钟数转为两位小数的小时字符串（DecimalField 可直接接收）"""
+    return f'{min(minutes, 5999) / 60:.2f}'
+
+
+def derive_columns(check_in_minutes, check_out_minutes, explicit_statuses):
+    """
+    按列计算工作时长、加班时长和考勤状态
+
+    Args:
+        check_in_minutes: 签到时间（当天分钟数）列表，可为 None
+        check_out_minutes: 签退时间列表，可为 None
+        explicit_statuses: 导入数据中显式给出的状态列表，可为 None
+
+    Returns:
+        tuple: (work_hours 列表, overtime_hours 列表, status 列表)
+    """
+    spans = [
+        (out - cin) if cin is not None and out is not None and out > cin else 0
+        for cin, out in zip(check_in_minutes, check_out_minutes)
+    ]
+    work_hours = [_hours(max(0, span - LUNCH_BREAK)) for span in spans]
+    overtime_hours = [
+        _hours(out - WORK_END) if out is not None and out >= OVERTIME_AFTER else '0.00'
+        for out in check_out_minutes
+    ]
+
+    statuses = []
+    for cin, out, explicit in zip(check_in_minutes, check_out_minutes, explicit_statuses):
+        if explicit in EXPLICIT_STATUSES or (explicit and cin is None and out is None):
+            statuses.append(explicit)
+        elif cin is None and out is None:
+            statuses.append('absent')
+        elif cin is not None and cin > LATE_AFTER:
+            statuses.append('late')
+        elif out is not None and out < EARLY_LEAVE_BEFORE:
+            statuses.append('early_leave')
+        elif out is not None and out >= OVERTIME_AFTER:
+            statuses.append('overtime')
+        else:
+            statuses.append(explicit or 'present')
+    return work_hours, overtime_hours, statuses
+
+
+def parse_ndjson(lines):
+    """
+    逐行解析 NDJSON，空行跳过；解析失败的行以异常对象返回，由导入流程记录错误
+
+    Yields:
+        tuple: (文件行号, 事件)
+    """
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as e:
+            yield line_number, AttendanceIngestError(f'无效的 JSON: {e}')
+
+
+def parse_csv(lines):
+    """
+    解析带表头的 CSV
+
+    Yields:
+        tuple: (文件行号, 事件)，行号为该行在文件中的结束行（含表头，字段内换行时按实际行计）
+    """
+    decoded = (line.decode('utf-8') if isinstance(line, bytes) else line for line in lines)
+    reader = csv.DictReader(decoded)
+    for row in reader:
+        yield reader.line_num, row
+
+
+PARSERS = {
+    'ndjson': parse_ndjson,
+    'csv': parse_csv,
+}
+# 支持的导入格式（json 为整体解析的 JSON 数组，仅用于较小的请求）
+INPUT_FORMATS = (*PARSERS, 'json')
+
+
+class AttendanceIngestService:
+    """
+    考勤批量导入服务
+
+    支持两种事件格式（可混用）：
+    - 打卡事件：{"employee_id": "EMP001", "date": "2025-06-01", "event": "check_in", "time": "08:55"}
+    - 整日记录：{"employee_id": "EMP001", "date": "2025-06-01", "check_in_time": "08:55",
+                 "check_out_time": "18:10", "status": "present"}
+    """
+
+    DEFAULT_BATCH_SIZE = 5000
+    MAX_REPORTED_ERRORS = 100
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self.stats = {'received': 0, 'upserted': 0, 'failed': 0, 'batches': 0}
+        self.errors = []
+
+    def record_error(self, line, message):
+        self.stats['failed'] += 1
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'error': message})
+
+    @staticmethod
+    def normalize_event(event):
+        """
+        将单条事件规范化为 (工号, 日期, 签到, 签退, 状态)
+
+        Raises:
+            AttendanceIngestError: 字段缺失或取值无效
+            ParseError: 日期或时间格式错误
+        """
+        if isinstance(event, Exception):
+            raise event
+        if not isinstance(event, dict):
+            raise AttendanceIngestError('每条记录必须是对象')
+
+        employee_code = str(event.get('employee_id') or '').strip()
+        if not employee_code:
+            raise AttendanceIngestError('缺少 employee_id')
+        record_date = parse_date(event.get('date'))
+
+        check_in = _parse_time(event.get('check_in_time'))
+        check_out = _parse_time(event.get('check_out_time'))
+        event_type = event.get('event')
+        if event_type:
+            punch = _parse_time(event.get('time'))
+            if event_type == 'check_in':
+                check_in = punch
+            elif event_type == 'check_out':
+                check_out = punch
+            else:
+                raise AttendanceIngestError(f'无效的事件类型: {event_type}')
+
+        status = event.get('status') or None
+        if status and status not in VALID_STATUSES:
+            raise AttendanceIngestError(f'无效的考勤状态: {status}')
+
+        return employee_code, record_date, check_in, check_out, status
+
+    def ingest(self, events):
+        """
+        导入事件流
+
+        Args:
+            events: 可迭代的 (行号, 事件) 对，事件为字典或解析失败的异常对象（见 read_events / PARSERS）
+
+        Returns:
+            dict: 导入统计（接收、写入、失败行数、批次数、耗时、行/秒）及错误明细
+        """
+        started = time.perf_counter()
+        batch = []
+        for line_number, event in events:
+            self.stats['received'] += 1
+            try:
+                batch.append((line_number, self.normalize_event(event)))
+            except (AttendanceIngestError, ParseError) as e:
+                self.record_error(line_number, str(e))
+
+            if len(batch) >= self.batch_size:
+                self.ingest_batch(batch)
+                batch = []
+
+        if batch:
+            self.ingest_batch(batch)
+
+        elapsed = time.perf_counter() - started
+        result = {
+            **self.stats,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.stats['received'] / elapsed, 1) if elapsed else None,
+            'errors': self.errors,
+        }
+        logger.info(
+            f"考勤导入完成：接收 {result['received']} 行，写入 {result['upserted']} 条，"
+            f"失败 {result['failed']} 行，{result['rows_per_second']} 行/秒"
+        )
+        return result
+
+    def ingest_batch(self, batch):
+        """处理一批已规范化的事件"""
+        self.stats['batches'] += 1
+
+        # 1. 工号 -> 员工 UUID 和部门（一次查询）
+        codes = {normalized[0] for _, normalized in batch}
+        employees = Employee.objects.filter(employee_id__in=codes).values_list('employee_id', 'id', 'department')
+        employee_ids = {code: employee_uuid for code, employee_uuid, _ in employees}
+        departments = {employee_uuid: department for _, employee_uuid, department in employees}
+
+        # 2. 同一员工同一天的事件合并
+        merged = {}
+        for line_number, (code, record_date, check_in, check_out, status) in batch:
+            employee_uuid = employee_ids.get(code)
+            if employee_uuid is None:
+                self.record_error(line_number, f'员工不存在: {code}')
+                continue
+            key = (employee_uuid, record_date)
+            current = merged.get(key)
+            if current is None:
+                merged[key] = [check_in, check_out, status]
+            else:
+                current[0] = min(filter(None, (current[0], check_in)), default=None)
+                current[1] = max(filter(None, (current[1], check_out)), default=None)
+                current[2] = status or current[2]
+
+        if not merged:
+            return
+
+        with transaction.atomic():
+            records, changes = self.merge_and_write(merged, departments)
+            self.after_batch_written(changes)
+
+        self.stats['upserted'] += len(records)
+
+    def merge_and_write(self, merged, departments):
+        """
+        与库中已有记录合并后批量 upsert（需在事务中调用）
+
+        Returns:
+            tuple: (写入的记录, 汇总差值所需的 (写入前, 写入后) 列表)
+        """
+        # 3. 与库中已有记录合并（一次查询，锁定已有行），避免只含签退的批次覆盖已有签到、只含打卡的批次覆盖请假状态
+        existing = AttendanceRecord.objects.select_for_update().filter(
+            employee_id__in={key[0] for key in merged},
+            date__in={key[1] for key in merged},
+        ).values_list(
+            'employee_id', 'date', 'check_in_time', 'check_out_time', 'status', 'work_hours', 'overtime_hours',
+        )
+        previous = {}
+        for employee_uuid, record_date, check_in, check_out, status, work, overtime in existing:
+            current = merged.get((employee_uuid, record_date))
+            if current is None:
+                continue
+            previous[(employee_uuid, record_date)] = rollup_fact(
+                record_date, departments[employee_uuid], status, work, overtime,
+            )
+            current[0] = min(filter(None, (current[0], check_in)), default=None)
+            current[1] = max(filter(None, (current[1], check_out)), default=None)
+            if current[2] is None and status in PRESERVED_STATUSES:
+                current[2] = status
+
+        # 4. 按列计算工时和状态
+        keys = list(merged)
+        values = [merged[key] for key in keys]
+        work_hours, overtime_hours, statuses = derive_columns(
+            [_to_minutes(value[0]) for value in values],
+            [_to_minutes(value[1]) for value in values],
+            [value[2] for value in values],
+        )
+
+        records = [
+            AttendanceRecord(
+                employee_id=employee_uuid,
+                date=record_date,
+                check_in_time=value[0],
+                check_out_time=value[1],
+                status=status,
+                work_hours=work,
+                overtime_hours=overtime,
+            )
+            for (employee_uuid, record_date), value, work, overtime, status
+            in zip(keys, values, work_hours, overtime_hours, statuses)
+        ]
+
+        # 5. 批量 upsert
+        AttendanceRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=['employee', 'date'],
+            update_fields=[
+                'check_in_time', 'check_out_time', 'status',
+                'work_hours', 'overtime_hours', 'updated_at',
+            ],
+        )
+        changes = [
+            (
+                previous.get((record.employee_id, record.date)),
+                AttendanceRollupService.record_fact(record, departments[record.employee_id]),
+            )
+            for record in records
+        ]
+        return records, changes
+
+    def after_batch_written(self, changes):
+        """批量写入不会触发模型信号，这里手动按差值更新汇总表并使相关缓存失效"""
+        AttendanceRollupService().apply_changes(changes)
+        bump_model_version(AttendanceRecord)
+        DashboardStatsService.mark_stale()
+
+
+def read_events(content, input_format):
+    """
+    将请求体或文件内容解析为事件迭代器
+
+    Args:
+        content: bytes 或 str
+        input_format: ndjson / csv / json
+
+    Returns:
+        iterator: (行号, 事件) 对；JSON 数组的行号为元素序号
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    if input_format == 'json':
+        data = json.loads(content or '[]')
+        return enumerate(data if isinstance(data, list) else [data], 1)
+    return PARSERS[input_format](io.StringIO(content))
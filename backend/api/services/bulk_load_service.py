@@ -0,0 +1,801 @@
+"""
+历史数据批量装载服务（员工、薪资记录、考勤记录）
+
+设计思路：
+1. 面向从旧 HR 系统迁移历史数据的大文件，按批流式读取 CSV / Parquet，不经过 ORM、不实例化模型对象：
+   - CSV 逐行读取后按列转置；Parquet（可选依赖 pyarrow）直接按 RecordBatch 读取列
+   - 每列按目标字段类型统一解析（日期、时间、金额、长度、choices 代码或中文），重复取值的解析结果缓存复用
+   - 解析失败的行记录行号和逐列错误后跳过，不影响其余行
+2. 解析后的列写入临时暂存表：PostgreSQL 使用 COPY FROM STDIN，其他数据库（SQLite）使用 executemany；
+   写入由 BulkWriter 完成（种子数据生成共用）
+3. 全部批次写入暂存表后，一条 INSERT ... SELECT ... ON CONFLICT DO UPDATE 合并到目标表：
+   - 外键按集合解析：暂存表中的工号与 api_employee 连接得到员工 UUID，部门名称与 api_department 连接
+   - 工号不存在、部门名称不存在的行由反连接查询统计并报告行号，不参与合并
+   - 同一唯一键在文件中出现多次时以最后一行为准（每个键只取最大行号）
+   - 文件未提供的派生列在 SQL 中计算：薪资快照取员工当前职位和基础工资，应发 = 基础 + 奖金，实发 = 应发 - 扣除；
+     考勤的工作时长、加班时长和状态在解析时按列计算（规则与考勤导入相同，见 attendance_service.derive_columns）
+4. 暂存与合并在同一事务中完成，失败时整体回滚（临时表随事务一并撤销）
+5. 直接写表不触发模型信号，合并后手动使缓存失效、刷新考勤汇总表并将仪表盘快照标记为过期；
+   批量装载调整了员工部门时（不经过员工保存信号），部门考勤汇总需要执行 rebuild_attendance_rollups
+"""
+
+import csv
+import io
+import logging
+import time
+import uuid
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import MaxLengthValidator, RegexValidator
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.utils import timezone
+
+from ..cache import bump_model_version
+from ..models import Department, Employee, SalaryRecord, AttendanceRecord
+from ..parsing import ParseError, choice_aliases, parse_date, parse_time
+from .attendance_rollup_service import AttendanceRollupService
+from .attendance_service import derive_columns
+from .dashboard_service import DashboardStatsService
+from .payroll_rules_service import BREAKDOWN_COLUMNS
+
+try:
+    import pyarrow.parquet as pyarrow_parquet
+except ImportError:  # pragma: no cover - 未安装时不支持 Parquet
+    pyarrow_parquet = None
+
+logger = logging.getLogger(__name__)
+
+# 按原样传给数据库驱动的字段类型
+PASSTHROUGH_TYPES = {
+    'CharField', 'TextField', 'EmailField', 'SlugField', 'BooleanField',
+    'IntegerField', 'BigIntegerField', 'SmallIntegerField',
+    'PositiveIntegerField', 'PositiveBigIntegerField', 'PositiveSmallIntegerField',
+    'AutoField', 'BigAutoField', 'SmallAutoField',
+}
+# 取值重复度高、转换结果可以缓存的字段类型
+REPEATED_TYPES = {'DateField', 'TimeField', 'DateTimeField', 'DecimalField'}
+TEXT_TYPES = {'CharField', 'TextField', 'EmailField', 'SlugField'}
+
+PERIOD_VALIDATOR = RegexValidator(r'^\d{4}-(0[1-9]|1[0-2])$', '薪资期间格式应为 YYYY-MM')
+STAGING_PREFIX = 'bulk_load_'
+
+
+class BulkLoadError(ValueError):
+    """文件无法装载（格式不支持、缺少必填列），或单个取值无效"""
+
+
+def _memoized(convert):
+    """缓存转换结果（日期、时间、金额等取值重复度高的列）"""
+    cache = {}
+
+    def memoized(value):
+        try:
+            return cache[value]
+        except KeyError:
+            result = cache[value] = convert(value)
+            return result
+
+    return memoized
+
+
+def _copy_text(value):
+    """COPY 文本格式的字符串转义"""
+    if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+        value = value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return value
+
+
+class BulkWriter:
+    """
+    按列批量写入一张表
+
+    默认写入模型的表，columns 为 {字段 attname: 值列表}，必须包含模型的全部数据库字段（含主键和时间戳）；
+    传入 fields / table 时写入指定表的指定列（如暂存表）。
+    PostgreSQL 使用 COPY FROM STDIN（psycopg 3 / psycopg2 均可），其他数据库使用 executemany。
+    """
+
+    def __init__(self, model, using=DEFAULT_DB_ALIAS, fields=None, table=None):
+        self.model = model
+        self.connection = connections[using]
+        self.fields = list(fields if fields is not None else model._meta.concrete_fields)
+        self.use_copy = self.connection.vendor == 'postgresql'
+        self.null = '\\N' if self.use_copy else None
+        self.converters = [self.converter(field) for field in self.fields]
+
+        quote_name = self.connection.ops.quote_name
+        table = quote_name(table or model._meta.db_table)
+        column_names = ', '.join(quote_name(field.column) for field in self.fields)
+        self.copy_sql = f'COPY {table} ({column_names}) FROM STDIN'
+        placeholders = ', '.join(['%s'] * len(self.fields))
+        self.insert_sql = f'INSERT INTO {table} ({column_names}) VALUES ({placeholders})'
+
+    def converter(self, field):
+        """字段值到数据库驱动格式（COPY 时为文本）的转换函数，None 表示不需要转换"""
+        internal_type = (field.target_field if field.is_relation else field).get_internal_type()
+        if self.use_copy:
+            if internal_type in TEXT_TYPES:
+                return _copy_text
+            if internal_type == 'BooleanField':
+                return lambda value: 't' if value else 'f'
+            return _memoized(str) if internal_type in REPEATED_TYPES else str
+
+        if internal_type in PASSTHROUGH_TYPES:
+            return None
+        if internal_type == 'UUIDField' and not self.connection.features.has_native_uuid_field:
+            return lambda value: value.hex
+        convert = lambda value: field.get_db_prep_save(value, self.connection)  # noqa: E731
+        return _memoized(convert) if internal_type in REPEATED_TYPES else convert
+
+    def write(self, columns):
+        """写入一批数据，返回行数"""
+        values = []
+        for field, convert in zip(self.fields, self.converters):
+            column = columns[field.attname]
+            if convert is not None:
+                null = self.null
+                column = [null if value is None else convert(value) for value in column]
+            values.append(column)
+
+        count = len(values[0]) if values else 0
+        if not count:
+            return 0
+        with self.connection.cursor() as cursor:
+            if self.use_copy:
+                self.copy(cursor, values)
+            else:
+                cursor.executemany(self.insert_sql, list(zip(*values)))
+        return count
+
+    def copy(self, cursor, values):
+        data = ''.join('\t'.join(row) + '\n' for row in zip(*values))
+        raw_cursor = cursor.cursor
+        if hasattr(raw_cursor, 'copy'):
+            # psycopg 3
+            with raw_cursor.copy(self.copy_sql) as copy:
+                copy.write(data)
+        else:
+            # psycopg2
+            raw_cursor.copy_expert(self.copy_sql, io.StringIO(data))
+
+
+# ==================== 文件读取 ====================
+
+# 第一条数据的行号（表头为第 1 行），CSV 与 Parquet 的错误行号一致
+FIRST_DATA_LINE = 2
+
+
+def read_csv_batches(path, batch_size):
+    """
+    逐行读取带表头的 CSV（支持 UTF-8 BOM），每 batch_size 行按列返回一批，行号为文件中的实际行
+
+    Yields:
+        tuple: (行号列表, {表头: 取值列表})
+    """
+    with open(path, encoding='utf-8-sig', newline='') as handle:
+        reader = csv.reader(handle)
+        headers = next(reader, None)
+        if headers is None:
+            return
+        headers = [header.strip() for header in headers]
+        width = len(headers)
+
+        lines, rows = [], []
+        for row in reader:
+            if not any(cell.strip() for cell in row):
+                continue
+            lines.append(reader.line_num)
+            rows.append(row[:width] + [''] * (width - len(row)))
+            if len(rows) >= batch_size:
+                yield lines, dict(zip(headers, zip(*rows)))
+                lines, rows = [], []
+        if rows:
+            yield lines, dict(zip(headers, zip(*rows)))
+
+
+def read_parquet_batches(path, batch_size):
+    """
+    按 RecordBatch 读取 Parquet 文件（需要 pyarrow）
+
+    行号与内容相同的 CSV 文件一致：表头占第 1 行，第一条数据为第 2 行。
+
+    Yields:
+        tuple: (行号列表, {列名: 取值列表})
+    """
+    if pyarrow_parquet is None:
+        raise BulkLoadError('读取 Parquet 文件需要安装 pyarrow')
+    parquet_file = pyarrow_parquet.ParquetFile(path)
+    line = FIRST_DATA_LINE
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        lines = list(range(line, line + batch.num_rows))
+        line += batch.num_rows
+        yield lines, {name: column.to_pylist() for name, column in zip(batch.schema.names, batch.columns)}
+
+
+READERS = {
+    'csv': read_csv_batches,
+    'parquet': read_parquet_batches,
+}
+
+
+def detect_format(path):
+    """按扩展名判断文件格式（.parquet / .pq 为 Parquet，其余按 CSV 读取）"""
+    return 'parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv'
+
+
+# ==================== 列解析 ====================
+
+def _decimal_parser(field):
+    quantum = Decimal(1).scaleb(-field.decimal_places)
+    limit = Decimal(10) ** (field.max_digits - field.decimal_places)
+
+    def parse(value):
+        try:
+            number = Decimal(str(value).strip()).quantize(quantum)
+        except (InvalidOperation, ValueError):
+            raise BulkLoadError(f'无效的数值: {value}')
+        if not number.is_finite() or abs(number) >= limit:
+            raise BulkLoadError(f'数值超出范围: {value}')
+        return number
+
+    return parse
+
+
+def _choice_parser(field):
+    """choices 字段：代码和中文显示值均可"""
+    aliases = choice_aliases(field)
+
+    def parse(value):
+        try:
+            return aliases[str(value).strip()]
+        except KeyError:
+            raise BulkLoadError(f'无效的取值: {value}')
+
+    return parse
+
+
+def _text_parser(field, validators):
+    max_length = field.max_length
+    validators = [
+        validator for validator in list(field.validators) + list(validators)
+        if not isinstance(validator, MaxLengthValidator)
+    ]
+
+    def parse(value):
+        if isinstance(value, float) and value.is_integer():
+            # 工号、手机号在 Parquet / Excel 导出中常为数值
+            value = int(value)
+        text = str(value).strip()
+        if max_length and len(text) > max_length:
+            raise BulkLoadError(f'长度不能超过 {max_length} 个字符')
+        for validator in validators:
+            try:
+                validator(text)
+            except DjangoValidationError as e:
+                raise BulkLoadError('; '.join(str(message) for message in e.messages))
+        return text
+
+    return parse
+
+
+class LoadColumn:
+    """
+    文件中的一列
+
+    Args:
+        name: 暂存表列名（同时可作为表头）
+        field: 决定类型、长度、choices 和校验器的模型字段
+        required: 是否必填
+        default: 未填写时的取值
+        aliases: 额外可识别的表头（字段名和中文名默认可识别）
+        validators: 额外的校验器（仅文本列）
+    """
+
+    def __init__(self, name, field, required=False, default=None, aliases=(), validators=()):
+        self.name = name
+        self.label = field.name
+        self.required = required
+        self.default = default
+        self.headers = {name, field.name, str(field.verbose_name), *aliases}
+
+        self.staging_field = field.clone()
+        self.staging_field.set_attributes_from_name(name)
+
+        internal_type = field.get_internal_type()
+        if internal_type == 'DateField':
+            self.convert = _memoized(parse_date)
+        elif internal_type == 'TimeField':
+            self.convert = _memoized(parse_time)
+        elif internal_type == 'DecimalField':
+            self.convert = _memoized(_decimal_parser(field))
+        elif field.choices:
+            self.convert = _choice_parser(field)
+        else:
+            self.convert = _text_parser(field, validators)
+
+    def parse(self, value):
+        if value is None or (isinstance(value, str) and not value.strip()):
+            if self.required:
+                raise BulkLoadError('该字段不能为空')
+            return self.default
+        return self.convert(value)
+
+
+def _staging_field(name, field):
+    field.set_attributes_from_name(name)
+    return field
+
+
+def _code_column():
+    return LoadColumn('employee_code', Employee._meta.get_field('employee_id'), required=True)
+
+
+# ==================== 装载 ====================
+
+class BulkLoader:
+    """
+    装载一张目标表的基类
+
+    子类声明：
+        model: 目标模型
+        columns: 文件列（LoadColumn），第一列固定为工号 employee_code
+        key: 除工号外的唯一键列（暂存表列名），同一键在文件中只保留最后一行
+        conflict: [(目标表唯一约束列, 对应的 SELECT 表达式)]，用作 ON CONFLICT 目标并统计更新行数
+        resolve_employee: 是否按工号连接 api_employee（工号不存在的行报告为失败）
+    并实现 select_columns() 返回 [(目标表列名, SELECT 表达式)]。
+    SQL 中暂存表别名为 s，员工表为 e，目标表为 t。
+    """
+
+    DEFAULT_BATCH_SIZE = 50000
+    MAX_REPORTED_ERRORS = 100
+
+    model = None
+    columns = ()
+    key = ()
+    resolve_employee = True
+
+    def __init__(self, batch_size=None, using=DEFAULT_DB_ALIAS):
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self.using = using
+        self.connection = connections[using]
+        self.qn = self.connection.ops.quote_name
+        self.table = self.model._meta.db_table
+        self.staging = f'{STAGING_PREFIX}{self.table}'
+        self.staging_fields = [
+            _staging_field('line_number', models.BigIntegerField()),
+            _staging_field('id', models.UUIDField()),
+        ] + [column.staging_field for column in self.columns]
+        self.headers = None
+        self.stats = {
+            'received': 0, 'staged': 0, 'failed': 0, 'duplicates': 0,
+            'unresolved': 0, 'inserted': 0, 'updated': 0, 'batches': 0,
+        }
+        self.errors = []
+
+    def s(self, column):
+        return f's.{self.qn(column)}'
+
+    # -------------------- 子类实现 --------------------
+
+    def conflict(self):
+        raise NotImplementedError
+
+    def select_columns(self):
+        raise NotImplementedError
+
+    def source_sql(self):
+        """FROM 子句：暂存表（别名 s）及外键连接"""
+        staging = f'{self.qn(self.staging)} s'
+        if not self.resolve_employee:
+            return staging
+        qn = self.qn
+        return f'{staging} JOIN {qn(Employee._meta.db_table)} e ON e.{qn("employee_id")} = s.{qn("employee_code")}'
+
+    def prepare(self, columns):
+        """写入暂存表前按列补充派生值"""
+
+    def collect_changes(self, cursor):
+        """合并后、删除暂存表前收集刷新汇总所需的信息"""
+        return None
+
+    def after_load(self, changes):
+        """直接写表不触发模型信号：使缓存失效"""
+        bump_model_version(self.model)
+
+    # -------------------- 读取与暂存 --------------------
+
+    def resolve_headers(self, headers):
+        """
+        表头映射为 {暂存表列名: 表头}
+
+        Raises:
+            BulkLoadError: 缺少必填列
+        """
+        mapping = {}
+        for header in headers:
+            for column in self.columns:
+                if str(header).strip() in column.headers and column.name not in mapping:
+                    mapping[column.name] = header
+                    break
+        missing = [column.label for column in self.columns if column.required and column.name not in mapping]
+        if missing:
+            raise BulkLoadError(f'缺少必填列: {", ".join(missing)}')
+        return mapping
+
+    def record_error(self, line, employee_id, errors):
+        self.stats['failed'] += 1
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'employee_id': employee_id, 'errors': errors})
+
+    def parse_batch(self, lines, raw):
+        """
+        按列解析一批数据
+
+        Returns:
+            dict: {暂存表列名: 取值列表}，只含通过解析的行
+        """
+        if self.headers is None:
+            self.headers = self.resolve_headers(raw)
+        count = len(lines)
+
+        columns = {}
+        row_errors = {}
+        for column in self.columns:
+            header = self.headers.get(column.name)
+            values = raw[header] if header is not None else [None] * count
+            parse = column.parse
+            parsed = []
+            for index, value in enumerate(values):
+                try:
+                    parsed.append(parse(value))
+                except (BulkLoadError, ParseError) as e:
+                    parsed.append(None)
+                    row_errors.setdefault(index, {})[column.name] = [str(e)]
+            columns[column.name] = parsed
+        columns['line_number'] = list(lines)
+
+        if row_errors:
+            codes = raw.get(self.headers['employee_code'], [None] * count)
+            for index, errors in sorted(row_errors.items()):
+                self.record_error(lines[index], codes[index], errors)
+            keep = [index for index in range(count) if index not in row_errors]
+            columns = {name: [values[index] for index in keep] for name, values in columns.items()}
+
+        columns['id'] = [uuid.uuid4() for _ in columns['line_number']]
+        self.prepare(columns)
+        return columns
+
+    def create_staging(self, cursor):
+        qn = self.qn
+        definitions = ', '.join(
+            f'{qn(field.column)} {field.db_type(self.connection)}' for field in self.staging_fields
+        )
+        cursor.execute(f'DROP TABLE IF EXISTS {qn(self.staging)}')
+        cursor.execute(f'CREATE TEMPORARY TABLE {qn(self.staging)} ({definitions})')
+
+    # -------------------- 合并 --------------------
+
+    def latest_rows_sql(self):
+        """同一唯一键只保留文件中最后一行"""
+        qn = self.qn
+        group_by = ', '.join(qn(name) for name in ('employee_code',) + tuple(self.key))
+        return f's.{qn("line_number")} IN (SELECT MAX({qn("line_number")}) FROM {qn(self.staging)} GROUP BY {group_by})'
+
+    def count(self, cursor, sql, params=()):
+        cursor.execute(sql, params)
+        return cursor.fetchone()[0]
+
+    def unresolved_checks(self):
+        """
+        外键无法解析的行：[(LEFT JOIN 子句, 未匹配条件, 报告的列, 错误提示)]
+
+        这些行不参与合并（source_sql 使用内连接），由 report_unresolved 报告为失败。
+        """
+        if not self.resolve_employee:
+            return []
+        qn = self.qn
+        return [(
+            f'LEFT JOIN {qn(Employee._meta.db_table)} e ON e.{qn("employee_id")} = s.{qn("employee_code")}',
+            f'e.{qn("id")} IS NULL', 'employee_code', '工号不存在',
+        )]
+
+    def report_unresolved(self, cursor):
+        """每项外键检查一次反连接统计，报告前 MAX_REPORTED_ERRORS 行"""
+        qn = self.qn
+        latest = self.latest_rows_sql()
+        for join, condition, column, message in self.unresolved_checks():
+            source = f'{qn(self.staging)} s {join}'
+            where = f'{condition} AND {latest}'
+            unresolved = self.count(cursor, f'SELECT COUNT(*) FROM {source} WHERE {where}')
+            if not unresolved:
+                continue
+            self.stats['unresolved'] += unresolved
+            self.stats['failed'] += unresolved
+            cursor.execute(
+                f'SELECT s.{qn("line_number")}, s.{qn("employee_code")}, s.{qn(column)} FROM {source} '
+                f'WHERE {where} ORDER BY s.{qn("line_number")}',
+            )
+            for line, code, value in cursor.fetchmany(max(0, self.MAX_REPORTED_ERRORS - len(self.errors))):
+                text = message if column == 'employee_code' else f'{message}: {value}'
+                self.errors.append({'line': line, 'employee_id': code, 'errors': {column: [text]}})
+
+    def merge(self, cursor):
+        qn = self.qn
+        latest = self.latest_rows_sql()
+        self.stats['duplicates'] = self.count(
+            cursor, f'SELECT COUNT(*) FROM {qn(self.staging)} s WHERE NOT {latest}',
+        )
+        self.report_unresolved(cursor)
+
+        conflict = self.conflict()
+        match = ' AND '.join(f't.{qn(column)} = {expression}' for column, expression in conflict)
+        existing = self.count(
+            cursor,
+            f'SELECT COUNT(*) FROM {self.source_sql()} JOIN {qn(self.table)} t ON {match} WHERE {latest}',
+        )
+
+        select_columns = self.select_columns()
+        now = self.connection.ops.adapt_datetimefield_value(timezone.now())
+        targets = [column for column, _ in select_columns]
+        expressions = [expression for _, expression in select_columns]
+        conflict_columns = [column for column, _ in conflict]
+        updates = [
+            column for column in targets
+            if column not in conflict_columns and column not in ('id', 'created_at')
+        ]
+        sql = (
+            f'INSERT INTO {qn(self.table)} ({", ".join(qn(column) for column in targets)}) '
+            f'SELECT {", ".join(expressions)} FROM {self.source_sql()} WHERE {latest} '
+            f'ON CONFLICT ({", ".join(qn(column) for column in conflict_columns)}) DO UPDATE SET '
+            + ', '.join(f'{qn(column)} = EXCLUDED.{qn(column)}' for column in updates)
+        )
+        cursor.execute(sql, [now] * sum(expression == '%s' for expression in expressions))
+        merged = cursor.rowcount
+        self.stats['updated'] = existing
+        self.stats['inserted'] = merged - existing
+
+    def load_batches(self, batches):
+        """
+        装载按列读取的批次
+
+        Args:
+            batches: 可迭代的 (行号列表, {表头: 取值列表})，见 READERS
+
+        Returns:
+            dict: 装载统计（接收、暂存、失败、重复、工号或部门不存在、新增、更新行数、批次数、耗时、行/秒）及错误明细
+
+        Raises:
+            BulkLoadError: 缺少必填列
+        """
+        started = time.perf_counter()
+        writer = BulkWriter(None, using=self.using, fields=self.staging_fields, table=self.staging)
+        changes = None
+
+        with transaction.atomic(using=self.using):
+            with self.connection.cursor() as cursor:
+                self.create_staging(cursor)
+
+            for lines, raw in batches:
+                self.stats['received'] += len(lines)
+                self.stats['staged'] += writer.write(self.parse_batch(lines, raw))
+                self.stats['batches'] += 1
+
+            with self.connection.cursor() as cursor:
+                if self.stats['staged']:
+                    self.merge(cursor)
+                    changes = self.collect_changes(cursor)
+                cursor.execute(f'DROP TABLE {self.qn(self.staging)}')
+
+        if self.stats['inserted'] or self.stats['updated']:
+            self.after_load(changes)
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"批量装载 {self.table}：接收 {self.stats['received']} 行，新增 {self.stats['inserted']}，"
+            f"更新 {self.stats['updated']}，失败 {self.stats['failed']}，耗时 {elapsed:.2f}s"
+        )
+        return {
+            **self.stats,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.stats['received'] / elapsed) if elapsed else 0,
+            'errors': self.errors,
+        }
+
+    def load_file(self, path, input_format=None):
+        """
+        装载 CSV / Parquet 文件
+
+        Raises:
+            BulkLoadError: 格式不支持、缺少必填列或未安装 pyarrow
+            OSError: 文件无法读取
+        """
+        input_format = input_format or detect_format(path)
+        if input_format not in READERS:
+            raise BulkLoadError(f'不支持的文件格式: {input_format}，可选值: {", ".join(READERS)}')
+        return self.load_batches(READERS[input_format](path, self.batch_size))
+
+
+class EmployeeLoader(BulkLoader):
+    """员工：按工号 upsert，部门名称按集合解析为 department_ref（部门不存在的行报告为失败）"""
+
+    model = Employee
+    resolve_employee = False
+    columns = [
+        _code_column(),
+        LoadColumn('name', Employee._meta.get_field('name'), required=True),
+        LoadColumn('gender', Employee._meta.get_field('gender'), required=True),
+        LoadColumn('department', Employee._meta.get_field('department'), required=True, aliases=('部门名称',)),
+        LoadColumn('position', Employee._meta.get_field('position'), required=True, aliases=('职位',)),
+        LoadColumn('phone', Employee._meta.get_field('phone'), default=''),
+        LoadColumn('hire_date', Employee._meta.get_field('hire_date'), required=True),
+        LoadColumn('birth_date', Employee._meta.get_field('birth_date')),
+        LoadColumn('base_salary', Employee._meta.get_field('base_salary'), required=True),
+        LoadColumn('status', Employee._meta.get_field('status'), default='active', aliases=('状态',)),
+        LoadColumn('location', Employee._meta.get_field('location')),
+        LoadColumn('notes', Employee._meta.get_field('notes')),
+    ]
+
+    def source_sql(self):
+        """部门名称不存在的行不合并（与员工导入一致，报告为失败），避免已有员工的 department_ref 被清空"""
+        return f'{self.qn(self.staging)} s JOIN {self.department_join()}'
+
+    def department_join(self):
+        qn = self.qn
+        return f'{qn(Department._meta.db_table)} d ON d.{qn("name")} = s.{qn("department")}'
+
+    def unresolved_checks(self):
+        return [(f'LEFT JOIN {self.department_join()}', f'd.{self.qn("id")} IS NULL', 'department', '部门不存在')]
+
+    def conflict(self):
+        return [('employee_id', self.s('employee_code'))]
+
+    def select_columns(self):
+        s = self.s
+        return [
+            ('id', s('id')),
+            ('employee_id', s('employee_code')),
+            *[(name, s(name)) for name in ('name', 'gender', 'department')],
+            ('department_ref_id', f'd.{self.qn("id")}'),
+            *[
+                (name, s(name)) for name in (
+                    'position', 'phone', 'hire_date', 'birth_date', 'base_salary', 'status', 'location', 'notes',
+                )
+            ],
+            ('created_at', '%s'),
+            ('updated_at', '%s'),
+        ]
+
+    def after_load(self, changes):
+        bump_model_version(Employee)
+        DashboardStatsService.mark_stale()
+
+
+class SalaryRecordLoader(BulkLoader):
+    """薪资记录：按 (员工, 薪资期间) upsert，快照和应发 / 实发未提供时按员工当前数据和规则明细计算"""
+
+    model = SalaryRecord
+    key = ('salary_period',)
+    columns = [
+        _code_column(),
+        LoadColumn(
+            'salary_period', SalaryRecord._meta.get_field('salary_period'),
+            required=True, validators=[PERIOD_VALIDATOR],
+        ),
+        LoadColumn('position_snapshot', SalaryRecord._meta.get_field('position_snapshot'), aliases=('职位',)),
+        LoadColumn('base_salary_snapshot', SalaryRecord._meta.get_field('base_salary_snapshot'), aliases=('基础工资',)),
+        LoadColumn('bonus', SalaryRecord._meta.get_field('bonus'), default=Decimal('0.00')),
+        LoadColumn('deductions', SalaryRecord._meta.get_field('deductions'), default=Decimal('0.00')),
+        *[
+            LoadColumn(name, SalaryRecord._meta.get_field(name), default=Decimal('0.00'))
+            for name in BREAKDOWN_COLUMNS
+        ],
+        LoadColumn('gross_salary', SalaryRecord._meta.get_field('gross_salary')),
+        LoadColumn('net_salary', SalaryRecord._meta.get_field('net_salary')),
+    ]
+
+    def conflict(self):
+        return [('employee_id', f'e.{self.qn("id")}'), ('salary_period', self.s('salary_period'))]
+
+    def select_columns(self):
+        s, qn = self.s, self.qn
+        base = f'COALESCE({s("base_salary_snapshot")}, e.{qn("base_salary")})'
+        gross = f'COALESCE({s("gross_salary")}, ROUND({base} + {s("bonus")} + {s("department_bonus")}, 2))'
+        net = ' - '.join([gross, s('deductions'), s('attendance_deduction'), s('social_insurance'), s('income_tax')])
+        return [
+            ('id', s('id')),
+            ('employee_id', f'e.{qn("id")}'),
+            ('salary_period', s('salary_period')),
+            ('position_snapshot', f'COALESCE({s("position_snapshot")}, e.{qn("position")})'),
+            ('base_salary_snapshot', base),
+            ('bonus', s('bonus')),
+            ('deductions', s('deductions')),
+            *[(name, s(name)) for name in BREAKDOWN_COLUMNS],
+            ('gross_salary', gross),
+            ('net_salary', f'COALESCE({s("net_salary")}, ROUND({net}, 2))'),
+            ('created_at', '%s'),
+            ('updated_at', '%s'),
+        ]
+
+
+class AttendanceRecordLoader(BulkLoader):
+    """考勤记录：按 (员工, 日期) upsert，文件中的记录覆盖已有记录（历史数据以文件为准）"""
+
+    model = AttendanceRecord
+    key = ('date',)
+    columns = [
+        _code_column(),
+        LoadColumn('date', AttendanceRecord._meta.get_field('date'), required=True),
+        LoadColumn('check_in_time', AttendanceRecord._meta.get_field('check_in_time'), aliases=('check_in',)),
+        LoadColumn('check_out_time', AttendanceRecord._meta.get_field('check_out_time'), aliases=('check_out',)),
+        LoadColumn('status', AttendanceRecord._meta.get_field('status'), aliases=('考勤状态',)),
+        LoadColumn('work_hours', AttendanceRecord._meta.get_field('work_hours')),
+        LoadColumn('overtime_hours', AttendanceRecord._meta.get_field('overtime_hours')),
+        LoadColumn('notes', AttendanceRecord._meta.get_field('notes')),
+    ]
+
+    def prepare(self, columns):
+        """未提供的工作时长、加班时长和状态按打卡时间按列计算；文件中给出的值保留"""
+        missing = [
+            index for index, values in enumerate(zip(
+                columns['status'], columns['work_hours'], columns['overtime_hours'],
+            ))
+            if None in values
+        ]
+        if not missing:
+            return
+
+        def minutes(values):
+            return [
+                None if values[index] is None
+                else values[index].hour * 60 + values[index].minute + values[index].second / 60
+                for index in missing
+            ]
+
+        derived = derive_columns(
+            minutes(columns['check_in_time']),
+            minutes(columns['check_out_time']),
+            [columns['status'][index] for index in missing],
+        )
+        for name, values in zip(('work_hours', 'overtime_hours', 'status'), derived):
+            column = columns[name]
+            for index, value in zip(missing, values):
+                if column[index] is None:
+                    column[index] = value
+
+    def conflict(self):
+        return [('employee_id', f'e.{self.qn("id")}'), ('date', self.s('date'))]
+
+    def select_columns(self):
+        s = self.s
+        return [
+            ('id', s('id')),
+            ('employee_id', f'e.{self.qn("id")}'),
+            *[
+                (name, s(name)) for name in (
+                    'date', 'check_in_time', 'check_out_time', 'status', 'work_hours', 'overtime_hours', 'notes',
+                )
+            ],
+            ('created_at', '%s'),
+            ('updated_at', '%s'),
+        ]
+
+    def collect_changes(self, cursor):
+        """受影响的考勤日期（只刷新这些日期的汇总）"""
+        cursor.execute(f'SELECT DISTINCT {self.qn("date")} FROM {self.qn(self.staging)}')
+        return [
+            value if isinstance(value, date) else date.fromisoformat(str(value))
+            for value, in cursor.fetchall()
+        ]
+
+    def after_load(self, changes):
+        AttendanceRollupService().refresh_dates(changes or [])
+        bump_model_version(AttendanceRecord)
+        DashboardStatsService.mark_stale()
+
+
+LOADERS = {
+    'employees': EmployeeLoader,
+    'salaries': SalaryRecordLoader,
+    'attendance': AttendanceRecordLoader,
+}
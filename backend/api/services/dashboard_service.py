@@ -0,0 +1,164 @@
+"""
+仪表盘统计服务
+
+设计思路：
+1. 员工相关指标用一条条件聚合查询（Count / Avg + filter）完成
+2. 本月和上月的考勤出勤数从考勤日汇总表（AttendanceDailyRollup）读取，一条条件聚合查询完成
+3. 统计结果写入 DashboardSnapshot，接口只读取快照
+4. 员工和考勤写入时通过信号将快照标记为过期，下次读取或定时命令刷新时重新计算
+5. 读取到过期快照时，只有取得刷新锁（cache.add）的请求重新计算，其余并发请求直接返回过期快照，
+   避免写入后大量读请求同时重算；快照不存在时无可用数据，直接计算
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Avg, Sum, Q, F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Employee, AttendanceDailyRollup, DashboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class DashboardStatsService:
+    """仪表盘统计服务类"""
+
+    SUMMARY_KEY = 'summary'
+    # 快照最长有效期：统计依赖当前日期，即使没有写入也需要定期刷新
+    MAX_AGE = timedelta(seconds=getattr(settings, 'DASHBOARD_SNAPSHOT_MAX_AGE', 300))
+    # 刷新锁的超时时间（秒），持锁进程异常退出时锁自动释放
+    REFRESH_LOCK_TIMEOUT = 60
+
+    def compute_summary(self, now=None):
+        """
+        计算仪表盘汇总数据
+
+        Returns:
+            dict: 与前端约定的汇总字段（totalEmployees、attendanceRate 等）
+        """
+        current_date = timezone.localtime(now or timezone.now())
+        last_month_cutoff = current_date - timedelta(days=30)
+
+        # 员工指标：单次条件聚合查询
+        employee_stats = Employee.objects.aggregate(
+            total_employees=Count('id'),
+            last_month_employees=Count('id', filter=Q(created_at__lt=last_month_cutoff)),
+            total_departments=Count('department', distinct=True),
+            active_employees=Count('id', filter=Q(status='active')),
+            last_month_active_employees=Count(
+                'id', filter=Q(status='active', created_at__lt=last_month_cutoff)
+            ),
+            avg_salary=Avg('base_salary', filter=Q(status='active')),
+        )
+
+        # 考勤日期范围
+        today = current_date.date()
+        current_month_start = today.replace(day=1)
+        total_work_days = (today - current_month_start).days + 1
+        last_month_start = last_month_cutoff.date().replace(day=1)
+        last_month_end = current_month_start - timedelta(days=1)
+        last_month_work_days = (last_month_end - last_month_start).days + 1
+
+        # 考勤指标：本月与上月出勤数从日汇总表读取（每天一行），一次查询完成
+        attended = F('present_count') + F('late_count') + F('early_leave_count') + F('overtime_count')
+        attendance_stats = AttendanceDailyRollup.objects.filter(
+            date__gte=last_month_start,
+            date__lte=today,
+        ).aggregate(
+            present_records=Coalesce(Sum(attended, filter=Q(date__gte=current_month_start)), 0),
+            last_month_present=Coalesce(
+                Sum(attended, filter=Q(date__gte=last_month_start, date__lte=last_month_end)), 0
+            ),
+        )
+
+        return self.build_summary(employee_stats, attendance_stats, total_work_days, last_month_work_days)
+
+    @staticmethod
+    def build_summary(employee_stats, attendance_stats, total_work_days, last_month_work_days):
+        """根据聚合结果计算增长率和考勤率"""
+        total_employees = employee_stats['total_employees']
+        last_month_employees = employee_stats['last_month_employees']
+
+        # 计算员工增长率
+        if last_month_employees > 0:
+            employee_growth = round(((total_employees - last_month_employees) / last_month_employees) * 100, 1)
+        else:
+            employee_growth = 0
+
+        # 计算考勤率
+        expected_attendance = employee_stats['active_employees'] * total_work_days
+        if expected_attendance > 0:
+            attendance_rate = round((attendance_stats['present_records'] / expected_attendance) * 100, 1)
+        else:
+            attendance_rate = 0
+
+        # 上月考勤率（用于增长率）
+        last_month_expected = employee_stats['last_month_active_employees'] * last_month_work_days
+        if last_month_expected > 0:
+            last_month_attendance_rate = (attendance_stats['last_month_present'] / last_month_expected) * 100
+            attendance_rate_growth = round(attendance_rate - last_month_attendance_rate, 1)
+        else:
+            attendance_rate_growth = 0
+
+        avg_salary = employee_stats['avg_salary']
+
+        return {
+            'totalEmployees': total_employees,
+            'employeeGrowth': employee_growth,
+            'totalDepartments': employee_stats['total_departments'],
+            'attendanceRate': attendance_rate,
+            'averageSalary': int(avg_salary) if avg_salary else 0,
+            'attendanceRateGrowth': attendance_rate_growth,
+        }
+
+    def refresh_snapshot(self):
+        """重新计算并保存汇总快照"""
+        now = timezone.now()
+        snapshot, _ = DashboardSnapshot.objects.update_or_create(
+            key=self.SUMMARY_KEY,
+            defaults={
+                'data': self.compute_summary(now),
+                'is_stale': False,
+                'computed_at': now,
+            }
+        )
+        logger.info(f"仪表盘快照已刷新：{snapshot.computed_at.isoformat()}")
+        return snapshot
+
+    def is_expired(self, snapshot):
+        """快照已标记过期、超过最长有效期或不是今天计算的"""
+        return (
+            snapshot.is_stale
+            or timezone.now() - snapshot.computed_at > self.MAX_AGE
+            or timezone.localtime(snapshot.computed_at).date() != timezone.localdate()
+        )
+
+    def get_summary_snapshot(self):
+        """
+        获取汇总快照
+
+        快照有效时直接返回（单次索引查询）；已过期时由取得刷新锁的请求重新计算，
+        未取得锁的请求返回过期快照；快照不存在时直接计算。
+        """
+        snapshot = DashboardSnapshot.objects.filter(key=self.SUMMARY_KEY).first()
+        if snapshot is None:
+            return self.refresh_snapshot()
+        if not self.is_expired(snapshot):
+            return snapshot
+
+        lock_key = f'dashboard_snapshot_refresh:{self.SUMMARY_KEY}'
+        if not cache.add(lock_key, 1, timeout=self.REFRESH_LOCK_TIMEOUT):
+            return snapshot
+        try:
+            return self.refresh_snapshot()
+        finally:
+            cache.delete(lock_key)
+
+    @classmethod
+    def mark_stale(cls):
+        """将汇总快照标记为过期（写入信号中调用，只执行一条 UPDATE）"""
+        DashboardSnapshot.objects.filter(key=cls.SUMMARY_KEY, is_stale=False).update(is_stale=True)
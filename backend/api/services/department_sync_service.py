@@ -0,0 +1,189 @@
+"""
+员工部门名称一致性服务
+
+Employee.department 是 department_ref.name 的冗余副本（Employee.save 时同步），
+列表筛选、导出和考勤汇总都直接使用该字段。
+
+设计思路：
+1. 部门改名：由 api.signals 在 Department 保存后调用 propagate_rename，
+   用一条 UPDATE 同步该部门全部员工，不逐个加载员工对象
+2. 按部门名称汇总的考勤表同样按名称改写（与已有同名汇总冲突的日期改为重算）
+3. 漂移检测：统计名称与关联部门不一致、未关联但名称可匹配、以及名称无法匹配任何部门的员工
+4. 回填：按主键顺序分批处理，每批两条基于子查询的 UPDATE（同步名称、按名称补关联），
+   每批独立事务，适合百万级数据，并通过回调输出进度
+5. update() 不触发模型信号，写入后手动使缓存失效并将仪表盘快照标记为过期
+"""
+
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.utils import timezone
+
+from ..cache import bump_model_version
+from ..models import Department, Employee, AttendanceDepartmentDailyRollup
+from .attendance_rollup_service import AttendanceRollupService
+from .dashboard_service import DashboardStatsService
+
+logger = logging.getLogger(__name__)
+
+
+def department_name_subquery():
+    """关联部门当前名称的子查询（UPDATE 中不能直接引用跨表 F 表达式）"""
+    return Subquery(Department.objects.filter(pk=OuterRef('department_ref')).values('name')[:1])
+
+
+def department_id_subquery():
+    """按部门名称查找部门主键的子查询"""
+    return Subquery(Department.objects.filter(name=OuterRef('department')).values('pk')[:1])
+
+
+class DepartmentSyncService:
+    """员工部门名称同步、漂移检测与回填"""
+
+    DEFAULT_CHUNK_SIZE = 5000
+
+    @staticmethod
+    def mismatched_employees():
+        """已关联部门但名称与部门当前名称不一致的员工"""
+        return Employee.objects.filter(department_ref__isnull=False).exclude(
+            department=F('department_ref__name')
+        )
+
+    @staticmethod
+    def unlinked_employees():
+        """未关联部门，但部门名称与某个部门一致（可自动补关联）的员工"""
+        return Employee.objects.filter(
+            department_ref__isnull=True,
+            department__in=Department.objects.values('name'),
+        )
+
+    @staticmethod
+    def orphaned_employees():
+        """未关联部门，且部门名称无法匹配任何部门的员工（需人工处理）"""
+        return Employee.objects.filter(department_ref__isnull=True).exclude(
+            department__in=Department.objects.values('name')
+        )
+
+    def propagate_rename(self, department, old_name):
+        """
+        部门改名后同步员工的部门名称和按部门汇总的考勤数据
+
+        Args:
+            department: 已保存新名称的部门
+            old_name: 改名前的名称
+
+        Returns:
+            int: 更新的员工数
+        """
+        new_name = department.name
+        with transaction.atomic():
+            updated = Employee.objects.filter(department_ref=department).exclude(
+                department=new_name
+            ).update(department=new_name, updated_at=timezone.now())
+            self.rename_rollups(old_name, new_name)
+
+        if updated:
+            self.after_employees_updated()
+        logger.info(f"部门改名 {old_name} -> {new_name}：同步 {updated} 名员工")
+        return updated
+
+    @staticmethod
+    def rename_rollups(old_name, new_name):
+        """按部门汇总的考勤数据改用新名称；新名称在同一天已有汇总时重算这些日期"""
+        stale = AttendanceDepartmentDailyRollup.objects.filter(department=old_name)
+        conflict_dates = set(
+            AttendanceDepartmentDailyRollup.objects.filter(
+                department=new_name, date__in=stale.values('date')
+            ).values_list('date', flat=True)
+        )
+        stale.exclude(date__in=conflict_dates).update(department=new_name)
+        if conflict_dates:
+            AttendanceRollupService().refresh_dates(conflict_dates)
+
+    @staticmethod
+    def after_employees_updated():
+        """批量 UPDATE 不会触发模型信号，手动使缓存失效"""
+        bump_model_version(Employee)
+        DashboardStatsService.mark_stale()
+
+    def report(self, sample_size=10):
+        """
+        部门名称漂移报告
+
+        Returns:
+            dict: 各类漂移的员工数及按 (员工部门名称, 关联部门名称) 分组的样例
+        """
+        mismatched = self.mismatched_employees()
+        return {
+            'total_employees': Employee.objects.count(),
+            'mismatched': mismatched.count(),
+            'unlinked': self.unlinked_employees().count(),
+            'orphaned': self.orphaned_employees().count(),
+            'mismatched_groups': list(
+                mismatched.values('department', current_name=F('department_ref__name'))
+                .annotate(count=Count('id'))
+                .order_by('-count')[:sample_size]
+            ),
+            'orphaned_groups': list(
+                self.orphaned_employees().values('department')
+                .annotate(count=Count('id'))
+                .order_by('-count')[:sample_size]
+            ),
+        }
+
+    def backfill(self, chunk_size=None, link_unlinked=True, progress=None):
+        """
+        分批修复部门名称漂移
+
+        Args:
+            chunk_size: 每批处理的员工数
+            link_unlinked: 是否为未关联部门的员工按名称补关联
+            progress: 进度回调，参数为 (已处理员工数, 累计同步名称数, 累计补关联数)
+
+        Returns:
+            dict: 处理的员工数、同步名称数、补关联数、批次数和耗时
+        """
+        chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        started = time.perf_counter()
+        stats = {'processed': 0, 'renamed': 0, 'linked': 0, 'chunks': 0}
+        last_id = None
+
+        while True:
+            chunk = Employee.objects.order_by('pk')
+            if last_id is not None:
+                chunk = chunk.filter(pk__gt=last_id)
+            ids = list(chunk.values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+
+            now = timezone.now()
+            with transaction.atomic():
+                if link_unlinked:
+                    # 先补关联，再统一同步名称
+                    stats['linked'] += self.unlinked_employees().filter(pk__in=ids).update(
+                        department_ref=department_id_subquery(), updated_at=now
+                    )
+                stats['renamed'] += self.mismatched_employees().filter(pk__in=ids).update(
+                    department=department_name_subquery(), updated_at=now
+                )
+
+            stats['processed'] += len(ids)
+            stats['chunks'] += 1
+            last_id = ids[-1]
+            if progress:
+                progress(stats['processed'], stats['renamed'], stats['linked'])
+
+        if stats['renamed'] or stats['linked']:
+            self.after_employees_updated()
+        if stats['renamed']:
+            # 员工部门名称变化后按部门汇总的考勤数据需要重算
+            AttendanceRollupService().rebuild()
+
+        stats['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(
+            f"部门名称回填完成：处理 {stats['processed']} 名员工，同步名称 {stats['renamed']}，"
+            f"补关联 {stats['linked']}，耗时 {stats['elapsed_seconds']}s"
+        )
+        return stats
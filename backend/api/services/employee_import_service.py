@@ -0,0 +1,392 @@
+"""
+员工批量导入服务
+
+设计思路：
+1. 支持 CSV 和 XLSX（按 OOXML 格式直接解析 zip 中的工作表，不依赖第三方库，与导出服务一致）
+2. 表头可使用字段名（employee_id）或模型字段的中文名（工号）；性别、状态可填写代码或中文（男 / 在职）
+3. 校验全部在内存中完成，不逐行访问数据库：
+   - 工号唯一性：导入前一次性查询文件中出现的工号中已存在的部分，同时检查文件内重复
+   - 部门：一次性读取部门名称 -> 主键映射
+   - 字段校验：逐列执行与模型字段 clean() 等价的校验（类型转换、choices、长度、RegexValidator），
+     再复用 EmployeeSerializer 的 validate_* 业务规则（工资大于 0、入职日期、入职年龄）
+4. 校验失败的行记录行号和逐字段错误，不影响其余行写入
+5. 通过校验的行按批 bulk_create，每批独立事务；bulk_create 不触发信号，写入后手动使缓存失效
+"""
+
+import csv
+import io
+import logging
+import re
+import time
+import zipfile
+from xml.etree import ElementTree
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from ..cache import bump_model_version
+from ..models import Department, Employee
+from ..parsing import ParseError, choice_aliases, parse_date
+from ..serializers import EmployeeSerializer
+from .dashboard_service import DashboardStatsService
+
+logger = logging.getLogger(__name__)
+
+# 可导入的列（department 为部门名称，导入时解析为 department_ref）
+IMPORT_FIELDS = [
+    'employee_id', 'name', 'gender', 'department', 'position', 'phone',
+    'hire_date', 'birth_date', 'base_salary', 'status', 'location', 'notes',
+]
+DATE_FIELDS = {'hire_date', 'birth_date'}
+
+_SHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_CELL_REF = re.compile(r'([A-Z]+)')
+
+
+class EmployeeImportError(ValueError):
+    """导入文件无法解析"""
+
+
+def _column_index(cell_ref):
+    """单元格引用（如 C12）转为从 0 开始的列号"""
+    index = 0
+    for char in _CELL_REF.match(cell_ref).group(1):
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def _numeric_text(value):
+    """数值单元格转为文本：整数去掉 .0（工号、手机号常被 Excel 存为数值）"""
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return str(int(number)) if number.is_integer() else value
+
+
+def read_xlsx_rows(content):
+    """
+    解析 XLSX 第一个工作表，逐行返回单元格文本列表
+
+    支持共享字符串、内联字符串、数值和布尔单元格；日期单元格以 Excel 序列号返回，由日期字段解析。
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+    except zipfile.BadZipFile:
+        raise EmployeeImportError('无效的 XLSX 文件')
+
+    with archive:
+        names = set(archive.namelist())
+        shared_strings = []
+        if 'xl/sharedStrings.xml' in names:
+            root = ElementTree.fromstring(archive.read('xl/sharedStrings.xml'))
+            shared_strings = [
+                ''.join(node.text or '' for node in item.iter(f'{_SHEET_NS}t'))
+                for item in root.iter(f'{_SHEET_NS}si')
+            ]
+
+        sheets = sorted(name for name in names if name.startswith('xl/worksheets/sheet'))
+        if not sheets:
+            raise EmployeeImportError('XLSX 文件中没有工作表')
+        sheet = 'xl/worksheets/sheet1.xml' if 'xl/worksheets/sheet1.xml' in names else sheets[0]
+
+        rows = []
+        with archive.open(sheet) as stream:
+            for _, element in ElementTree.iterparse(stream):
+                if element.tag != f'{_SHEET_NS}row':
+                    continue
+                values = []
+                for cell in element.iter(f'{_SHEET_NS}c'):
+                    cell_type = cell.get('t')
+                    if cell_type == 'inlineStr':
+                        text = ''.join(node.text or '' for node in cell.iter(f'{_SHEET_NS}t'))
+                    else:
+                        node = cell.find(f'{_SHEET_NS}v')
+                        text = node.text if node is not None and node.text is not None else ''
+                        if cell_type == 's' and text:
+                            text = shared_strings[int(text)]
+                        elif cell_type in (None, 'n') and text:
+                            text = _numeric_text(text)
+                    reference = cell.get('r')
+                    if reference:
+                        # 空单元格可能被省略，按列号补齐
+                        values.extend([''] * (_column_index(reference) - len(values)))
+                    values.append(text)
+                rows.append(values)
+                element.clear()
+        return rows
+
+
+def read_csv_rows(content):
+    """解析 CSV（支持 UTF-8 BOM），逐行返回单元格文本列表"""
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    return list(csv.reader(io.StringIO(content)))
+
+
+READERS = {
+    'csv': read_csv_rows,
+    'xlsx': read_xlsx_rows,
+}
+
+
+def _header_aliases():
+    """表头别名：字段名和模型字段的中文名均可识别"""
+    aliases = {}
+    for name in IMPORT_FIELDS:
+        field = Employee._meta.get_field(name)
+        aliases[name] = name
+        aliases[str(field.verbose_name)] = name
+    aliases['部门名称'] = 'department'
+    aliases['状态'] = 'status'
+    aliases['职位'] = 'position'
+    return aliases
+
+
+def _field_cleaner(field):
+    """
+    返回与 field.clean(value, None) 等价的校验函数
+
+    转换函数、choices 集合和校验器列表预先取出，逐行校验时不再重复查找（导入的热点路径）
+    """
+    to_python = field.to_python
+    validators = field.validators
+    empty_values = field.empty_values
+    error_messages = field.error_messages
+    choices = {key for key, _ in field.flatchoices} if field.choices else None
+
+    def clean(value):
+        value = to_python(value)
+        is_empty = value in empty_values
+        if choices is not None and not is_empty and value not in choices:
+            raise DjangoValidationError(
+                error_messages['invalid_choice'], code='invalid_choice', params={'value': value}
+            )
+        if value is None and not field.null:
+            raise DjangoValidationError(error_messages['null'], code='null')
+        if is_empty and not field.blank:
+            raise DjangoValidationError(error_messages['blank'], code='blank')
+
+        if not is_empty and validators:
+            errors = []
+            for validator in validators:
+                try:
+                    validator(value)
+                except DjangoValidationError as e:
+                    if e.code in error_messages:
+                        e.message = error_messages[e.code]
+                    errors.extend(e.error_list)
+            if errors:
+                raise DjangoValidationError(errors)
+        return value
+
+    return clean
+
+
+class EmployeeImportService:
+    """员工批量导入"""
+
+    DEFAULT_CHUNK_SIZE = 2000
+    MAX_REPORTED_ERRORS = 100
+    # 预查询已存在工号时每条 IN 查询的工号数
+    LOOKUP_CHUNK_SIZE = 5000
+
+    def __init__(self, chunk_size=None, dry_run=False):
+        self.chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+        self.dry_run = dry_run
+        self.stats = {'received': 0, 'valid': 0, 'created': 0, 'failed': 0, 'chunks': 0}
+        self.errors = []
+        self.model_fields = {name: Employee._meta.get_field(name) for name in IMPORT_FIELDS}
+        self.cleaners = {name: _field_cleaner(field) for name, field in self.model_fields.items()}
+        # 按模型字段顺序位置传参构造实例（Model.__init__ 的快速路径），未导入的字段取默认值
+        self.attnames = [(field.attname, field.get_default) for field in Employee._meta.concrete_fields]
+        self.gender_aliases = choice_aliases(self.model_fields['gender'])
+        self.status_aliases = choice_aliases(self.model_fields['status'])
+        # 复用序列化器中的业务校验规则（工号唯一性改为批量检查，不调用 validate_employee_id）
+        self.serializer = EmployeeSerializer()
+
+    def record_error(self, line, employee_id, errors):
+        self.stats['failed'] += 1
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'employee_id': employee_id, 'errors': errors})
+
+    @staticmethod
+    def map_header(header):
+        """
+        表头转为字段名列表（无法识别的列映射为 None，导入时忽略）
+
+        Raises:
+            EmployeeImportError: 缺少必填列
+        """
+        aliases = _header_aliases()
+        columns = [aliases.get(str(name).strip()) for name in header]
+        required = {'employee_id', 'name', 'gender', 'department', 'position', 'hire_date', 'base_salary'}
+        missing = required - set(columns)
+        if missing:
+            raise EmployeeImportError(f'缺少必填列: {", ".join(sorted(missing))}')
+        return columns
+
+    def existing_employee_ids(self, codes):
+        """一次性查询文件中出现的工号中已存在的部分（按 LOOKUP_CHUNK_SIZE 分段 IN 查询）"""
+        codes = list(codes)
+        existing = set()
+        for index in range(0, len(codes), self.LOOKUP_CHUNK_SIZE):
+            existing.update(
+                Employee.objects.filter(
+                    employee_id__in=codes[index:index + self.LOOKUP_CHUNK_SIZE]
+                ).values_list('employee_id', flat=True)
+            )
+        return existing
+
+    def clean_row(self, raw):
+        """
+        校验并转换一行数据
+
+        Returns:
+            tuple: (清洗后的字段字典, 错误字典)
+        """
+        values = {}
+        errors = {}
+
+        for name, field in self.model_fields.items():
+            value = raw.get(name, '')
+            value = value.strip() if isinstance(value, str) else value
+            if name == 'gender' and value:
+                value = self.gender_aliases.get(value, value)
+            elif name == 'status':
+                value = self.status_aliases.get(value, value) if value else field.get_default()
+            elif name in DATE_FIELDS and value:
+                try:
+                    value = parse_date(value, excel_serial=True)
+                except ParseError:
+                    # 保留原值，由字段校验给出错误提示
+                    pass
+            if value == '' and field.null:
+                value = None
+
+            try:
+                values[name] = self.cleaners[name](value)
+            except DjangoValidationError as e:
+                errors[name] = [str(message) for message in e.messages]
+
+        # 序列化器中的业务规则
+        for name in ('phone', 'base_salary', 'hire_date'):
+            if name in values and values[name] not in (None, ''):
+                try:
+                    getattr(self.serializer, f'validate_{name}')(values[name])
+                except serializers.ValidationError as e:
+                    errors[name] = [str(message) for message in e.detail]
+        if not errors:
+            try:
+                self.serializer.validate(values)
+            except serializers.ValidationError as e:
+                errors['non_field_errors'] = [str(message) for message in e.detail]
+
+        return values, errors
+
+    def import_rows(self, rows):
+        """
+        导入表格数据（第一行为表头）
+
+        Returns:
+            dict: 导入统计（接收、通过校验、写入、失败行数、批次数、耗时、行/秒）及错误明细
+        """
+        started = time.perf_counter()
+        rows = iter(rows)
+        try:
+            columns = self.map_header(next(rows))
+        except StopIteration:
+            raise EmployeeImportError('导入文件为空')
+
+        records = []
+        for line_number, cells in enumerate(rows, 2):
+            if not any(str(cell).strip() for cell in cells):
+                continue
+            raw = {name: cell for name, cell in zip(columns, cells) if name}
+            records.append((line_number, raw))
+        self.stats['received'] = len(records)
+
+        # 工号唯一性：已存在的工号一次性查出，文件内重复在遍历时检查
+        codes = {str(raw.get('employee_id', '')).strip() for _, raw in records}
+        existing = self.existing_employee_ids(code for code in codes if code)
+        departments = dict(Department.objects.values_list('name', 'pk'))
+
+        seen = {}
+        employees = []
+        for line_number, raw in records:
+            values, errors = self.clean_row(raw)
+            code = values.get('employee_id')
+            if code:
+                if code in existing:
+                    errors.setdefault('employee_id', []).append('该工号已存在')
+                elif code in seen:
+                    errors.setdefault('employee_id', []).append(f'与第 {seen[code]} 行工号重复')
+                else:
+                    seen[code] = line_number
+            department = values.get('department')
+            if department and department not in departments:
+                errors.setdefault('department', []).append(f'部门不存在: {department}')
+
+            if errors:
+                self.record_error(line_number, code or raw.get('employee_id'), errors)
+                continue
+
+            # bulk_create 不调用 save()，在这里同步 department_ref 和部门名称
+            values['department_ref_id'] = departments[department]
+            employees.append((line_number, self.build_employee(values)))
+
+        self.stats['valid'] = len(employees)
+        if not self.dry_run:
+            for index in range(0, len(employees), self.chunk_size):
+                self.write_chunk(employees[index:index + self.chunk_size])
+            if self.stats['created']:
+                bump_model_version(Employee)
+                DashboardStatsService.mark_stale()
+
+        elapsed = time.perf_counter() - started
+        result = {
+            **self.stats,
+            'dry_run': self.dry_run,
+            'elapsed_seconds': round(elapsed, 3),
+            'rows_per_second': round(self.stats['received'] / elapsed, 1) if elapsed else None,
+            'errors': self.errors,
+        }
+        logger.info(
+            f"员工导入完成：接收 {result['received']} 行，写入 {result['created']} 条，"
+            f"失败 {result['failed']} 行，{result['rows_per_second']} 行/秒"
+        )
+        return result
+
+    def build_employee(self, values):
+        return Employee(*[
+            values[attname] if attname in values else get_default()
+            for attname, get_default in self.attnames
+        ])
+
+    def write_chunk(self, chunk):
+        """写入一批员工；并发导入导致唯一约束冲突时整批记为失败"""
+        self.stats['chunks'] += 1
+        try:
+            with transaction.atomic():
+                Employee.objects.bulk_create([employee for _, employee in chunk])
+        except IntegrityError as e:
+            for line_number, employee in chunk:
+                self.record_error(line_number, employee.employee_id, {'non_field_errors': [f'写入失败: {e}']})
+            return
+        self.stats['created'] += len(chunk)
+
+    def import_file(self, content, input_format):
+        """
+        导入 CSV / XLSX 文件内容
+
+        Raises:
+            EmployeeImportError: 格式不支持或文件无法解析
+        """
+        if input_format not in READERS:
+            raise EmployeeImportError(f'不支持的导入格式: {input_format}，可选值: {", ".join(READERS)}')
+        try:
+            rows = READERS[input_format](content)
+        except (UnicodeDecodeError, csv.Error, ElementTree.ParseError, KeyError) as e:
+            raise EmployeeImportError(f'文件解析失败: {e}')
+        return self.import_rows(rows)
@@ -0,0 +1,383 @@
+"""
+薪资规则引擎
+
+设计思路：
+1. 薪资规则在 settings.PAYROLL_RULES 中声明，计算薪资接口、按员工计算接口和批量生成（PayrollGenerator）共用：
+   - 部门奖金：按部门名称配置固定金额和 / 或基础工资比例
+   - 考勤扣款：按考勤状态配置每次的固定金额，或按日工资（基础工资 / 月计薪天数）折算的天数
+   - 社会保险和住房公积金个人缴纳：缴费基数为基础工资（限定在上下限之间）× 各险种比例之和
+   - 个人所得税：应纳税所得额 = 应发 - 考勤扣款 - 社保 - 起征点，按超额累进税率表（速算扣除数）计算
+2. 结果列与 SalaryRecord 字段一一对应：bonus / deductions 为手工奖金和扣除，规则计算的各项明细
+   （部门奖金、考勤扣款、社保公积金、个税）单独存储，应发 = 基础 + bonus + 部门奖金，
+   实发 = 应发 - deductions - 考勤扣款 - 社保 - 个税，与 SalaryRecord.save() 的计算关系一致
+3. 按列计算：一次处理全部员工（或一个分块），不逐个对象调用 Decimal 运算：
+   金额换算为整数分、比例换算为整数分数，只做整数运算，每项规则只四舍五入一次（ROUND_HALF_UP），
+   结果与逐条 Decimal 计算（calculate_reference）完全一致，且不依赖 NumPy
+4. 考勤扣款所需的各状态天数由一次分组查询（按员工、状态计数）取得，未配置考勤规则时不查询
+5. 规则默认不启用（settings.PAYROLL_RULES = {}），此时结果与原先的 应发 = 基础 + 奖金、实发 = 应发 - 扣除 相同
+"""
+
+import calendar
+import logging
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from fractions import Fraction
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count
+
+from ..models import AttendanceRecord
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+HUNDRED = Decimal(100)
+ZERO = Decimal('0.00')
+DEFAULT_WORK_DAYS_PER_MONTH = '21.75'
+
+# calculate() 返回的列（与 SalaryRecord 字段同名）；后四项为规则计算的明细，已计入应发 / 实发
+RESULT_COLUMNS = (
+    'bonus', 'deductions', 'gross_salary', 'net_salary',
+    'department_bonus', 'attendance_deduction', 'social_insurance', 'income_tax',
+)
+BREAKDOWN_COLUMNS = RESULT_COLUMNS[4:]
+
+
+def _cents(value):
+    """金额转为整数分（四舍五入到分）"""
+    return int(Decimal(str(value)).quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def _ratio(value):
+    """比例转为精确分数"""
+    return Fraction(Decimal(str(value)))
+
+
+def _round_div(numerator, denominator):
+    """整数除法并四舍五入（ROUND_HALF_UP，远离零），denominator 为正数"""
+    if numerator >= 0:
+        return (2 * numerator + denominator) // (2 * denominator)
+    return -((-2 * numerator + denominator) // (2 * denominator))
+
+
+def period_range(salary_period):
+    """薪资期间（YYYY-MM）的首日和末日"""
+    year, month = (int(part) for part in salary_period.split('-'))
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _tax_bounds(brackets):
+    """
+    校验个税税率表并返回各档上限（整数分，不含最后一档）
+
+    Raises:
+        ImproperlyConfigured: 最后一档上限不是 None、None 之后还有税率档或上限未严格递增
+    """
+    if not brackets:
+        return []
+    uppers = [upper for upper, _, _ in brackets]
+    if None in uppers[:-1]:
+        raise ImproperlyConfigured('PAYROLL_RULES 个税税率表：上限为 None 的税率档必须是最后一档')
+    if uppers[-1] is not None:
+        raise ImproperlyConfigured('PAYROLL_RULES 个税税率表：最后一档的上限必须为 None')
+    bounds = [_cents(upper) for upper in uppers[:-1]]
+    if any(lower >= upper for lower, upper in zip(bounds, bounds[1:])):
+        raise ImproperlyConfigured('PAYROLL_RULES 个税税率表：各档上限必须严格递增')
+    return bounds
+
+
+class PayrollRules:
+    """
+    解析后的薪资规则（金额为整数分，比例为 Fraction）
+
+    settings.PAYROLL_RULES 示例：
+        {
+            'DEPARTMENT_BONUSES': {'技术部': {'amount': '500'}, '市场部': {'rate': '0.05'}},
+            'ATTENDANCE_DEDUCTIONS': {
+                'WORK_DAYS_PER_MONTH': '21.75',
+                'STATUSES': {'absent': {'days': '1'}, 'late': {'amount': '50'}},
+            },
+            'SOCIAL_INSURANCE': {'BASE_MIN': '4000', 'BASE_MAX': '30000', 'RATES': {'pension': '0.08'}},
+            'INCOME_TAX': {'THRESHOLD': '5000', 'BRACKETS': [('3000', '0.03', '0'), (None, '0.10', '210')]},
+        }
+    BRACKETS 为 (应纳税所得额上限, 税率, 速算扣除数)，上限严格递增，最后一档上限为 None，
+    否则抛出 ImproperlyConfigured。
+    """
+
+    def __init__(self, config=None):
+        if config is None:
+            config = getattr(settings, 'PAYROLL_RULES', {})
+        self.config = config
+
+        self.department_bonuses = {
+            name: (_cents(rule.get('amount', 0)), _ratio(rule.get('rate', 0)))
+            for name, rule in (config.get('DEPARTMENT_BONUSES') or {}).items()
+        }
+
+        attendance = config.get('ATTENDANCE_DEDUCTIONS') or {}
+        statuses = attendance.get('STATUSES') or {}
+        self.work_days = _ratio(attendance.get('WORK_DAYS_PER_MONTH', DEFAULT_WORK_DAYS_PER_MONTH))
+        self.attendance_amounts = {
+            status: _cents(rule.get('amount', 0)) for status, rule in statuses.items()
+        }
+        # 折算天数通分为整数：扣款 = 基础工资 × Σ(次数 × attendance_day_units) × day_scale / day_denominator
+        days = {status: _ratio(rule.get('days', 0)) for status, rule in statuses.items()}
+        common = math.lcm(1, *(value.denominator for value in days.values()))
+        self.attendance_day_units = {status: int(value * common) for status, value in days.items()}
+        self.day_scale = self.work_days.denominator
+        self.day_denominator = common * self.work_days.numerator
+
+        insurance = config.get('SOCIAL_INSURANCE') or {}
+        self.insurance_rate = sum((_ratio(rate) for rate in (insurance.get('RATES') or {}).values()), Fraction(0))
+        self.insurance_base_min = _cents(insurance.get('BASE_MIN', 0))
+        base_max = insurance.get('BASE_MAX')
+        self.insurance_base_max = _cents(base_max) if base_max is not None else None
+
+        tax = config.get('INCOME_TAX') or {}
+        brackets = tax.get('BRACKETS') or []
+        self.tax_threshold = _cents(tax.get('THRESHOLD', 0))
+        self.tax_bounds = _tax_bounds(brackets)
+        self.tax_rates = [(_ratio(rate), _cents(quick_deduction)) for _, rate, quick_deduction in brackets]
+
+    @property
+    def attendance_statuses(self):
+        return sorted(self.attendance_amounts)
+
+
+class PayrollEngine:
+    """按列计算一组员工的薪资"""
+
+    # 员工数不超过该值时按员工 UUID 过滤考勤计数，否则读取整个期间
+    LOOKUP_LIMIT = 5000
+
+    def __init__(self, rules=None):
+        self.rules = rules or PayrollRules()
+
+    def attendance_counts(self, salary_period, employee_ids=None):
+        """
+        期间内各员工计入扣款的考勤状态天数，一次分组查询
+
+        Returns:
+            dict: {员工 UUID: {状态: 天数}}
+        """
+        statuses = self.rules.attendance_statuses
+        if not statuses:
+            return {}
+        start, end = period_range(salary_period)
+        queryset = AttendanceRecord.objects.filter(date__range=(start, end), status__in=statuses)
+        if employee_ids is not None:
+            queryset = queryset.filter(employee_id__in=list(employee_ids))
+
+        counts = defaultdict(dict)
+        rows = queryset.values('employee_id', 'status').annotate(days=Count('id')).order_by()
+        for row in rows:
+            counts[row['employee_id']][row['status']] = row['days']
+        return counts
+
+    # ==================== 各规则（整数分） ====================
+
+    def department_bonus_column(self, base, departments):
+        bonuses = self.rules.department_bonuses
+        if not bonuses:
+            return [0] * len(base)
+        column = []
+        for cents, department in zip(base, departments):
+            rule = bonuses.get(department)
+            if rule is None:
+                column.append(0)
+            else:
+                amount, rate = rule
+                column.append(amount + _round_div(cents * rate.numerator, rate.denominator))
+        return column
+
+    def attendance_column(self, base, employee_ids, attendance):
+        rules = self.rules
+        if not rules.attendance_amounts or not attendance:
+            return [0] * len(base)
+        amounts, units = rules.attendance_amounts, rules.attendance_day_units
+        scale, denominator = rules.day_scale, rules.day_denominator
+        column = []
+        for cents, employee_id in zip(base, employee_ids):
+            counts = attendance.get(employee_id)
+            if not counts:
+                column.append(0)
+                continue
+            amount = day_units = 0
+            for status, days in counts.items():
+                amount += amounts[status] * days
+                day_units += units[status] * days
+            deduction = amount + _round_div(cents * day_units * scale, denominator)
+            # 考勤扣款不超过基础工资
+            column.append(min(deduction, cents))
+        return column
+
+    def insurance_column(self, base):
+        rules = self.rules
+        rate = rules.insurance_rate
+        if not rate:
+            return [0] * len(base)
+        low, high = rules.insurance_base_min, rules.insurance_base_max
+        numerator, denominator = rate.numerator, rate.denominator
+        column = []
+        for cents in base:
+            cents = max(cents, low)
+            if high is not None:
+                cents = min(cents, high)
+            column.append(_round_div(cents * numerator, denominator))
+        return column
+
+    def tax_column(self, incomes):
+        """incomes 为扣除考勤扣款和社保后的税前收入（分）"""
+        rules = self.rules
+        if not rules.tax_rates:
+            return [0] * len(incomes)
+        threshold, bounds, rates = rules.tax_threshold, rules.tax_bounds, rules.tax_rates
+        column = []
+        for income in incomes:
+            taxable = income - threshold
+            if taxable <= 0:
+                column.append(0)
+                continue
+            rate, quick_deduction = rates[bisect_left(bounds, taxable)]
+            column.append(max(0, _round_div(taxable * rate.numerator, rate.denominator) - quick_deduction))
+        return column
+
+    # ==================== 计算 ====================
+
+    def calculate(self, employees, salary_period, bonus=ZERO, deductions=ZERO, attendance=None):
+        """
+        按列计算薪资
+
+        Args:
+            employees: 员工列 {'id': [...], 'base_salary': [...], 'department': [...]}，见 employee_columns()
+            salary_period: 薪资期间（YYYY-MM），用于统计考勤
+            bonus: 每人统一发放的手工奖金
+            deductions: 每人统一的手工扣除
+            attendance: attendance_counts() 的结果；为 None 时按本组员工查询
+
+        Returns:
+            dict: {列名: Decimal 列表}，列见 RESULT_COLUMNS
+        """
+        employee_ids = employees['id']
+        if attendance is None:
+            attendance = self.attendance_counts(
+                salary_period, employee_ids if len(employee_ids) <= self.LOOKUP_LIMIT else None,
+            )
+
+        base = []
+        for value in employees['base_salary']:
+            if not isinstance(value, Decimal):
+                value = Decimal(str(value))
+            base.append(int((value * HUNDRED).to_integral_value(ROUND_HALF_UP)))
+        bonus_cents, deduction_cents = _cents(bonus), _cents(deductions)
+
+        department_bonus = self.department_bonus_column(base, employees['department'])
+        attendance_deduction = self.attendance_column(base, employee_ids, attendance)
+        social_insurance = self.insurance_column(base)
+        gross = [cents + bonus_cents + extra for cents, extra in zip(base, department_bonus)]
+        income_tax = self.tax_column([
+            value - absence - insurance
+            for value, absence, insurance in zip(gross, attendance_deduction, social_insurance)
+        ])
+        total_deductions = [
+            deduction_cents + absence + insurance + tax
+            for absence, insurance, tax in zip(attendance_deduction, social_insurance, income_tax)
+        ]
+
+        count = len(base)
+        columns = {
+            'bonus': [bonus_cents] * count,
+            'deductions': [deduction_cents] * count,
+            'gross_salary': gross,
+            'net_salary': [value - total for value, total in zip(gross, total_deductions)],
+            'department_bonus': department_bonus,
+            'attendance_deduction': attendance_deduction,
+            'social_insurance': social_insurance,
+            'income_tax': income_tax,
+        }
+        # 整数分乘以 0.01 为精确运算（结果位数远小于 Decimal 默认精度）
+        to_money = CENT.__mul__
+        return {name: list(map(to_money, map(Decimal, values))) for name, values in columns.items()}
+
+    def calculate_employee(self, employee, salary_period, bonus=ZERO, deductions=ZERO):
+        """计算单个员工的薪资，返回 {列名: Decimal}"""
+        columns = self.calculate(employee_columns([employee]), salary_period, bonus, deductions)
+        return {name: values[0] for name, values in columns.items()}
+
+
+def employee_columns(employees):
+    """员工对象列表转为 calculate() 所需的列"""
+    return {
+        'id': [employee.id for employee in employees],
+        'base_salary': [employee.base_salary for employee in employees],
+        'department': [employee.department for employee in employees],
+    }
+
+
+def calculate_reference(rules, base_salary, department, attendance, bonus=ZERO, deductions=ZERO):
+    """
+    逐条 Decimal 计算一名员工的薪资（按列计算的对照实现，用于基准测试和校验）
+
+    Returns:
+        dict: {列名: Decimal}
+    """
+    config = rules.config
+
+    def rounded(value):
+        return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+    base = rounded(Decimal(str(base_salary)))
+    bonus, deductions = rounded(Decimal(str(bonus))), rounded(Decimal(str(deductions)))
+
+    department_bonus = ZERO
+    rule = (config.get('DEPARTMENT_BONUSES') or {}).get(department)
+    if rule:
+        department_bonus = rounded(Decimal(str(rule.get('amount', 0)))) + rounded(base * Decimal(str(rule.get('rate', 0))))
+
+    attendance_deduction = ZERO
+    attendance_config = config.get('ATTENDANCE_DEDUCTIONS') or {}
+    statuses = attendance_config.get('STATUSES') or {}
+    if attendance and statuses:
+        work_days = Decimal(str(attendance_config.get('WORK_DAYS_PER_MONTH', DEFAULT_WORK_DAYS_PER_MONTH)))
+        amount = sum((rounded(Decimal(str(statuses[status].get('amount', 0)))) * days
+                      for status, days in attendance.items()), ZERO)
+        leave_days = sum((Decimal(str(statuses[status].get('days', 0))) * days
+                          for status, days in attendance.items()), ZERO)
+        attendance_deduction = min(amount + rounded(base * leave_days / work_days), base)
+
+    social_insurance = ZERO
+    insurance = config.get('SOCIAL_INSURANCE') or {}
+    rate = sum((Decimal(str(value)) for value in (insurance.get('RATES') or {}).values()), ZERO)
+    if rate:
+        contribution_base = max(base, rounded(Decimal(str(insurance.get('BASE_MIN', 0)))))
+        if insurance.get('BASE_MAX') is not None:
+            contribution_base = min(contribution_base, rounded(Decimal(str(insurance['BASE_MAX']))))
+        social_insurance = rounded(contribution_base * rate)
+
+    gross = base + bonus + department_bonus
+    income_tax = ZERO
+    tax = config.get('INCOME_TAX') or {}
+    taxable = gross - attendance_deduction - social_insurance - rounded(Decimal(str(tax.get('THRESHOLD', 0))))
+    if taxable > 0:
+        for upper, tax_rate, quick_deduction in tax.get('BRACKETS') or []:
+            if upper is None or taxable <= Decimal(str(upper)):
+                income_tax = max(
+                    ZERO, rounded(taxable * Decimal(str(tax_rate))) - rounded(Decimal(str(quick_deduction))),
+                )
+                break
+
+    total_deductions = deductions + attendance_deduction + social_insurance + income_tax
+    return {
+        'bonus': bonus,
+        'deductions': deductions,
+        'gross_salary': gross,
+        'net_salary': gross - total_deductions,
+        'department_bonus': department_bonus,
+        'attendance_deduction': attendance_deduction,
+        'social_insurance': social_insurance,
+        'income_tax': income_tax,
+    }
@@ -0,0 +1,329 @@
+"""
+批量薪资生成服务
+
+设计思路：
+1. 一次查询取出本期已发薪的员工集合，避免逐个 exists() 检查
+2. 在内存中构建全部 SalaryRecord 对象（包含职位和基础工资快照），金额由薪资规则引擎
+   （payroll_rules_service.PayrollEngine）对整批员工按列计算，考勤扣款所需的考勤天数一次查询取得
+3. 使用分批 bulk_create 写入，并忽略 (employee, salary_period) 唯一约束冲突
+4. 整个写入过程包裹在一个事务中，保证数据一致性
+5. 大批量生成可提交为 PayrollJob，由本地 worker 按员工分块异步处理，支持断点续跑；
+   接管超时任务时以 worker_token 区分执行者，避免两个 worker 同时写入进度
+"""
+
+import logging
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from ..models import Employee, SalaryRecord, PayrollJob
+from ..cache import bump_model_version
+from .payroll_rules_service import PayrollEngine, RESULT_COLUMNS, employee_columns
+
+logger = logging.getLogger(__name__)
+
+
+class PayrollGenerator:
+    """批量薪资生成器"""
+
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(self, salary_period, bonus=Decimal('0.00'), deductions=Decimal('0.00'),
+                 batch_size=None):
+        """
+        初始化薪资生成器
+
+        Args:
+            salary_period: 薪资期间（YYYY-MM）
+            bonus: 统一发放的奖金
+            deductions: 统一扣除金额
+            batch_size: 每批写入的记录数
+        """
+        self.salary_period = salary_period
+        self.bonus = bonus
+        self.deductions = deductions
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self.engine = PayrollEngine()
+
+    def get_paid_employees(self):
+        """
+        获取本期已有薪资记录的员工
+
+        Returns:
+            dict: {员工 UUID: 工号}，单次查询完成
+        """
+        return dict(
+            SalaryRecord.objects.filter(salary_period=self.salary_period)
+            .values_list('employee_id', 'employee__employee_id')
+        )
+
+    def get_employee_queryset(self):
+        """构建待处理员工查询集，只加载计算所需字段"""
+        return Employee.objects.only('id', 'employee_id', 'position', 'base_salary', 'department').order_by('id')
+
+    def build_record(self, employee):
+        """根据员工当前信息构建一条薪资记录（未保存）"""
+        return self.build_records([employee], set())[0]
+
+    def build_records(self, employees, paid_employee_ids, attendance=None):
+        """
+        为未发薪的员工批量构建薪资记录
+
+        Args:
+            employees: 员工对象（可迭代）
+            paid_employee_ids: 本期已发薪的员工 UUID
+            attendance: PayrollEngine.attendance_counts() 的结果；为 None 时按本批员工查询
+        """
+        employees = [employee for employee in employees if employee.id not in paid_employee_ids]
+        if not employees:
+            return []
+
+        # 整批员工按列计算：应发 = 基础 + 奖金 + 部门奖金，实发 = 应发 - 扣除 - 考勤扣款 - 社保 - 个税
+        amounts = self.engine.calculate(
+            employee_columns(employees), self.salary_period,
+            bonus=self.bonus, deductions=self.deductions, attendance=attendance,
+        )
+        return [
+            SalaryRecord(
+                employee_id=employee.id,
+                salary_period=self.salary_period,
+                position_snapshot=employee.position,
+                base_salary_snapshot=employee.base_salary,
+                **{name: amounts[name][index] for name in RESULT_COLUMNS},
+            )
+            for index, employee in enumerate(employees)
+        ]
+
+    def write_records(self, records):
+        """
+        分批写入薪资记录
+
+        bulk_create 不会调用 SalaryRecord.save()，应发/实发工资已在 build_records 中按列计算。
+        ignore_conflicts 保证并发生成时不会因唯一约束失败而回滚整批数据。
+        bulk_create 也不会触发 post_save 信号，需手动递增模型缓存版本号。
+        """
+        SalaryRecord.objects.bulk_create(
+            records,
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        bump_model_version(SalaryRecord)
+
+    def written_record_ids(self, records):
+        """
+        实际写入数据库的记录 ID（按构建顺序）
+
+        忽略冲突时数据库不会返回实际插入的行，并发生成时被跳过的记录 ID 在数据库中不存在，
+        需在同一事务内按批查询确认。
+        """
+        written = set()
+        for start in range(0, len(records), self.batch_size):
+            written.update(
+                SalaryRecord.objects.filter(
+                    salary_period=self.salary_period,
+                    id__in=[record.id for record in records[start:start + self.batch_size]],
+                ).values_list('id', flat=True)
+            )
+        return [record.id for record in records if record.id in written]
+
+    def process_chunk(self, employees):
+        """
+        处理一批员工：检查已发薪记录、构建并写入薪资记录
+
+        Args:
+            employees: 员工对象列表
+
+        Returns:
+            tuple: (新建数量, 跳过数量)
+        """
+        employee_ids = [employee.id for employee in employees]
+        period_records = SalaryRecord.objects.filter(
+            salary_period=self.salary_period, employee_id__in=employee_ids
+        )
+        paid_employee_ids = set(period_records.values_list('employee_id', flat=True))
+
+        records = self.build_records(employees, paid_employee_ids)
+        self.write_records(records)
+
+        created_count = period_records.count() - len(paid_employee_ids)
+        return created_count, len(paid_employee_ids)
+
+    def generate(self):
+        """
+        执行批量生成
+
+        Returns:
+            dict: 包含新建数量、跳过数量、跳过的工号和新建记录 ID 列表
+        """
+        with transaction.atomic():
+            paid_employees = self.get_paid_employees()
+            employees = self.get_employee_queryset().iterator(chunk_size=self.batch_size)
+            # 全员计算时一次读取整个期间的考勤计数
+            attendance = self.engine.attendance_counts(self.salary_period)
+            records = self.build_records(employees, paid_employees, attendance=attendance)
+            self.write_records(records)
+            created_record_ids = self.written_record_ids(records)
+            created_count = len(created_record_ids)
+
+        logger.info(
+            f"薪资期间 {self.salary_period} 批量生成完成：新建 {created_count} 条，"
+            f"跳过 {len(paid_employees)} 条"
+        )
+
+        return {
+            'created_count': created_count,
+            'skipped_count': len(paid_employees),
+            'skipped_employee_ids': list(paid_employees.values()),
+            'created_record_ids': created_record_ids,
+        }
+
+
+class JobLeaseLost(Exception):
+    """任务已被其他 worker 接管，当前 worker 不能再写入进度"""
+
+
+class PayrollJobRunner:
+    """
+    薪资生成任务执行器
+
+    设计思路：
+    - 以员工 UUID 为游标按块处理（keyset），不依赖 OFFSET
+    - 每块在独立事务中写入薪资记录并更新任务进度，崩溃后从 last_employee_id 继续
+    - 领取任务时生成 worker_token，进度按 (id, worker_token) 条件更新：
+      任务被其他 worker 接管后原 worker 的更新影响 0 行，本块回滚并停止，计数和游标不会被覆盖或重复累加
+    - 累计批次数和总耗时用于计算吞吐量，chunk_timings 只保留最近 RECENT_CHUNKS 批
+    """
+
+    # 运行中任务超过该时间未更新视为 worker 已崩溃，可被重新领取
+    STALE_AFTER = timedelta(minutes=5)
+
+    def __init__(self, job):
+        self.job = job
+        self.token = job.worker_token
+        self.chunk_size = min(max(1, job.chunk_size), PayrollJob.MAX_CHUNK_SIZE)
+        self.generator = PayrollGenerator(
+            job.salary_period,
+            bonus=job.bonus,
+            deductions=job.deductions,
+            batch_size=self.chunk_size,
+        )
+
+    @classmethod
+    def claim_next_job(cls, stale_after=None):
+        """
+        领取下一个待处理任务
+
+        优先处理最早创建的等待中任务，同时接管超时未更新的运行中任务（断点续跑）。
+        PostgreSQL 下使用 SKIP LOCKED 避免多个 worker 领取同一任务；
+        每次领取都生成新的 worker_token，原 worker 之后的进度更新会失败。
+        """
+        stale_before = timezone.now() - (stale_after or cls.STALE_AFTER)
+        with transaction.atomic():
+            job = (
+                PayrollJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status='pending') |
+                    Q(status='running', updated_at__lt=stale_before)
+                )
+                .order_by('created_at')
+                .first()
+            )
+            if job is None:
+                return None
+
+            if job.status == 'pending':
+                job.started_at = timezone.now()
+                job.total_employees = Employee.objects.count()
+            else:
+                logger.warning(f"接管超时未更新的薪资生成任务 {job.id}")
+            job.status = 'running'
+            job.worker_token = uuid.uuid4()
+            job.save(update_fields=['status', 'started_at', 'total_employees', 'worker_token', 'updated_at'])
+        return job
+
+    def next_chunk(self):
+        """按游标取下一块员工"""
+        queryset = self.generator.get_employee_queryset()
+        if self.job.last_employee_id:
+            queryset = queryset.filter(id__gt=self.job.last_employee_id)
+        return list(queryset[:self.chunk_size])
+
+    def save_progress(self, **fields):
+        """
+        持有令牌时写入任务字段
+
+        Raises:
+            JobLeaseLost: 任务已被其他 worker 接管
+        """
+        fields['updated_at'] = timezone.now()
+        updated = PayrollJob.objects.filter(id=self.job.id, worker_token=self.token).update(**fields)
+        if not updated:
+            raise JobLeaseLost(f"薪资生成任务 {self.job.id} 已被其他 worker 接管")
+        for name, value in fields.items():
+            setattr(self.job, name, value)
+
+    def run(self):
+        """执行任务直到完成、失败或被其他 worker 接管"""
+        job = self.job
+        logger.info(f"开始处理薪资生成任务 {job.id}（{job.salary_period}）")
+
+        try:
+            while True:
+                started = time.perf_counter()
+                with transaction.atomic():
+                    employees = self.next_chunk()
+                    if not employees:
+                        break
+
+                    created_count, skipped_count = self.generator.process_chunk(employees)
+                    seconds = time.perf_counter() - started
+
+                    chunk_count = job.chunk_count + 1
+                    timing = {
+                        'index': chunk_count,
+                        'rows': len(employees),
+                        'created': created_count,
+                        'seconds': round(seconds, 4),
+                        'rows_per_second': round(len(employees) / seconds, 1) if seconds else None,
+                    }
+                    # 令牌校验失败时抛出 JobLeaseLost，本块写入随事务回滚
+                    self.save_progress(
+                        processed_employees=job.processed_employees + len(employees),
+                        created_count=job.created_count + created_count,
+                        skipped_count=job.skipped_count + skipped_count,
+                        last_employee_id=employees[-1].id,
+                        chunk_count=chunk_count,
+                        processing_seconds=job.processing_seconds + seconds,
+                        chunk_timings=(job.chunk_timings + [timing])[-PayrollJob.RECENT_CHUNKS:],
+                    )
+        except JobLeaseLost as e:
+            logger.warning(str(e))
+            return job
+        except Exception as e:
+            logger.exception(f"薪资生成任务 {job.id} 执行失败")
+            try:
+                self.save_progress(status='failed', error_message=str(e), finished_at=timezone.now())
+            except JobLeaseLost as lost:
+                logger.warning(str(lost))
+            return job
+
+        try:
+            # 任务期间新增的员工也计入总数，保证进度为 100%
+            self.save_progress(
+                status='completed',
+                finished_at=timezone.now(),
+                total_employees=max(job.total_employees, job.processed_employees),
+            )
+        except JobLeaseLost as e:
+            logger.warning(str(e))
+            return job
+        logger.info(
+            f"薪资生成任务 {job.id} 完成：新建 {job.created_count} 条，跳过 {job.skipped_count} 条，"
+            f"{job.throughput} 行/秒"
+        )
+        return job
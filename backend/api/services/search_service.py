@@ -0,0 +1,108 @@
+"""
+员工搜索服务
+
+设计思路：
+1. 筛选使用 icontains，PostgreSQL 下编译为 UPPER("col"::text) LIKE UPPER('%关键字%')，
+   由 UPPER(col::text) 表达式上的 pg_trgm GIN 索引支撑（见迁移 0006），不做全表扫描
+2. 使用 TrigramSimilarity 计算各字段相似度并取最大值作为相关度排序（只对筛选后的行计算）
+3. 其他数据库（如 SQLite 测试环境）按相同条件筛选，相关度在 Python 中计算，与 pg_trgm 的 similarity() 一致；
+   匹配行数超过 PYTHON_RANK_LIMIT 时不再逐行计算，相关度统一为 0（即按创建时间倒序）
+"""
+
+import re
+
+from django.db import connections
+from django.db.models import Case, When, Value, FloatField, Q
+
+# 参与搜索的员工字段
+EMPLOYEE_SEARCH_FIELDS = ('name', 'employee_id', 'department', 'position')
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def trigrams(text):
+    """
+    按 pg_trgm 的规则生成三元组集合
+
+    每个单词转为小写，前补两个空格、后补一个空格后切分为连续的三个字符。
+    """
+    result = set()
+    for word in _WORD_RE.findall((text or '').lower()):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def trigram_similarity(a, b):
+    """计算两个字符串的三元组相似度（0~1），与 pg_trgm similarity() 一致"""
+    trigrams_a = trigrams(a)
+    trigrams_b = trigrams(b)
+    if not trigrams_a or not trigrams_b:
+        return 0.0
+    shared = len(trigrams_a & trigrams_b)
+    return shared / (len(trigrams_a) + len(trigrams_b) - shared)
+
+
+class EmployeeSearchBackend:
+    """员工搜索后端，按数据库类型选择实现"""
+
+    rank_annotation = 'search_rank'
+    # 非 PostgreSQL 时 Python 相关度排序的最大匹配行数，避免加载全部匹配行并生成过长的 CASE 表达式
+    PYTHON_RANK_LIMIT = 500
+
+    def __init__(self, fields=EMPLOYEE_SEARCH_FIELDS):
+        self.fields = fields
+
+    def filter(self, queryset, term):
+        """多字段模糊匹配（PostgreSQL 下由 UPPER(col::text) 上的 trigram GIN 索引支撑）"""
+        condition = Q()
+        for field in self.fields:
+            condition |= Q(**{f'{field}__icontains': term})
+        return queryset.filter(condition)
+
+    def rank(self, queryset, term):
+        """为查询集添加相关度注解 search_rank"""
+        if connections[queryset.db].vendor == 'postgresql':
+            return self._rank_postgresql(queryset, term)
+        return self._rank_python(queryset, term)
+
+    def _rank_postgresql(self, queryset, term):
+        # 延迟导入：django.contrib.postgres 依赖 psycopg
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db.models.functions import Greatest
+
+        similarities = [TrigramSimilarity(field, term) for field in self.fields]
+        rank = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        return queryset.annotate(**{self.rank_annotation: rank})
+
+    def _rank_python(self, queryset, term):
+        """纯 Python 计算相似度，适用于 SQLite 测试环境的小数据量"""
+        rows = list(queryset.values_list('pk', *self.fields)[:self.PYTHON_RANK_LIMIT + 1])
+        if not rows or len(rows) > self.PYTHON_RANK_LIMIT:
+            return queryset.annotate(**{self.rank_annotation: Value(0.0, output_field=FloatField())})
+
+        ranks = {row[0]: max(trigram_similarity(term, value) for value in row[1:]) for row in rows}
+
+        rank = Case(
+            *[When(pk=pk, then=Value(score)) for pk, score in ranks.items()],
+            default=Value(0.0),
+            output_field=FloatField(),
+        )
+        return queryset.annotate(**{self.rank_annotation: rank})
+
+    def search(self, queryset, term, ordered=True):
+        """
+        搜索员工
+
+        Args:
+            queryset: 基础查询集
+            term: 搜索关键字
+            ordered: 是否按相关度降序排序（相同相关度按创建时间倒序）
+
+        Returns:
+            QuerySet: 筛选（并排序）后的查询集
+        """
+        queryset = self.filter(queryset, term)
+        if not ordered:
+            return queryset
+        return self.rank(queryset, term).order_by(f'-{self.rank_annotation}', '-created_at')
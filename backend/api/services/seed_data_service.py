@@ -0,0 +1,328 @@
+"""
+确定性测试数据生成服务
+
+设计思路：
+1. 所有随机值来自以 seed 初始化的 random.Random，主键 UUID 也由它生成；
+   同一 seed、同一规模、同一截止日期生成的数据完全相同，基准测试结果可以横向比较
+2. 数据按列构建（每列一个列表，每批约 batch_size 行），不实例化模型对象：
+   百万级考勤数据中模型实例化和逐字段取值是主要开销
+3. BulkWriter（见 bulk_load_service）按列写入：PostgreSQL 使用 COPY FROM STDIN，其他数据库使用单条 INSERT 的 executemany；
+   列值按字段类型转换为数据库驱动格式，日期、时间、金额等重复值的转换结果缓存复用
+4. 不做逐行 exists() 检查：工号按序号生成不会冲突，(员工, 期间) / (员工, 日期) 由循环本身保证唯一；
+   应发 / 实发工资、员工的部门名称、created_at 等由 save() / auto_now 维护的字段在构建时直接计算
+5. 直接写表不触发模型信号，写入后手动使缓存失效、重建考勤汇总表并将仪表盘快照标记为过期
+6. DATASETS 预设 10k / 100k / 1m 三档规模（按部门 + 员工 + 薪资 + 考勤的总行数估算）
+"""
+
+import logging
+import random
+import time
+import uuid
+from datetime import date, time as dt_time, timedelta
+from decimal import Decimal
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from ..cache import bump_model_version
+from ..models import (
+    Department, Employee, SalaryRecord, AttendanceRecord, PayrollJob,
+    AttendanceDailyRollup, AttendanceDepartmentDailyRollup,
+)
+from .attendance_rollup_service import AttendanceRollupService
+from .bulk_load_service import BulkWriter, _memoized
+from .dashboard_service import DashboardStatsService
+
+logger = logging.getLogger(__name__)
+
+# 预设数据规模：员工数、薪资月数、考勤天数（自然日，只为在职员工的工作日生成考勤）
+DATASETS = {
+    '10k': {'employees': 500, 'months': 6, 'days': 21},
+    '100k': {'employees': 4000, 'months': 6, 'days': 28},
+    '1m': {'employees': 20000, 'months': 12, 'days': 56},
+}
+
+# 固定的数据截止日期，使同一 seed 在不同日期生成的数据一致
+DEFAULT_END_DATE = date(2025, 6, 30)
+
+DEPARTMENTS = [
+    ('技术部', 'TECH'), ('市场部', 'MKT'), ('人力资源部', 'HR'),
+    ('财务部', 'FIN'), ('运营部', 'OPS'), ('客服部', 'CS'),
+]
+SURNAMES = ['王', '李', '张', '刘', '陈', '杨', '赵', '黄', '周', '吴', '徐', '孙', '胡', '朱', '高', '林']
+GIVEN_NAMES = ['伟', '芳', '娜', '秀英', '敏', '静', '丽', '强', '磊', '军', '洋', '勇', '艳', '杰', '涛', '明']
+LOCATIONS = ['北京总部', '上海分部', '广州研发中心', '深圳办公室', '远程办公']
+PHONE_PREFIXES = ['130', '135', '138', '139', '150', '158', '186', '188']
+
+# 职位及基础工资
+POSITION_SALARIES = {
+    '专员': 8000, '助理': 6000, '工程师': 12000, '高级工程师': 15000, '分析师': 10000,
+    '主管': 15000, '经理': 20000, '项目经理': 18000, '总监': 28000,
+}
+# 员工状态权重：在职 / 休假 / 离职
+EMPLOYEE_STATUS_WEIGHTS = (('active', 85), ('on_leave', 5), ('terminated', 10))
+# 考勤状态权重（模拟真实情况）
+ATTENDANCE_STATUS_WEIGHTS = (
+    ('present', 70), ('late', 15), ('early_leave', 5), ('sick_leave', 3),
+    ('personal_leave', 2), ('annual_leave', 3), ('absent', 2),
+)
+LEAVE_NOTES = {
+    'sick_leave': ['感冒发烧', '身体不适', '医院检查'],
+    'personal_leave': ['家庭事务', '个人事务', '办理证件'],
+    'annual_leave': ['年假休息', '旅游度假', '回家探亲'],
+    'absent': ['无故缺勤'],
+}
+LUNCH_BREAK_MINUTES = 60
+
+# 一天中每分钟对应的时间对象（考勤签到 / 签退）
+MINUTE_TIMES = [dt_time(minute // 60, minute % 60) for minute in range(24 * 60)]
+ZERO_HOURS = Decimal('0.00')
+# 薪资规则明细（演示数据不计算规则）
+ZERO_AMOUNT = Decimal('0.00')
+RULE_AMOUNT_FIELDS = ('department_bonus', 'attendance_deduction', 'social_insurance', 'income_tax')
+
+
+def expand_weights(weights):
+    """将 (取值, 权重) 展开为可直接 random.choice 的列表"""
+    return [value for value, weight in weights for _ in range(weight)]
+
+
+def salary_periods(end_date, months):
+    """截止日期所在月份及之前共 months 个月的期间（YYYY-MM，升序）"""
+    periods = []
+    year, month = end_date.year, end_date.month
+    for _ in range(months):
+        periods.append(f'{year:04d}-{month:02d}')
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return periods[::-1]
+
+
+def work_days(end_date, days):
+    """截止日期及之前 days 个自然日中的工作日（升序）"""
+    dates = (end_date - timedelta(days=offset) for offset in range(days))
+    return sorted(day for day in dates if day.weekday() < 5)
+
+
+def new_columns(model):
+    """模型全部数据库字段的空列"""
+    return {field.attname: [] for field in model._meta.concrete_fields}
+
+
+class SeedDataGenerator:
+    """按 seed 确定性生成部门、员工、薪资和考勤数据"""
+
+    DEFAULT_BATCH_SIZE = 20000
+
+    def __init__(self, seed=42, end_date=DEFAULT_END_DATE, batch_size=None, using=DEFAULT_DB_ALIAS):
+        """
+        Args:
+            seed: 随机种子
+            end_date: 数据截止日期（薪资期间和考勤日期以此倒推）
+            batch_size: 每批写入的行数
+            using: 写入的数据库别名
+        """
+        self.seed = seed
+        self.end_date = end_date
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self.using = using
+        self.random = random.Random(seed)
+        self.now = timezone.now()
+        self.employee_statuses = expand_weights(EMPLOYEE_STATUS_WEIGHTS)
+        self.attendance_statuses = expand_weights(ATTENDANCE_STATUS_WEIGHTS)
+        # 工时（分钟）-> 小时数，取值只有几百种
+        self.hours = _memoized(lambda minutes: (Decimal(max(0, minutes)) / 60).quantize(Decimal('0.01')))
+
+    def uuid(self):
+        """由随机数生成器产生的 UUID4（保证主键也可复现）"""
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def phone(self):
+        return self.random.choice(PHONE_PREFIXES) + f'{self.random.randrange(10 ** 8):08d}'
+
+    def name(self):
+        return self.random.choice(SURNAMES) + self.random.choice(GIVEN_NAMES)
+
+    def timestamps(self, columns, count):
+        columns['created_at'] = columns['updated_at'] = [self.now] * count
+        return columns
+
+    # ==================== 按列构建 ====================
+
+    def department_columns(self):
+        columns = new_columns(Department)
+        for name, code in DEPARTMENTS:
+            columns['id'].append(self.uuid())
+            columns['name'].append(name)
+            columns['code'].append(code)
+            columns['description'].append(f'{name}的职责描述。')
+            columns['manager'].append(self.name())
+            columns['manager_title'].append('经理')
+            columns['location'].append(self.random.choice(LOCATIONS))
+            columns['phone'].append(self.phone())
+            columns['email'].append(f'{code.lower()}@example.com')
+            columns['budget'].append(Decimal(self.random.randint(500, 5000) * 1000))
+            columns['status'].append('active')
+        return self.timestamps(columns, len(DEPARTMENTS))
+
+    def employee_columns(self, count, departments):
+        columns = new_columns(Employee)
+        positions = list(POSITION_SALARIES)
+        rng = self.random
+        for index in range(count):
+            department = index % len(departments['id'])
+            position = rng.choice(positions)
+            columns['id'].append(self.uuid())
+            columns['employee_id'].append(f'EMP{index + 1:07d}')
+            columns['name'].append(self.name())
+            columns['gender'].append(rng.choice('MF'))
+            columns['department'].append(departments['name'][department])
+            columns['department_ref_id'].append(departments['id'][department])
+            columns['position'].append(position)
+            columns['phone'].append(self.phone())
+            columns['hire_date'].append(self.end_date - timedelta(days=rng.randint(30, 15 * 365)))
+            columns['birth_date'].append(self.end_date - timedelta(days=rng.randint(22 * 365, 60 * 365)))
+            columns['base_salary'].append(Decimal(int(POSITION_SALARIES[position] * rng.uniform(0.8, 1.2))))
+            columns['status'].append(rng.choice(self.employee_statuses))
+            columns['location'].append(rng.choice(LOCATIONS))
+            columns['notes'].append('')
+        return self.timestamps(columns, count)
+
+    def salary_batches(self, employees, periods):
+        """按批生成薪资记录列"""
+        rng = self.random
+        columns = new_columns(SalaryRecord)
+        for employee_pk, position, base_salary in zip(
+            employees['id'], employees['position'], employees['base_salary']
+        ):
+            max_bonus = int(base_salary * Decimal('0.3'))
+            min_deductions, max_deductions = int(base_salary * Decimal('0.05')), int(base_salary * Decimal('0.2'))
+            for period in periods:
+                bonus = Decimal(rng.randint(0, max_bonus))
+                deductions = Decimal(rng.randint(min_deductions, max_deductions))
+                gross_salary = base_salary + bonus
+                columns['id'].append(self.uuid())
+                columns['employee_id'].append(employee_pk)
+                columns['salary_period'].append(period)
+                columns['position_snapshot'].append(position)
+                columns['base_salary_snapshot'].append(base_salary)
+                columns['bonus'].append(bonus)
+                columns['deductions'].append(deductions)
+                for name in RULE_AMOUNT_FIELDS:
+                    columns[name].append(ZERO_AMOUNT)
+                columns['gross_salary'].append(gross_salary)
+                columns['net_salary'].append(gross_salary - deductions)
+            if len(columns['id']) >= self.batch_size:
+                yield self.timestamps(columns, len(columns['id']))
+                columns = new_columns(SalaryRecord)
+        if columns['id']:
+            yield self.timestamps(columns, len(columns['id']))
+
+    def attendance_batches(self, employees, dates):
+        """按批生成考勤记录列（只为在职员工生成）"""
+        rng = self.random
+        randint, choice = rng.randint, rng.choice
+        statuses = self.attendance_statuses
+        hours = self.hours
+
+        columns = new_columns(AttendanceRecord)
+        for employee_pk, employee_status in zip(employees['id'], employees['status']):
+            if employee_status != 'active':
+                continue
+            for day in dates:
+                status = choice(statuses)
+                if status in LEAVE_NOTES:
+                    check_in = check_out = None
+                    work_hours = ZERO_HOURS
+                    notes = choice(LEAVE_NOTES[status])
+                else:
+                    check_in_minute = randint(8 * 60 + 30, 9 * 60 + 30)
+                    check_out_minute = randint(17 * 60 + 30, 18 * 60 + 30)
+                    notes = ''
+                    if status == 'late':
+                        check_in_minute = randint(9 * 60 + 30, 10 * 60 + 30)
+                        notes = f'迟到 {check_in_minute - 9 * 60} 分钟'
+                    elif status == 'early_leave':
+                        check_out_minute = randint(16 * 60, 17 * 60)
+                        notes = f'早退 {18 * 60 - check_out_minute} 分钟'
+                    check_in, check_out = MINUTE_TIMES[check_in_minute], MINUTE_TIMES[check_out_minute]
+                    work_hours = hours(check_out_minute - check_in_minute - LUNCH_BREAK_MINUTES)
+
+                columns['id'].append(self.uuid())
+                columns['employee_id'].append(employee_pk)
+                columns['date'].append(day)
+                columns['check_in_time'].append(check_in)
+                columns['check_out_time'].append(check_out)
+                columns['status'].append(status)
+                columns['work_hours'].append(work_hours)
+                columns['overtime_hours'].append(ZERO_HOURS)
+                columns['notes'].append(notes)
+            if len(columns['id']) >= self.batch_size:
+                yield self.timestamps(columns, len(columns['id']))
+                columns = new_columns(AttendanceRecord)
+        if columns['id']:
+            yield self.timestamps(columns, len(columns['id']))
+
+    # ==================== 写入 ====================
+
+    def generate(self, employees, months, days, progress=None):
+        """
+        生成并写入一套完整数据
+
+        Args:
+            employees: 员工数
+            months: 每名员工的薪资月数
+            days: 考勤覆盖的自然日数（只为在职员工的工作日生成考勤）
+            progress: 进度回调，参数为 (数据类型, 写入行数, 耗时秒数)
+
+        Returns:
+            dict: 各表写入的行数和总耗时
+        """
+        started = time.perf_counter()
+        stats = {}
+
+        def step(label, model, batches):
+            step_started = time.perf_counter()
+            writer = BulkWriter(model, using=self.using)
+            with transaction.atomic(using=self.using):
+                stats[label] = sum(writer.write(columns) for columns in batches)
+            if progress:
+                progress(label, stats[label], time.perf_counter() - step_started)
+
+        departments = self.department_columns()
+        step('departments', Department, [departments])
+        employee_columns = self.employee_columns(employees, departments)
+        step('employees', Employee, [employee_columns])
+        step('salary_records', SalaryRecord,
+             self.salary_batches(employee_columns, salary_periods(self.end_date, months)))
+        step('attendance_records', AttendanceRecord,
+             self.attendance_batches(employee_columns, work_days(self.end_date, days)))
+
+        self.after_load()
+        stats['elapsed_seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(f"测试数据生成完成（seed={self.seed}）：{stats}")
+        return stats
+
+    def clear(self):
+        """
+        清空生成器写入的表（PostgreSQL 为一条 TRUNCATE，其他数据库为逐表 DELETE）
+
+        不经过 ORM 删除，不会逐行加载对象和触发信号；用户与 Token 不受影响。
+        """
+        connection = connections[self.using]
+        models = [
+            AttendanceDailyRollup, AttendanceDepartmentDailyRollup, AttendanceRecord,
+            SalaryRecord, PayrollJob, Employee, Department,
+        ]
+        tables = [model._meta.db_table for model in models]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables))
+        self.after_load(rebuild_rollups=False)
+
+    @staticmethod
+    def after_load(rebuild_rollups=True):
+        """直接写表不触发模型信号：使缓存失效、重建考勤汇总、标记仪表盘快照过期"""
+        for model in (Department, Employee, SalaryRecord, AttendanceRecord):
+            bump_model_version(model)
+        if rebuild_rollups:
+            AttendanceRollupService().rebuild()
+        DashboardStatsService.mark_stale()
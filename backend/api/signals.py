@@ -0,0 +1,156 @@
+"""
+模型信号处理
+
+设计思路：
+- 集中注册模型写入后的缓存失效逻辑
+- 在 ApiConfig.ready() 中导入，保证信号在应用启动时完成注册
+"""
+
+from django.contrib.auth.models import User, Group
+from rest_framework.authtoken.models import Token
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Department, Employee, SalaryRecord, AttendanceRecord
+from .cache import bump_model_version
+from .roles import invalidate_user_roles, invalidate_all_roles
+from .authentication import invalidate_token, invalidate_user_tokens
+from .services.dashboard_service import DashboardStatsService
+from .services.attendance_rollup_service import AttendanceRollupService, rollup_fact
+from .services.department_sync_service import DepartmentSyncService
+
+
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Employee)
+@receiver([post_save, post_delete], sender=SalaryRecord)
+@receiver([post_save, post_delete], sender=AttendanceRecord)
+def bump_cache_version(sender, **kwargs):
+    """模型写入后递增缓存版本号，使列表总数和接口响应缓存失效"""
+    bump_model_version(sender)
+
+
+@receiver([post_save, post_delete], sender=Employee)
+@receiver([post_save, post_delete], sender=AttendanceRecord)
+def mark_dashboard_snapshot_stale(sender, **kwargs):
+    """员工或考勤数据变化后将仪表盘快照标记为过期"""
+    DashboardStatsService.mark_stale()
+
+
+def _attendance_department(record):
+    return Employee.objects.filter(pk=record.employee_id).values_list('department', flat=True).first()
+
+
+@receiver(pre_save, sender=AttendanceRecord)
+def remember_attendance_rollup_fact(sender, instance, raw=False, **kwargs):
+    """记录考勤记录保存前的日期、状态和工时，用于计算汇总差值（含修改日期的情况）"""
+    instance._rollup_previous = None
+    if instance._state.adding:
+        return
+    previous = (
+        AttendanceRecord.objects.filter(pk=instance.pk)
+        .values_list('date', 'employee__department', 'status', 'work_hours', 'overtime_hours')
+        .first()
+    )
+    if previous is not None:
+        instance._rollup_previous = rollup_fact(*previous)
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def update_attendance_rollups_on_save(sender, instance, **kwargs):
+    """单条考勤记录写入后按差值更新汇总（旧日期减去、新日期加上）"""
+    after = AttendanceRollupService.record_fact(instance, _attendance_department(instance))
+    AttendanceRollupService().apply_changes([(getattr(instance, '_rollup_previous', None), after)])
+    instance._rollup_previous = after
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def update_attendance_rollups_on_delete(sender, instance, **kwargs):
+    """单条考勤记录删除后从汇总中减去"""
+    department = _attendance_department(instance)
+    if department is None:
+        # 员工已不存在，无法确定部门
+        AttendanceRollupService().refresh_dates([instance.date])
+        return
+    AttendanceRollupService().apply_changes([(AttendanceRollupService.record_fact(instance, department), None)])
+
+
+@receiver(pre_save, sender=Employee)
+def remember_employee_department(sender, instance, raw=False, **kwargs):
+    """记录员工保存前的部门，用于判断是否调整部门"""
+    if raw or instance._state.adding:
+        instance._previous_department = None
+        return
+    instance._previous_department = (
+        Employee.objects.filter(pk=instance.pk).values_list('department', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Employee)
+def move_attendance_rollups_on_department_change(sender, instance, created, raw=False, **kwargs):
+    """员工调整部门后将其考勤从原部门的汇总行移到新部门"""
+    previous_department = getattr(instance, '_previous_department', None)
+    if raw or created or previous_department is None or previous_department == instance.department:
+        return
+    AttendanceRollupService().move_employee(instance.pk, previous_department, instance.department)
+    instance._previous_department = instance.department
+
+
+@receiver(pre_save, sender=Department)
+def remember_department_name(sender, instance, raw=False, **kwargs):
+    """记录部门保存前的名称，用于判断是否改名"""
+    if raw or instance._state.adding:
+        instance._previous_name = None
+        return
+    instance._previous_name = (
+        Department.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Department)
+def propagate_department_rename(sender, instance, created, raw=False, **kwargs):
+    """部门改名后用一条 UPDATE 同步员工的部门名称"""
+    previous_name = getattr(instance, '_previous_name', None)
+    if raw or created or previous_name is None or previous_name == instance.name:
+        return
+    DepartmentSyncService().propagate_rename(instance, previous_name)
+    instance._previous_name = instance.name
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    用户组成员变化后使角色缓存失效
+
+    user.groups.add(...) 时 instance 为用户；group.user_set.add(...) 时 instance 为组，
+    pk_set 为用户 ID 集合（clear 操作的 pk_set 为空，直接清空全部缓存）。
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        invalidate_user_roles(instance.pk)
+    elif pk_set:
+        invalidate_user_roles(*pk_set)
+    else:
+        invalidate_all_roles()
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_roles_on_group_change(sender, **kwargs):
+    """组改名或删除会影响其全部成员，清空角色缓存"""
+    invalidate_all_roles()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_roles_on_user_delete(sender, instance, **kwargs):
+    invalidate_user_roles(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_tokens_on_user_change(sender, instance, **kwargs):
+    """用户信息变化（禁用、修改密码、权限调整）后清除缓存中的用户快照"""
+    invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token_on_delete(sender, instance, **kwargs):
+    invalidate_token(instance.key)
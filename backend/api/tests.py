@@ -1,3 +1,2171 @@
-from django.test import TestCase
+import importlib.util
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .models import Department, Employee, SalaryRecord, AttendanceRecord
+from .authentication import token_cache
+from .db_router import REPLICA_ALIAS
+from .roles import invalidate_all_roles
+
+
+class AdminAPITestCase(TestCase):
+    """以管理员身份请求接口的测试基类：清空缓存，self.client 已认证为 self.admin"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'admin123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+
+class DepartmentListQueryCountTests(AdminAPITestCase):
+    """部门列表查询次数回归测试：员工数量在查询中聚合，不随分页大小增长"""
+
+    def setUp(self):
+        super().setUp()
+
+        for index in range(30):
+            department = Department.objects.create(name=f'部门{index:02d}', code=f'D{index:02d}')
+            for employee_index in range(2):
+                Employee.objects.create(
+                    employee_id=f'E{index:02d}{employee_index}',
+                    name=f'员工{index}-{employee_index}',
+                    gender='M',
+                    department_ref=department,
+                    position='专员',
+                    hire_date=date(2020, 1, 1),
+                    base_salary=Decimal('8000.00'),
+                    status='active' if employee_index == 0 else 'on_leave',
+                )
+
+    def count_list_queries(self, page_size):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/departments/', {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries), response.json()['data']['results']
+
+    def test_query_count_is_constant_across_page_sizes(self):
+        small_queries, small_results = self.count_list_queries(5)
+        large_queries, large_results = self.count_list_queries(30)
+
+        self.assertEqual(len(small_results), 5)
+        self.assertEqual(len(large_results), 30)
+        self.assertEqual(small_queries, large_queries)
+
+    def test_employee_counts_are_annotated(self):
+        _, results = self.count_list_queries(30)
+
+        for department in results:
+            self.assertEqual(department['employee_count'], 2)
+            self.assertEqual(department['active_employee_count'], 1)
+
+    def test_detail_uses_annotated_counts(self):
+        department = Department.objects.get(code='D00')
+        response = self.client.get(f'/api/departments/{department.id}/')
+
+        self.assertEqual(response.json()['data']['employee_count'], 2)
+        self.assertEqual(response.json()['data']['active_employee_count'], 1)
+
+
+class RoleResolutionTests(TestCase):
+    """角色解析：请求内和进程内缓存用户组，组成员变化时失效"""
+
+    def setUp(self):
+        cache.clear()
+        invalidate_all_roles()
+        self.user = User.objects.create_user('staff', 'staff@example.com', 'staff123')
+        self.admin_group = Group.objects.create(name='Admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        group_queries = [q for q in context.captured_queries if 'auth_group' in q['sql']]
+        return response.status_code, len(group_queries)
+
+    def test_groups_are_cached_across_requests(self):
+        status_code, first = self.count_queries('/api/cache/stats/')
+        self.assertEqual(status_code, 403)
+        self.assertEqual(first, 1)
+
+        status_code, second = self.count_queries('/api/cache/stats/')
+        self.assertEqual(status_code, 403)
+        self.assertEqual(second, 0)
+
+    def test_membership_change_invalidates_cache(self):
+        self.assertEqual(self.count_queries('/api/cache/stats/')[0], 403)
+
+        self.user.groups.add(self.admin_group)
+        self.assertEqual(self.count_queries('/api/cache/stats/')[0], 200)
+
+        self.admin_group.user_set.remove(self.user)
+        self.assertEqual(self.count_queries('/api/cache/stats/')[0], 403)
+
+    def test_view_role_check_reuses_resolved_groups(self):
+        self.user.groups.add(self.admin_group)
+        department = Department.objects.create(name='技术部', code='TECH')
+        employee = Employee.objects.create(
+            employee_id='E001', name='张三', gender='M', department_ref=department,
+            position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+        )
+
+        status_code, group_queries = self.count_queries(f'/api/employees/{employee.employee_id}/salary/')
+        self.assertEqual(status_code, 200)
+        self.assertEqual(group_queries, 1)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Token 认证缓存：命中时不查询数据库，登出和修改密码后立即失效，支持过期和滑动续期"""
+
+    def setUp(self):
+        token_cache.clear()
+        invalidate_all_roles()
+        User.objects.create_user('staff', 'staff@example.com', 'staff123')
+        self.client = APIClient()
+
+    def login(self, password='staff123'):
+        self.client.credentials()
+        response = self.client.post('/api/auth/login/', {'username': 'staff', 'password': password}, format='json')
+        self.assertEqual(response.status_code, 200)
+        token = response.json()['data']['token']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token}')
+        return token
+
+    def count_token_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/auth/check/')
+        self.assertEqual(response.status_code, 200)
+        return len([q for q in context.captured_queries if 'authtoken_token' in q['sql']])
+
+    def test_cached_token_skips_auth_queries(self):
+        self.login()
+        self.assertEqual(self.count_token_queries(), 0)
+
+    def test_cache_miss_loads_token_once(self):
+        self.login()
+        token_cache.clear()
+        self.assertEqual(self.count_token_queries(), 1)
+        self.assertEqual(self.count_token_queries(), 0)
+
+    def test_logout_invalidates_cached_token(self):
+        self.login()
+        self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/check/').status_code, 401)
+
+    def test_change_password_invalidates_cached_token(self):
+        self.login()
+        response = self.client.post(
+            '/api/auth/change-password/',
+            {'old_password': 'staff123', 'new_password': 'changed123'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/auth/check/').status_code, 401)
+
+    def test_expired_token_is_rejected_and_rotated_on_login(self):
+        key = self.login()
+        Token.objects.filter(key=key).update(created=timezone.now() - timedelta(days=30))
+        token_cache.clear()
+
+        self.assertEqual(self.client.get('/api/auth/check/').status_code, 401)
+        self.assertFalse(Token.objects.filter(key=key).exists())
+        self.assertNotEqual(self.login(), key)
+
+    def test_sliding_refresh_extends_token(self):
+        key = self.login()
+        stale = timezone.now() - timedelta(hours=2)
+        Token.objects.filter(key=key).update(created=stale)
+        token_cache.clear()
+
+        self.assertEqual(self.client.get('/api/auth/check/').status_code, 200)
+        self.assertGreater(Token.objects.get(key=key).created, stale)
+
+
+@skipUnless(REPLICA_ALIAS in settings.DATABASES, '需要配置 replica 数据库（core.settings_test）')
+class ReadReplicaRoutingTests(AdminAPITestCase):
+    """报表接口读取只读副本；用户写入后固定读取主库；未配置副本时回退到主库"""
+
+    # 未配置副本时测试被跳过，但测试运行器仍会校验 databases 中的别名
+    databases = {'default', REPLICA_ALIAS} if REPLICA_ALIAS in settings.DATABASES else {'default'}
+
+    def setUp(self):
+        super().setUp()
+
+        # 副本与主库写入不同的数据，通过接口结果区分读取来源
+        for alias, department, count in (('default', '主库部门', 1), ('replica', '副本部门', 2)):
+            for index in range(count):
+                Employee.objects.using(alias).create(
+                    employee_id=f'{alias}-{index}', name=f'员工{index}', gender='M',
+                    department=department, position='专员', hire_date=date(2020, 1, 1),
+                    base_salary=Decimal('8000.00'),
+                )
+
+    def distribution(self):
+        # 每次使用不同的查询参数，绕过接口响应缓存
+        self.request_count = getattr(self, 'request_count', 0) + 1
+        response = self.client.get('/api/dashboard/department-distribution/', {'_': self.request_count})
+        self.assertEqual(response.status_code, 200)
+        return {item['name'] for item in response.json()['data']}
+
+    def test_reporting_view_reads_replica(self):
+        self.assertEqual(self.distribution(), {'副本部门'})
+
+    def test_user_is_pinned_to_primary_after_write(self):
+        response = self.client.post('/api/departments/', {'name': '新部门', 'code': 'NEW'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.distribution(), {'主库部门'})
+
+        cache.delete(f'db_primary_pin:{self.admin.pk}')
+        self.assertEqual(self.distribution(), {'副本部门'})
+
+    def test_streaming_export_reads_replica(self):
+        employee = Employee.objects.using('replica').get(employee_id='replica-0')
+        SalaryRecord.objects.using('replica').create(
+            employee=employee, salary_period='2025-06', position_snapshot='专员',
+            base_salary_snapshot=Decimal('8000.00'), gross_salary=Decimal('8000.00'),
+            net_salary=Decimal('8000.00'),
+        )
+        response = self.client.get('/api/salaries/export/')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('replica-0', content)
+
+    def test_falls_back_to_primary_without_replica(self):
+        with patch('api.db_router.replica_configured', return_value=False):
+            self.assertEqual(self.distribution(), {'主库部门'})
+
+    def test_lagging_replica_response_is_not_cached_for_primary_readers(self):
+        import time
+        from .db_router import pin_to_primary
+
+        # 写入主库后版本号已递增，副本尚未复制（副本中没有新员工）
+        pin_to_primary(self.admin)
+        Employee.objects.create(
+            employee_id='E-new', name='新员工', gender='M', department='新部门', position='专员',
+            hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+        )
+        reader = User.objects.create_user('reader', 'reader@example.com', 'reader123')
+        reader_client = APIClient()
+        reader_client.force_authenticate(reader)
+        url = '/api/dashboard/department-distribution/'
+
+        response = reader_client.get(url)
+        self.assertEqual({item['name'] for item in response.json()['data']}, {'副本部门'})
+
+        # 写入者读取主库，不会命中副本响应的缓存
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual({item['name'] for item in response.json()['data']}, {'主库部门', '新部门'})
+
+        # 副本响应只缓存 REPLICA_STICKY_SECONDS 秒，而不是接口的 300 秒
+        self.assertEqual(reader_client.get(url)['X-Cache'], 'HIT')
+        later = time.time() + settings.REPLICA_STICKY_SECONDS + 1
+        with patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(reader_client.get(url)['X-Cache'], 'MISS')
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+
+class FastReadPathTests(AdminAPITestCase):
+    """列表快速读取路径：values() 投影和 ORJSONRenderer 的输出与序列化器、JSONRenderer 完全一致"""
+
+    def setUp(self):
+        super().setUp()
+
+        department = Department.objects.create(name='技术部', code='TECH')
+        for index in range(5):
+            employee = Employee.objects.create(
+                employee_id=f'E{index:03d}',
+                name=f'员工{index}',
+                gender='M',
+                department='市场部' if index == 0 else '',
+                # 第一个员工没有关联部门，department_name 在序列化器输出中被省略
+                department_ref=None if index == 0 else department,
+                position='工程师',
+                hire_date=date(2020, 1, 1),
+                base_salary=Decimal('8000.50'),
+                birth_date=None if index % 2 else date(1990, 1, 1),
+            )
+            SalaryRecord.objects.create(
+                employee=employee,
+                salary_period='2025-06',
+                position_snapshot='工程师',
+                base_salary_snapshot=Decimal('8000.50'),
+                bonus=Decimal(index * 100),
+                deductions=Decimal('0.10'),
+            )
+
+    def assert_same_output(self, serializer_class, queryset):
+        from rest_framework.renderers import JSONRenderer
+        from .projections import ValuesProjection
+        from .renderers import ORJSONRenderer
+
+        projection = ValuesProjection(serializer_class)
+        expected = serializer_class(queryset, many=True).data
+        actual = projection.to_representation(projection.values(queryset))
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(ORJSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_salary_projection_matches_serializer(self):
+        from .serializers import SalaryRecordSerializer
+
+        self.assert_same_output(
+            SalaryRecordSerializer, SalaryRecord.objects.select_related('employee').order_by('-created_at')
+        )
+
+    def test_employee_projection_matches_serializer(self):
+        from .serializers import EmployeeSerializer
+
+        self.assert_same_output(EmployeeSerializer, Employee.objects.order_by('employee_id'))
+
+    def test_unsupported_fields_are_rejected(self):
+        from .projections import ValuesProjection
+        from .serializers import DepartmentSerializer
+
+        # employee_count 是查询注解（模型上为属性），无法从数据库列推导
+        with self.assertRaises(ValueError):
+            ValuesProjection(DepartmentSerializer)
+
+    def test_renderer_matches_json_renderer_for_special_values(self):
+        from rest_framework.renderers import JSONRenderer
+        from .renderers import ORJSONRenderer
+
+        data = {
+            'decimal': Decimal('1.50'),
+            'datetime': timezone.now(),
+            'date': date(2025, 6, 1),
+            'text': '中文 换行',
+            1: [None, True, 1.5],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_list_endpoints_with_cursor_pagination(self):
+        response = self.client.get('/api/salaries/', {'page_size': 2, 'cursor': ''})
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()['data']
+        self.assertEqual(len(first_page['results']), 2)
+        self.assertIsNotNone(first_page['next'])
+
+        response = self.client.get(first_page['next'])
+        second_page = response.json()['data']['results']
+        self.assertEqual(len(second_page), 2)
+        self.assertFalse({row['id'] for row in second_page} & {row['id'] for row in first_page['results']})
+
+        response = self.client.get('/api/employees/', {'include_all_status': 'true'})
+        self.assertEqual(response.status_code, 200)
+        results = {row['employee_id']: row for row in response.json()['results']}
+        self.assertEqual(len(results), 5)
+        self.assertNotIn('department_name', results['E000'])
+        self.assertEqual(results['E001']['department_name'], '技术部')
+        self.assertEqual(results['E001']['base_salary'], '8000.50')
+
+
+class SparseFieldsTests(AdminAPITestCase):
+    """列表接口 ?fields= / ?exclude=：同时裁剪输出字段和查询的列"""
+
+    def setUp(self):
+        super().setUp()
+
+        department = Department.objects.create(name='技术部', code='TECH')
+        for index in range(3):
+            employee = Employee.objects.create(
+                employee_id=f'E{index:03d}',
+                name=f'员工{index}',
+                gender='F',
+                department_ref=department,
+                position='工程师',
+                hire_date=date(2020, 1, 1),
+                base_salary=Decimal('9000.00'),
+                notes='备注' * 100,
+            )
+            SalaryRecord.objects.create(
+                employee=employee,
+                salary_period='2025-06',
+                position_snapshot='工程师',
+                base_salary_snapshot=Decimal('9000.00'),
+            )
+
+    def get(self, url, params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params)
+        sql = ' '.join(query['sql'] for query in context.captured_queries)
+        return response, sql
+
+    def test_employee_fields(self):
+        response, sql = self.get('/api/employees/', {'fields': 'name,employee_id,department_name'})
+        self.assertEqual(response.status_code, 200)
+        # 输出保持序列化器中的字段顺序
+        self.assertEqual(list(response.json()['results'][0]), ['employee_id', 'name', 'department_name'])
+        self.assertNotIn('"notes"', sql)
+
+    def test_employee_exclude(self):
+        response, sql = self.get('/api/employees/', {'exclude': 'notes,created_at'})
+        row = response.json()['results'][0]
+        self.assertNotIn('notes', row)
+        self.assertNotIn('created_at', row)
+        self.assertIn('updated_at', row)
+        self.assertNotIn('"notes"', sql)
+
+    def test_salary_fields_skip_employee_join(self):
+        response, sql = self.get('/api/salaries/', {'fields': 'id,salary_period,net_salary'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.json()['data']['results'][0]), ['id', 'salary_period', 'net_salary'])
+        self.assertNotIn('JOIN', sql)
+
+        response, sql = self.get('/api/salaries/', {'fields': 'employee_name,net_salary', 'cursor': ''})
+        self.assertEqual(list(response.json()['data']['results'][0]), ['employee_name', 'net_salary'])
+        self.assertIn('JOIN', sql)
+
+    def test_department_fields_skip_employee_counts(self):
+        response, sql = self.get('/api/departments/', {'fields': 'name,code'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['results'], [{'name': '技术部', 'code': 'TECH'}])
+        self.assertNotIn('COUNT(DISTINCT', sql)
+        self.assertNotIn('"description"', sql)
+
+        response, _ = self.get('/api/departments/', {'fields': 'name,employee_count'})
+        self.assertEqual(response.json()['data']['results'], [{'name': '技术部', 'employee_count': 3}])
+
+    def test_unknown_field_is_rejected(self):
+        response, _ = self.get('/api/employees/', {'fields': 'name,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.json())
+
+
+class DepartmentSyncTests(TestCase):
+    """部门改名同步、漂移检测和分批回填"""
+
+    def setUp(self):
+        cache.clear()
+        self.department = Department.objects.create(name='技术部', code='TECH')
+        self.other = Department.objects.create(name='市场部', code='MKT')
+        for index in range(6):
+            Employee.objects.create(
+                employee_id=f'E{index:03d}',
+                name=f'员工{index}',
+                gender='M',
+                department_ref=self.department if index < 4 else self.other,
+                position='工程师',
+                hire_date=date(2020, 1, 1),
+                base_salary=Decimal('8000.00'),
+            )
+
+    def test_rename_propagates_with_single_update(self):
+        self.department.name = '研发部'
+        with CaptureQueriesContext(connection) as context:
+            self.department.save()
+
+        employee_updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "api_employee"')
+        ]
+        self.assertEqual(len(employee_updates), 1)
+        self.assertEqual(Employee.objects.filter(department='研发部').count(), 4)
+        self.assertEqual(Employee.objects.filter(department='市场部').count(), 2)
+
+    def test_report_and_backfill(self):
+        from .services.department_sync_service import DepartmentSyncService
+
+        # 模拟历史漂移：绕过 save() 直接改库
+        Employee.objects.filter(employee_id__in=['E000', 'E001']).update(department='旧名称')
+        Employee.objects.filter(employee_id='E004').update(department_ref=None)
+        Employee.objects.filter(employee_id='E005').update(department_ref=None, department='不存在的部门')
+
+        service = DepartmentSyncService()
+        report = service.report()
+        self.assertEqual(report['mismatched'], 2)
+        self.assertEqual(report['unlinked'], 1)
+        self.assertEqual(report['orphaned'], 1)
+        self.assertEqual(report['mismatched_groups'], [{'department': '旧名称', 'current_name': '技术部', 'count': 2}])
+
+        progress = []
+        stats = service.backfill(chunk_size=4, progress=lambda *args: progress.append(args))
+        self.assertEqual(stats['chunks'], 2)
+        self.assertEqual(stats['renamed'], 2)
+        self.assertEqual(stats['linked'], 1)
+        self.assertEqual(progress[-1][0], 6)
+
+        report = service.report()
+        self.assertEqual((report['mismatched'], report['unlinked'], report['orphaned']), (0, 0, 1))
+        self.assertEqual(Employee.objects.get(employee_id='E004').department_ref, self.other)
+
+
+class EmployeeImportTests(AdminAPITestCase):
+    """员工批量导入：批量唯一性校验、逐行错误和分批写入"""
+
+    HEADER = ['工号', '姓名', '性别', '部门', '职称/职务', '电话', '入职日期', '出生日期', '基础工资', '状态']
+
+    def setUp(self):
+        super().setUp()
+        self.department = Department.objects.create(name='技术部', code='TECH')
+        Employee.objects.create(
+            employee_id='E000', name='老员工', gender='M', department_ref=self.department,
+            position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+        )
+
+    def rows(self, count):
+        return [
+            [f'N{index:05d}', f'新员工{index}', '女' if index % 2 else 'M', '技术部', '工程师',
+             '13800138000', '2024-03-01', '1995/05/06', '9000.50', '在职']
+            for index in range(count)
+        ]
+
+    def test_csv_import_reports_row_errors(self):
+        import csv
+        import io
+
+        rows = self.rows(5) + [
+            ['E000', '重复工号', 'M', '技术部', '工程师', '', '2024-03-01', '', '9000', ''],
+            ['N00001', '文件内重复', 'M', '技术部', '工程师', '', '2024-03-01', '', '9000', ''],
+            ['N00100', '手机号错误', 'M', '技术部', '工程师', '123', '2024-03-01', '', '9000', ''],
+            ['N00101', '部门错误', 'X', '不存在', '工程师', '', '2024-03-01', '', '-1', ''],
+        ]
+        output = io.StringIO()
+        csv.writer(output).writerows([self.HEADER] + rows)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                '/api/employees/import/', output.getvalue().encode('utf-8'), content_type='text/csv'
+            )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual((data['received'], data['created'], data['failed']), (9, 5, 4))
+
+        errors = {error['line']: error['errors'] for error in data['errors']}
+        self.assertEqual(errors[7], {'employee_id': ['该工号已存在']})
+        self.assertEqual(errors[8], {'employee_id': ['与第 3 行工号重复']})
+        self.assertIn('phone', errors[9])
+        self.assertEqual(set(errors[10]), {'gender', 'department', 'base_salary'})
+
+        employee = Employee.objects.get(employee_id='N00001')
+        self.assertEqual((employee.gender, employee.department_ref, employee.department), ('F', self.department, '技术部'))
+        self.assertEqual(employee.birth_date, date(1995, 5, 6))
+        # 查询数与行数无关：工号、部门各一次，写入一次
+        self.assertLess(len(context.captured_queries), 10)
+
+    def test_xlsx_upload_and_dry_run(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .services.export_service import XLSXExportWriter
+
+        writer = XLSXExportWriter(self.HEADER)
+        content = b''.join(writer.stream(self.rows(3)))
+        upload = SimpleUploadedFile('employees.xlsx', content)
+
+        response = self.client.post('/api/employees/import/?dry_run=true', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual((data['valid'], data['created']), (3, 0))
+        self.assertFalse(Employee.objects.filter(employee_id__startswith='N').exists())
+
+        upload.seek(0)
+        response = self.client.post('/api/employees/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.json()['data']['created'], 3)
+        self.assertEqual(Employee.objects.filter(employee_id__startswith='N').count(), 3)
+
+    def test_missing_columns_are_rejected(self):
+        response = self.client.post('/api/employees/import/', b'name\nfoo\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('employee_id', response.json()['error'])
+
+
+class BatchUniqueValidationTests(AdminAPITestCase):
+    """many=True 写入：唯一性和关联字段整批校验，查询次数与数量无关"""
+
+    def setUp(self):
+        super().setUp()
+        self.department = Department.objects.create(name='技术部', code='TECH')
+        self.employee = Employee.objects.create(
+            employee_id='E000', name='老员工', gender='M', department_ref=self.department,
+            position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+        )
+
+    def employee_payload(self, count):
+        return [
+            {
+                'employee_id': f'N{index:04d}', 'name': f'新员工{index}', 'gender': 'F',
+                'department_ref': str(self.department.pk), 'position': '工程师',
+                'hire_date': '2024-03-01', 'base_salary': '9000.00',
+            }
+            for index in range(count)
+        ]
+
+    def count_validation_queries(self, serializer_class, data):
+        serializer = serializer_class(data=data, many=True)
+        with CaptureQueriesContext(connection) as context:
+            valid = serializer.is_valid()
+        return valid, len(context.captured_queries)
+
+    def test_query_count_is_constant(self):
+        from .serializers import EmployeeSerializer, DepartmentSerializer
+
+        small = self.count_validation_queries(EmployeeSerializer, self.employee_payload(3))
+        large = self.count_validation_queries(EmployeeSerializer, self.employee_payload(50))
+        self.assertEqual(small, large)
+        self.assertTrue(large[0])
+
+        departments = [{'name': f'部门{index}', 'code': f'D{index}'} for index in range(40)]
+        valid, queries = self.count_validation_queries(DepartmentSerializer, departments)
+        self.assertTrue(valid)
+        # 名称、代码各一次
+        self.assertEqual(queries, 2)
+
+    def test_duplicates_in_batch_and_database(self):
+        from .serializers import DepartmentSerializer, EmployeeSerializer, SalaryRecordSerializer
+
+        serializer = DepartmentSerializer(data=[
+            {'name': '技术部', 'code': 'NEW1'},
+            {'name': '市场部', 'code': 'MKT'},
+            {'name': '市场部', 'code': 'MKT2'},
+        ], many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors[0], {'name': ['该部门名称已存在']})
+        self.assertEqual(serializer.errors[1], {})
+        self.assertEqual(serializer.errors[2], {'name': ['与第 2 条数据重复']})
+
+        payload = self.employee_payload(2)
+        payload[1]['department_ref'] = '00000000-0000-0000-0000-000000000000'
+        payload.append(dict(payload[0], name='重复'))
+        serializer = EmployeeSerializer(data=payload, many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('department_ref', serializer.errors[1])
+        self.assertEqual(serializer.errors[2], {'employee_id': ['与第 1 条数据重复']})
+
+        SalaryRecord.objects.create(
+            employee=self.employee, salary_period='2025-01', base_salary_snapshot=Decimal('8000.00'),
+        )
+        record = {'employee': str(self.employee.pk), 'position_snapshot': '工程师', 'base_salary_snapshot': '8000.00'}
+        serializer = SalaryRecordSerializer(data=[
+            dict(record, salary_period='2025-01'), dict(record, salary_period='2025-02'),
+        ], many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors[0], {'non_field_errors': ['该员工在此期间已有薪资记录']})
+        self.assertEqual(serializer.errors[1], {})
+
+    def test_bulk_create_through_api(self):
+        response = self.client.post('/api/employees/', self.employee_payload(5), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 5)
+        self.assertEqual(Employee.objects.filter(department='技术部').count(), 6)
+
+        response = self.client.post('/api/departments/', [
+            {'name': '市场部', 'code': 'MKT'}, {'name': '财务部', 'code': 'MKT'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][1], {'code': ['与第 1 条数据重复']})
+        self.assertFalse(Department.objects.filter(code='MKT').exists())
+
+        # 单个对象仍按原方式校验
+        response = self.client.post('/api/departments/', {'name': '技术部', 'code': 'X'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json()['errors'])
+
+
+class RequestMetricsTests(AdminAPITestCase):
+    """请求性能监控：Server-Timing、按路由聚合的直方图和性能预算"""
+
+    def setUp(self):
+        from .metrics import request_metrics
+
+        super().setUp()
+        request_metrics.reset()
+        Department.objects.create(name='技术部', code='TECH')
+
+    def server_timing(self, response):
+        return dict(
+            (entry.split(';')[0], entry) for entry in response['Server-Timing'].split(', ')
+        )
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/departments/')
+        self.assertEqual(response.status_code, 200)
+        timing = self.server_timing(response)
+        self.assertEqual(set(timing), {'db', 'serialize', 'render', 'total'})
+        self.assertIn(f'desc="{len(context.captured_queries)} queries"', timing['db'])
+        self.assertNotEqual(timing['serialize'], 'serialize;dur=0.00')
+
+    def test_serializer_timing_does_not_patch_drf(self):
+        from rest_framework.serializers import BaseSerializer, ListSerializer
+        from .metrics import track_request
+        from .serializers import DepartmentSerializer, TimedSerializerMixin
+
+        self.assertNotIn('timed', vars(BaseSerializer.data.fget))
+        self.assertNotIn(TimedSerializerMixin, ListSerializer.__mro__)
+
+        with track_request() as metrics:
+            DepartmentSerializer(Department.objects.all(), many=True).data
+        self.assertGreater(metrics.timings['serialize'], 0)
+
+    def test_metrics_endpoint(self):
+        self.client.get('/api/departments/')
+        self.client.get('/api/departments/')
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+        body = response.content.decode()
+        labels = 'method="GET",route="/api/departments/"'
+        self.assertIn(f'api_requests_total{{{labels},status="200"}} 2', body)
+        self.assertIn(f'api_request_duration_seconds_count{{{labels}}} 2', body)
+        self.assertIn(f'api_request_queries_bucket{{{labels},le="+Inf"}} 2', body)
+
+        user = User.objects.create_user('user', 'user@example.com', 'user123')
+        self.client.force_authenticate(user)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+
+    def test_budget_warning(self):
+        from django.test import override_settings
+        from .metrics import request_metrics
+
+        budgets = {'ROUTE_BUDGETS': {'department_list_create': {'queries': 0}}}
+        with override_settings(API_METRICS=budgets), self.assertLogs('api.middleware', 'WARNING') as logs:
+            self.client.get('/api/departments/')
+        self.assertIn('/api/departments/', logs.output[0])
+        self.assertIn(
+            'api_budget_exceeded_total{method="GET",route="/api/departments/",budget="queries"} 1',
+            request_metrics.render(),
+        )
+
+
+class SeedDataBenchmarkTests(TestCase):
+    """确定性测试数据生成与接口基准测试"""
+
+    def test_seed_data_is_deterministic(self):
+        from .services.seed_data_service import SeedDataGenerator
+
+        def snapshot():
+            return (
+                list(Employee.objects.order_by('employee_id').values_list('id', 'name', 'base_salary', 'status')),
+                list(SalaryRecord.objects.order_by('id').values_list('id', 'net_salary')),
+            )
+
+        stats = SeedDataGenerator(seed=3).generate(employees=20, months=2, days=7)
+        self.assertEqual((stats['employees'], stats['salary_records']), (20, 40))
+        active = Employee.objects.filter(status='active').count()
+        self.assertEqual(stats['attendance_records'], active * 5)
+        first = snapshot()
+
+        generator = SeedDataGenerator(seed=3)
+        generator.clear()
+        self.assertFalse(Employee.objects.exists() or Department.objects.exists())
+        generator.generate(employees=20, months=2, days=7)
+        self.assertEqual(snapshot(), first)
+
+        # 直接写表的值与 ORM 读取一致
+        employee = Employee.objects.select_related('department_ref').first()
+        self.assertEqual(employee.department, employee.department_ref.name)
+        record = SalaryRecord.objects.first()
+        self.assertEqual(record.net_salary, record.base_salary_snapshot + record.bonus - record.deductions)
+        attendance = AttendanceRecord.objects.exclude(check_in_time=None).first()
+        self.assertLess(attendance.check_in_time, attendance.check_out_time)
+        self.assertIsNotNone(attendance.created_at)
+
+    def test_benchmark_endpoints_reports_json(self):
+        import json
+        import tempfile
+        from django.core.management import call_command
+        from .cache import get_model_version
+        from .services.seed_data_service import SeedDataGenerator
+
+        SeedDataGenerator(seed=1).generate(employees=10, months=1, days=7)
+        version = get_model_version(SalaryRecord)
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'benchmark_endpoints', '--existing-data', '--requests', '2', '--warmup', '0',
+                '--only', 'employee_list', 'salary_list',
+                '--output', output.name, stderr=io.StringIO(),
+            )
+            result = json.load(open(output.name, encoding='utf-8'))
+
+        endpoints = result['endpoints']
+        self.assertEqual(set(endpoints), {'employee_list', 'salary_list'})
+        self.assertEqual(endpoints['employee_list']['status'], 200)
+        self.assertGreater(endpoints['salary_list']['queries'], 0)
+        # 临时管理员账号和 Token 已删除
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Token.objects.exists())
+        self.assertEqual(get_model_version(SalaryRecord), version)
+
+    def test_benchmark_endpoints_refuses_writes_on_existing_data(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+        from .services.seed_data_service import SeedDataGenerator
+
+        SeedDataGenerator(seed=1).generate(employees=10, months=1, days=7)
+        with self.assertRaisesMessage(CommandError, 'calculate_salary'):
+            call_command(
+                'benchmark_endpoints', '--existing-data', '--requests', '1',
+                '--only', 'employee_list', 'calculate_salary', stderr=io.StringIO(),
+            )
+        self.assertFalse(User.objects.exists())
+
+    def test_benchmark_write_request_is_rolled_back(self):
+        from django.test import Client
+        from .management.commands.benchmark_endpoints import Command, Endpoint
+        from .management.commands.benchmark_load import benchmark_token
+        from .services.seed_data_service import SeedDataGenerator
+
+        SeedDataGenerator(seed=1).generate(employees=10, months=1, days=7)
+        employee = Employee.objects.order_by('employee_id').first()
+        endpoint = Endpoint('calculate_salary', '/api/salaries/calculate_and_create/', 'POST', {
+            'employee_id': employee.employee_id, 'salary_period': '2099-01', 'bonus': '500', 'deductions': '100',
+        }, write=True)
+        with benchmark_token() as token:
+            client = Client(SERVER_NAME='localhost', HTTP_AUTHORIZATION=f'Token {token}')
+            status_code, *_ = Command().request(client, endpoint)
+        self.assertEqual(status_code, 201)
+        self.assertFalse(SalaryRecord.objects.filter(salary_period='2099-01').exists())
+
+
+class BulkLoadTests(TestCase):
+    """暂存表批量装载：解析、外键按集合解析、按唯一键 upsert"""
+
+    def setUp(self):
+        self.department = Department.objects.create(name='技术部', code='TECH')
+        self.employee = Employee.objects.create(
+            employee_id='E001', name='张三', gender='M', department_ref=self.department,
+            position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('10000.00'),
+        )
+
+    def write_csv(self, content):
+        import os
+        import tempfile
+
+        handle = tempfile.NamedTemporaryFile('w', suffix='.csv', encoding='utf-8', delete=False)
+        with handle:
+            handle.write(content)
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+    def test_load_employees_resolves_departments_and_upserts(self):
+        from .services.bulk_load_service import EmployeeLoader
+
+        path = self.write_csv(
+            '工号,姓名,性别,部门,职位,入职日期,基础工资,员工状态\n'
+            'E001,张三丰,男,技术部,高级工程师,2020/01/01,15000,在职\n'
+            'E002,李四,F,技术部,工程师,2023-03-01,12000.5,\n'
+            'E003,王五,M,旧系统部门,专员,2023-03-01,8000,terminated\n'
+            'E004,赵六,X,技术部,专员,2023-13-01,abc,\n'
+        )
+        result = EmployeeLoader(batch_size=2).load_file(path)
+
+        self.assertEqual((result['inserted'], result['updated'], result['failed']), (1, 1, 2))
+        self.assertEqual((result['batches'], result['unresolved']), (2, 1))
+        self.assertEqual(result['errors'][0]['line'], 5)
+        self.assertEqual(set(result['errors'][0]['errors']), {'gender', 'hire_date', 'base_salary'})
+
+        self.employee.refresh_from_db()
+        self.assertEqual((self.employee.name, self.employee.position), ('张三丰', '高级工程师'))
+        self.assertEqual(self.employee.base_salary, Decimal('15000.00'))
+        new = Employee.objects.get(employee_id='E002')
+        self.assertEqual((new.department_ref, new.status, new.phone), (self.department, 'active', ''))
+        self.assertEqual(new.base_salary, Decimal('12000.50'))
+        self.assertIsNotNone(new.created_at)
+        # 部门名称在部门表中不存在的行与员工导入一样报告为失败，不写入
+        self.assertEqual(
+            result['errors'][1],
+            {'line': 4, 'employee_id': 'E003', 'errors': {'department': ['部门不存在: 旧系统部门']}},
+        )
+        self.assertFalse(Employee.objects.filter(employee_id='E003').exists())
+
+    def test_unknown_department_keeps_existing_employee_linked(self):
+        from .services.bulk_load_service import EmployeeLoader
+
+        path = self.write_csv(
+            'employee_id,name,gender,department,position,hire_date,base_salary\n'
+            'E001,张三,M,不存在的部门,工程师,2020-01-01,20000\n'
+        )
+        result = EmployeeLoader().load_file(path)
+        self.assertEqual((result['updated'], result['unresolved'], result['failed']), (0, 1, 1))
+        self.employee.refresh_from_db()
+        self.assertEqual((self.employee.department_ref, self.employee.base_salary), (self.department, Decimal('10000.00')))
+
+    @skipUnless(importlib.util.find_spec('pyarrow'), '需要安装 pyarrow')
+    def test_parquet_line_numbers_match_csv(self):
+        import os
+        import tempfile
+        import pyarrow
+        import pyarrow.parquet
+        from .services.bulk_load_service import SalaryRecordLoader
+
+        rows = {'employee_id': ['E001', 'E999', 'E001'], 'salary_period': ['2024-01', '2024-01', '2024-13']}
+        csv_path = self.write_csv(
+            'employee_id,salary_period\n' + ''.join(f'{code},{period}\n' for code, period in zip(*rows.values()))
+        )
+        parquet_path = os.path.join(tempfile.mkdtemp(), 'salaries.parquet')
+        pyarrow.parquet.write_table(pyarrow.table(rows), parquet_path)
+        self.addCleanup(os.remove, parquet_path)
+
+        errors = [
+            sorted(error['line'] for error in SalaryRecordLoader().load_file(path)['errors'])
+            for path in (csv_path, parquet_path)
+        ]
+        self.assertEqual(errors, [[3, 4], [3, 4]])
+
+    def test_load_salaries_computes_missing_columns(self):
+        from .services.bulk_load_service import SalaryRecordLoader
+
+        SalaryRecord.objects.create(
+            employee=self.employee, salary_period='2024-02', position_snapshot='工程师',
+            base_salary_snapshot=Decimal('9000.00'), gross_salary=Decimal('9000.00'), net_salary=Decimal('9000.00'),
+        )
+        path = self.write_csv(
+            'employee_id,salary_period,bonus,deductions,base_salary_snapshot\n'
+            'E001,2024-01,100,50,\n'
+            'E001,2024-02,1000,200,11000\n'
+            'E999,2024-01,0,0,\n'
+            'E001,2024-13,0,0,\n'
+            'E001,2024-01,500.25,100,\n'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            result = SalaryRecordLoader().load_file(path)
+
+        self.assertEqual((result['inserted'], result['updated']), (1, 1))
+        self.assertEqual((result['duplicates'], result['unresolved'], result['failed']), (1, 1, 2))
+        self.assertEqual(
+            sorted((error['line'], error['employee_id']) for error in result['errors']),
+            [(4, 'E999'), (5, 'E001')],
+        )
+        # 查询次数与行数无关
+        self.assertLess(len(queries), 15)
+
+        january = SalaryRecord.objects.get(employee=self.employee, salary_period='2024-01')
+        self.assertEqual(january.position_snapshot, '工程师')
+        self.assertEqual(january.base_salary_snapshot, Decimal('10000.00'))
+        self.assertEqual(january.gross_salary, Decimal('10500.25'))
+        self.assertEqual(january.net_salary, Decimal('10400.25'))
+        february = SalaryRecord.objects.get(employee=self.employee, salary_period='2024-02')
+        self.assertEqual((february.gross_salary, february.net_salary), (Decimal('12000.00'), Decimal('11800.00')))
+
+    def test_load_attendance_derives_hours_and_refreshes_rollups(self):
+        from .models import AttendanceDailyRollup
+        from .services.bulk_load_service import AttendanceRecordLoader
+
+        AttendanceRecord.objects.create(employee=self.employee, date=date(2024, 1, 3), status='absent')
+        path = self.write_csv(
+            'employee_id,date,check_in_time,check_out_time,status,notes\n'
+            'E001,2024-01-02,08:55,19:30,,\n'
+            'E001,2024-01-03,09:40,18:00,,补录\n'
+            'E001,2024-01-04,,,sick_leave,感冒\n'
+        )
+        result = AttendanceRecordLoader().load_file(path)
+        self.assertEqual((result['inserted'], result['updated'], result['failed']), (2, 1, 0))
+
+        records = {record.date.day: record for record in AttendanceRecord.objects.filter(employee=self.employee)}
+        self.assertEqual(records[2].status, 'overtime')
+        self.assertEqual((records[2].work_hours, records[2].overtime_hours), (Decimal('9.58'), Decimal('1.50')))
+        self.assertEqual((records[3].status, records[3].notes), ('late', '补录'))
+        self.assertEqual(records[4].status, 'sick_leave')
+        self.assertEqual(
+            set(AttendanceDailyRollup.objects.values_list('date', flat=True)),
+            {date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)},
+        )
+
+    def test_bulk_load_command(self):
+        from django.core.management import call_command
+        from django.core.management.base import CommandError
+
+        path = self.write_csv('employee_id,salary_period\nE001,2024-01\n')
+        output = io.StringIO()
+        call_command('bulk_load', 'salaries', path, stdout=output)
+        self.assertIn('新增 1 条', output.getvalue())
+        self.assertTrue(SalaryRecord.objects.filter(salary_period='2024-01', net_salary=Decimal('10000.00')).exists())
+
+        with self.assertRaisesMessage(CommandError, '缺少必填列: date'):
+            call_command('bulk_load', 'attendance', path, stdout=io.StringIO())
+
+
+PAYROLL_TEST_RULES = {
+    'DEPARTMENT_BONUSES': {'技术部': {'amount': '500', 'rate': '0.05'}},
+    'ATTENDANCE_DEDUCTIONS': {
+        'WORK_DAYS_PER_MONTH': '21.75',
+        'STATUSES': {'absent': {'days': '1'}, 'sick_leave': {'days': '0.4'}, 'late': {'amount': '50'}},
+    },
+    'SOCIAL_INSURANCE': {
+        'BASE_MIN': '4000', 'BASE_MAX': '30000',
+        'RATES': {'pension': '0.08', 'medical': '0.02', 'unemployment': '0.005', 'housing_fund': '0.12'},
+    },
+    'INCOME_TAX': {
+        'THRESHOLD': '5000',
+        'BRACKETS': [('3000', '0.03', '0'), ('12000', '0.10', '210'), ('25000', '0.20', '1410'), (None, '0.45', '15160')],
+    },
+}
+
+
+@override_settings(PAYROLL_RULES=PAYROLL_TEST_RULES)
+class PayrollEngineTests(AdminAPITestCase):
+    """薪资规则引擎：按列计算与逐条 Decimal 计算一致，三个薪资接口共用"""
+
+    def setUp(self):
+        super().setUp()
+        self.department = Department.objects.create(name='技术部', code='TECH')
+        self.employee = Employee.objects.create(
+            employee_id='E001', name='张三', gender='M', department_ref=self.department,
+            position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('10000.00'),
+        )
+        for day, status_value in ((2, 'absent'), (3, 'late'), (4, 'late'), (5, 'present')):
+            AttendanceRecord.objects.create(employee=self.employee, date=date(2025, 6, day), status=status_value)
+        # 期间外的缺勤不计入
+        AttendanceRecord.objects.create(employee=self.employee, date=date(2025, 5, 30), status='absent')
+
+    # 部门奖金 500 + 10000 × 5% = 1000；考勤 10000 / 21.75 + 2 × 50 = 559.77；社保 10000 × 22.5% = 2250
+    # 手工奖金、扣除各 100：个税 (11100 - 559.77 - 2250 - 5000) × 10% - 210 = 119.02
+    EXPECTED = {
+        'bonus': Decimal('100.00'), 'deductions': Decimal('100.00'),
+        'gross_salary': Decimal('11100.00'), 'net_salary': Decimal('8071.21'),
+        'department_bonus': Decimal('1000.00'), 'attendance_deduction': Decimal('559.77'),
+        'social_insurance': Decimal('2250.00'), 'income_tax': Decimal('119.02'),
+    }
+
+    def test_engine_applies_rules(self):
+        from .services.payroll_rules_service import PayrollEngine
+
+        amounts = PayrollEngine().calculate_employee(self.employee, '2025-06', Decimal('100'), Decimal('100'))
+        self.assertEqual(amounts, self.EXPECTED)
+
+    def test_without_rules_matches_plain_formula(self):
+        from .services.payroll_rules_service import PayrollEngine, PayrollRules
+
+        with CaptureQueriesContext(connection) as queries:
+            amounts = PayrollEngine(PayrollRules({})).calculate_employee(
+                self.employee, '2025-06', Decimal('300.50'), Decimal('120.25'),
+            )
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(amounts['gross_salary'], Decimal('10300.50'))
+        self.assertEqual(amounts['net_salary'], Decimal('10180.25'))
+        self.assertEqual(amounts['deductions'], Decimal('120.25'))
+
+    def test_columnar_matches_decimal_reference(self):
+        from .management.commands.benchmark_payroll import synthetic_workforce
+        from .services.payroll_rules_service import (
+            PayrollEngine, PayrollRules, RESULT_COLUMNS, calculate_reference,
+        )
+
+        rules = PayrollRules()
+        columns, attendance = synthetic_workforce(2000, rules, seed=7)
+        # 覆盖税率表各档和社保上下限
+        columns['base_salary'][:4] = [Decimal('2500.00'), Decimal('45000.00'), Decimal('8000.005'), 9000]
+        result = PayrollEngine(rules).calculate(columns, '2025-06', Decimal('200'), Decimal('50'), attendance=attendance)
+
+        for index, employee_id in enumerate(columns['id']):
+            expected = calculate_reference(
+                rules, columns['base_salary'][index], columns['department'][index],
+                attendance.get(employee_id), Decimal('200'), Decimal('50'),
+            )
+            self.assertEqual({name: result[name][index] for name in RESULT_COLUMNS}, expected)
+
+    def test_salary_endpoints_use_engine(self):
+        response = self.client.post(
+            f'/api/salaries/calculate/{self.employee.id}/',
+            {'salary_period': '2025-06', 'bonus': '100', 'deductions': '100'}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['breakdown']['income_tax'], '119.02')
+        record = SalaryRecord.objects.get(employee=self.employee, salary_period='2025-06')
+        self.assertEqual({name: getattr(record, name) for name in self.EXPECTED}, self.EXPECTED)
+
+        # 修改奖金后规则明细保留，打印数据包含明细
+        response = self.client.patch(f'/api/salaries/{record.id}/', {'bonus': '150.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['income_tax'], '119.02')
+        record.refresh_from_db()
+        self.assertEqual(record.social_insurance, Decimal('2250.00'))
+        response = self.client.get(f'/api/salaries/{record.id}/print_view/')
+        self.assertEqual(response.json()['salary_info']['attendance_deduction'], 559.77)
+
+        response = self.client.post('/api/salaries/calculate_and_create/', {
+            'employee_id': 'E001', 'salary_period': '2025-07', 'bonus': '0', 'deductions': '0',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        # 7 月无考勤扣款：个税 (10000 + 1000 - 2250 - 5000) × 10% - 210 = 165
+        self.assertEqual(Decimal(response.json()['data']['net_salary']), Decimal('8585.00'))
+
+        other = Employee.objects.create(
+            employee_id='E002', name='李四', gender='F', department='市场部',
+            position='专员', hire_date=date(2021, 1, 1), base_salary=Decimal('3000.00'),
+        )
+        response = self.client.post('/api/salaries/generate/', {'salary_period': '2025-06'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['data']['created_count'], 1)
+        # 社保按缴费基数下限 4000 计算，未达起征点不缴个税
+        record = SalaryRecord.objects.get(employee=other, salary_period='2025-06')
+        self.assertEqual(
+            (record.deductions, record.social_insurance, record.income_tax, record.net_salary),
+            (Decimal('0.00'), Decimal('900.00'), Decimal('0.00'), Decimal('2100.00')),
+        )
+
+    def test_invalid_tax_brackets_are_rejected(self):
+        from django.core.exceptions import ImproperlyConfigured
+        from .services.payroll_rules_service import PayrollRules
+
+        cases = {
+            '必须是最后一档': [('3000', '0.03', '0'), (None, '0.10', '210'), ('12000', '0.20', '1410')],
+            '最后一档的上限必须为 None': [('3000', '0.03', '0'), ('12000', '0.10', '210')],
+            '严格递增': [('12000', '0.03', '0'), ('3000', '0.10', '210'), (None, '0.20', '1410')],
+        }
+        for message, brackets in cases.items():
+            with self.subTest(message), self.assertRaisesMessage(ImproperlyConfigured, message):
+                PayrollRules({'INCOME_TAX': {'THRESHOLD': '5000', 'BRACKETS': brackets}})
+
+    def test_rules_disabled_by_default(self):
+        from core import settings as base_settings
+        from .services.payroll_rules_service import BREAKDOWN_COLUMNS, PayrollEngine, PayrollRules
+
+        self.assertEqual(base_settings.PAYROLL_RULES, {})
+        amounts = PayrollEngine(PayrollRules(base_settings.PAYROLL_RULES)).calculate_employee(
+            self.employee, '2025-06', Decimal('100'), Decimal('100'),
+        )
+        self.assertEqual({name: amounts[name] for name in BREAKDOWN_COLUMNS}, dict.fromkeys(BREAKDOWN_COLUMNS, Decimal('0.00')))
+        self.assertEqual(amounts['net_salary'], Decimal('10000.00'))
+
+
+@override_settings(PAYROLL_RULES={})
+class PayrollGeneratorTests(AdminAPITestCase):
+    """批量薪资生成：跳过已发薪员工、分批写入、新建记录分页返回"""
+
+    def setUp(self):
+        super().setUp()
+        department = Department.objects.create(name='技术部', code='TECH')
+        self.employees = [
+            Employee.objects.create(
+                employee_id=f'E{index:03d}', name=f'员工{index}', gender='M', department_ref=department,
+                position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal(8000 + index * 100),
+            )
+            for index in range(5)
+        ]
+        SalaryRecord.objects.create(
+            employee=self.employees[0], salary_period='2025-06', position_snapshot='工程师',
+            base_salary_snapshot=Decimal('8000.00'), bonus=Decimal('0'), deductions=Decimal('0'),
+        )
+
+    def test_generate_skips_existing_and_counts(self):
+        from .services.payroll_service import PayrollGenerator
+
+        result = PayrollGenerator('2025-06', bonus=Decimal('200'), deductions=Decimal('50')).generate()
+
+        self.assertEqual(result['created_count'], 4)
+        self.assertEqual(result['skipped_count'], 1)
+        self.assertEqual(result['skipped_employee_ids'], ['E000'])
+        self.assertEqual(len(result['created_record_ids']), 4)
+        self.assertEqual(SalaryRecord.objects.filter(salary_period='2025-06').count(), 5)
+
+        record = SalaryRecord.objects.get(employee=self.employees[2], salary_period='2025-06')
+        self.assertEqual(record.base_salary_snapshot, Decimal('8200.00'))
+        self.assertEqual(record.position_snapshot, '工程师')
+        self.assertEqual(record.gross_salary, Decimal('8400.00'))
+        self.assertEqual(record.net_salary, Decimal('8350.00'))
+
+        # 再次生成时全部跳过
+        result = PayrollGenerator('2025-06').generate()
+        self.assertEqual((result['created_count'], result['skipped_count']), (0, 5))
+
+    def test_records_are_written_in_batches(self):
+        from .services.payroll_service import PayrollGenerator
+
+        with CaptureQueriesContext(connection) as context:
+            result = PayrollGenerator('2025-07', batch_size=2).generate()
+        inserts = [
+            q for q in context.captured_queries
+            if q['sql'].startswith('INSERT') and '"api_salaryrecord"' in q['sql'].split('(')[0]
+        ]
+
+        self.assertEqual(result['created_count'], 5)
+        self.assertEqual(len(inserts), 3)
+
+    def test_view_paginates_created_records(self):
+        response = self.client.post('/api/salaries/generate/', {
+            'salary_period': '2025-06', 'include_results': 'true', 'page': 2, 'page_size': 3,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        data = response.json()['data']
+
+        self.assertEqual((data['created_count'], data['skipped_count']), (4, 1))
+        self.assertEqual((data['total_pages'], data['current_page']), (2, 2))
+        self.assertEqual(len(data['results']), 1)
+
+        response = self.client.post('/api/salaries/generate/', {'salary_period': '2025-6'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_concurrently_created_records_are_not_reported(self):
+        from .services.payroll_service import PayrollGenerator
+
+        write_records = PayrollGenerator.write_records
+
+        def concurrent_write(generator, records):
+            # 另一个生成请求在本次读取已发薪员工之后写入了两名员工的记录
+            for employee in self.employees[1:3]:
+                SalaryRecord.objects.create(
+                    employee=employee, salary_period='2025-06', position_snapshot='工程师',
+                    base_salary_snapshot=employee.base_salary, bonus=Decimal('0'), deductions=Decimal('0'),
+                )
+            write_records(generator, records)
+
+        with patch.object(PayrollGenerator, 'write_records', concurrent_write):
+            response = self.client.post('/api/salaries/generate/', {
+                'salary_period': '2025-06', 'include_results': 'true', 'page_size': 1,
+            }, format='json')
+        data = response.json()['data']
+
+        self.assertEqual(data['created_count'], 2)
+        self.assertEqual(data['total_pages'], 2)
+        self.assertEqual(len(data['results']), 1)
+        self.assertIn(data['results'][0]['employee_id'], {'E003', 'E004'})
+
+
+@override_settings(PAYROLL_RULES={})
+class PayrollJobRunnerTests(AdminAPITestCase):
+    """异步薪资任务：领取、断点续跑、接管超时任务和完成状态"""
+
+    def setUp(self):
+        super().setUp()
+        department = Department.objects.create(name='技术部', code='TECH')
+        for index in range(7):
+            Employee.objects.create(
+                employee_id=f'E{index:03d}', name=f'员工{index}', gender='M', department_ref=department,
+                position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+            )
+
+    def create_job(self, **fields):
+        from .models import PayrollJob
+
+        return PayrollJob.objects.create(salary_period='2025-06', chunk_size=3, **fields)
+
+    def make_stale(self, job):
+        from .models import PayrollJob
+
+        PayrollJob.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(minutes=10))
+
+    def test_claim_sets_token_once(self):
+        from .services.payroll_service import PayrollJobRunner
+
+        job = self.create_job()
+        claimed = PayrollJobRunner.claim_next_job()
+        self.assertEqual(claimed.id, job.id)
+        self.assertEqual(claimed.status, 'running')
+        self.assertEqual(claimed.total_employees, 7)
+        self.assertIsNotNone(claimed.worker_token)
+        # 运行中且未超时的任务不会被再次领取
+        self.assertIsNone(PayrollJobRunner.claim_next_job())
+
+    def test_run_completes_with_bounded_timings(self):
+        from .models import PayrollJob
+        from .services.payroll_service import PayrollJobRunner
+
+        self.create_job()
+        with patch.object(PayrollJob, 'RECENT_CHUNKS', 2):
+            job = PayrollJobRunner(PayrollJobRunner.claim_next_job()).run()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.processed_employees, job.created_count, job.skipped_count), (7, 7, 0))
+        self.assertEqual(job.progress, 100.0)
+        self.assertEqual(job.chunk_count, 3)
+        self.assertEqual([chunk['index'] for chunk in job.chunk_timings], [2, 3])
+        self.assertGreater(job.processing_seconds, 0)
+        self.assertEqual(SalaryRecord.objects.filter(salary_period='2025-06').count(), 7)
+
+    def test_stale_job_resumes_from_cursor(self):
+        from .services.payroll_service import PayrollGenerator, PayrollJobRunner
+
+        # 模拟 worker 处理完第一块后崩溃
+        first_chunk = list(PayrollGenerator('2025-06').get_employee_queryset()[:3])
+        PayrollGenerator('2025-06').process_chunk(first_chunk)
+        job = self.create_job(
+            status='running', total_employees=7, processed_employees=3, created_count=3,
+            chunk_count=1, last_employee_id=first_chunk[-1].id,
+        )
+        self.make_stale(job)
+
+        job = PayrollJobRunner(PayrollJobRunner.claim_next_job()).run()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.processed_employees, job.created_count, job.skipped_count), (7, 7, 0))
+        self.assertEqual(job.chunk_count, 3)
+
+    def test_taken_over_worker_stops_without_writing(self):
+        from .services.payroll_service import PayrollJobRunner
+
+        self.create_job()
+        stale_runner = PayrollJobRunner(PayrollJobRunner.claim_next_job())
+        self.make_stale(stale_runner.job)
+        new_runner = PayrollJobRunner(PayrollJobRunner.claim_next_job())
+
+        job = stale_runner.run()
+        self.assertEqual(job.processed_employees, 0)
+        self.assertFalse(SalaryRecord.objects.exists())
+
+        job = new_runner.run()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual((job.processed_employees, job.created_count), (7, 7))
+
+    def test_chunk_size_is_capped(self):
+        from .models import PayrollJob
+
+        response = self.client.post('/api/salaries/generate/', {
+            'salary_period': '2025-06', 'async': 'true', 'chunk_size': 10 ** 9,
+        }, format='json')
+        self.assertEqual(response.status_code, 202)
+        job = PayrollJob.objects.get(id=response.json()['data']['job_id'])
+        self.assertEqual(job.chunk_size, PayrollJob.MAX_CHUNK_SIZE)
+
+
+class KeysetPaginatorTests(AdminAPITestCase):
+    """游标分页：游标编解码、非唯一排序字段按主键决胜、无效游标"""
+
+    def setUp(self):
+        super().setUp()
+        self.department = Department.objects.create(name='技术部', code='TECH')
+        # 每 3 名员工基础工资相同，排序字段不唯一
+        for index in range(10):
+            Employee.objects.create(
+                employee_id=f'E{index:03d}', name=f'员工{index}', gender='M', department_ref=self.department,
+                position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal(8000 + index // 3 * 1000),
+            )
+
+    def walk(self, paginator, cursor=None, forward=True):
+        pages = []
+        while True:
+            objects, next_cursor, previous_cursor = paginator.paginate(cursor)
+            pages.append([employee.employee_id for employee in objects])
+            cursor = next_cursor if forward else previous_cursor
+            if cursor is None:
+                return pages, next_cursor, previous_cursor
+
+    def test_cursor_round_trip_keeps_precision(self):
+        from .pagination import decode_cursor, encode_cursor
+
+        created_at = timezone.now().replace(microsecond=123456)
+        values = [created_at, Decimal('8000.50'), 'E001']
+        cursor = encode_cursor(values, reverse=True)
+
+        self.assertRegex(cursor, r'^[A-Za-z0-9_-]+=*$')
+        decoded, reverse = decode_cursor(cursor)
+        self.assertTrue(reverse)
+        self.assertEqual(decoded, [created_at.isoformat(), '8000.50', 'E001'])
+
+    def test_ties_are_broken_by_primary_key(self):
+        from .pagination import KeysetPaginator
+
+        queryset = Employee.objects.order_by('-base_salary')
+        paginator = KeysetPaginator(queryset, page_size=4)
+        self.assertEqual(paginator.ordering, ['-base_salary', '-pk'])
+
+        expected = [employee.employee_id for employee in queryset.order_by('-base_salary', '-pk')]
+        pages, _, previous_cursor = self.walk(paginator)
+        self.assertEqual([len(page) for page in pages], [4, 4, 2])
+        self.assertEqual(sum(pages, []), expected)
+
+        # 从最后一页向前翻页得到相同的分页
+        backward, _, _ = self.walk(paginator, previous_cursor, forward=False)
+        self.assertEqual(backward, pages[-2::-1])
+
+    def test_invalid_cursor(self):
+        from rest_framework.exceptions import ValidationError
+        from .pagination import KeysetPaginator, encode_cursor
+
+        paginator = KeysetPaginator(Employee.objects.order_by('name'), page_size=5)
+        for cursor in ('not-base64!', encode_cursor(['员工1']), 'eyJ4IjoxfQ=='):
+            with self.assertRaises(ValidationError):
+                paginator.paginate(cursor)
+
+        response = self.client.get('/api/employees/', {'cursor': 'not-base64!'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CountStrategyTests(AdminAPITestCase):
+    """列表总数：精确计数缓存、关联模型写入后失效、大表估算"""
+
+    def setUp(self):
+        super().setUp()
+        self.employees = []
+        for index, department in enumerate(['技术部', '技术部', '市场部']):
+            employee = Employee.objects.create(
+                employee_id=f'E{index:03d}', name=f'员工{index}', gender='M', department=department,
+                position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+            )
+            SalaryRecord.objects.create(
+                employee=employee, salary_period='2025-06', position_snapshot='工程师',
+                base_salary_snapshot=Decimal('8000.00'), bonus=Decimal('0'), deductions=Decimal('0'),
+            )
+            self.employees.append(employee)
+
+    def count_salaries(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/salaries/', params)
+        self.assertEqual(response.status_code, 200)
+        count_queries = [q for q in context.captured_queries if 'COUNT(' in q['sql']]
+        return response.json()['data']['count'], len(count_queries)
+
+    def test_exact_count_is_cached(self):
+        self.assertEqual(self.count_salaries(department='技术部'), (2, 1))
+        self.assertEqual(self.count_salaries(department='技术部'), (2, 0))
+        # 不同筛选条件使用不同的缓存键
+        self.assertEqual(self.count_salaries(department='市场部'), (1, 1))
+
+    def test_joined_model_write_invalidates_count(self):
+        from .pagination import referenced_models
+
+        queryset = SalaryRecord.objects.filter(employee__department='技术部')
+        self.assertEqual(referenced_models(queryset.query), [Employee, SalaryRecord])
+        subquery = SalaryRecord.objects.filter(
+            employee_id__in=Employee.objects.filter(department_ref__name='技术部').values('id')
+        )
+        self.assertEqual(referenced_models(subquery.query), [Department, Employee, SalaryRecord])
+
+        self.assertEqual(self.count_salaries(department='技术部'), (2, 1))
+        employee = self.employees[2]
+        employee.department = '技术部'
+        employee.save()
+        self.assertEqual(self.count_salaries(department='技术部'), (3, 1))
+
+    def test_estimated_count_for_unfiltered_list(self):
+        from .pagination import CountStrategy
+
+        with patch.object(CountStrategy, 'estimate', return_value=250000) as estimate:
+            response = self.client.get('/api/salaries/', {'page': 5000, 'page_size': 20})
+            data = response.json()['data']
+            self.assertEqual((data['count'], data['count_is_exact']), (250000, False))
+            # 估算值不裁剪页码
+            self.assertEqual((data['current_page'], data['results']), (5000, []))
+
+            response = self.client.get('/api/salaries/', {'salary_period': '2025-06'})
+            data = response.json()['data']
+            self.assertEqual((data['count'], data['count_is_exact']), (3, True))
+        self.assertEqual(estimate.call_count, 1)
+
+        # 非 PostgreSQL 不估算
+        self.assertIsNone(CountStrategy(SalaryRecord.objects.all()).estimate())
+
+
+class EmployeeSearchTests(AdminAPITestCase):
+    """员工搜索：多字段筛选、三元组相似度与 pg_trgm 一致、相关度排序"""
+
+    def setUp(self):
+        super().setUp()
+        for employee_id, name, department, position in (
+            ('E001', 'Anna Lee', '技术部', 'Engineer'),
+            ('E002', 'Hannah Smith', '市场部', 'Manager'),
+            ('E003', 'Annabel Wu', '技术部', 'Analyst'),
+            ('E004', 'Bob 50%', '财务部', 'Accountant'),
+        ):
+            Employee.objects.create(
+                employee_id=employee_id, name=name, gender='F', department=department,
+                position=position, hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+            )
+
+    def test_trigram_similarity_matches_pg_trgm(self):
+        from .services.search_service import trigram_similarity, trigrams
+
+        self.assertEqual(trigrams('Cat'), {'  c', ' ca', 'cat', 'at '})
+        # pg_trgm 文档示例：similarity('word', 'two words') = 0.363636
+        self.assertAlmostEqual(trigram_similarity('word', 'two words'), 4 / 11)
+        self.assertEqual(trigram_similarity('anna', 'ANNA'), 1.0)
+        self.assertEqual(trigram_similarity('', 'anna'), 0.0)
+
+    def test_filter_matches_any_field(self):
+        from .services.search_service import EmployeeSearchBackend
+
+        backend = EmployeeSearchBackend()
+
+        def search(term):
+            return sorted(backend.filter(Employee.objects.all(), term).values_list('employee_id', flat=True))
+
+        self.assertEqual(search('ANNA'), ['E001', 'E002', 'E003'])
+        self.assertEqual(search('技术'), ['E001', 'E003'])
+        self.assertEqual(search('e004'), ['E004'])
+        # LIKE 通配符按字面匹配
+        self.assertEqual(search('50%'), ['E004'])
+        self.assertEqual(search('%'), ['E004'])
+
+    def test_results_are_ranked_by_similarity(self):
+        response = self.client.get('/api/employees/', {'search': 'anna'})
+        self.assertEqual(response.status_code, 200)
+        results = [row['employee_id'] for row in response.json()['results']]
+        self.assertEqual(results, ['E001', 'E003', 'E002'])
+
+        # 指定排序时不计算相关度
+        response = self.client.get('/api/employees/', {'search': 'anna', 'ordering': 'employee_id'})
+        self.assertEqual([row['employee_id'] for row in response.json()['results']], ['E001', 'E002', 'E003'])
+
+    def test_python_ranking_is_capped(self):
+        from .services.search_service import EmployeeSearchBackend
+
+        backend = EmployeeSearchBackend()
+        with patch.object(EmployeeSearchBackend, 'PYTHON_RANK_LIMIT', 2):
+            queryset = backend.search(Employee.objects.all(), 'anna')
+            self.assertNotIn('CASE', str(queryset.query))
+            self.assertEqual({employee.search_rank for employee in queryset}, {0.0})
+
+        queryset = backend.search(Employee.objects.all(), 'anna')
+        self.assertIn('CASE', str(queryset.query))
+
+
+class DashboardSnapshotTests(AdminAPITestCase):
+    """仪表盘快照：写入后标记过期，过期快照只由取得刷新锁的请求重算"""
+
+    def setUp(self):
+        super().setUp()
+        self.create_employee('E001')
+        # 汇总接口读取只读副本，这里只验证快照逻辑，统一读取主库
+        replica = patch('api.db_router.replica_configured', return_value=False)
+        replica.start()
+        self.addCleanup(replica.stop)
+
+    def create_employee(self, employee_id):
+        return Employee.objects.create(
+            employee_id=employee_id, name='员工', gender='M', department='技术部', position='工程师',
+            hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'), status='active',
+        )
+
+    def summary(self):
+        response = self.client.get('/api/dashboard/summary-stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_snapshot_is_reused_until_marked_stale(self):
+        from .models import DashboardSnapshot
+
+        self.assertEqual(self.summary()['totalEmployees'], 1)
+        with CaptureQueriesContext(connection) as context:
+            self.summary()
+        self.assertFalse(any('api_employee' in q['sql'] for q in context.captured_queries))
+
+        self.create_employee('E002')
+        self.assertTrue(DashboardSnapshot.objects.get().is_stale)
+        self.assertEqual(self.summary()['totalEmployees'], 2)
+        self.assertFalse(DashboardSnapshot.objects.get().is_stale)
+
+    def test_stale_snapshot_is_served_while_refresh_lock_is_held(self):
+        from .services.dashboard_service import DashboardStatsService
+
+        service = DashboardStatsService()
+        service.refresh_snapshot()
+        self.create_employee('E002')
+
+        lock_key = f'dashboard_snapshot_refresh:{service.SUMMARY_KEY}'
+        cache.add(lock_key, 1)
+        with patch.object(DashboardStatsService, 'compute_summary') as compute:
+            snapshot = service.get_summary_snapshot()
+        compute.assert_not_called()
+        self.assertEqual(snapshot.data['totalEmployees'], 1)
+        self.assertTrue(snapshot.is_stale)
+
+        cache.delete(lock_key)
+        snapshot = service.get_summary_snapshot()
+        self.assertEqual(snapshot.data['totalEmployees'], 2)
+        # 刷新后释放锁
+        self.assertIsNone(cache.get(lock_key))
+
+    def test_refresh_command_if_stale(self):
+        from django.core.management import call_command
+
+        self.summary()
+        output = io.StringIO()
+        call_command('refresh_dashboard_snapshot', '--if-stale', stdout=output)
+        self.assertIn('跳过', output.getvalue())
+
+        self.create_employee('E002')
+        call_command('refresh_dashboard_snapshot', '--if-stale', stdout=output)
+        self.assertEqual(self.summary()['totalEmployees'], 2)
+
+
+class ResponseCacheTests(AdminAPITestCase):
+    """接口响应缓存：命中 / 未命中、ETag 与 304、模型写入后失效"""
+
+    def setUp(self):
+        from .cache import cache_stats
+
+        super().setUp()
+        cache_stats.reset()
+        replica = patch('api.db_router.replica_configured', return_value=False)
+        replica.start()
+        self.addCleanup(replica.stop)
+        self.employee = Employee.objects.create(
+            employee_id='E001', name='张三', gender='M', department='技术部', position='工程师',
+            hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+        )
+
+    def create_salary(self, period):
+        SalaryRecord.objects.create(
+            employee=self.employee, salary_period=period, position_snapshot='工程师',
+            base_salary_snapshot=Decimal('8000.00'), bonus=Decimal('0'), deductions=Decimal('0'),
+        )
+
+    def test_hit_miss_and_invalidation(self):
+        from .cache import cache_stats
+
+        self.create_salary('2025-05')
+        first = self.client.get('/api/salaries/stats/')
+        self.assertEqual((first.status_code, first['X-Cache']), (200, 'MISS'))
+        self.assertEqual(first.json()['data']['totalRecords'], 1)
+
+        with CaptureQueriesContext(connection) as context:
+            second = self.client.get('/api/salaries/stats/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertFalse(any('api_salaryrecord' in q['sql'] for q in context.captured_queries))
+
+        # 依赖的模型写入后版本号变化，缓存失效
+        self.create_salary('2025-06')
+        third = self.client.get('/api/salaries/stats/')
+        self.assertEqual(third['X-Cache'], 'MISS')
+        self.assertEqual(third.json()['data']['totalRecords'], 2)
+        self.assertNotEqual(third['ETag'], first['ETag'])
+
+        stats = cache_stats.snapshot()['salary_stats']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get('/api/salaries/stats/')['ETag']
+
+        response = self.client.get('/api/salaries/stats/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get('/api/salaries/stats/', HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual((response.status_code, response['X-Cache']), (200, 'HIT'))
+
+    def test_query_string_and_disabled_endpoint(self):
+        self.client.get('/api/salaries/stats/')
+        self.assertEqual(self.client.get('/api/salaries/stats/', {'x': 1})['X-Cache'], 'MISS')
+
+        config = {**settings.API_RESPONSE_CACHE, 'ENDPOINTS': {'salary_stats': {'enabled': False}}}
+        with override_settings(API_RESPONSE_CACHE=config):
+            response = self.client.get('/api/salaries/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('X-Cache'))
+
+
+def read_xlsx_rows(content):
+    """解析导出的 XLSX，返回工作表各行的单元格取值（数值为字符串，空单元格为 None）"""
+    import zipfile
+    from xml.etree import ElementTree
+
+    namespace = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        ElementTree.fromstring(archive.read('[Content_Types].xml'))
+        workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+        assert workbook.find('s:sheets/s:sheet', namespace) is not None
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+
+    rows = []
+    for row in sheet.iterfind('s:sheetData/s:row', namespace):
+        values = []
+        for cell in row.iterfind('s:c', namespace):
+            if cell.get('t') == 'inlineStr':
+                values.append(cell.find('s:is/s:t', namespace).text or '')
+            else:
+                value = cell.find('s:v', namespace)
+                values.append(None if value is None else value.text)
+        rows.append(values)
+    return rows
+
+
+class SalaryExportTests(AdminAPITestCase):
+    """薪资导出：CSV / XLSX 写入器、gzip 流式压缩和导出接口"""
+
+    ROWS = [
+        ('张三', 'E001', '技术部', '2025-06', '工程师, "高级"', Decimal('8000.00'), 12, None, '', '2025-06-30'),
+        ('<李四>&', 'E002', '市场部', '2025-06', '多行\n职位\x01', Decimal('7000.50'), 1.5, 0, '0', '2025-06-30'),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        replica = patch('api.db_router.replica_configured', return_value=False)
+        replica.start()
+        self.addCleanup(replica.stop)
+
+    def stream(self, export_format, rows, **kwargs):
+        from .services.export_service import SalaryExportService
+
+        chunks, writer = SalaryExportService().stream(export_format, rows=iter(rows), **kwargs)
+        return list(chunks), writer
+
+    def test_csv_writer_round_trip(self):
+        import csv
+        from .services.export_service import SalaryExportService
+
+        with patch('api.services.export_service.FLUSH_THRESHOLD', 16):
+            chunks, writer = self.stream('csv', self.ROWS * 3)
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(writer.extension, 'csv')
+
+        text = b''.join(chunks).decode('utf-8')
+        self.assertTrue(text.startswith('\ufeff'))
+        rows = list(csv.reader(io.StringIO(text[1:])))
+        self.assertEqual(rows[0], SalaryExportService.HEADERS)
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[1][4], '工程师, "高级"')
+        self.assertEqual(rows[2][4], '多行\n职位\x01')
+        self.assertEqual(rows[1][5:9], ['8000.00', '12', '', ''])
+
+    def test_xlsx_writer_round_trip(self):
+        from .services.export_service import SalaryExportService
+
+        with patch('api.services.export_service.FLUSH_THRESHOLD', 64):
+            chunks, writer = self.stream('xlsx', self.ROWS * 50)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(writer.extension, 'xlsx')
+
+        rows = read_xlsx_rows(b''.join(chunks))
+        self.assertEqual(len(rows), 101)
+        self.assertEqual(rows[0], SalaryExportService.HEADERS)
+        self.assertEqual(
+            rows[1], ['张三', 'E001', '技术部', '2025-06', '工程师, "高级"', '8000.00', '12', None, None, '2025-06-30'],
+        )
+        # XML 特殊字符转义，非法控制字符被移除；数值写为数字单元格
+        self.assertEqual(rows[2][:1] + rows[2][4:9], ['<李四>&', '多行\n职位', '7000.50', '1.5', '0', '0'])
+
+    def test_gzip_stream(self):
+        import gzip
+
+        plain, _ = self.stream('csv', self.ROWS)
+        compressed, _ = self.stream('csv', self.ROWS, compress=True)
+        self.assertEqual(gzip.decompress(b''.join(compressed)), b''.join(plain))
+
+    def test_export_view(self):
+        import csv
+        import gzip
+
+        for employee_id, department in (('E001', '技术部'), ('E002', '市场部')):
+            employee = Employee.objects.create(
+                employee_id=employee_id, name=employee_id, gender='M', department=department,
+                position='工程师', hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+            )
+            SalaryRecord.objects.create(
+                employee=employee, salary_period='2025-06', position_snapshot='工程师',
+                base_salary_snapshot=Decimal('8000.00'), bonus=Decimal('100'), deductions=Decimal('0'),
+            )
+
+        response = self.client.get('/api/salaries/export/', {'department': '技术部', 'gzip': 'true'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('.csv"', response['Content-Disposition'])
+        text = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual([row[1] for row in rows[1:]], ['E001'])
+        self.assertEqual(rows[1][6:10], ['8100.00', '100.00', '0.00', '8100.00'])
+        self.assertEqual(rows[0][10:14], ['部门奖金', '考勤扣款', '社保公积金', '个人所得税'])
+        self.assertEqual(rows[1][10:14], ['0.00'] * 4)
+
+        response = self.client.get('/api/salaries/export/', {'export_format': 'xlsx'})
+        self.assertTrue(response['Content-Type'].startswith('application/vnd.openxmlformats'))
+        rows = read_xlsx_rows(b''.join(response.streaming_content))
+        self.assertEqual(sorted(row[1] for row in rows[1:]), ['E001', 'E002'])
+
+        response = self.client.get('/api/salaries/export/', {'export_format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AttendanceIngestTests(AdminAPITestCase):
+    """考勤导入：NDJSON / CSV 解析、按 (员工, 日期) upsert、逐行错误报告"""
+
+    def setUp(self):
+        super().setUp()
+        self.employee = Employee.objects.create(
+            employee_id='E001', name='张三', gender='M', department='技术部', position='工程师',
+            hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+        )
+
+    def ingest(self, body, content_type='application/x-ndjson', **params):
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        response = self.client.post(
+            f'/api/attendance/ingest/?{query}', data=body.encode('utf-8'), content_type=content_type,
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def record(self, day):
+        return AttendanceRecord.objects.get(employee=self.employee, date=date(2025, 6, day))
+
+    def test_ndjson_merges_punches_and_reports_errors(self):
+        body = '\n'.join([
+            '{"employee_id": "E001", "date": "2025-06-02", "event": "check_in", "time": "08:55"}',
+            '',
+            '{"employee_id": "E001", "date": "2025-06-02", "event": "check_out", "time": "19:30"}',
+            '{"employee_id": "E001", "date": "2025-06-02", "event": "check_in", "time": "09:10"}',
+            'not json',
+            '{"employee_id": "E999", "date": "2025-06-02", "event": "check_in", "time": "09:00"}',
+            '{"employee_id": "E001", "date": "2025-06-31", "event": "check_in", "time": "09:00"}',
+            '{"employee_id": "E001", "date": "2025-06-03", "status": "holiday"}',
+        ])
+        result = self.ingest(body)
+
+        self.assertEqual((result['received'], result['upserted'], result['failed']), (7, 1, 4))
+        # 行号为文件中的实际行（含空行）
+        self.assertEqual(
+            [(error['line'], error['error'].split(':')[0]) for error in result['errors']],
+            [(5, '无效的 JSON'), (7, '无效的日期'), (8, '无效的考勤状态'), (6, '员工不存在')],
+        )
+        record = self.record(2)
+        self.assertEqual((record.check_in_time, record.check_out_time), (time_of('08:55'), time_of('19:30')))
+        self.assertEqual((record.status, record.work_hours, record.overtime_hours), ('overtime', Decimal('9.58'), Decimal('1.50')))
+
+    def test_csv_upsert_merges_with_existing_record(self):
+        self.ingest('employee_id,date,check_in_time\nE001,2025-06-02,09:45\n', content_type='text/csv')
+        self.assertEqual(self.record(2).status, 'late')
+
+        result = self.ingest(
+            'employee_id,date,check_out_time,status\nE001,2025-06-02,18:05,\nE001,2025-06-03,,annual_leave\n'
+            'E001,2025-06-04,25:00,\n',
+            content_type='text/csv', batch_size=1,
+        )
+        self.assertEqual((result['upserted'], result['failed'], result['batches']), (2, 1, 2))
+        self.assertEqual(result['errors'], [{'line': 4, 'error': '无效的时间: 25:00'}])
+        self.assertEqual(AttendanceRecord.objects.count(), 2)
+        record = self.record(2)
+        self.assertEqual((record.check_in_time, record.check_out_time), (time_of('09:45'), time_of('18:05')))
+        self.assertEqual((record.status, record.work_hours), ('late', Decimal('7.33')))
+        self.assertEqual(self.record(3).status, 'annual_leave')
+
+    def test_reingest_keeps_stored_explicit_status(self):
+        AttendanceRecord.objects.create(employee=self.employee, date=date(2025, 6, 2), status='sick_leave')
+        AttendanceRecord.objects.create(employee=self.employee, date=date(2025, 6, 3), status='absent')
+
+        self.ingest('\n'.join([
+            '{"employee_id": "E001", "date": "2025-06-02", "check_in_time": "09:00", "check_out_time": "12:00"}',
+            '{"employee_id": "E001", "date": "2025-06-03", "check_in_time": "09:00", "check_out_time": "18:00"}',
+        ]))
+        self.assertEqual(self.record(2).status, 'sick_leave')
+        self.assertEqual(self.record(2).check_out_time, time_of('12:00'))
+        # 缺勤记录出现打卡后按打卡时间重新计算
+        self.assertEqual(self.record(3).status, 'present')
+
+        # 显式给出的状态覆盖已有状态
+        self.ingest('{"employee_id": "E001", "date": "2025-06-02", "status": "personal_leave"}')
+        self.assertEqual(self.record(2).status, 'personal_leave')
+
+    def test_json_array_and_unsupported_format(self):
+        result = self.ingest(
+            '[{"employee_id": "E001", "date": "2025-06-02", "status": "personal_leave"}]',
+            content_type='application/json',
+        )
+        self.assertEqual(result['upserted'], 1)
+        self.assertEqual(self.record(2).status, 'personal_leave')
+
+        response = self.client.post('/api/attendance/ingest/?input_format=xml', data=b'', content_type='text/xml')
+        self.assertEqual(response.status_code, 400)
+
+
+def time_of(value):
+    from datetime import datetime as dt
+
+    return dt.strptime(value, '%H:%M').time()
+
+
+class AttendanceRollupTests(AdminAPITestCase):
+    """考勤汇总：单条写入 / 批量导入按差值维护，与全量重建和原始记录聚合结果一致"""
+
+    def setUp(self):
+        super().setUp()
+        self.tech = Employee.objects.create(
+            employee_id='E001', name='张三', gender='M', department='技术部', position='工程师',
+            hire_date=date(2020, 1, 1), base_salary=Decimal('8000.00'),
+        )
+        self.sales = Employee.objects.create(
+            employee_id='E002', name='李四', gender='F', department='销售部', position='销售',
+            hire_date=date(2020, 1, 1), base_salary=Decimal('6000.00'),
+        )
+
+    def snapshot(self):
+        from .models import AttendanceDailyRollup, AttendanceDepartmentDailyRollup
+        from .services.attendance_rollup_service import ROLLUP_FIELDS
+
+        return (
+            list(AttendanceDailyRollup.objects.order_by('date').values_list('date', *ROLLUP_FIELDS)),
+            list(AttendanceDepartmentDailyRollup.objects.order_by('date', 'department')
+                 .values_list('date', 'department', *ROLLUP_FIELDS)),
+        )
+
+    def assertMatchesRebuild(self):
+        from .services.attendance_rollup_service import AttendanceRollupService
+
+        incremental = self.snapshot()
+        AttendanceRollupService().rebuild()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_saves_and_deletes_apply_deltas(self):
+        first = AttendanceRecord.objects.create(
+            employee=self.tech, date=date(2025, 6, 2), check_in_time=time_of('08:55'),
+            check_out_time=time_of('18:00'), status='present', work_hours=Decimal('8.08'),
+        )
+        AttendanceRecord.objects.create(employee=self.sales, date=date(2025, 6, 2), status='sick_leave')
+        late = AttendanceRecord.objects.create(
+            employee=self.sales, date=date(2025, 6, 3), status='late', work_hours=Decimal('7.50'),
+        )
+        self.assertMatchesRebuild()
+
+        first.status = 'overtime'
+        first.overtime_hours = Decimal('2.00')
+        first.save()
+        self.assertMatchesRebuild()
+
+        # 修改日期：旧日期减去、新日期加上，旧日期的部门行清空后删除
+        first.date = date(2025, 6, 4)
+        first.save()
+        self.assertMatchesRebuild()
+        daily, departments = self.snapshot()
+        self.assertEqual([row[0] for row in daily], [date(2025, 6, 2), date(2025, 6, 3), date(2025, 6, 4)])
+        self.assertNotIn((date(2025, 6, 2), '技术部'), [row[:2] for row in departments])
+
+        late.delete()
+        self.assertMatchesRebuild()
+        self.assertNotIn(date(2025, 6, 3), [row[0] for row in self.snapshot()[0]])
+
+    def test_department_change_moves_rollups(self):
+        record = AttendanceRecord.objects.create(
+            employee=self.tech, date=date(2025, 6, 2), status='late', work_hours=Decimal('7.50'),
+        )
+        AttendanceRecord.objects.create(employee=self.tech, date=date(2025, 6, 3), status='present')
+        AttendanceRecord.objects.create(employee=self.sales, date=date(2025, 6, 2), status='present')
+
+        sales = Department.objects.create(name='销售部', code='SALES')
+        response = self.client.patch(f'/api/employees/{self.tech.id}/', {'department_ref': str(sales.id)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRebuild()
+        departments = self.snapshot()[1]
+        self.assertEqual({row[1] for row in departments}, {'销售部'})
+        self.assertEqual([row[2] for row in departments if row[0] == date(2025, 6, 2)], [2])
+
+        # 调整部门后修改旧记录，差值计入新部门
+        record.status = 'present'
+        record.save()
+        self.assertMatchesRebuild()
+
+    def test_single_save_does_not_scan_the_day(self):
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(employee=employee, date=date(2025, 6, day), status='present')
+            for employee in (self.tech, self.sales) for day in range(1, 4)
+        ])
+        from .services.attendance_rollup_service import AttendanceRollupService
+        AttendanceRollupService().rebuild()
+
+        record = AttendanceRecord.objects.get(employee=self.tech, date=date(2025, 6, 2))
+        record.status = 'late'
+        with CaptureQueriesContext(connection) as queries:
+            record.save()
+        rollup_queries = [q['sql'] for q in queries.captured_queries if 'rollup' in q['sql']]
+        self.assertTrue(rollup_queries)
+        # 只有按差值的 UPDATE，不再读取当天的原始记录重新聚合
+        self.assertTrue(all(sql.startswith('UPDATE') for sql in rollup_queries))
+        self.assertFalse([q for q in queries.captured_queries if 'GROUP BY' in q['sql']])
+        self.assertMatchesRebuild()
+
+    def test_out_of_sync_rollup_falls_back_to_refresh(self):
+        from .models import AttendanceDailyRollup
+
+        record = AttendanceRecord.objects.create(employee=self.tech, date=date(2025, 6, 2), status='present')
+        AttendanceDailyRollup.objects.all().delete()
+        with self.assertLogs('api.services.attendance_rollup_service', 'WARNING'):
+            record.delete()
+        self.assertMatchesRebuild()
+
+    def test_ingest_batches_apply_deltas(self):
+        from .services.attendance_service import AttendanceIngestService, parse_ndjson
+
+        AttendanceRecord.objects.create(employee=self.tech, date=date(2025, 6, 2), status='annual_leave')
+        lines = [
+            '{"employee_id": "E001", "date": "2025-06-02", "event": "check_in", "time": "09:00"}',
+            '{"employee_id": "E002", "date": "2025-06-02", "check_in_time": "09:30", "check_out_time": "18:00"}',
+            '{"employee_id": "E002", "date": "2025-06-03", "check_in_time": "08:50", "check_out_time": "20:00"}',
+        ]
+        result = AttendanceIngestService(batch_size=2).ingest(parse_ndjson(lines))
+        self.assertEqual(result['upserted'], 3)
+        self.assertMatchesRebuild()
+
+        AttendanceIngestService().ingest(parse_ndjson([
+            '{"employee_id": "E002", "date": "2025-06-03", "status": "personal_leave"}',
+        ]))
+        self.assertMatchesRebuild()
+
+    def test_trends_match_raw_aggregation(self):
+        from django.db.models.functions import TruncMonth
+        from .services.attendance_rollup_service import AttendanceRollupService, rollup_aggregates
+
+        statuses = ['present', 'late', 'absent', 'overtime', 'sick_leave', 'early_leave']
+        for day in range(1, 13):
+            for index, employee in enumerate((self.tech, self.sales)):
+                AttendanceRecord.objects.create(
+                    employee=employee, date=date(2025, 5 + day // 7, day), status=statuses[(day + index) % 6],
+                    work_hours=Decimal('7.25') + index, overtime_hours=Decimal(day % 3),
+                )
+        service = AttendanceRollupService()
+        start, end = date(2025, 5, 1), date(2025, 6, 30)
+
+        raw = {
+            row['month'].strftime('%Y-%m'): service.build_point(row['month'].strftime('%Y-%m'), row)
+            for row in AttendanceRecord.objects.filter(date__range=(start, end), employee__department='技术部')
+            .annotate(month=TruncMonth('date')).values('month').annotate(**rollup_aggregates()).order_by()
+        }
+        trends = service.get_trends(start, end, department='技术部', group_by='month')
+        self.assertEqual(trends, [raw[point['date']] for point in trends])
+        self.assertEqual(len(trends), 2)
+
+        daily = service.get_trends(start, end)
+        self.assertEqual(len(daily), 61)
+        self.assertEqual(sum(point['total_count'] for point in daily), 24)
+
+    def test_rebuild_command(self):
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import AttendanceDailyRollup
+
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(employee=self.tech, date=date(2025, 6, day), status='present') for day in range(1, 4)
+        ])
+        AttendanceDailyRollup.objects.create(date=date(2025, 5, 1), total_count=3)
+        self.assertEqual(AttendanceDailyRollup.objects.count(), 1)
+
+        out = StringIO()
+        call_command('rebuild_attendance_rollups', '--start', '2025-05-01', stdout=out)
+        self.assertIn('4 天', out.getvalue())
+        self.assertEqual(
+            list(AttendanceDailyRollup.objects.order_by('date').values_list('date', 'total_count')),
+            [(date(2025, 6, day), 1) for day in range(1, 4)],
+        )
+
+
+class ProductionSettingsTests(TestCase):
+    """生产配置：由环境变量构建数据库配置，配置副本时注册读写路由"""
+
+    def load(self, **env):
+        import importlib
+        import os
+
+        with patch.dict(os.environ, env, clear=False):
+            for name in [name for name in os.environ if name.startswith('DB_') and name not in env]:
+                del os.environ[name]
+            import core.settings_production as module
+            return importlib.reload(module)
+
+    def test_persistent_connections_by_default(self):
+        production = self.load(DB_NAME='hr', DB_HOST='db.internal')
+        default = production.DATABASES['default']
+        self.assertEqual((default['NAME'], default['HOST']), ('hr', 'db.internal'))
+        self.assertEqual((default['CONN_MAX_AGE'], default['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertEqual(default['OPTIONS'], {'connect_timeout': 5})
+        self.assertNotIn('replica', production.DATABASES)
+        self.assertFalse(production.DEBUG)
+
+    def test_environment_overrides(self):
+        production = self.load(DB_CONN_MAX_AGE='300', DB_CONN_HEALTH_CHECKS='false', DB_CONNECT_TIMEOUT='2')
+        default = production.DATABASES['default']
+        self.assertEqual((default['CONN_MAX_AGE'], default['CONN_HEALTH_CHECKS']), (300, False))
+        self.assertEqual(default['OPTIONS']['connect_timeout'], 2)
+
+    def test_replica_inherits_primary_settings(self):
+        production = self.load(DB_NAME='hr', DB_REPLICA_HOST='replica.internal')
+        replica = production.DATABASES['replica']
+        self.assertEqual((replica['NAME'], replica['HOST']), ('hr', 'replica.internal'))
+        self.assertEqual(replica['TEST'], {'MIRROR': 'default'})
+        self.assertEqual(production.DATABASE_ROUTERS, ['api.db_router.ReadReplicaRouter'])
+
+    def test_pool_mode_disables_persistent_connections(self):
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            self.skipTest('未安装 psycopg_pool')
+        production = self.load(DB_POOL='true', DB_POOL_MAX_SIZE='20')
+        default = production.DATABASES['default']
+        self.assertEqual(default['CONN_MAX_AGE'], 0)
+        self.assertEqual(default['OPTIONS']['pool']['max_size'], 20)
+
+
+class ReadReplicaRouterTests(TestCase):
+    """数据库路由：只有 read_from_replica() 内的读查询使用副本，写入始终使用主库"""
+
+    def test_routes_reads_only_inside_context(self):
+        from .db_router import ReadReplicaRouter, read_from_replica
+
+        router = ReadReplicaRouter()
+        with patch('api.db_router.replica_configured', return_value=True):
+            self.assertIsNone(router.db_for_read(Employee))
+            with read_from_replica():
+                self.assertEqual(router.db_for_read(Employee), REPLICA_ALIAS)
+                self.assertEqual(router.db_for_write(Employee), 'default')
+            self.assertIsNone(router.db_for_read(Employee))
+
+        with patch('api.db_router.replica_configured', return_value=False), read_from_replica():
+            self.assertIsNone(router.db_for_read(Employee))
+
+    def test_replica_is_not_migrated(self):
+        from .db_router import ReadReplicaRouter
+
+        router = ReadReplicaRouter()
+        with self.settings(REPLICA_ALLOW_MIGRATE=False):
+            self.assertTrue(router.allow_migrate('default', 'api'))
+            self.assertFalse(router.allow_migrate(REPLICA_ALIAS, 'api'))
+        with self.settings(REPLICA_ALLOW_MIGRATE=True):
+            self.assertTrue(router.allow_migrate(REPLICA_ALIAS, 'api'))
+
+    def test_replica_read_skips_pinned_users(self):
+        from .db_router import pin_to_primary, should_use_replica
+
+        cache.clear()
+        user = User.objects.create_user('staff', 'staff@example.com', 'staff123')
+        request = type('Request', (), {'user': user})()
+        with patch('api.db_router.replica_configured', return_value=True):
+            self.assertTrue(should_use_replica(request))
+            pin_to_primary(user)
+            self.assertFalse(should_use_replica(request))
+
+
+class BenchmarkTokenTests(TestCase):
+    """基准测试命令使用的临时管理员账号在结束或出错时删除"""
+
+    def test_user_and_token_removed(self):
+        from .management.commands.benchmark_load import benchmark_token
+
+        with benchmark_token() as key:
+            token = Token.objects.select_related('user').get(key=key)
+            self.assertTrue(token.user.is_superuser)
+            self.assertFalse(token.user.has_usable_password())
+        self.assertFalse(User.objects.filter(pk=token.user.pk).exists())
+        self.assertFalse(Token.objects.filter(key=key).exists())
+
+        with self.assertRaises(RuntimeError), benchmark_token():
+            raise RuntimeError
+        self.assertFalse(User.objects.exists())
+
+
+class ParsingTests(TestCase):
+    """导入共用的日期、时间和 choices 取值解析"""
+
+    def test_parse_date(self):
+        from datetime import datetime
+        from .parsing import ParseError, parse_date
+
+        self.assertEqual(parse_date('2025-06-01'), date(2025, 6, 1))
+        self.assertEqual(parse_date(' 2025/6/1 '), date(2025, 6, 1))
+        self.assertEqual(parse_date(datetime(2025, 6, 1, 8, 30)), date(2025, 6, 1))
+        self.assertEqual(parse_date('45809', excel_serial=True), date(2025, 6, 1))
+        for value in ('45809', '2025-06-31', '', None):
+            with self.assertRaisesMessage(ParseError, '无效的日期'):
+                parse_date(value)
+
+    def test_parse_time_and_choice_aliases(self):
+        from .parsing import ParseError, choice_aliases, parse_time
+
+        self.assertEqual(parse_time('08:05'), time_of('08:05'))
+        self.assertEqual(parse_time('18:00:30').second, 30)
+        with self.assertRaisesMessage(ParseError, '无效的时间: 25:00'):
+            parse_time('25:00')
+
+        aliases = choice_aliases(Employee._meta.get_field('gender'))
+        self.assertEqual((aliases['M'], aliases['男']), ('M', 'M'))
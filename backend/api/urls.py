@@ -2,7 +2,9 @@ from django.urls import path
 from django.http import JsonResponse
 from . import views
 from . import auth_views
+from .cache import cache_response
 
+@cache_response('api_info')
 def api_info(request):
     """API信息视图"""
     return JsonResponse({
@@ -22,6 +24,10 @@ def api_info(request):
                 'summary_stats': '/api/dashboard/summary-stats/',
                 'department_distribution': '/api/dashboard/department-distribution/'
             },
+            'monitoring': {
+                'cache_stats': '/api/cache/stats/',
+                'metrics': '/api/metrics/'
+            },
             'departments': {
                 'list': '/api/departments/',
                 'detail': '/api/departments/{id}/',
@@ -32,6 +38,7 @@ def api_info(request):
             'employees': {
                 'list': '/api/employees/',
                 'detail': '/api/employees/{id}/',
+                'import': '/api/employees/import/',
                 'salary_history': '/api/employees/{employee_id}/salary/'
             },
             'salaries': {
@@ -40,7 +47,13 @@ def api_info(request):
                 'calculate': '/api/salaries/calculate_and_create/',
                 'print': '/api/salaries/{record_id}/print_view/',
                 'stats': '/api/salaries/stats/',
-                'export': '/api/salaries/export/'
+                'export': '/api/salaries/export/',
+                'generate': '/api/salaries/generate/',
+                'job': '/api/salaries/jobs/{job_id}/'
+            },
+            'attendance': {
+                'ingest': '/api/attendance/ingest/',
+                'trends': '/api/attendance/trends/'
             }
         }
     })
@@ -61,12 +74,17 @@ urlpatterns = [
     path('dashboard/summary-stats/', views.dashboard_summary_stats, name='dashboard_summary_stats'),
     path('dashboard/department-distribution/', views.dashboard_department_distribution, name='dashboard_department_distribution'),
     
+    # 监控
+    path('cache/stats/', views.cache_stats_view, name='cache_stats'),
+    path('metrics/', views.metrics_view, name='metrics'),
+    
     # 部门管理
     path('departments/', views.DepartmentListCreateView.as_view(), name='department_list_create'),
     path('departments/<uuid:pk>/', views.DepartmentDetailView.as_view(), name='department_detail'),
     
     # 员工管理
     path('employees/', views.EmployeeListCreateView.as_view(), name='employee_list_create'),
+    path('employees/import/', views.employee_import_view, name='employee_import'),
     path('employees/<uuid:id>/', views.EmployeeDetailView.as_view(), name='employee_detail'),
     path('employees/<str:employee_id>/salary/', views.employee_salary_history_view, name='employee_salary_history'),
     
@@ -79,6 +97,11 @@ urlpatterns = [
     path('salaries/export/', views.salary_export_view, name='salary_export'),
     path('salaries/generate/', views.generate_salaries_view, name='generate_salaries'),
     path('salaries/calculate/<uuid:employee_id>/', views.calculate_salary_by_employee_view, name='calculate_salary_by_employee'),
+    path('salaries/jobs/<uuid:job_id>/', views.payroll_job_detail_view, name='payroll_job_detail'),
+
+    # 考勤管理
+    path('attendance/ingest/', views.attendance_ingest_view, name='attendance_ingest'),
+    path('attendance/trends/', views.attendance_trends_view, name='attendance_trends'),
     
     # # RAG知识库管理
     # path('knowledge/documents/', views.KnowledgeDocumentListCreateView.as_view(), name='knowledge_document_list_create'),
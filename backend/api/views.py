@@ -31,17 +31,18 @@ from rest_framework.authtoken.models import Token
 from rest_framework.views import APIView
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.db.models import Q
 from django.core.paginator import Paginator
 from decimal import Decimal
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 import json
 import time
 from datetime import datetime
 import re
 
-from .models import Department, Employee, SalaryRecord, AttendanceRecord
+from .models import Department, Employee, SalaryRecord, AttendanceRecord, PayrollJob
 # KnowledgeDocument, ChatSession, ChatMessage (RAG 功能暂时注释)
 from .serializers import (
     DepartmentSerializer, EmployeeSerializer, SalaryRecordSerializer, 
@@ -51,6 +52,21 @@ from .serializers import (
     # ChatRequestSerializer, DocumentSearchSerializer
 )
 from .permissions import IsAdminOrReadOnly, IsAdminUser, IsSalaryOwnerOrAdmin
+from .roles import is_admin
+from .db_router import replica_read
+from .authentication import obtain_token, revoke_token
+from .pagination import ListPaginationMixin
+from .projections import SparseFieldsMixin
+from .cache import cache_response, cache_stats
+from .metrics import request_metrics, PROMETHEUS_CONTENT_TYPE
+from .services.payroll_service import PayrollGenerator
+from .services.payroll_rules_service import PayrollEngine, RESULT_COLUMNS, BREAKDOWN_COLUMNS
+from .services.search_service import EmployeeSearchBackend
+from .services.dashboard_service import DashboardStatsService
+from .services.export_service import SalaryExportService, EXPORT_WRITERS
+from .services.attendance_service import AttendanceIngestService, read_events, INPUT_FORMATS as ATTENDANCE_INPUT_FORMATS
+from .services.attendance_rollup_service import AttendanceRollupService
+from .services.employee_import_service import EmployeeImportService, EmployeeImportError
 # from .services.vector_service import VectorService
 # from .services.document_service import DocumentProcessor
 # from .services.llm_service import LLMService
@@ -77,8 +93,8 @@ class CustomAuthToken(ObtainAuthToken):
             # 使用 Django 内置的认证系统验证用户
             user = authenticate(username=username, password=password)
             if user:
-                # 获取或创建用户的 Token
-                token, created = Token.objects.get_or_create(user=user)
+                # 获取用户的 Token（过期则换发），并写入认证缓存
+                token = obtain_token(user)
                 return Response({
                     'token': token.key,
                     'user': UserSerializer(user).data
@@ -101,7 +117,7 @@ def logout_view(request):
     - 确保用户再次访问需要重新认证
     """
     try:
-        request.user.auth_token.delete()
+        revoke_token(request.user)
         return Response({'message': '登出成功'})
     except:
         return Response({'error': '登出失败'}, status=status.HTTP_400_BAD_REQUEST)
@@ -122,7 +138,25 @@ def current_user_view(request):
 
 # ==================== 员工管理视图 ====================
 
-class EmployeeListCreateView(generics.ListCreateAPIView):
+class BulkCreateMixin:
+    """
+    创建接口支持批量提交：请求体为数组时使用 many=True
+    
+    唯一性和关联字段由 BatchUniqueListSerializer 整批校验（查询次数与数量无关）；
+    写入仍逐个调用 save()，保留模型 save() 中的同步逻辑和信号，整批在同一事务中提交
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if isinstance(kwargs.get('data'), list):
+            kwargs['many'] = True
+        return super().get_serializer(*args, **kwargs)
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            serializer.save()
+
+
+class EmployeeListCreateView(BulkCreateMixin, SparseFieldsMixin, ListPaginationMixin, generics.ListCreateAPIView):
     """
     员工列表和创建视图
     
@@ -141,7 +175,7 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
         
         设计思路：
         - 根据查询参数动态构建 QuerySet
-        - 支持多字段搜索（姓名、工号、部门、职位）
+        - 支持多字段搜索（姓名、工号、部门、职位），按相关度排序
         - 支持多维度筛选（部门、职位、状态）
         - 支持自定义排序
         """
@@ -152,16 +186,6 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
         else:
             queryset = Employee.objects.filter(status='active')
         
-        # 搜索功能 - 支持多字段模糊匹配
-        search = self.request.query_params.get('search', None)
-        if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(employee_id__icontains=search) |
-                Q(department__icontains=search) |
-                Q(position__icontains=search)
-            )
-        
         # 筛选功能 - 精确匹配
         department = self.request.query_params.get('department', None)
         if department:
@@ -175,10 +199,19 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
         if status:
             queryset = queryset.filter(status=status)
         
+        ordering = self.request.query_params.get('ordering', None)
+        
+        # 搜索功能 - 多字段模糊匹配（PostgreSQL 使用 trigram 索引）
+        # 未指定排序时按相关度排序
+        search = self.request.query_params.get('search', None)
+        if search:
+            queryset = EmployeeSearchBackend().search(queryset, search, ordered=not ordering)
+        
         # 排序功能 - 默认按创建时间倒序
-        ordering = self.request.query_params.get('ordering', '-created_at')
         if ordering:
             queryset = queryset.order_by(ordering)
+        elif not search:
+            queryset = queryset.order_by('-created_at')
         
         return queryset
     
@@ -186,33 +219,22 @@ class EmployeeListCreateView(generics.ListCreateAPIView):
         """
         重写列表方法，添加分页功能
 
-        - 使用 Django 的 Paginator 实现分页
+        - 默认使用 Django 的 Paginator 实现页码分页
         - 返回统一格式的响应数据
         - 包含分页信息（总页数、当前页、总记录数）
+        - 携带 ?cursor= 时使用游标分页，返回 next / previous 链接
+        - 只读列表使用 values() 快速读取路径（见 api.projections），输出与序列化器一致
+        - 支持 ?fields= / ?exclude= 选择返回字段，只查询选中字段对应的列
         """
-        queryset = self.get_queryset()
-        
-        # 分页处理
-        page = request.query_params.get('page', 1)
-        page_size = request.query_params.get('page_size', 20)
-        
-        try:
-            page = int(page)
-            page_size = int(page_size)
-        except ValueError:
-            page = 1
-            page_size = 20
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
+        projection = self.get_list_projection()
+        queryset = projection.values(self.get_queryset())
         
-        serializer = self.get_serializer(page_obj, many=True)
+        # 分页处理（携带 cursor 参数时使用游标分页）
+        page_obj, page_info = self.paginate_list(queryset)
         
         return Response({
-            'results': serializer.data,
-            'total_pages': paginator.num_pages,
-            'current_page': page,
-            'total_count': paginator.count
+            'results': projection.to_representation(page_obj),
+            **page_info
         })
 
 
@@ -231,9 +253,70 @@ class EmployeeDetailView(generics.RetrieveUpdateDestroyAPIView):
     lookup_field = 'id'  # 使用 UUID 作为查找字段
 
 
+# 员工导入请求体的 Content-Type -> 导入格式
+EMPLOYEE_IMPORT_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+}
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def employee_import_view(request):
+    """
+    批量导入员工（CSV / XLSX）
+    
+    设计思路：
+    - 以 multipart 上传文件（字段名 file，格式由扩展名判断），或直接以文件内容作为请求体
+      （格式由 Content-Type 或 input_format 参数决定）
+    - 工号唯一性按整个文件一次性校验，字段校验在内存中完成，错误行不影响其余数据写入
+    - dry_run=true 时只校验不写入，可用于导入前预检
+    
+    URL: /api/employees/import/
+    """
+    content_type = (request.content_type or '').split(';')[0].strip().lower()
+    input_format = request.query_params.get('input_format')
+
+    if content_type == 'multipart/form-data':
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({
+                'success': False,
+                'error': '请上传文件（字段名 file）'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        input_format = input_format or upload.name.rsplit('.', 1)[-1]
+        content = upload.read()
+    else:
+        input_format = input_format or EMPLOYEE_IMPORT_CONTENT_TYPES.get(content_type, 'csv')
+        content = request.body
+
+    dry_run = request.query_params.get('dry_run', 'false').lower() == 'true'
+    try:
+        chunk_size = int(request.query_params.get('chunk_size', EmployeeImportService.DEFAULT_CHUNK_SIZE))
+    except (ValueError, TypeError):
+        chunk_size = EmployeeImportService.DEFAULT_CHUNK_SIZE
+
+    try:
+        result = EmployeeImportService(chunk_size=max(1, chunk_size), dry_run=dry_run).import_file(
+            content, input_format.lower()
+        )
+    except EmployeeImportError as e:
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    action = '校验' if dry_run else '导入'
+    return Response({
+        'success': True,
+        'message': f'员工{action}完成，通过 {result["valid"]} 行，写入 {result["created"]} 条，失败 {result["failed"]} 行',
+        'data': result
+    })
+
+
 # ==================== 薪资管理视图 ====================
 
-class SalaryRecordListView(generics.ListAPIView):
+class SalaryRecordListView(SparseFieldsMixin, ListPaginationMixin, generics.ListAPIView):
     """
     薪资记录列表视图（仅管理员可访问）
     
@@ -308,32 +391,26 @@ class SalaryRecordListView(generics.ListAPIView):
         return queryset
     
     def list(self, request, *args, **kwargs):
-        """重写列表方法，返回统一格式的响应"""
-        queryset = self.get_queryset()
-        
-        # 分页处理
-        page = request.query_params.get('page', 1)
-        page_size = request.query_params.get('page_size', 20)
-        
-        try:
-            page = int(page)
-            page_size = int(page_size)
-        except ValueError:
-            page = 1
-            page_size = 20
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
+        """
+        重写列表方法，返回统一格式的响应
+
+        使用 values() 快速读取路径（见 api.projections），只查询输出所需的列，输出与序列化器一致；
+        支持 ?fields= / ?exclude= 选择返回字段，未选择员工信息字段时不再关联员工表
+        """
+        projection = self.get_list_projection()
+        queryset = projection.values(self.get_queryset())
         
-        serializer = self.get_serializer(page_obj, many=True)
+        # 分页处理（携带 cursor 参数时使用游标分页）
+        page_obj, page_info = self.paginate_list(queryset)
+        if 'total_count' in page_info:
+            # 薪资列表沿用 count 字段名
+            page_info['count'] = page_info.pop('total_count')
         
         return Response({
             'success': True,
             'data': {
-                'results': serializer.data,
-                'count': paginator.count,
-                'total_pages': paginator.num_pages,
-                'current_page': page
+                'results': projection.to_representation(page_obj),
+                **page_info
             }
         })
 
@@ -361,7 +438,7 @@ def calculate_salary_view(request):
     
     设计思路：
     - 接收员工工号和薪资参数
-    - 自动计算应发和实发工资
+    - 按薪资规则（部门奖金、考勤扣款、社保、个税）计算应发和实发工资
     - 防止重复创建同期薪资记录
     - 创建薪资快照，保证历史数据准确性
     """
@@ -370,7 +447,7 @@ def calculate_salary_view(request):
     
     设计思路：
     - 接收员工工号和薪资参数
-    - 自动计算应发和实发工资
+    - 按薪资规则（部门奖金、考勤扣款、社保、个税）计算应发和实发工资
     - 防止重复创建同期薪资记录
     - 创建薪资快照，保证历史数据准确性
     """
@@ -392,27 +469,23 @@ def calculate_salary_view(request):
                     'error': '该员工在此期间已有薪资记录'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # 薪资计算逻辑
-            base_salary = employee.base_salary
-            gross_salary = base_salary + bonus  # 应发 = 基础 + 奖金
-            net_salary = gross_salary - deductions  # 实发 = 应发 - 扣除
+            # 薪资计算（规则引擎：部门奖金、考勤扣款、社保、个税）
+            amounts = PayrollEngine().calculate_employee(employee, salary_period, bonus, deductions)
             
             # 创建薪资记录（包含快照数据）
             salary_record = SalaryRecord.objects.create(
                 employee=employee,
                 salary_period=salary_period,
-                position_snapshot=employee.position,  # 职位快照
-                base_salary_snapshot=base_salary,     # 基础工资快照
-                bonus=bonus,
-                deductions=deductions,
-                gross_salary=gross_salary,
-                net_salary=net_salary
+                position_snapshot=employee.position,           # 职位快照
+                base_salary_snapshot=employee.base_salary,     # 基础工资快照
+                **{name: amounts[name] for name in RESULT_COLUMNS}  # 金额及规则明细
             )
             
             return Response({
                 'success': True,
                 'message': '薪资计算完成',
-                'data': SalaryRecordSerializer(salary_record).data
+                'data': SalaryRecordSerializer(salary_record).data,
+                'breakdown': {name: str(amounts[name]) for name in BREAKDOWN_COLUMNS}
             }, status=status.HTTP_201_CREATED)
             
         except Employee.DoesNotExist:
@@ -443,8 +516,7 @@ def salary_print_view(request, record_id):
         salary_record = SalaryRecord.objects.select_related('employee').get(id=record_id)
         
         # 权限检查
-        if not (request.user.is_superuser or 
-                request.user.groups.filter(name='Admin').exists()):
+        if not is_admin(request):
             # 这里需要检查是否为员工本人，暂时返回403
             return Response(
                 {'error': '权限不足'}, 
@@ -464,6 +536,10 @@ def salary_print_view(request, record_id):
                 'base_salary': float(salary_record.base_salary_snapshot),
                 'bonus': float(salary_record.bonus),
                 'deductions': float(salary_record.deductions),
+                'department_bonus': float(salary_record.department_bonus),
+                'attendance_deduction': float(salary_record.attendance_deduction),
+                'social_insurance': float(salary_record.social_insurance),
+                'income_tax': float(salary_record.income_tax),
                 'gross_salary': float(salary_record.gross_salary),
                 'net_salary': float(salary_record.net_salary),
             },
@@ -495,8 +571,7 @@ def employee_salary_history_view(request, employee_id):
         employee = Employee.objects.get(employee_id=employee_id)
         
         # 权限检查
-        if not (request.user.is_superuser or 
-                request.user.groups.filter(name='Admin').exists()):
+        if not is_admin(request):
             # 这里需要检查是否为员工本人，暂时返回403
             return Response(
                 {'error': '权限不足'}, 
@@ -538,22 +613,26 @@ def employee_salary_history_view(request, employee_id):
 
 # ==================== 部门管理视图 ====================
 
-class DepartmentListCreateView(generics.ListCreateAPIView):
+class DepartmentListCreateView(BulkCreateMixin, SparseFieldsMixin, ListPaginationMixin, generics.ListCreateAPIView):
     """
     部门列表和创建视图
     
     设计思路：
     - 支持部门的查看和创建
     - 实现搜索、筛选、排序功能
-    - 自动计算部门员工数量
+    - 在查询中聚合部门员工数量，查询次数与分页大小无关
     - 统一的响应格式
     """
     serializer_class = DepartmentSerializer
     permission_classes = [IsAdminOrReadOnly]
     
     def get_queryset(self):
-        """构建部门查询集"""
-        queryset = Department.objects.all()
+        """构建部门查询集（聚合员工数量，避免序列化时逐行 COUNT）"""
+        if self.is_field_selected('employee_count') or self.is_field_selected('active_employee_count'):
+            queryset = Department.objects.with_employee_counts()
+        else:
+            # 未请求员工数量字段时不做聚合
+            queryset = Department.objects.all()
         
         # 搜索功能 - 多字段搜索
         search = self.request.query_params.get('search', None)
@@ -578,32 +657,19 @@ class DepartmentListCreateView(generics.ListCreateAPIView):
         return queryset
     
     def list(self, request, *args, **kwargs):
-        """重写列表方法，添加分页和统一响应格式"""
-        queryset = self.get_queryset()
+        """重写列表方法，添加分页和统一响应格式（支持 ?fields= / ?exclude= 选择返回字段）"""
+        queryset = self.only_selected_columns(self.get_queryset())
         
-        # 分页处理
-        page = request.query_params.get('page', 1)
-        page_size = request.query_params.get('page_size', 20)
+        # 分页处理（携带 cursor 参数时使用游标分页）
+        page_obj, page_info = self.paginate_list(queryset)
         
-        try:
-            page = int(page)
-            page_size = int(page_size)
-        except ValueError:
-            page = 1
-            page_size = 20
-        
-        paginator = Paginator(queryset, page_size)
-        page_obj = paginator.get_page(page)
-        
-        serializer = self.get_serializer(page_obj, many=True)
+        serializer = self.narrow_serializer(self.get_serializer(page_obj, many=True))
         
         return Response({
             'success': True,
             'data': {
                 'results': serializer.data,
-                'total_pages': paginator.num_pages,
-                'current_page': page,
-                'total_count': paginator.count
+                **page_info
             }
         })
     
@@ -611,7 +677,7 @@ class DepartmentListCreateView(generics.ListCreateAPIView):
         """重写创建方法，统一响应格式"""
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
-            department = serializer.save()
+            self.perform_create(serializer)
             return Response({
                 'success': True,
                 'message': '部门创建成功',
@@ -634,7 +700,7 @@ class DepartmentDetailView(generics.RetrieveUpdateDestroyAPIView):
     - 删除前检查是否有关联员工
     - 统一的响应格式
     """
-    queryset = Department.objects.all()
+    queryset = Department.objects.with_employee_counts()
     serializer_class = DepartmentSerializer
     permission_classes = [IsAdminOrReadOnly]
     
@@ -695,6 +761,7 @@ class DepartmentDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@replica_read
 def dashboard_summary_stats(request):
     """
     获取仪表盘总体统计数据
@@ -703,101 +770,16 @@ def dashboard_summary_stats(request):
     - 提供系统关键指标的汇总统计
     - 计算同比增长率
     - 支持考勤率计算
+    - 统计结果由 DashboardStatsService 以条件聚合计算并存入快照，接口只读取快照
     - 异常处理确保系统稳定性
     """
     try:
-        from datetime import datetime, timedelta
-        from django.db.models import Count, Avg, Q
-        from decimal import Decimal
-        
-        # 获取当前月份
-        current_date = datetime.now()
-        current_month = current_date.strftime('%Y-%m')
-        last_month = (current_date - timedelta(days=30)).strftime('%Y-%m')
-        
-        # 员工总数统计
-        total_employees = Employee.objects.count()
-        
-        # 上月员工数量（用于计算增长率）
-        last_month_employees = Employee.objects.filter(
-            created_at__lt=current_date - timedelta(days=30)
-        ).count()
-        
-        # 计算员工增长率
-        if last_month_employees > 0:
-            employee_growth = round(((total_employees - last_month_employees) / last_month_employees) * 100, 1)
-        else:
-            employee_growth = 0
-        
-        # 部门总数统计
-        total_departments = Employee.objects.values('department').distinct().count()
-        
-        # 本月考勤率计算
-        current_month_start = current_date.replace(day=1)
-        total_work_days = (current_date - current_month_start).days + 1
-        
-        # 计算本月出勤记录
-        present_records = AttendanceRecord.objects.filter(
-            date__gte=current_month_start,
-            date__lte=current_date,
-            status__in=['present', 'late', 'early_leave', 'overtime']
-        ).count()
-        
-        # 计算应出勤总数
-        active_employees = Employee.objects.filter(status='active').count()
-        expected_attendance = active_employees * total_work_days
-        
-        # 计算考勤率
-        if expected_attendance > 0:
-            attendance_rate = round((present_records / expected_attendance) * 100, 1)
-        else:
-            attendance_rate = 0
-        
-        # 上月考勤率计算（用于增长率）
-        last_month_start = (current_date - timedelta(days=30)).replace(day=1)
-        last_month_end = current_month_start - timedelta(days=1)
-        last_month_work_days = (last_month_end - last_month_start).days + 1
-        
-        last_month_present = AttendanceRecord.objects.filter(
-            date__gte=last_month_start,
-            date__lte=last_month_end,
-            status__in=['present', 'late', 'early_leave', 'overtime']
-        ).count()
-        
-        last_month_active_employees = Employee.objects.filter(
-            status='active',
-            created_at__lt=current_date - timedelta(days=30)
-        ).count()
-        last_month_expected = last_month_active_employees * last_month_work_days
-        
-        if last_month_expected > 0:
-            last_month_attendance_rate = (last_month_present / last_month_expected) * 100
-            attendance_rate_growth = round(attendance_rate - last_month_attendance_rate, 1)
-        else:
-            attendance_rate_growth = 0
-        
-        # 平均薪资计算
-        avg_salary = Employee.objects.filter(status='active').aggregate(
-            avg_salary=Avg('base_salary')
-        )['avg_salary']
-        
-        if avg_salary:
-            average_salary = int(avg_salary)
-        else:
-            average_salary = 0
-        
-        stats_data = {
-            'totalEmployees': total_employees,
-            'employeeGrowth': employee_growth,
-            'totalDepartments': total_departments,
-            'attendanceRate': attendance_rate,
-            'averageSalary': average_salary,
-            'attendanceRateGrowth': attendance_rate_growth
-        }
+        snapshot = DashboardStatsService().get_summary_snapshot()
         
         return Response({
             'success': True,
-            'data': stats_data
+            'data': snapshot.data,
+            'computed_at': snapshot.computed_at.isoformat()
         })
         
     except Exception as e:
@@ -809,6 +791,8 @@ def dashboard_summary_stats(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cache_response('dashboard_department_distribution', models=[Employee])
+@replica_read
 def dashboard_department_distribution(request):
     """
     获取部门员工分布数据
@@ -817,6 +801,7 @@ def dashboard_department_distribution(request):
     - 统计各部门的员工数量
     - 为饼图或柱状图提供数据
     - 预定义颜色方案，提升视觉效果
+    - 响应按员工模型版本缓存，员工变动后自动失效
     """
     try:
         from django.db.models import Count
@@ -868,6 +853,8 @@ def dashboard_department_distribution(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@cache_response('salary_stats', models=[SalaryRecord, Employee])
+@replica_read
 def salary_stats_view(request):
     """
     获取薪资统计数据
@@ -876,6 +863,7 @@ def salary_stats_view(request):
     - 提供薪资相关的统计指标
     - 按当前月份统计
     - 支持薪资总额和平均薪资计算
+    - 响应按薪资和员工模型版本缓存，写入后自动失效
     """
     try:
         from django.db.models import Count, Sum, Avg
@@ -917,63 +905,41 @@ def salary_stats_view(request):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@replica_read
 def salary_export_view(request):
     """
     导出薪资数据
     
     设计思路：
-    - 生成 CSV 格式的薪资数据导出
+    - 生成 CSV / XLSX 格式的薪资数据导出（export_format=csv|xlsx）
     - 支持按部门和薪资期间筛选
     - 添加 BOM 支持 Excel 中文显示
     - 包含完整的薪资信息
+    - 使用 StreamingHttpResponse 流式输出，支持 gzip=true 压缩传输
     """
     try:
-        import csv
-        from django.http import HttpResponse
-        from io import StringIO
-        
         # 获取筛选参数
         department = request.query_params.get('department', None)
         salary_period = request.query_params.get('salary_period', None)
+        # 注意：DRF 保留了 format 参数用于内容协商，这里使用 export_format
+        export_format = request.query_params.get('export_format', 'csv').lower()
+        compress = request.query_params.get('gzip', 'false').lower() == 'true'
         
-        # 构建查询
-        queryset = SalaryRecord.objects.select_related('employee').all()
+        if export_format not in EXPORT_WRITERS:
+            return Response({
+                'success': False,
+                'error': f'不支持的导出格式: {export_format}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        if department:
-            queryset = queryset.filter(employee__department=department)
-        if salary_period:
-            queryset = queryset.filter(salary_period=salary_period)
+        service = SalaryExportService(department=department, salary_period=salary_period)
+        chunks, writer = service.stream(export_format, compress=compress)
         
-        # 创建CSV响应
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="salary_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        # 添加BOM以支持Excel中文显示
-        response.write('\ufeff')
-        
-        writer = csv.writer(response)
-        
-        # 写入表头
-        writer.writerow([
-            '员工姓名', '工号', '部门', '薪资期间', '职称',
-            '基础工资', '应发工资', '奖金', '扣除', '实发工资', '发放日期'
-        ])
-        
-        # 写入数据
-        for record in queryset:
-            writer.writerow([
-                record.employee.name,
-                record.employee.employee_id,
-                record.employee.department,
-                record.salary_period,
-                record.position_snapshot,
-                float(record.base_salary_snapshot),
-                float(record.gross_salary),
-                float(record.bonus),
-                float(record.deductions),
-                float(record.net_salary),
-                record.pay_date.strftime('%Y-%m-%d') if record.pay_date else ''
-            ])
+        # 流式响应：边查询边输出，内存占用与导出行数无关
+        response = StreamingHttpResponse(chunks, content_type=writer.content_type)
+        filename = f'salary_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{writer.extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        if compress:
+            response['Content-Encoding'] = 'gzip'
         
         return response
         
@@ -984,6 +950,36 @@ def salary_export_view(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats_view(request):
+    """
+    接口响应缓存命中统计
+    
+    设计思路：
+    - 提供各缓存接口的命中、未命中和 304 次数，用于监控缓存效果
+    - 统计为进程内数据，多进程部署时每个 worker 独立计数
+    """
+    return Response({
+        'success': True,
+        'data': cache_stats.snapshot()
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def metrics_view(request):
+    """
+    请求性能指标（Prometheus 文本格式）
+    
+    设计思路：
+    - 按 (请求方法, 路由) 输出请求次数、耗时 / SQL 耗时 / 序列化耗时 / 查询次数直方图和超出预算次数
+    - 同时输出接口缓存命中统计，监控只需抓取一个地址
+    - 统计为进程内数据，多进程部署时每个 worker 独立计数
+    """
+    return HttpResponse(request_metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # ==================== RAG 和 AI 相关视图（暂时注释） ====================
 # 这部分代码为 RAG（检索增强生成）和 AI 聊天功能
 # 由于依赖外部服务，暂时注释保留
@@ -1003,7 +999,7 @@ def calculate_salary_by_employee_view(request, employee_id):
     - 为前端提供更直接的薪资计算接口
     - 使用员工 UUID 而非工号，提高安全性
     - 支持 deduction 和 deductions 两种字段名，保证兼容性
-    - 实现完整的薪资计算逻辑和数据验证
+    - 薪资由规则引擎（payroll_rules_service）计算，响应附带各项明细
     
     URL: /api/salaries/calculate/<employee_id>/
     """
@@ -1025,27 +1021,23 @@ def calculate_salary_by_employee_view(request, employee_id):
     if SalaryRecord.objects.filter(employee=employee, salary_period=salary_period).exists():
         return Response({'success': False, 'error': '该员工在此期间已有薪资记录'}, status=status.HTTP_400_BAD_REQUEST)
 
-    # 薪资计算逻辑
-    base_salary = employee.base_salary
-    gross_salary = base_salary + bonus      # 应发工资 = 基础工资 + 奖金
-    net_salary = gross_salary - deduction   # 实发工资 = 应发工资 - 扣除
+    # 薪资计算（规则引擎：规则计算的部门奖金、考勤扣款、社保、个税单独保存，计入应发 / 实发）
+    amounts = PayrollEngine().calculate_employee(employee, salary_period, bonus, deduction)
 
     # 创建薪资记录，包含快照数据
     salary_record = SalaryRecord.objects.create(
         employee=employee,
         salary_period=salary_period,
-        position_snapshot=employee.position,        # 职位快照
-        base_salary_snapshot=base_salary,          # 基础工资快照
-        bonus=bonus,
-        deductions=deduction,                      # 注意：数据库字段是 deductions
-        gross_salary=gross_salary,
-        net_salary=net_salary
+        position_snapshot=employee.position,              # 职位快照
+        base_salary_snapshot=employee.base_salary,        # 基础工资快照
+        **{name: amounts[name] for name in RESULT_COLUMNS}  # 金额及规则明细，注意：数据库字段是 deductions
     )
 
     return Response({
         'success': True,
         'message': '薪资计算完成',
-        'data': SalaryRecordSerializer(salary_record).data
+        'data': SalaryRecordSerializer(salary_record).data,
+        'breakdown': {name: str(amounts[name]) for name in BREAKDOWN_COLUMNS}
     }, status=status.HTTP_201_CREATED)
 
 
@@ -1057,9 +1049,10 @@ def generate_salaries_view(request):
     
     设计思路：
     - 支持批量薪资生成，提高管理效率
-    - 自动跳过已存在的薪资记录，避免重复
-    - 返回详细的处理结果，包括成功和跳过的记录
-    - 使用事务确保数据一致性
+    - 一次查询获取本期已发薪员工，自动跳过已存在的薪资记录
+    - 使用 PayrollGenerator 分批 bulk_create 写入，事务确保数据一致性；金额由薪资规则引擎对全员按列计算
+    - 返回成功和跳过的数量；include_results=true 时分页返回新建记录
+    - async=true 时只创建 PayrollJob 并立即返回任务 ID，由 run_payroll_worker 异步处理
     
     URL: /api/salaries/generate/
     """
@@ -1071,42 +1064,197 @@ def generate_salaries_view(request):
     if not salary_period or not re.match(r'^\d{4}-\d{2}$', str(salary_period)):
         return Response({'success': False, 'error': '薪资期间格式应为 YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
 
-    created_records = []
-    skipped_employees = []
-
-    # 遍历所有员工进行批量处理
-    for employee in Employee.objects.all():
-        # 跳过已存在记录的员工
-        if SalaryRecord.objects.filter(employee=employee, salary_period=salary_period).exists():
-            skipped_employees.append(employee.employee_id)
-            continue
-
-        # 薪资计算
-        base_salary = employee.base_salary
-        gross_salary = base_salary + bonus
-        net_salary = gross_salary - deduction
-
-        # 创建薪资记录
-        record = SalaryRecord.objects.create(
-            employee=employee,
-            salary_period=salary_period,
-            position_snapshot=employee.position,
-            base_salary_snapshot=base_salary,
-            bonus=bonus,
-            deductions=deduction,
-            gross_salary=gross_salary,
-            net_salary=net_salary
+    # 异步模式：提交任务后立即返回，不占用 HTTP worker
+    run_async = str(request.data.get('async', request.query_params.get('async', 'false'))).lower() == 'true'
+    if run_async:
+        job_fields = {
+            'salary_period': salary_period,
+            'bonus': bonus,
+            'deductions': deduction,
+            'created_by': request.user,
+        }
+        try:
+            chunk_size = int(request.data.get('chunk_size', 1000))
+            job_fields['chunk_size'] = min(max(1, chunk_size), PayrollJob.MAX_CHUNK_SIZE)
+        except (ValueError, TypeError):
+            pass
+        job = PayrollJob.objects.create(**job_fields)
+
+        return Response({
+            'success': True,
+            'message': '薪资生成任务已提交',
+            'data': {
+                'job_id': str(job.id),
+                'status': job.status,
+                'status_url': f'/api/salaries/jobs/{job.id}/'
+            }
+        }, status=status.HTTP_202_ACCEPTED)
+
+    generator = PayrollGenerator(salary_period, bonus=bonus, deductions=deduction)
+    result = generator.generate()
+
+    response_data = {
+        'created_count': result['created_count'],
+        'skipped_count': result['skipped_count'],
+        'skipped_employee_ids': result['skipped_employee_ids']
+    }
+
+    # 可选：分页返回本次新建的薪资记录，避免一次性序列化全部数据
+    include_results = str(request.data.get(
+        'include_results', request.query_params.get('include_results', 'false')
+    )).lower() == 'true'
+    if include_results:
+        page = request.data.get('page', request.query_params.get('page', 1))
+        page_size = request.data.get('page_size', request.query_params.get('page_size', 20))
+
+        try:
+            page = int(page)
+            page_size = int(page_size)
+        except (ValueError, TypeError):
+            page = 1
+            page_size = 20
+
+        paginator = Paginator(result['created_record_ids'], page_size)
+        page_obj = paginator.get_page(page)
+        page_records = SalaryRecord.objects.select_related('employee').filter(
+            id__in=list(page_obj)
         )
-        created_records.append(record)
+
+        response_data['results'] = SalaryRecordSerializer(page_records, many=True).data
+        response_data['total_pages'] = paginator.num_pages
+        response_data['current_page'] = page
+
+    return Response({
+        'success': True,
+        'message': f'批量生成完成，成功 {result["created_count"]} 条，跳过 {result["skipped_count"]} 条',
+        'data': response_data
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def payroll_job_detail_view(request, job_id):
+    """
+    查询薪资生成任务进度
+    
+    设计思路：
+    - 供前端轮询异步薪资生成任务的状态
+    - 返回进度、吞吐量（行/秒）和每批次耗时
+    
+    URL: /api/salaries/jobs/<job_id>/
+    """
+    try:
+        job = PayrollJob.objects.get(id=job_id)
+    except PayrollJob.DoesNotExist:
+        return Response({'success': False, 'error': '任务不存在'}, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'data': job.to_dict()
+    })
+
+# ==================== 考勤数据接口 ====================
+
+# 请求 Content-Type 与导入格式的对应关系
+ATTENDANCE_CONTENT_TYPES = {
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv',
+    'application/json': 'json',
+}
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def attendance_ingest_view(request):
+    """
+    批量导入考勤打卡数据
+    
+    设计思路：
+    - 请求体为 NDJSON / CSV / JSON 数组，格式由 Content-Type 或 input_format 参数决定
+    - 按 (employee, date) 合并打卡事件并批量 upsert，已有记录的签到/签退时间会被合并而非覆盖
+    - 逐行校验，错误行不影响其余数据写入，响应中返回错误明细和导入速度（行/秒）
+    
+    URL: /api/attendance/ingest/
+    """
+    content_type = (request.content_type or '').split(';')[0].strip().lower()
+    input_format = request.query_params.get(
+        'input_format', ATTENDANCE_CONTENT_TYPES.get(content_type, 'ndjson')
+    ).lower()
+
+    if input_format not in ATTENDANCE_INPUT_FORMATS:
+        return Response({
+            'success': False,
+            'error': f'不支持的导入格式: {input_format}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        # 直接读取原始请求体，绕过 DRF 的解析器（不支持 NDJSON / CSV）
+        events = read_events(request.body, input_format)
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({
+            'success': False,
+            'error': f'请求体解析失败: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        batch_size = int(request.query_params.get('batch_size', AttendanceIngestService.DEFAULT_BATCH_SIZE))
+    except (ValueError, TypeError):
+        batch_size = AttendanceIngestService.DEFAULT_BATCH_SIZE
+
+    result = AttendanceIngestService(batch_size=max(1, batch_size)).ingest(events)
+
+    return Response({
+        'success': True,
+        'message': f'考勤导入完成，写入 {result["upserted"]} 条，失败 {result["failed"]} 行',
+        'data': result
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def attendance_trends_view(request):
+    """
+    考勤趋势
+    
+    设计思路：
+    - 只读取考勤汇总表（按日 / 按部门按日），不扫描原始考勤记录
+    - period=7d|30d|90d|12m，或使用 start_date / end_date 指定范围
+    - group_by=day 时缺失日期补零，group_by=month 按月合计
+    - 可按 department 筛选单个部门
+    
+    URL: /api/attendance/trends/
+    """
+    params = request.query_params
+    group_by = params.get('group_by', 'day')
+    if group_by not in ('day', 'month'):
+        return Response({'success': False, 'error': 'group_by 只能为 day 或 month'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        start_date = datetime.strptime(params['start_date'], '%Y-%m-%d').date() if params.get('start_date') else None
+        end_date = datetime.strptime(params['end_date'], '%Y-%m-%d').date() if params.get('end_date') else None
+        start_date, end_date = AttendanceRollupService.resolve_range(
+            params.get('period'), start_date, end_date
+        )
+    except ValueError as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    department = params.get('department') or None
+    service = AttendanceRollupService()
 
     return Response({
         'success': True,
-        'message': f'批量生成完成，成功 {len(created_records)} 条，跳过 {len(skipped_employees)} 条',
         'data': {
-            'created': SalaryRecordSerializer(created_records, many=True).data,
-            'skipped_employee_ids': skipped_employees
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'group_by': group_by,
+            'department': department,
+            'summary': service.get_totals(start_date, end_date, department),
+            'trends': service.get_trends(start_date, end_date, department, group_by),
         }
-    }, status=status.HTTP_201_CREATED)
+    })
+
 
 # ==================== 接口设计说明 ====================
 """
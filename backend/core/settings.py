@@ -49,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.RequestMetricsMiddleware',  # 请求 SQL 次数/耗时统计、Server-Timing、性能预算
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -56,6 +57,7 @@ MIDDLEWARE = [
     'api.middleware.CSRFExemptMiddleware',  # 自定义CSRF豁免中间件
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.PrimaryPinMiddleware',  # 写请求后读取主库（只读副本的读写一致性）
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -95,6 +97,79 @@ DATABASES = {
 }
 
 
+# Cache
+# 通过环境变量 DJANGO_CACHE_BACKEND 选择缓存后端：locmem（默认）/ file / redis
+# 注意：locmem 为进程内缓存，多进程部署时各 worker 的失效版本号互不可见，生产环境建议使用 redis
+CACHE_BACKEND = os.getenv('DJANGO_CACHE_BACKEND', 'locmem')
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vntinit-default',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', os.path.join(BASE_DIR, 'cache')),
+    },
+    'redis': {
+        # 兼容 Redis 协议的服务均可（Redis / KeyDB / Valkey），需要安装 redis 包
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+}
+
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+# 接口响应缓存配置（api.cache.cache_response）
+API_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'CACHE_ALIAS': 'default',
+    'DEFAULT_TIMEOUT': 60,
+    'ENDPOINTS': {
+        'api_info': {'timeout': 3600},
+        'dashboard_department_distribution': {'timeout': 300},
+        'salary_stats': {'timeout': 60},
+    },
+}
+
+# 请求性能监控（api.metrics）：Server-Timing 响应头、/api/metrics/ 直方图、超出预算时记录 warning
+API_METRICS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'QUERY_BUDGET': 30,
+    'LATENCY_BUDGET_MS': 1000,
+    # 按 URL 名称覆盖预算；导入、批量生成等批处理接口不限制查询次数
+    'ROUTE_BUDGETS': {
+        'employee_list_create': {'queries': 10, 'latency_ms': 500},
+        'salary_list': {'queries': 10, 'latency_ms': 500},
+        'department_list_create': {'queries': 10, 'latency_ms': 500},
+        'employee_import': {'queries': None, 'latency_ms': 30000},
+        'generate_salaries': {'queries': None, 'latency_ms': 30000},
+        'attendance_ingest': {'queries': None, 'latency_ms': 30000},
+    },
+}
+
+# 薪资规则（api.services.payroll_rules_service）：计算薪资、按员工计算和批量生成共用
+# 默认不启用（应发 = 基础 + 奖金，实发 = 应发 - 扣除）；配置格式见 PayrollRules 的文档示例，
+# 部门奖金、考勤扣款、社保公积金和个税按项保存在薪资记录中
+PAYROLL_RULES = {}
+
+# 用户角色（组）进程内缓存（api.roles），组成员变化时通过信号失效
+ROLE_CACHE_TIMEOUT = 60
+ROLE_CACHE_MAX_ENTRIES = 10000
+
+# Token 认证（api.authentication.CachedTokenAuthentication）
+TOKEN_AUTH = {
+    'EXPIRE_AFTER': int(os.getenv('TOKEN_EXPIRE_AFTER', 7 * 24 * 3600)),  # 闲置过期时间（秒）
+    'REFRESH_INTERVAL': 3600,   # 滑动续期最小间隔（秒）
+    'CACHE_TIMEOUT': 60,        # 进程内缓存时间（秒），多进程部署时也是登出在其他 worker 生效的最长延迟
+    'CACHE_MAX_ENTRIES': 10000,
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -145,7 +220,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -158,7 +233,8 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        # 与 JSONRenderer 输出一致，安装 orjson 时使用 orjson 编码
+        'api.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -169,6 +245,18 @@ REST_FRAMEWORK = {
     'TEST_REQUEST_DEFAULT_FORMAT': 'json',
 }
 
+# 列表分页总数设置
+# 精确总数缓存时间（秒），模型写入时自动失效
+LIST_COUNT_CACHE_TIMEOUT = 30
+# 无筛选条件时，PostgreSQL 表行数估算值超过该阈值则使用估算总数
+LIST_COUNT_ESTIMATE_THRESHOLD = 100000
+
+# 仪表盘快照最长有效期（秒），超过后读取时重新计算
+DASHBOARD_SNAPSHOT_MAX_AGE = 300
+
+# 只读副本：用户写入后固定读取主库的时间（秒），见 api.db_router
+REPLICA_STICKY_SECONDS = 10
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # Nuxt.js 开发服务器
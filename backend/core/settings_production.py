@@ -0,0 +1,97 @@
+"""
+生产环境配置
+
+用法：
+    DJANGO_SETTINGS_MODULE=core.settings_production gunicorn core.wsgi
+
+在开发配置（core.settings）基础上，通过环境变量覆盖数据库连接等设置，未设置的变量沿用开发默认值。
+
+数据库连接（两种模式二选一）：
+- 持久连接（默认）：CONN_MAX_AGE 秒内复用连接，CONN_HEALTH_CHECKS 在复用前检测连接是否可用
+- 连接池（DB_POOL=true）：使用 psycopg 3 的连接池（需要安装 psycopg[binary,pool]），
+  Django 要求此时 CONN_MAX_AGE 为 0，连接由连接池复用
+
+环境变量：
+    DJANGO_SECRET_KEY / DJANGO_DEBUG / DJANGO_ALLOWED_HOSTS
+    DB_NAME / DB_USER / DB_PASSWORD / DB_HOST / DB_PORT
+    DB_CONN_MAX_AGE（默认 60）/ DB_CONN_HEALTH_CHECKS（默认 true）/ DB_CONNECT_TIMEOUT（默认 5）
+    DB_POOL（默认 false）/ DB_POOL_MIN_SIZE（默认 2）/ DB_POOL_MAX_SIZE（默认 10）/ DB_POOL_TIMEOUT（默认 10）
+    DB_REPLICA_HOST 等 DB_REPLICA_* 变量：配置只读副本（未设置的项沿用主库配置）
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES as DEV_DATABASES
+
+
+def env_bool(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else default
+
+
+def database_from_env(prefix, fallback):
+    """
+    根据环境变量构建数据库配置
+
+    Args:
+        prefix: 环境变量前缀，如 DB_ / DB_REPLICA_
+        fallback: 未设置环境变量时沿用的配置
+    """
+    config = {
+        'ENGINE': fallback['ENGINE'],
+        'NAME': os.getenv(f'{prefix}NAME', fallback['NAME']),
+        'USER': os.getenv(f'{prefix}USER', fallback['USER']),
+        'PASSWORD': os.getenv(f'{prefix}PASSWORD', fallback['PASSWORD']),
+        'HOST': os.getenv(f'{prefix}HOST', fallback['HOST']),
+        'PORT': os.getenv(f'{prefix}PORT', fallback['PORT']),
+        'OPTIONS': {
+            'connect_timeout': env_int('DB_CONNECT_TIMEOUT', 5),
+        },
+    }
+
+    if env_bool('DB_POOL'):
+        from psycopg_pool import ConnectionPool
+
+        # 连接池模式：连接由 psycopg_pool 管理，不能与持久连接同时使用
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': env_int('DB_POOL_MAX_SIZE', 10),
+            'timeout': env_int('DB_POOL_TIMEOUT', 10),
+            # 从连接池取出连接时先检测是否可用（连接池模式下的健康检查）
+            'check': ConnectionPool.check_connection,
+        }
+    else:
+        config['CONN_MAX_AGE'] = env_int('DB_CONN_MAX_AGE', 60)
+        config['CONN_HEALTH_CHECKS'] = env_bool('DB_CONN_HEALTH_CHECKS', True)
+
+    return config
+
+
+SECRET_KEY = os.getenv('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+DEBUG = env_bool('DJANGO_DEBUG', False)
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in os.getenv('DJANGO_ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)).split(',')  # noqa: F405
+    if host.strip()
+]
+CORS_ALLOW_ALL_ORIGINS = DEBUG
+
+DATABASES = {
+    'default': database_from_env('DB_', DEV_DATABASES['default']),
+}
+
+# 只读副本（可选）：配置 DB_REPLICA_HOST 后启用，由 api.db_router 将指定的只读查询路由到副本
+if os.getenv('DB_REPLICA_HOST'):
+    DATABASES['replica'] = database_from_env('DB_REPLICA_', DATABASES['default'])
+    # 测试时副本指向主库的测试数据库，不单独创建
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['api.db_router.ReadReplicaRouter']
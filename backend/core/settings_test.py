@@ -0,0 +1,36 @@
+"""
+测试配置
+
+用法：
+    python manage.py test api --settings=core.settings_test
+
+使用两个 SQLite 数据库（default / replica，测试时均为内存数据库），不需要 PostgreSQL 即可运行测试，
+同时可以验证只读副本路由（api.db_router）。副本不镜像主库，测试可以分别写入两个库以区分读取来源。
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_default.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'test_replica.sqlite3',
+    },
+}
+DATABASE_ROUTERS = ['api.db_router.ReadReplicaRouter']
+# 测试副本是独立的数据库，需要执行迁移建表（生产环境副本的表结构由主库复制）
+REPLICA_ALLOW_MIGRATE = True
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vntinit-test',
+    },
+}
+
+# 加快测试中的用户创建
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']